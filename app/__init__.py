@@ -1,9 +1,37 @@
 import os
 from flask import Flask
+from sqlalchemy import event as sa_event
 from app.server import bp
 from app.models import db
+from app.services.ReadingBuffer import reading_buffer
+from app.services.RetentionManager import retention_manager
+from app.services.ConfigCache import config_cache
+from app.services.HardwareService import hardware_service
+from app.services.HardwareIPC import HardwareClient
+from app.config import HARDWARE_SOCKET
 
-def create_app():
+def _set_sqlite_pragmas(dbapi_connection, connection_record):
+    """
+    WAL journaling with synchronous=NORMAL only fsyncs at checkpoints instead of
+    on every commit, and lets web requests read while the flusher writes.
+    Incremental auto-vacuum lets the retention manager shrink the file; it only
+    takes effect on new databases, existing ones are converted offline by vacuum.py.
+    """
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA auto_vacuum=INCREMENTAL")
+    cursor.execute("PRAGMA journal_mode=WAL")
+    cursor.execute("PRAGMA synchronous=NORMAL")
+    cursor.close()
+
+def create_app(test_config=None, owns_hardware=None):
+    """
+    Build the application.
+
+    Args:
+        test_config (Optional[dict]): Flask config overrides.
+        owns_hardware (Optional[bool]): Whether this process drives the GPIO pins itself.
+            Defaults to True unless HARDWARE_SOCKET names a hardware daemon to use instead.
+    """
     # __file__ lives in your_project/app/__init__.py
     pkg_root = os.path.abspath(os.path.dirname(__file__))
 
@@ -17,13 +45,21 @@ def create_app():
     # Configure SQLite database
     app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///' + os.path.join(pkg_root, 'growlab.db')
     app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+    app.config['HARDWARE_SOCKET'] = HARDWARE_SOCKET
+    if test_config is not None:
+        app.config.update(test_config)
     
     # Initialize database
     db.init_app(app)
     
     # Create tables if they don't exist
     with app.app_context():
+        sa_event.listen(db.engine, 'connect', _set_sqlite_pragmas)
         db.create_all()
+        # Move any rows left in the legacy joined-table readings into sensor_reading
+        from app.services.ReadingStore import ReadingStore
+        ReadingStore().migrate_legacy_readings()
+
         # Initialize with default config if none exists
         from app.models import Config
         if not Config.query.first():
@@ -50,5 +86,16 @@ def create_app():
                 db.session.add(event)
             db.session.commit()
     
+    reading_buffer.init_app(app)
+    config_cache.init_app(app)
+    if owns_hardware is None:
+        owns_hardware = not app.config['HARDWARE_SOCKET']
+    if owns_hardware:
+        # Background maintenance runs once, alongside the hardware
+        retention_manager.init_app(app)
+        hardware_service.init_app(app)
+    else:
+        # Stateless web worker: the hardware daemon owns the pins
+        HardwareClient(app.config['HARDWARE_SOCKET']).init_app(app)
     app.register_blueprint(bp)
     return app
\ No newline at end of file
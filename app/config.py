@@ -5,4 +5,83 @@ from dotenv import load_dotenv
 load_dotenv()
 
 # Debug mode configuration
-DEBUG_MODE = os.getenv('DEBUG_MODE', 'false').lower() in ('true', '1', 't') 
\ No newline at end of file
+DEBUG_MODE = os.getenv('DEBUG_MODE', 'false').lower() in ('true', '1', 't')
+
+# Reading ingestion buffer: samples held in memory before producers block,
+# and the size/age thresholds that trigger a bulk flush to the database
+READING_BUFFER_MAX_SIZE = int(os.getenv('READING_BUFFER_MAX_SIZE', '10000'))
+READING_BUFFER_FLUSH_SIZE = int(os.getenv('READING_BUFFER_FLUSH_SIZE', '500'))
+READING_BUFFER_FLUSH_INTERVAL = float(os.getenv('READING_BUFFER_FLUSH_INTERVAL', '5.0'))
+
+# Retention: days of history kept per table (0 keeps it forever), rows deleted
+# per transaction, and hours between retention passes
+RETENTION_RAW_DAYS = int(os.getenv('RETENTION_RAW_DAYS', '7'))
+RETENTION_MINUTE_ROLLUP_DAYS = int(os.getenv('RETENTION_MINUTE_ROLLUP_DAYS', '90'))
+RETENTION_HOUR_ROLLUP_DAYS = int(os.getenv('RETENTION_HOUR_ROLLUP_DAYS', '0'))
+RETENTION_DAY_ROLLUP_DAYS = int(os.getenv('RETENTION_DAY_ROLLUP_DAYS', '0'))
+RETENTION_LOG_DAYS = int(os.getenv('RETENTION_LOG_DAYS', '30'))
+RETENTION_CHUNK_SIZE = int(os.getenv('RETENTION_CHUNK_SIZE', '1000'))
+RETENTION_INTERVAL_HOURS = float(os.getenv('RETENTION_INTERVAL_HOURS', '6'))
+
+# DHT11 reads: seconds a good value is served from cache, and seconds a read
+# keeps retrying before it falls back to the last good value
+DHT_CACHE_TTL = float(os.getenv('DHT_CACHE_TTL', '2.0'))
+DHT_RETRY_DEADLINE = float(os.getenv('DHT_RETRY_DEADLINE', '5.0'))
+
+# 1-wire temperature probes: sysfs directory and seconds between bulk conversions
+ONE_WIRE_ROOT = os.getenv('ONE_WIRE_ROOT', '/sys/bus/w1/devices')
+ONE_WIRE_POLL_INTERVAL = float(os.getenv('ONE_WIRE_POLL_INTERVAL', '5.0'))
+
+# Ultrasonic water level: measure in a separate worker process, optionally
+# pinned to one CPU core, every ULTRASONIC_WORKER_INTERVAL seconds
+ULTRASONIC_ISOLATED = os.getenv('ULTRASONIC_ISOLATED', 'false').lower() in ('true', '1', 't')
+ULTRASONIC_WORKER_CPU = int(os.getenv('ULTRASONIC_WORKER_CPU')) if os.getenv('ULTRASONIC_WORKER_CPU') else None
+ULTRASONIC_WORKER_INTERVAL = float(os.getenv('ULTRASONIC_WORKER_INTERVAL', '1.0'))
+
+# Sensor acquisition: threads polling sensors concurrently
+ACQUISITION_WORKERS = int(os.getenv('ACQUISITION_WORKERS', '4'))
+
+# Seconds the all-sensor snapshot waits before returning what has finished
+SNAPSHOT_TIMEOUT = float(os.getenv('SNAPSHOT_TIMEOUT', '2.0'))
+
+# Live event stream: events kept for clients resuming with Last-Event-ID, and
+# seconds of silence before a keep-alive comment is sent
+EVENT_REPLAY_SIZE = int(os.getenv('EVENT_REPLAY_SIZE', '1000'))
+EVENT_HEARTBEAT_INTERVAL = float(os.getenv('EVENT_HEARTBEAT_INTERVAL', '15.0'))
+
+# Unix socket of the hardware daemon (daemon.py). When set, web processes
+# reach the GPIO pins through the daemon instead of driving them directly
+HARDWARE_SOCKET = os.getenv('HARDWARE_SOCKET', '')
+
+# Route all GPIO access through one I/O thread with a command queue
+GPIO_DISPATCHER = os.getenv('GPIO_DISPATCHER', 'true').lower() in ('true', '1', 't')
+
+# Seconds between switching on consecutive relays in a bulk change, so
+# loads do not start drawing inrush current together (0 switches them at once)
+RELAY_INRUSH_DELAY = float(os.getenv('RELAY_INRUSH_DELAY', '0.0'))
+
+# Seconds between checkpoints of the relay runtime counters to the database
+RUNTIME_CHECKPOINT_INTERVAL = float(os.getenv('RUNTIME_CHECKPOINT_INTERVAL', '300'))
+
+# PWM dimming: frequency in Hz of the light and heater outputs (0 keeps them
+# plain on/off relays), whether pins 12, 13, 18 and 19 use pigpio hardware
+# PWM, microseconds the software PWM thread busy-waits before each edge, and
+# seconds between duty updates while a hardware PWM ramp runs
+LIGHT_PWM_FREQUENCY = float(os.getenv('LIGHT_PWM_FREQUENCY', '0'))
+HEATER_PWM_FREQUENCY = float(os.getenv('HEATER_PWM_FREQUENCY', '0'))
+PWM_HARDWARE = os.getenv('PWM_HARDWARE', 'true').lower() in ('true', '1', 't')
+PWM_SPIN_US = float(os.getenv('PWM_SPIN_US', '200'))
+PWM_RAMP_STEP = float(os.getenv('PWM_RAMP_STEP', '0.02'))
+
+# Automatic control: whether the control engine switches the outputs from the
+# Config thresholds, how far above light_threshold the light level must rise
+# before the light is turned off again, and how far below
+# water_level_threshold_low the measured distance down to the water must fall
+# (the tank refilled) before the pump may run again
+CONTROL_ENGINE = os.getenv('CONTROL_ENGINE', 'false').lower() in ('true', '1', 't')
+CONTROL_LIGHT_BAND = float(os.getenv('CONTROL_LIGHT_BAND', '5'))
+CONTROL_WATER_LEVEL_BAND = float(os.getenv('CONTROL_WATER_LEVEL_BAND', '2'))
+
+# Seconds without a sample of a rule's input after which the control engine
+# forces the rule's output off; the default is three polls of the slowest sensor
+CONTROL_STALE_AFTER = float(os.getenv('CONTROL_STALE_AFTER', '90'))
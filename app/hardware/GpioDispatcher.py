@@ -0,0 +1,276 @@
+from collections import deque
+from typing import Callable, Dict, Optional
+import queue
+import threading
+import time
+
+try:
+    import RPi.GPIO as GPIO
+except (ImportError, RuntimeError):
+    from unittest.mock import MagicMock
+    GPIO = MagicMock()
+
+class GpioCommand:
+    """
+    One queued unit of GPIO work.
+
+    Attributes:
+        kind (str): 'output' for pin writes, 'call' for any other GPIO function.
+        values (Dict[int, object]): Pin levels to write, for 'output' commands.
+        enqueued_ns (int): Monotonic time the command was queued.
+        done (threading.Event): Set once the command has been applied.
+        result: The return value of a 'call' command.
+        error (Optional[BaseException]): What the command raised.
+    """
+    __slots__ = ('kind', 'values', 'function', 'args', 'kwargs', 'enqueued_ns', 'done', 'result', 'error')
+
+    def __init__(
+            self,
+            kind: str,
+            values: Optional[Dict[int, object]] = None,
+            function: Optional[Callable] = None,
+            args: tuple = (),
+            kwargs: Optional[dict] = None
+        ):
+        self.kind = kind
+        self.values = values
+        self.function = function
+        self.args = args
+        self.kwargs = kwargs or {}
+        self.enqueued_ns = time.monotonic_ns()
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+class GpioDispatcher:
+    """
+    Single owner of GPIO access.
+
+    While running, every write and setup goes through a queue drained by one
+    I/O thread, so concurrent requests can no longer interleave GPIO.setup and
+    GPIO.output calls on shared pins. The thread keeps a shadow register of
+    the level last written to each pin and drops writes that would not change
+    it. Pin writes queued together in the same tick are merged, the last level
+    per pin winning, into one multi-channel GPIO.output call. Any other GPIO
+    call (setup, input, cleanup) is a barrier: pending writes are applied
+    before it, preserving order.
+
+    When the dispatcher is not running, calls go straight to GPIO on the
+    caller's thread, which is what scripts and unit tests get.
+    """
+
+    def __init__(self, gpio=GPIO, history: int = 1000):
+        """
+        Initialize the dispatcher without starting it.
+
+        Args:
+            gpio: The RPi.GPIO module, or a stand-in.
+            history (int): Command latencies kept for percentiles.
+        """
+        self.gpio = gpio
+        self._queue = queue.SimpleQueue()
+        self._lock = threading.Lock()
+        self._shadow = {}  # pin -> level last written
+        self._latencies = deque(maxlen=history)  # nanoseconds from enqueue to applied
+        self._thread = None
+        self.commands = 0
+        self.writes = 0
+        self.dropped = 0
+        self.coalesced = 0
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None
+
+    def start(self):
+        """
+        Start the I/O thread.
+        """
+        with self._lock:
+            if self._thread is not None:
+                return
+            # Levels written before are not known to still hold
+            self._shadow.clear()
+            self._thread = threading.Thread(target=self._run, name="GpioDispatcher", daemon=True)
+            self._thread.start()
+        print(f"[{time.strftime('%m-%d-%Y %H:%M:%S')}] - (GpioDispatcher) I/O thread started")
+
+    def stop(self):
+        """
+        Apply the queued commands and stop the I/O thread; later calls run on the caller's thread.
+        """
+        with self._lock:
+            thread, self._thread = self._thread, None
+            if thread is not None:
+                self._queue.put(None)
+        if thread is not None:
+            thread.join()
+
+    def output(self, pin: int, value, wait: bool = True) -> Optional[GpioCommand]:
+        """
+        Drive one output pin.
+
+        Args:
+            pin (int): The BCM pin number.
+            value: GPIO.HIGH/True or GPIO.LOW/False.
+            wait (bool): Whether to block until the write has been applied.
+
+        Returns:
+            Optional[GpioCommand]: The queued command, None if it ran inline.
+        """
+        return self.output_many({pin: value}, wait)
+
+    def output_many(self, values: Dict[int, object], wait: bool = True) -> Optional[GpioCommand]:
+        """
+        Drive several output pins in one call.
+
+        Args:
+            values (Dict[int, object]): Levels keyed by BCM pin number.
+            wait (bool): Whether to block until the writes have been applied.
+
+        Returns:
+            Optional[GpioCommand]: The queued command, None if it ran inline.
+        """
+        command = GpioCommand('output', values=dict(values))
+        if not self._queued(command):
+            # Direct writes keep every call, as GPIO would
+            for pin, value in command.values.items():
+                self.gpio.output(pin, value)
+                self._shadow[pin] = value
+            return None
+        if wait:
+            command.done.wait()
+            if command.error is not None:
+                raise command.error
+        return command
+
+    def setup(self, pin: int, mode, **kwargs):
+        """
+        Configure a pin, forgetting its shadowed level.
+        """
+        def setup():
+            self._shadow.pop(pin, None)
+            self.gpio.setup(pin, mode, **kwargs)
+        self.call(setup)
+
+    def input(self, pin: int):
+        """
+        Read a pin after every write queued before it.
+        """
+        return self.call(self.gpio.input, pin)
+
+    def cleanup(self, *args):
+        """
+        Release pins, forgetting every shadowed level.
+        """
+        def cleanup():
+            self._shadow.clear()
+            self.gpio.cleanup(*args)
+        self.call(cleanup)
+
+    def call(self, function: Callable, *args, **kwargs):
+        """
+        Run a GPIO function on the I/O thread and return its result.
+
+        Args:
+            function (Callable): Called with the arguments; it may make several GPIO calls that must not be interleaved.
+        """
+        command = GpioCommand('call', function=function, args=args, kwargs=kwargs)
+        if not self._queued(command):
+            return function(*args, **kwargs)
+        command.done.wait()
+        if command.error is not None:
+            raise command.error
+        return command.result
+
+    def stats(self) -> dict:
+        """
+        Return command counts and enqueue-to-applied latency percentiles in microseconds.
+        """
+        with self._lock:
+            latencies = sorted(self._latencies)
+            stats = {
+                'running': self.running,
+                'commands': self.commands,
+                'writes': self.writes,
+                'dropped': self.dropped,
+                'coalesced': self.coalesced,
+            }
+        for name, fraction in (('p50', 0.5), ('p99', 0.99)):
+            stats[f'latency_{name}_us'] = round(latencies[min(len(latencies) - 1, int(len(latencies) * fraction))] / 1000, 1) if latencies else None
+        stats['latency_max_us'] = round(latencies[-1] / 1000, 1) if latencies else None
+        return stats
+
+    def _queued(self, command: GpioCommand) -> bool:
+        """
+        Queue a command for the I/O thread, or return False to run it on the caller's thread.
+        """
+        with self._lock:
+            if self._thread is None or self._thread is threading.current_thread():
+                return False
+            self._queue.put(command)
+        return True
+
+    def _run(self):
+        while True:
+            batch = [self._queue.get()]
+            # Everything queued while the previous tick ran is handled in this one
+            while True:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            stopping = None in batch
+            pending = {}
+            waiting = []
+            for command in batch:
+                if command is None:
+                    continue
+                if command.kind == 'output':
+                    pending.update(command.values)
+                    waiting.append(command)
+                    continue
+                self._flush(pending, waiting)
+                pending, waiting = {}, []
+                try:
+                    command.result = command.function(*command.args, **command.kwargs)
+                except BaseException as e:
+                    command.error = e
+                self._complete(command)
+            self._flush(pending, waiting)
+            if stopping:
+                return
+
+    def _flush(self, pending: Dict[int, object], waiting: list):
+        """
+        Write the merged pin levels in one GPIO.output call and release their commands.
+        """
+        if not waiting:
+            return
+        requested = sum(len(command.values) for command in waiting)
+        changes = {pin: value for pin, value in pending.items() if pin not in self._shadow or self._shadow[pin] != value}
+        try:
+            if len(changes) == 1:
+                (pin, value), = changes.items()
+                self.gpio.output(pin, value)
+            elif changes:
+                self.gpio.output(list(changes), list(changes.values()))
+            self._shadow.update(changes)
+        except Exception as e:
+            print(f"[{time.strftime('%m-%d-%Y %H:%M:%S')}] - (GpioDispatcher) Error writing pins {sorted(changes)}: {str(e)}")
+            for command in waiting:
+                command.error = e
+        with self._lock:
+            self.writes += len(changes)
+            self.dropped += len(pending) - len(changes)
+            self.coalesced += requested - len(pending)
+        for command in waiting:
+            self._complete(command)
+
+    def _complete(self, command: GpioCommand):
+        with self._lock:
+            self.commands += 1
+            self._latencies.append(time.monotonic_ns() - command.enqueued_ns)
+        command.done.set()
+
+gpio_dispatcher = GpioDispatcher()
@@ -0,0 +1,402 @@
+from app.config import PWM_HARDWARE, PWM_SPIN_US, PWM_RAMP_STEP
+from collections import deque
+from typing import Dict, Optional
+import heapq
+import itertools
+import math
+import threading
+import time
+
+try:
+    import RPi.GPIO as GPIO
+except (ImportError, RuntimeError):
+    from unittest.mock import MagicMock
+    GPIO = MagicMock()
+
+try:
+    import pigpio
+except ImportError:
+    pigpio = None
+
+# Pin levels are written as True/False, which RPi.GPIO accepts in place of HIGH/LOW
+
+# BCM pins that can carry the SoC's hardware PWM, and the PWM channel each one uses
+HARDWARE_PWM_PINS = {12: 0, 18: 0, 13: 1, 19: 1}
+
+class PwmChannel:
+    """
+    One PWM output and its duty-cycle ramp.
+
+    Attributes:
+        pin (int): The BCM pin number.
+        frequency (float): PWM frequency in Hz.
+        period (float): Seconds per PWM cycle.
+        hardware (bool): Whether the SoC's PWM peripheral drives the pin.
+        duty (float): Target duty cycle between 0.0 and 1.0.
+        level: Level last written to the pin by the software PWM, None before the first edge.
+        periods (int): Software PWM cycles started.
+    """
+    __slots__ = ('pin', 'frequency', 'period', 'hardware', 'duty', 'level', 'periods', 'generation', '_start_duty', '_ramp_start', '_ramp_end')
+
+    def __init__(self, pin: int, frequency: float, hardware: bool = False):
+        self.pin = pin
+        self.frequency = frequency
+        self.period = 1.0 / frequency
+        self.hardware = hardware
+        self.duty = 0.0
+        self.level = None
+        self.periods = 0
+        self.generation = 0  # Bumped to invalidate queued edges
+        self._start_duty = 0.0
+        self._ramp_start = 0.0
+        self._ramp_end = 0.0
+
+    def set(self, duty: float, ramp: float, now: float):
+        """
+        Move towards a new duty cycle, linearly over ramp seconds from the current one.
+        """
+        self._start_duty = self.duty_at(now)
+        self.duty = duty
+        self._ramp_start = now
+        self._ramp_end = now + max(ramp, 0.0)
+
+    def ramping(self, now: float) -> bool:
+        return now < self._ramp_end
+
+    def duty_at(self, now: float) -> float:
+        """
+        Return the duty cycle at a perf_counter time, following the ramp in progress.
+        """
+        if now >= self._ramp_end:
+            return self.duty
+        fraction = (now - self._ramp_start) / (self._ramp_end - self._ramp_start)
+        return self._start_duty + (self.duty - self._start_duty) * fraction
+
+    def to_dict(self, now: Optional[float] = None) -> dict:
+        now = time.perf_counter() if now is None else now
+        return {
+            'pin': self.pin,
+            'frequency': self.frequency,
+            'hardware': self.hardware,
+            'duty': round(self.duty_at(now), 4),
+            'target': self.duty,
+            'ramping': self.ramping(now),
+        }
+
+class PwmEngine:
+    """
+    Drives PWM outputs, in hardware where the pin allows it and in software otherwise.
+
+    Pins wired to one of the SoC's two PWM channels use pigpio's hardware PWM
+    when the pigpio daemon is reachable, which costs no CPU and has no
+    jitter. Every other pin gets software PWM from one thread shared by all
+    channels: edges are kept in a heap of absolute perf_counter deadlines, so
+    timing errors do not accumulate from one cycle to the next, and the thread
+    sleeps until just before an edge and busy-waits the last spin_us
+    microseconds to hit it precisely. Edges of several channels falling due
+    together are written in one multi-channel GPIO.output call. Duty cycles at
+    0 or 1 park the channel at a steady level instead of producing edges.
+    Ramps are followed edge by edge in software, and in ramp_step increments
+    for hardware channels.
+
+    Software PWM pins are written by the engine thread directly, not through
+    the GpioDispatcher queue, whose latency would show up as jitter; the pins
+    belong to the engine while attached. When the thread is not running a
+    software channel can only be fully on or off: any duty above zero is
+    written as HIGH on the caller's thread, which is what scripts and unit
+    tests get.
+    """
+
+    def __init__(
+            self,
+            gpio=GPIO,
+            hardware: bool = PWM_HARDWARE,
+            spin_us: float = PWM_SPIN_US,
+            ramp_step: float = PWM_RAMP_STEP,
+            history: int = 1000
+        ):
+        """
+        Initialize the engine without starting its thread.
+
+        Args:
+            gpio: The RPi.GPIO module, or a stand-in.
+            hardware (bool): Whether to use pigpio hardware PWM on capable pins.
+            spin_us (float): Microseconds busy-waited before each software edge.
+            ramp_step (float): Seconds between duty updates of a ramping hardware channel.
+            history (int): Edge latencies kept for percentiles.
+        """
+        self.gpio = gpio
+        self.hardware = hardware
+        self.spin = spin_us / 1e6
+        self.ramp_step = ramp_step
+        self._channels: Dict[int, PwmChannel] = {}
+        self._heap = []
+        self._sequence = itertools.count()
+        self._condition = threading.Condition()
+        self._lateness = deque(maxlen=history)  # Seconds each edge was written after its deadline
+        self._thread = None
+        self._stopping = False
+        self._pi = None
+        self.edges = 0
+        self.writes = 0
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None
+
+    def start(self):
+        """
+        Start the software PWM thread.
+        """
+        with self._condition:
+            if self._thread is not None:
+                return
+            self._stopping = False
+            now = time.perf_counter()
+            for channel in self._channels.values():
+                if not channel.hardware:
+                    self._restart(channel, now)
+            self._thread = threading.Thread(target=self._run, name="PwmEngine", daemon=True)
+            self._thread.start()
+        print(f"[{time.strftime('%m-%d-%Y %H:%M:%S')}] - (PwmEngine) Software PWM thread started")
+
+    def stop(self):
+        """
+        Stop the software PWM thread, leaving each software channel fully on or off.
+        """
+        with self._condition:
+            thread, self._thread = self._thread, None
+            self._stopping = True
+            self._condition.notify()
+        if thread is None:
+            return
+        thread.join()
+        with self._condition:
+            self._heap.clear()
+            for channel in self._channels.values():
+                if not channel.hardware:
+                    self._write({channel.pin: channel.duty > 0})
+
+    def attach(self, pin: int, frequency: float) -> PwmChannel:
+        """
+        Start driving a pin with PWM at zero duty, replacing any earlier channel on it.
+
+        Args:
+            pin (int): The BCM pin number, already set up as an output.
+            frequency (float): PWM frequency in Hz.
+
+        Returns:
+            PwmChannel: The new channel.
+
+        Raises:
+            ValueError: If the frequency is not positive.
+        """
+        if frequency <= 0:
+            raise ValueError(f"PWM frequency must be positive, got {frequency}")
+        self.detach(pin)
+        with self._condition:
+            channel = PwmChannel(pin, frequency, self._claim_hardware(pin))
+            self._channels[pin] = channel
+            if channel.hardware:
+                self._pi.hardware_PWM(pin, int(frequency), 0)
+            else:
+                self._write({pin: False})
+        mode = 'hardware' if channel.hardware else 'software'
+        print(f"[{time.strftime('%m-%d-%Y %H:%M:%S')}] - (PwmEngine) Pin {pin} driven by {mode} PWM at {frequency} Hz")
+        return channel
+
+    def detach(self, pin: int):
+        """
+        Stop driving a pin with PWM and leave it LOW.
+        """
+        with self._condition:
+            channel = self._channels.pop(pin, None)
+            if channel is None:
+                return
+            channel.generation += 1
+            if channel.hardware:
+                self._pi.hardware_PWM(pin, 0, 0)
+            else:
+                self._write({pin: False})
+
+    def get(self, pin: int) -> Optional[PwmChannel]:
+        """
+        Return the channel attached to a pin, or None.
+        """
+        with self._condition:
+            return self._channels.get(pin)
+
+    def set_duty(self, pin: int, duty: float, ramp: float = 0.0):
+        """
+        Change the duty cycle of an attached pin.
+
+        Args:
+            pin (int): The BCM pin number.
+            duty (float): Duty cycle between 0.0 and 1.0.
+            ramp (float): Seconds to move there linearly from the current duty cycle; ramps need the thread running.
+
+        Raises:
+            KeyError: If no channel is attached to the pin.
+            ValueError: If the duty cycle is outside 0.0 to 1.0 or the ramp is negative or not finite.
+        """
+        if not 0.0 <= duty <= 1.0:
+            raise ValueError(f"Duty cycle must be between 0 and 1, got {duty}")
+        # A NaN ramp end would make every duty NaN and park the pin HIGH
+        if not math.isfinite(ramp) or ramp < 0:
+            raise ValueError(f"Ramp must be a finite number of seconds >= 0, got {ramp}")
+        with self._condition:
+            channel = self._channels[pin]
+            now = time.perf_counter()
+            channel.set(duty, ramp if self.running else 0.0, now)
+            if channel.hardware:
+                self._apply_hardware(channel, now)
+            elif self.running:
+                self._restart(channel, now)
+            else:
+                self._write({pin: duty > 0})
+
+    def channels(self) -> Dict[int, dict]:
+        """
+        Return every attached channel's settings keyed by pin.
+        """
+        with self._condition:
+            now = time.perf_counter()
+            return {pin: channel.to_dict(now) for pin, channel in self._channels.items()}
+
+    def stats(self) -> dict:
+        """
+        Return edge counts and edge lateness percentiles in microseconds.
+        """
+        with self._condition:
+            lateness = sorted(self._lateness)
+            stats = {
+                'running': self.running,
+                'channels': len(self._channels),
+                'hardware_channels': sum(1 for channel in self._channels.values() if channel.hardware),
+                'edges': self.edges,
+                'writes': self.writes,
+            }
+        for name, fraction in (('p50', 0.5), ('p99', 0.99)):
+            stats[f'lateness_{name}_us'] = round(lateness[min(len(lateness) - 1, int(len(lateness) * fraction))] * 1e6, 1) if lateness else None
+        stats['lateness_max_us'] = round(lateness[-1] * 1e6, 1) if lateness else None
+        return stats
+
+    def _claim_hardware(self, pin: int) -> bool:
+        """
+        Return True if a pin can get hardware PWM, connecting to pigpio on first use.
+        """
+        if not self.hardware or pin not in HARDWARE_PWM_PINS or pigpio is None:
+            return False
+        if self._pi is None:
+            pi = pigpio.pi()
+            self._pi = pi if pi.connected else False
+            if not self._pi:
+                print(f"[{time.strftime('%m-%d-%Y %H:%M:%S')}] - (PwmEngine) pigpio daemon not reachable, using software PWM")
+        if not self._pi:
+            return False
+        # Pins on the same PWM channel cannot have different settings
+        return not any(
+            channel.hardware and HARDWARE_PWM_PINS[other] == HARDWARE_PWM_PINS[pin]
+            for other, channel in self._channels.items()
+        )
+
+    def _apply_hardware(self, channel: PwmChannel, now: float):
+        self._pi.hardware_PWM(channel.pin, int(channel.frequency), int(round(channel.duty_at(now) * 1_000_000)))
+        if channel.ramping(now):
+            self._push(channel, now + self.ramp_step, 'ramp')
+
+    def _restart(self, channel: PwmChannel, now: float):
+        """
+        Begin a new cycle now, dropping the channel's queued edges.
+        """
+        channel.generation += 1
+        self._push(channel, now, 'period')
+
+    def _push(self, channel: PwmChannel, deadline: float, action: str):
+        heapq.heappush(self._heap, (deadline, next(self._sequence), channel, channel.generation, action))
+        if self._heap[0][2] is channel and self._heap[0][0] == deadline:
+            self._condition.notify()
+
+    def _write(self, levels: Dict[int, object]):
+        """
+        Write the pins whose level changes, in one GPIO.output call.
+        """
+        changes = {}
+        for pin, level in levels.items():
+            channel = self._channels.get(pin)
+            if channel is None or channel.level != level:
+                changes[pin] = level
+                if channel is not None:
+                    channel.level = level
+        try:
+            if len(changes) == 1:
+                (pin, level), = changes.items()
+                self.gpio.output(pin, level)
+            elif changes:
+                self.gpio.output(list(changes), list(changes.values()))
+        except Exception as e:
+            print(f"[{time.strftime('%m-%d-%Y %H:%M:%S')}] - (PwmEngine) Error writing pins {sorted(changes)}: {str(e)}")
+        self.writes += len(changes)
+
+    def _run(self):
+        while True:
+            with self._condition:
+                while True:
+                    if self._stopping:
+                        return
+                    if not self._heap:
+                        self._condition.wait()
+                        continue
+                    deadline = self._heap[0][0]
+                    remaining = deadline - time.perf_counter() - self.spin
+                    if remaining <= 0:
+                        break
+                    self._condition.wait(remaining)
+            # Busy-wait the last stretch, which sleeping cannot hit precisely
+            while time.perf_counter() < deadline:
+                pass
+            with self._condition:
+                self._fire_due()
+
+    def _fire_due(self):
+        """
+        Apply every edge that is due, writing the software pins together.
+        """
+        now = time.perf_counter()
+        levels = {}
+        due = []
+        while self._heap and self._heap[0][0] <= now:
+            deadline, _, channel, generation, action = heapq.heappop(self._heap)
+            if generation != channel.generation or self._channels.get(channel.pin) is not channel:
+                continue
+            due.append(deadline)
+            if action == 'ramp':
+                self._apply_hardware(channel, deadline)
+            elif action == 'low':
+                levels[channel.pin] = False
+            else:
+                self._start_period(channel, deadline, now, levels)
+        if not due:
+            return
+        writing = time.perf_counter()
+        self._write(levels)
+        self.edges += len(due)
+        self._lateness.extend(writing - deadline for deadline in due)
+
+    def _start_period(self, channel: PwmChannel, deadline: float, now: float, levels: Dict[int, object]):
+        """
+        Begin one software PWM cycle and queue its falling edge and the next cycle.
+        """
+        duty = channel.duty_at(deadline)
+        channel.periods += 1
+        if duty <= 0.0:
+            levels[channel.pin] = False
+        else:
+            levels[channel.pin] = True
+            if duty < 1.0:
+                self._push(channel, deadline + duty * channel.period, 'low')
+        if 0.0 < duty < 1.0 or channel.ramping(deadline):
+            # Cycles missed while the thread was held up are skipped, not replayed
+            self._push(channel, max(deadline + channel.period, now), 'period')
+
+pwm_engine = PwmEngine()
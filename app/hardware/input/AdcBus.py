@@ -0,0 +1,217 @@
+from array import array
+from typing import Dict, Iterable, Mapping, Optional, Union
+import math
+import threading
+import time
+try:
+    import board
+    import busio
+    import digitalio
+    import adafruit_mcp3xxx.mcp3008 as MCP
+    from adafruit_mcp3xxx.analog_in import AnalogIn
+except ImportError:
+    from unittest.mock import MagicMock
+    board = MagicMock()
+    busio = MagicMock()
+    digitalio = MagicMock()
+    MCP = MagicMock()
+    AnalogIn = MagicMock()
+
+CHANNELS = range(8)
+# Full-scale voltage of a conversion: the MCP3008 runs from the Pi's 3.3V rail
+REFERENCE_VOLTAGE = 3.3
+
+class OversampledReading:
+    """
+    Summary statistics of one oversampled ADC channel.
+
+    Attributes:
+        samples (int): Number of raw conversions.
+        mean (float): Arithmetic mean voltage.
+        median (float): Median voltage.
+        trimmed_mean (float): Mean voltage with the extreme samples discarded.
+        stdev (float): Population standard deviation, the noise estimate.
+    """
+    __slots__ = ('samples', 'mean', 'median', 'trimmed_mean', 'stdev')
+
+    def __init__(self, samples: int, mean: float, median: float, trimmed_mean: float, stdev: float):
+        self.samples = samples
+        self.mean = mean
+        self.median = median
+        self.trimmed_mean = trimmed_mean
+        self.stdev = stdev
+
+    @property
+    def value(self) -> float:
+        """
+        The robust estimate reported by sensors: the trimmed mean.
+        """
+        return self.trimmed_mean
+
+    def to_dict(self) -> dict:
+        """
+        Convert the reading to a dictionary for JSON serialization.
+        """
+        return {
+            'samples': self.samples,
+            'mean': self.mean,
+            'median': self.median,
+            'trimmed_mean': self.trimmed_mean,
+            'stdev': self.stdev,
+        }
+
+def summarize(raw: array, trim: float = 0.1) -> OversampledReading:
+    """
+    Reduce raw samples to an OversampledReading.
+
+    The samples are sorted once; the median and trimmed mean are read from the
+    sorted buffer and the mean and deviation come from compensated sums over it.
+
+    Args:
+        raw (array): Raw voltages.
+        trim (float): Fraction of samples discarded at each end for the trimmed mean.
+
+    Returns:
+        OversampledReading: The summary statistics.
+    """
+    n = len(raw)
+    if n == 0:
+        raise ValueError("Cannot summarize an empty sample buffer")
+    ordered = sorted(raw)
+    mean = math.fsum(ordered) / n
+    middle = n // 2
+    median = ordered[middle] if n % 2 else (ordered[middle - 1] + ordered[middle]) / 2
+    cut = int(n * trim)
+    kept = ordered[cut:n - cut] if n - 2 * cut > 0 else [median]
+    trimmed_mean = math.fsum(kept) / len(kept)
+    stdev = math.sqrt(math.fsum((x - mean) ** 2 for x in ordered) / n)
+    return OversampledReading(n, mean, median, trimmed_mean, stdev)
+
+class AdcBus:
+    """
+    Shared owner of the MCP3008 ADC on the SPI bus.
+
+    The SPI bus, chip-select and MCP3008 driver are created once, on first use,
+    and every analog sensor reads through the same instance. A lock serializes
+    bus access so concurrent readers never interleave SPI transfers, and scan()
+    reads any set of channels in a single locked session.
+
+    Attributes:
+        cs_pin: The board pin used as chip-select.
+        samples (int): Default number of conversions averaged per reading.
+    """
+
+    def __init__(self, cs_pin=None, samples: int = 10):
+        """
+        Initialize the bus manager without touching the hardware.
+
+        Args:
+            cs_pin: The board pin used as chip-select, defaults to board.D5.
+            samples (int): Default number of conversions averaged per reading.
+        """
+        self.cs_pin = cs_pin if cs_pin is not None else board.D5
+        self.samples = samples
+        self._lock = threading.RLock()
+        self._mcp = None
+        self._channels = {}
+
+    def _open(self):
+        """
+        Create the SPI bus and MCP3008 driver; called with the lock held.
+        """
+        if self._mcp is None:
+            spi = busio.SPI(clock=board.SCK, MISO=board.MISO, MOSI=board.MOSI)
+            cs = digitalio.DigitalInOut(self.cs_pin)
+            self._mcp = MCP.MCP3008(spi, cs)
+            print(f"[{time.strftime('%m-%d-%Y %H:%M:%S')}] - (AdcBus) MCP3008 initialized on SPI")
+        return self._mcp
+
+    def _channel(self, channel: int):
+        if channel not in CHANNELS:
+            raise ValueError(f"ADC channel must be 0-7, got {channel}")
+        if channel not in self._channels:
+            self._channels[channel] = AnalogIn(self._open(), channel)
+        return self._channels[channel]
+
+    def _sample(self, channel: int, samples: int) -> array:
+        chan = self._channel(channel)
+        return array('d', (chan.voltage for _ in range(samples)))
+
+    def sample(self, channel: int, samples: Optional[int] = None) -> array:
+        """
+        Collect raw conversions from one channel.
+
+        Args:
+            channel (int): The ADC channel number (0-7).
+            samples (Optional[int]): Number of conversions, defaults to self.samples.
+
+        Returns:
+            array: The raw voltages as a compact array of doubles.
+        """
+        with self._lock:
+            return self._sample(channel, samples or self.samples)
+
+    def read(self, channel: int, samples: Optional[int] = None, trim: float = 0.1) -> OversampledReading:
+        """
+        Oversample one channel and summarize it.
+
+        Args:
+            channel (int): The ADC channel number (0-7).
+            samples (Optional[int]): Number of conversions, defaults to self.samples.
+            trim (float): Fraction of samples discarded at each end for the trimmed mean.
+
+        Returns:
+            OversampledReading: Mean, median, trimmed mean and noise estimate.
+        """
+        return summarize(self.sample(channel, samples), trim)
+
+    def read_voltage(self, channel: int, samples: Optional[int] = None) -> float:
+        """
+        Read the mean voltage of one channel.
+
+        Args:
+            channel (int): The ADC channel number (0-7).
+            samples (Optional[int]): Conversions to average, defaults to self.samples.
+
+        Returns:
+            float: The mean voltage.
+        """
+        return self.read(channel, samples).mean
+
+    def scan(
+            self,
+            channels: Union[Iterable[int], Mapping[int, int]] = CHANNELS,
+            samples: Optional[int] = None,
+            trim: Union[float, Mapping[int, float]] = 0.1
+        ) -> Dict[int, OversampledReading]:
+        """
+        Oversample several channels in one bus session.
+
+        Args:
+            channels (Union[Iterable[int], Mapping[int, int]]): The channels to read, defaults to all
+                eight, or a mapping of channel to its own sample count.
+            samples (Optional[int]): Conversions per channel when no per-channel count is given.
+            trim (Union[float, Mapping[int, float]]): Fraction of samples discarded at each end for
+                the trimmed mean, or a mapping of channel to its own fraction.
+
+        Returns:
+            Dict[int, OversampledReading]: Summary statistics keyed by channel.
+        """
+        if not isinstance(channels, Mapping):
+            channels = {channel: samples for channel in channels}
+        with self._lock:
+            raw = {channel: self._sample(channel, count or samples or self.samples) for channel, count in channels.items()}
+        # Summaries are computed after the bus is released
+        if not isinstance(trim, Mapping):
+            trim = dict.fromkeys(raw, trim)
+        return {channel: summarize(values, trim[channel]) for channel, values in raw.items()}
+
+    def close(self):
+        """
+        Drop the driver so the next read reinitializes the bus.
+        """
+        with self._lock:
+            self._mcp = None
+            self._channels = {}
+
+adc_bus = AdcBus()
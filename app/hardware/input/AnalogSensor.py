@@ -0,0 +1,93 @@
+from app.hardware.input.Sensor import Sensor
+from typing import Optional
+import time
+from app.hardware.input.AdcBus import AdcBus, OversampledReading, REFERENCE_VOLTAGE, adc_bus
+
+class AnalogSensor(Sensor):
+    """
+    Base class for sensors read through a channel of the shared MCP3008 ADC.
+
+    Readings are reported as a percentage of the ADC's full-scale voltage, the
+    unit the light and soil thresholds in Config are set in. Subclasses set
+    quantity and simulate() the value returned in debug mode.
+
+    Attributes:
+        adc_channel (int): The ADC channel number (0-7) the sensor is connected to.
+        bus (AdcBus): The shared MCP3008 bus the channel is read through.
+        samples (int): Raw conversions per reading.
+        trim (float): Fraction of samples discarded at each end before averaging.
+    """
+
+    def __init__(self, adc_channel: int, sensor_name: str, debug_mode: bool = False, bus: AdcBus = adc_bus, samples: int = 10, trim: float = 0.1):
+        """
+        Initialize the analog sensor.
+
+        Args:
+            adc_channel (int): The ADC channel number (0-7) where the sensor is connected.
+            sensor_name (str): The name of the sensor for logging purposes.
+            debug_mode (bool): Whether to run in debug mode (simulated readings).
+            bus (AdcBus): The shared MCP3008 bus the channel is read through.
+            samples (int): Raw conversions per reading; fewer is faster, more is less noisy.
+            trim (float): Fraction of samples discarded at each end before averaging.
+        """
+        super().__init__(signal_pin=None, sensor_name=sensor_name, debug_mode=debug_mode)
+        self.adc_channel = adc_channel
+        self.bus = bus
+        self.samples = samples
+        self.trim = trim
+        print(f"[{time.strftime('%m-%d-%Y %H:%M:%S')}] - ({self.sensor_name}) Initialized on ADC channel {self.adc_channel}")
+
+    def read(self):
+        """
+        Read the sensor's value from its ADC channel.
+        Returns a simulated value in debug mode.
+        """
+        if self.debug_mode:
+            print(f"[{time.strftime('%m-%d-%Y %H:%M:%S')}] - ({self.sensor_name}) Debug mode: returning simulated {self.quantity} value.")
+            return self.simulate()
+
+        print(f"[{time.strftime('%m-%d-%Y %H:%M:%S')}] - ({self.sensor_name}) Reading {self.quantity} from ADC channel {self.adc_channel}")
+        try:
+            level = self.convert(self.bus.read(self.adc_channel, self.samples, self.trim))
+
+            print(f"[{time.strftime('%m-%d-%Y %H:%M:%S')}] - ({self.sensor_name}) Level: {level:.1f}%")
+            return level
+
+        except Exception as e:
+            print(f"[{time.strftime('%m-%d-%Y %H:%M:%S')}] - ({self.sensor_name}) Error: {str(e)}")
+            return None
+
+    def simulate(self) -> float:
+        """
+        Return a simulated reading for debug mode. Should be implemented by subclasses.
+        """
+        raise NotImplementedError("simulate() must be implemented by subclasses")
+
+    def convert(self, reading: OversampledReading) -> float:
+        """
+        Turn an oversampled reading of the channel into the sensor's value.
+
+        Shared by read() and DeviceManager.read_analog(), so both return the same value.
+
+        Args:
+            reading (OversampledReading): Taken with this sensor's samples and trim.
+
+        Returns:
+            float: The trimmed-mean voltage as a percentage of full scale, 0-100, rounded to one decimal.
+        """
+        return round(min(max(reading.value / REFERENCE_VOLTAGE, 0.0), 1.0) * 100, 1)
+
+    def sample(self) -> Optional[OversampledReading]:
+        """
+        Oversample the channel and return the full statistics, including the noise estimate.
+
+        Returns:
+            Optional[OversampledReading]: The summary, or None in debug mode or on error.
+        """
+        if self.debug_mode:
+            return None
+        try:
+            return self.bus.read(self.adc_channel, self.samples, self.trim)
+        except Exception as e:
+            print(f"[{time.strftime('%m-%d-%Y %H:%M:%S')}] - ({self.sensor_name}) Error: {str(e)}")
+            return None
@@ -1,4 +1,7 @@
 from app.hardware.input.Sensor import Sensor
+from app.config import DHT_CACHE_TTL, DHT_RETRY_DEADLINE
+from typing import Optional
+import threading
 import time
 import random
 try:
@@ -27,26 +30,83 @@ try:
 except ImportError:
     print("Error: Could not import board or adafruit_dht")
 
+# A DHT11 cannot produce a fresh measurement more often than this
+DHT11_MIN_INTERVAL = 1.0
+
+class DhtReading:
+    """
+    The result of a DHT11 read, possibly served from cache.
+
+    Attributes:
+        humidity (Optional[float]): Relative humidity in percent, None if never measured.
+        temperature (Optional[float]): Temperature in Celsius from the same measurement.
+        age (Optional[float]): Seconds since the value was measured.
+        stale (bool): True when the value is older than the cache TTL because fresh reads failed.
+        error (Optional[str]): The last measurement error, if the read failed.
+    """
+
+    def __init__(self, humidity: Optional[float], temperature: Optional[float], age: Optional[float], stale: bool, error: Optional[str] = None):
+        self.humidity = humidity
+        self.temperature = temperature
+        self.age = age
+        self.stale = stale
+        self.error = error
+
+    def to_dict(self) -> dict:
+        """
+        Convert the reading to a dictionary for JSON serialization.
+        """
+        return {
+            'humidity': self.humidity,
+            'temperature': self.temperature,
+            'age': self.age,
+            'stale': self.stale,
+            'error': self.error,
+        }
+
 class HumiditySensor(Sensor):
     """
     Represents a SunFounder Humiture (DHT11) sensor.
     This sensor provides both temperature and humidity readings.
     """
-    def __init__(self, signal_pin: int, debug_mode: bool = False):
+    quantity = "humidity"
+    quantities = ("humidity", "air_temperature")
+
+    def __init__(
+            self,
+            signal_pin: int,
+            debug_mode: bool = False,
+            ttl: float = DHT_CACHE_TTL,
+            retry_deadline: float = DHT_RETRY_DEADLINE,
+            min_interval: float = DHT11_MIN_INTERVAL
+        ):
         """
         Initialize the humidity sensor.
         
         Args:
             signal_pin (int): The GPIO pin number where the sensor is connected.
             debug_mode (bool): Whether to run in debug mode (simulated readings).
+            ttl (float): Seconds a good measurement is served from cache.
+            retry_deadline (float): Seconds a read keeps retrying a failed measurement.
+            min_interval (float): Minimum seconds between measurements.
         """
         super().__init__(signal_pin, "HumiditySensor", debug_mode)
+        self.ttl = max(ttl, min_interval)
+        self.retry_deadline = retry_deadline
+        self.min_interval = min_interval
+        self._condition = threading.Condition()
+        self._in_flight = False
+        self._humidity = None
+        self._temperature = None
+        self._measured_at = None  # Monotonic time of the last good measurement
+        self._attempted_at = None # Monotonic time of the last measurement attempt
+        self._error = None
         if not self.debug_mode:
             # Convert GPIO pin number to board pin
             print(f"[{time.strftime('%m-%d-%Y %H:%M:%S')}] - (HumiditySensor) Converting GPIO pin {signal_pin} to board pin")
             self.board_pin = pin_map.get(signal_pin)  # Default to D4 if pin not found
             self.dht = adafruit_dht.DHT11(self.board_pin, use_pulseio=False)
-            self.dht.measure()
+            self._measure_until(time.monotonic())  # Prime the cache; a failure is retried on the first read
             if self.board_pin is None:
                 raise ValueError(f"Invalid GPIO pin number: {signal_pin}")
         print(f"[{time.strftime('%m-%d-%Y %H:%M:%S')}] - (HumiditySensor) Initialized on pin {self.signal_pin}")
@@ -60,15 +120,93 @@ class HumiditySensor(Sensor):
             print(f"[{time.strftime('%m-%d-%Y %H:%M:%S')}] - (HumiditySensor) Debug mode: returning simulated humidity value.")
             return round(45.0 + random.random() * 20.0, 1)  # Simulated humidity between 45-65%
         print(f"[{time.strftime('%m-%d-%Y %H:%M:%S')}] - (HumiditySensor) Reading humidity from pin {self.signal_pin}")
+        reading = self.sample()
+        if reading.humidity is None:
+            print(f"[{time.strftime('%m-%d-%Y %H:%M:%S')}] - (HumiditySensor) All attempts failed: {reading.error}")
+            return None
+        print(f"[{time.strftime('%m-%d-%Y %H:%M:%S')}] - (HumiditySensor) Humidity: {reading.humidity:.1f}%{' (stale)' if reading.stale else ''}")
+        return round(reading.humidity, 1)
+
+    def read_all(self) -> dict:
+        """
+        Read humidity and air temperature from the same DHT11 measurement.
+
+        Returns:
+            dict: Humidity in percent and air temperature in Fahrenheit; a value is None if unavailable.
+        """
+        reading = self.sample()
+        temperature = reading.temperature
+        return {
+            'humidity': round(reading.humidity, 1) if reading.humidity is not None else None,
+            'air_temperature': round(temperature * 9.0 / 5.0 + 32.0, 1) if temperature is not None else None,
+        }
+
+    def sample(self) -> DhtReading:
+        """
+        Return the latest measurement, measuring only when the cached one has expired.
+
+        Concurrent callers share a single in-flight measurement. A failed
+        measurement is retried until the retry deadline, after which the last
+        good value is returned marked as stale.
+
+        Returns:
+            DhtReading: Humidity and temperature with their age and staleness.
+        """
+        if self.debug_mode:
+            return DhtReading(round(45.0 + random.random() * 20.0, 1), round(20.0 + random.random() * 5.0, 1), 0.0, False)
+        with self._condition:
+            if self._fresh():
+                return self._result()
+            if self._in_flight:
+                # Another caller is measuring: wait for its result instead of touching the bus
+                self._condition.wait_for(lambda: not self._in_flight, timeout=self.retry_deadline + self.min_interval)
+                return self._result()
+            self._in_flight = True
         try:
-            humidity = self.dht.humidity
-            self.dht.measure()
-            print(f"[{time.strftime('%m-%d-%Y %H:%M:%S')}] - (HumiditySensor) Humidity: {humidity:.1f}%")
-            return round(humidity, 1)
-        except Exception as e:
-            print(f"[{time.strftime('%m-%d-%Y %H:%M:%S')}] - (HumiditySensor) trying again: {str(e)}")
-            time.sleep(2)  # Wait 2 second before retrying
-            return self.read()
-        
-        # print(f"[{time.strftime('%m-%d-%Y %H:%M:%S')}] - (HumiditySensor) All attempts failed")
-        # return None
+            self._measure_until(time.monotonic() + self.retry_deadline)
+        finally:
+            with self._condition:
+                self._in_flight = False
+                self._condition.notify_all()
+        with self._condition:
+            return self._result()
+
+    def _fresh(self) -> bool:
+        return self._measured_at is not None and time.monotonic() - self._measured_at < self.ttl
+
+    def _result(self) -> DhtReading:
+        if self._measured_at is None:
+            return DhtReading(None, None, None, True, self._error)
+        age = time.monotonic() - self._measured_at
+        stale = age >= self.ttl
+        return DhtReading(self._humidity, self._temperature, age, stale, self._error if stale else None)
+
+    def _measure_until(self, deadline: float):
+        """
+        Measure, retrying failures no faster than min_interval, until success or the deadline.
+        """
+        while True:
+            if self._attempted_at is not None:
+                wait = self._attempted_at + self.min_interval - time.monotonic()
+                if wait > 0:
+                    if time.monotonic() + wait > deadline:
+                        return
+                    time.sleep(wait)
+            self._attempted_at = time.monotonic()
+            try:
+                self.dht.measure()
+                humidity = self.dht.humidity
+                temperature = self.dht.temperature
+                if humidity is None:
+                    raise RuntimeError("DHT11 returned no data")
+                with self._condition:
+                    self._humidity = humidity
+                    self._temperature = temperature
+                    self._measured_at = time.monotonic()
+                    self._error = None
+                return
+            except Exception as e:
+                self._error = str(e)
+                print(f"[{time.strftime('%m-%d-%Y %H:%M:%S')}] - (HumiditySensor) trying again: {str(e)}")
+            if time.monotonic() >= deadline:
+                return
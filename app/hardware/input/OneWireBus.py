@@ -0,0 +1,196 @@
+from app.config import ONE_WIRE_ROOT, ONE_WIRE_POLL_INTERVAL
+from typing import Dict, List, Optional
+import glob
+import os
+import threading
+import time
+
+# Family code of DS18B20 temperature probes
+DS18B20_FAMILY = '28'
+
+class OneWireBus:
+    """
+    Background reader for every DS18B20 probe on the 1-wire bus.
+
+    A DS18B20 conversion takes up to 750ms, so reading w1_slave inline blocks
+    the caller for that long per probe. This reader discovers all probes,
+    starts one bulk conversion through each bus master's therm_bulk_read file
+    (so every probe converts at once), then reads the results on a background
+    thread and keeps them in memory. Callers get the latest temperatures
+    without touching sysfs.
+
+    Bus masters without bulk conversion support fall back to reading each
+    probe's w1_slave file, which converts on read.
+
+    A value older than max_age is no longer served, so a failed or unplugged
+    probe reads as missing instead of repeating its last temperature.
+    """
+
+    def __init__(
+            self,
+            root: str = ONE_WIRE_ROOT,
+            interval: float = ONE_WIRE_POLL_INTERVAL,
+            conversion_timeout: float = 1.0,
+            max_age: Optional[float] = None
+        ):
+        """
+        Initialize the reader without starting it.
+
+        Args:
+            root (str): The sysfs directory holding bus masters and slave devices.
+            interval (float): Seconds between bulk conversions.
+            conversion_timeout (float): Maximum seconds to wait for a bulk conversion.
+            max_age (Optional[float]): Seconds a probe's last value stays valid, defaults to three scan intervals.
+        """
+        self.root = root
+        self.interval = interval
+        self.conversion_timeout = conversion_timeout
+        self.max_age = max_age if max_age is not None else 3 * (interval + conversion_timeout)
+        self._lock = threading.Lock()
+        self._latest = {}  # device id -> (temperature in Celsius, time.monotonic() of the scan)
+        self._scanned = threading.Event()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        """
+        Start the background reader if it is not already running.
+        """
+        with self._lock:
+            if self._thread is not None:
+                return
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="OneWireBus", daemon=True)
+            self._thread.start()
+        print(f"[{time.strftime('%m-%d-%Y %H:%M:%S')}] - (OneWireBus) Background reader started on {self.root}")
+
+    def stop(self):
+        """
+        Stop the background reader.
+        """
+        self._stop.set()
+        with self._lock:
+            thread, self._thread = self._thread, None
+        if thread is not None:
+            thread.join()
+
+    def discover(self) -> List[str]:
+        """
+        Return the ids of every DS18B20 probe on the bus.
+        """
+        paths = glob.glob(os.path.join(self.root, f'{DS18B20_FAMILY}-*'))
+        return sorted(os.path.basename(path) for path in paths)
+
+    def scan(self) -> Dict[str, float]:
+        """
+        Convert and read every probe once, updating the cached values.
+
+        Returns:
+            Dict[str, float]: Temperatures in Celsius keyed by device id; failed probes are left out.
+        """
+        bulk = self._bulk_convert()
+        results = {}
+        for device_id in self.discover():
+            temperature = self._read_probe(device_id, bulk)
+            if temperature is not None:
+                results[device_id] = temperature
+        now = time.monotonic()
+        with self._lock:
+            for device_id, temperature in results.items():
+                self._latest[device_id] = (temperature, now)
+        self._scanned.set()
+        return results
+
+    def latest(self, device_id: Optional[str] = None, wait: Optional[float] = None) -> Optional[float]:
+        """
+        Return the last temperature read from a probe, starting the reader if needed.
+
+        Args:
+            device_id (Optional[str]): The probe id, defaults to the first probe on the bus.
+            wait (Optional[float]): Seconds to wait for the first scan, defaults to the conversion timeout.
+
+        Returns:
+            Optional[float]: The temperature in Celsius, or None if the probe has not been read
+                successfully within max_age.
+        """
+        if self._thread is None:
+            self.start()
+        if not self._scanned.is_set():
+            self._scanned.wait(self.conversion_timeout if wait is None else wait)
+        with self._lock:
+            if device_id is None:
+                if not self._latest:
+                    return None
+                device_id = min(self._latest)
+            entry = self._latest.get(device_id)
+        return entry[0] if entry is not None and self._fresh(entry) else None
+
+    def temperatures(self) -> Dict[str, float]:
+        """
+        Return the last temperature of every probe read within max_age in Celsius, keyed by device id.
+        """
+        with self._lock:
+            return {device_id: entry[0] for device_id, entry in self._latest.items() if self._fresh(entry)}
+
+    def _fresh(self, entry) -> bool:
+        return time.monotonic() - entry[1] <= self.max_age
+
+    def _bulk_convert(self) -> bool:
+        """
+        Trigger a simultaneous conversion on every bus master that supports it and wait for it.
+
+        Returns:
+            bool: True if a bulk conversion completed, so probes hold fresh results.
+        """
+        triggers = glob.glob(os.path.join(self.root, 'w1_bus_master*', 'therm_bulk_read'))
+        if not triggers:
+            return False
+        try:
+            for trigger in triggers:
+                with open(trigger, 'w') as f:
+                    f.write('trigger\n')
+            deadline = time.monotonic() + self.conversion_timeout
+            while time.monotonic() < deadline:
+                # -1 while any probe is still converting, 1 once all results are ready
+                states = []
+                for trigger in triggers:
+                    with open(trigger, 'r') as f:
+                        states.append(f.read().strip())
+                if '-1' not in states:
+                    return True
+                time.sleep(0.05)
+        except OSError as e:
+            print(f"[{time.strftime('%m-%d-%Y %H:%M:%S')}] - (OneWireBus) Bulk conversion failed: {str(e)}")
+        return False
+
+    def _read_probe(self, device_id: str, bulk: bool) -> Optional[float]:
+        """
+        Read one probe, using its converted result after a bulk conversion.
+        """
+        device_dir = os.path.join(self.root, device_id)
+        try:
+            temperature_file = os.path.join(device_dir, 'temperature')
+            if bulk and os.path.exists(temperature_file):
+                with open(temperature_file, 'r') as f:
+                    return float(f.read().strip()) / 1000.0
+            with open(os.path.join(device_dir, 'w1_slave'), 'r') as f:
+                lines = f.readlines()
+            # Parse temperature value from the device file
+            if lines[0].strip()[-3:] == 'YES':  # CRC check passed
+                temp_pos = lines[1].find('t=')
+                if temp_pos != -1:
+                    return float(lines[1][temp_pos+2:]) / 1000.0
+            print(f"[{time.strftime('%m-%d-%Y %H:%M:%S')}] - (OneWireBus) CRC check failed for {device_id}")
+        except (OSError, ValueError, IndexError) as e:
+            print(f"[{time.strftime('%m-%d-%Y %H:%M:%S')}] - (OneWireBus) Error reading {device_id}: {str(e)}")
+        return None
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                self.scan()
+            except Exception as e:
+                print(f"[{time.strftime('%m-%d-%Y %H:%M:%S')}] - (OneWireBus) Scan failed: {str(e)}")
+            self._stop.wait(self.interval)
+
+one_wire_bus = OneWireBus()
@@ -8,7 +8,12 @@ class Sensor:
         signal_pin (int): The GPIO pin number that reads the sensor value.
         sensor_name (str): The name of the sensor for logging purposes.
         debug_mode (bool): Whether the sensor is in debug mode.
+        quantity (str): The name under which the sensor's readings are stored.
+        quantities (tuple): Every quantity one physical read produces, for multi-value sensors.
     """
+    quantity = None
+    quantities = ()
+
     def __init__(self, signal_pin: int, sensor_name: str, debug_mode: bool = False):
         self.signal_pin = signal_pin
         self.sensor_name = sensor_name
@@ -24,6 +29,22 @@ class Sensor:
         """
         raise NotImplementedError("read() must be implemented by subclasses")
 
+    def read_all(self) -> dict:
+        """
+        Read every quantity the sensor provides from a single physical read.
+
+        Single-value sensors return their one reading; multi-value sensors override this.
+
+        Returns:
+            dict: Readings keyed by quantity name.
+        """
+        return {self.quantity: self.read()}
+
+    def close(self):
+        """
+        Release whatever the sensor holds beyond its pins; nothing by default.
+        """
+
     def get_status(self):
         """
         Get the current status or value of the sensor.
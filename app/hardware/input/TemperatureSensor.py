@@ -1,14 +1,33 @@
 from app.hardware.input.Sensor import Sensor
+from app.hardware.input.OneWireBus import OneWireBus, one_wire_bus
+from typing import Optional
 import time
 import os
 import random
 
 class TemperatureSensor(Sensor):
     """
-    Represents a temperature sensor connected to a GPIO pin.
+    Represents a DS18B20 temperature probe on the 1-wire bus.
+    Readings come from the shared background OneWireBus reader.
     """
-    def __init__(self, signal_pin: int, debug_mode: bool = False):
+    quantity = "temperature"
+
+    def __init__(self, signal_pin: int, debug_mode: bool = False, device_id: Optional[str] = None, bus: OneWireBus = one_wire_bus):
+        """
+        Initialize the temperature sensor.
+
+        Args:
+            signal_pin (int): The GPIO pin the 1-wire bus is on.
+            debug_mode (bool): Whether to run in debug mode (simulated readings).
+            device_id (Optional[str]): The probe id, defaults to the 1wire_sensor_id environment
+                variable or the first probe on the bus.
+            bus (OneWireBus): The background reader the probe is read through.
+        """
         super().__init__(signal_pin, "TemperatureSensor", debug_mode)
+        self.device_id = device_id or os.environ.get("1wire_sensor_id")
+        self.bus = bus
+        if not self.debug_mode:
+            self.bus.start()
 
     def read(self):
         """
@@ -19,25 +38,9 @@ class TemperatureSensor(Sensor):
             print(f"[{time.strftime('%m-%d-%Y %H:%M:%S')}] - (TemperatureSensor) Debug mode: returning simulated temperature value.")
             return 72.0+round(random.random()*10, 1)  # Simulated temperature in Fahrenheit
         print(f"[{time.strftime('%m-%d-%Y %H:%M:%S')}] - (TemperatureSensor) Reading temperature from pin {self.signal_pin}")
-        try:
-            # Open the 1-wire device file
-            device_file = f'/sys/bus/w1/devices/{os.environ["1wire_sensor_id"]}/w1_slave'
-            with open(device_file, 'r') as f:
-                lines = f.readlines()
-            
-            # Parse temperature value from the device file
-            if lines[0].strip()[-3:] == 'YES':  # CRC check passed
-                temp_pos = lines[1].find('t=')
-                if temp_pos != -1:
-                    # Convert temperature from millicelsius to Fahrenheit
-                    temp_c = float(lines[1][temp_pos+2:]) / 1000.0
-                    temp_f = (temp_c * 9.0 / 5.0) + 32.0
-                    return temp_f
-                    
+        temp_c = self.bus.latest(self.device_id)
+        if temp_c is None:
             print(f"[{time.strftime('%m-%d-%Y %H:%M:%S')}] - (TemperatureSensor) Error reading temperature")
             return None
-                
-        except Exception as e:
-            print(f"[{time.strftime('%m-%d-%Y %H:%M:%S')}] - (TemperatureSensor) Error: {str(e)}")
-            return None
-        return None
+        # Convert temperature from Celsius to Fahrenheit
+        return (temp_c * 9.0 / 5.0) + 32.0
@@ -1,24 +1,131 @@
 from app.hardware.input.Sensor import Sensor
+from app.hardware.input.OneWireBus import one_wire_bus
+from app.hardware.GpioDispatcher import gpio_dispatcher
+from app.config import ULTRASONIC_ISOLATED, ULTRASONIC_WORKER_CPU, ULTRASONIC_WORKER_INTERVAL
+from typing import Callable, List, Optional
+import statistics
+import threading
 import time
 
 try:
     import RPi.GPIO as GPIO
-except ImportError:
+except (ImportError, RuntimeError):
     from unittest.mock import MagicMock
     GPIO = MagicMock()
 
+# Air temperature assumed when no reading is available, in Celsius
+DEFAULT_AIR_TEMPERATURE = 20.0
+
+# Longest echo the HC-SR04 produces (about 4m) plus margin, in seconds
+ECHO_TIMEOUT = 0.04
+
+def speed_of_sound(temperature_c: Optional[float]) -> float:
+    """
+    Return the speed of sound in air in centimeters per second.
+
+    Args:
+        temperature_c (Optional[float]): Air temperature in Celsius, None for the default.
+    """
+    if temperature_c is None:
+        temperature_c = DEFAULT_AIR_TEMPERATURE
+    return (331.3 + 0.606 * temperature_c) * 100.0
+
+def aggregate(distances: List[float], tolerance: float = 2.0) -> Optional[float]:
+    """
+    Reject outlying pings and return the median of the rest.
+
+    A ping is an outlier if it is further from the median than three median
+    absolute deviations, or than tolerance centimeters when the burst is tight.
+
+    Args:
+        distances (List[float]): Distances from one burst, in centimeters.
+        tolerance (float): Minimum accepted deviation from the median, in centimeters.
+
+    Returns:
+        Optional[float]: The median of the accepted pings, or None if there are none.
+    """
+    if not distances:
+        return None
+    median = statistics.median(distances)
+    mad = statistics.median(abs(d - median) for d in distances)
+    limit = max(3 * mad, tolerance)
+    kept = [d for d in distances if abs(d - median) <= limit]
+    return statistics.median(kept)
+
+def latest_probe_temperature() -> Optional[float]:
+    """
+    Return the latest 1-wire probe temperature in Celsius without starting the bus reader.
+    """
+    temperatures = one_wire_bus.temperatures()
+    return temperatures[min(temperatures)] if temperatures else None
+
 class UltrasonicSensor(Sensor):
     """
     Represents an HC-SR04 Ultrasonic Distance Sensor.
     Uses two GPIO pins: trigger and echo.
+
+    Echo edges are timestamped by a GPIO edge-detection callback with the
+    monotonic nanosecond clock, so the reading thread sleeps on an event
+    instead of spinning on GPIO.input. Each read fires a burst of pings,
+    rejects outliers and returns the median, using a speed of sound corrected
+    for the latest air temperature.
+
+    In isolated mode the measurements run in an UltrasonicWorker process and
+    read() returns the newest result from shared memory without blocking.
     """
-    def __init__(self, trigger_pin: int, echo_pin: int, debug_mode: bool = False):
+    quantity = "water_level"
+
+    def __init__(
+            self,
+            trigger_pin: int,
+            echo_pin: int,
+            debug_mode: bool = False,
+            pings: int = 5,
+            ping_interval: float = 0.06,
+            temperature_source: Callable[[], Optional[float]] = latest_probe_temperature,
+            isolated: bool = ULTRASONIC_ISOLATED
+        ):
+        """
+        Initialize the ultrasonic sensor.
+
+        Args:
+            trigger_pin (int): The GPIO pin driving the trigger input.
+            echo_pin (int): The GPIO pin reading the echo output.
+            debug_mode (bool): Whether to run in debug mode (simulated readings).
+            pings (int): Pings per reading; more pings reject noise better but take longer.
+            ping_interval (float): Seconds between pings so stray echoes die out.
+            temperature_source (Callable[[], Optional[float]]): Returns the air temperature in Celsius.
+            isolated (bool): Whether to measure in a dedicated worker process.
+        """
         super().__init__(signal_pin=None, sensor_name="UltrasonicSensor", debug_mode=debug_mode)
         self.trigger_pin = trigger_pin
         self.echo_pin = echo_pin
-        if not self.debug_mode:
-            GPIO.setup(self.trigger_pin, GPIO.OUT)
-            GPIO.setup(self.echo_pin, GPIO.IN)
+        self.pings = max(1, pings)
+        self.ping_interval = ping_interval
+        self.temperature_source = temperature_source
+        self.edge_detection = False
+        # Edge timestamps of the pending ping, None while no ping is waiting
+        self._edges = None
+        self._echo_done = threading.Event()
+        self._lock = threading.Lock()
+        self.worker = None
+        if isolated and not self.debug_mode:
+            # The worker process owns the pins; this process only reads its results
+            from app.hardware.input.UltrasonicWorker import UltrasonicWorker
+            self.worker = UltrasonicWorker(
+                trigger_pin, echo_pin,
+                interval=ULTRASONIC_WORKER_INTERVAL, cpu=ULTRASONIC_WORKER_CPU,
+                pings=self.pings, ping_interval=ping_interval
+            )
+            self.worker.start()
+        elif not self.debug_mode:
+            gpio_dispatcher.setup(self.trigger_pin, GPIO.OUT)
+            gpio_dispatcher.setup(self.echo_pin, GPIO.IN)
+            try:
+                gpio_dispatcher.call(GPIO.add_event_detect, self.echo_pin, GPIO.BOTH, callback=self._on_edge)
+                self.edge_detection = True
+            except RuntimeError as e:
+                print(f"[{time.strftime('%m-%d-%Y %H:%M:%S')}] - (UltrasonicSensor) Edge detection unavailable, polling echo: {str(e)}")
         print(f"[{time.strftime('%m-%d-%Y %H:%M:%S')}] - (UltrasonicSensor) Initialized with trigger pin {self.trigger_pin} and echo pin {self.echo_pin}")
 
     def read(self):
@@ -29,7 +136,64 @@ class UltrasonicSensor(Sensor):
         if self.debug_mode:
             print(f"[{time.strftime('%m-%d-%Y %H:%M:%S')}] - (UltrasonicSensor) Debug mode: returning simulated distance value.")
             return 42.0  # Simulated distance in cm
+        try:
+            temperature = self.temperature_source() if self.temperature_source is not None else None
+        except Exception:
+            temperature = None
+        if self.worker is not None:
+            self.worker.set_air_temperature(temperature)
+            distance = self.worker.latest()
+            return round(distance, 2) if distance is not None else None
         print(f"[{time.strftime('%m-%d-%Y %H:%M:%S')}] - (UltrasonicSensor) Measuring distance...")
+        speed = speed_of_sound(temperature)
+
+        distances = []
+        with self._lock:
+            for i in range(self.pings):
+                if i:
+                    time.sleep(self.ping_interval)
+                duration = self._ping()
+                if duration is not None:
+                    distances.append(duration * speed / 2)
+
+        if len(distances) * 2 < self.pings:
+            print(f"[{time.strftime('%m-%d-%Y %H:%M:%S')}] - (UltrasonicSensor) Timeout waiting for echo ({len(distances)}/{self.pings} pings returned)")
+            return None
+        distance = round(aggregate(distances), 2)
+        print(f"[{time.strftime('%m-%d-%Y %H:%M:%S')}] - (UltrasonicSensor) Measured distance: {distance} cm")
+        return distance
+
+    def close(self):
+        """
+        Stop the worker process, if any.
+        """
+        if self.worker is not None:
+            self.worker.stop()
+            self.worker = None
+
+    def _on_edge(self, channel):
+        """
+        GPIO callback for both echo edges.
+
+        The pin is not read back: on a short echo it has often changed again
+        by the time the callback runs, so the edges are told apart by order.
+        """
+        self._edge(time.monotonic_ns())
+
+    def _edge(self, timestamp_ns: int):
+        # The first edge after the trigger is the rise and the second the fall
+        edges = self._edges
+        if edges is None or len(edges) >= 2:
+            return
+        edges.append(timestamp_ns)
+        if len(edges) == 2:
+            self._echo_done.set()
+
+    def _trigger(self):
+        # The whole pulse runs as one I/O thread command so no other write lands inside it
+        gpio_dispatcher.call(self._send_trigger)
+
+    def _send_trigger(self):
         # Send 10us pulse to trigger
         GPIO.output(self.trigger_pin, False)
         time.sleep(0.0002)
@@ -37,27 +201,46 @@ class UltrasonicSensor(Sensor):
         time.sleep(0.00001)
         GPIO.output(self.trigger_pin, False)
 
+    def _ping(self) -> Optional[float]:
+        """
+        Fire one ping and return the echo pulse width in seconds, or None on timeout.
+        """
+        if not self.edge_detection:
+            return self._ping_polling()
+        self._echo_done.clear()
+        edges = self._edges = []
+        self._trigger()
+        done = self._echo_done.wait(2 * ECHO_TIMEOUT)
+        # Stray edges before the next trigger must not count as its echo
+        self._edges = None
+        if not done:
+            return None
+        return (edges[1] - edges[0]) / 1e9
+
+    def _ping_polling(self) -> Optional[float]:
+        """
+        Fallback for kernels without edge detection: poll the echo pin on the monotonic clock.
+
+        The ping runs as one I/O thread command, holding off other GPIO
+        commands for at most two echo timeouts.
+        """
+        return gpio_dispatcher.call(self._poll_echo)
+
+    def _poll_echo(self) -> Optional[float]:
+        self._trigger()
+        timeout_ns = int(ECHO_TIMEOUT * 1e9)
         # Wait for echo to go high
-        pulse_start = time.time()
-        timeout = pulse_start + 0.04  # 40ms timeout
+        pulse_start = time.monotonic_ns()
+        deadline = pulse_start + timeout_ns
         while GPIO.input(self.echo_pin) == 0:
-            pulse_start = time.time()
-            if pulse_start > timeout:
-                print(f"[{time.strftime('%m-%d-%Y %H:%M:%S')}] - (UltrasonicSensor) Timeout waiting for echo to go high")
+            pulse_start = time.monotonic_ns()
+            if pulse_start > deadline:
                 return None
-
         # Wait for echo to go low
-        pulse_end = time.time()
-        timeout = pulse_end + 0.04
+        pulse_end = time.monotonic_ns()
+        deadline = pulse_end + timeout_ns
         while GPIO.input(self.echo_pin) == 1:
-            pulse_end = time.time()
-            if pulse_end > timeout:
-                print(f"[{time.strftime('%m-%d-%Y %H:%M:%S')}] - (UltrasonicSensor) Timeout waiting for echo to go low")
+            pulse_end = time.monotonic_ns()
+            if pulse_end > deadline:
                 return None
-
-        pulse_duration = pulse_end - pulse_start
-        # Speed of sound at sea level = 34300 cm/s
-        distance = pulse_duration * 17150  # (34300/2)
-        distance = round(distance, 2)
-        print(f"[{time.strftime('%m-%d-%Y %H:%M:%S')}] - (UltrasonicSensor) Measured distance: {distance} cm")
-        return distance 
\ No newline at end of file
+        return (pulse_end - pulse_start) / 1e9
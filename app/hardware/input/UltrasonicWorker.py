@@ -0,0 +1,296 @@
+from app.hardware.input.UltrasonicSensor import UltrasonicSensor, GPIO
+from multiprocessing import shared_memory
+from typing import Callable, List, Optional, Tuple
+import math
+import multiprocessing
+import os
+import struct
+import time
+
+# Header: records written so far, latest air temperature in Celsius (NaN if unknown)
+HEADER = struct.Struct('<Qd')
+# Record: seqlock version (odd while the writer is inside the record), sequence,
+# wall-clock timestamp, distance in cm (NaN on timeout) and seconds the measurement took
+RECORD = struct.Struct('<QQddd')
+VERSION = struct.Struct('<Q')
+PAYLOAD = struct.Struct('<Qddd')
+SEQUENCE = struct.Struct('<Q')
+
+class SharedRing:
+    """
+    Single-writer ring buffer of ultrasonic measurements in shared memory.
+
+    The worker process appends records; any process can read the newest ones
+    without locks. Each slot is a seqlock: the writer makes the slot's version
+    odd before changing the record and even again afterwards, and a reader
+    copies the record between two reads of the version, retrying when the
+    version was odd or changed in between.
+    """
+
+    def __init__(self, name: Optional[str] = None, slots: int = 64):
+        """
+        Create a new ring, or attach to an existing one by name.
+
+        Args:
+            name (Optional[str]): The shared memory block to attach to, None to create one.
+            slots (int): Number of records the ring holds.
+        """
+        self.slots = slots
+        self.owner = name is None
+        size = HEADER.size + slots * RECORD.size
+        self.shm = shared_memory.SharedMemory(name=name, create=self.owner, size=size)
+        if self.owner:
+            HEADER.pack_into(self.shm.buf, 0, 0, math.nan)
+
+    @property
+    def name(self) -> str:
+        return self.shm.name
+
+    @property
+    def count(self) -> int:
+        """
+        Total number of records written.
+        """
+        return HEADER.unpack_from(self.shm.buf, 0)[0]
+
+    @property
+    def air_temperature(self) -> Optional[float]:
+        """
+        The air temperature the writer uses for the speed of sound, in Celsius.
+        """
+        value = HEADER.unpack_from(self.shm.buf, 0)[1]
+        return None if math.isnan(value) else value
+
+    @air_temperature.setter
+    def air_temperature(self, value: Optional[float]):
+        struct.pack_into('<d', self.shm.buf, SEQUENCE.size, math.nan if value is None else value)
+
+    def append(self, timestamp: float, distance: Optional[float], elapsed: float):
+        """
+        Write a record; only the worker process calls this.
+        """
+        sequence = self.count + 1
+        offset = HEADER.size + (sequence % self.slots) * RECORD.size
+        buf = self.shm.buf
+        version = VERSION.unpack_from(buf, offset)[0]
+        VERSION.pack_into(buf, offset, version + 1)
+        PAYLOAD.pack_into(buf, offset + VERSION.size, sequence, timestamp, math.nan if distance is None else distance, elapsed)
+        VERSION.pack_into(buf, offset, version + 2)
+        SEQUENCE.pack_into(buf, 0, sequence)
+
+    def _read(self, sequence: int, attempts: int = 3) -> Optional[Tuple[float, Optional[float], float]]:
+        offset = HEADER.size + (sequence % self.slots) * RECORD.size
+        buf = self.shm.buf
+        for _ in range(attempts):
+            before = VERSION.unpack_from(buf, offset)[0]
+            if before & 1:
+                continue
+            found, timestamp, distance, elapsed = PAYLOAD.unpack_from(buf, offset + VERSION.size)
+            if VERSION.unpack_from(buf, offset)[0] != before:
+                continue
+            # A consistent copy of a record that has since been overwritten is no use either
+            if found != sequence:
+                return None
+            return timestamp, None if math.isnan(distance) else distance, elapsed
+        return None
+
+    def latest(self) -> Optional[Tuple[float, Optional[float], float]]:
+        """
+        Return the newest record as (timestamp, distance, elapsed), or None if there is none.
+        """
+        for _ in range(3):
+            sequence = self.count
+            if sequence == 0:
+                return None
+            record = self._read(sequence)
+            if record is not None:
+                return record
+        return None
+
+    def records(self, limit: Optional[int] = None) -> List[Tuple[float, Optional[float], float]]:
+        """
+        Return up to limit of the newest records, oldest first.
+        """
+        newest = self.count
+        limit = min(limit or self.slots, self.slots - 1, newest)
+        records = [self._read(sequence) for sequence in range(newest - limit + 1, newest + 1)]
+        return [record for record in records if record is not None]
+
+    def close(self):
+        """
+        Detach from the ring, freeing it if this process created it.
+        """
+        self.shm.close()
+        if self.owner:
+            self.shm.unlink()
+
+def build_sensor(trigger_pin: int, echo_pin: int, debug_mode: bool, pings: int, ping_interval: float, temperature_source: Callable) -> UltrasonicSensor:
+    """
+    Build the in-process sensor the worker drives.
+    """
+    return UltrasonicSensor(
+        trigger_pin, echo_pin, debug_mode,
+        pings=pings, ping_interval=ping_interval, temperature_source=temperature_source, isolated=False
+    )
+
+def run_worker(ring_name: str, slots: int, stop, options: dict):
+    """
+    Entry point of the worker process: measure at a fixed interval and publish to the ring.
+    """
+    cpu = options.get('cpu')
+    if cpu is not None and hasattr(os, 'sched_setaffinity'):
+        try:
+            os.sched_setaffinity(0, {cpu})
+        except OSError as e:
+            print(f"[{time.strftime('%m-%d-%Y %H:%M:%S')}] - (UltrasonicWorker) Could not pin to CPU {cpu}: {str(e)}")
+    try:
+        # Real-time priority keeps the timing loop ahead of ordinary processes when permitted
+        os.sched_setscheduler(0, os.SCHED_FIFO, os.sched_param(1))
+    except (AttributeError, OSError):
+        pass
+
+    ring = SharedRing(ring_name, slots)
+    debug_mode = options.get('debug_mode', False)
+    if not debug_mode:
+        GPIO.setmode(GPIO.BCM)
+    factory = options.get('sensor_factory') or build_sensor
+    sensor = factory(
+        options['trigger_pin'], options['echo_pin'], debug_mode,
+        options.get('pings', 5), options.get('ping_interval', 0.06), lambda: ring.air_temperature
+    )
+    interval = options.get('interval', 1.0)
+    try:
+        next_run = time.monotonic()
+        while not stop.is_set():
+            started = time.monotonic()
+            distance = sensor.read()
+            ring.append(time.time(), distance, time.monotonic() - started)
+            next_run = max(next_run + interval, time.monotonic())
+            stop.wait(next_run - time.monotonic())
+    finally:
+        if not debug_mode:
+            GPIO.cleanup([options['trigger_pin'], options['echo_pin']])
+        ring.close()
+
+class UltrasonicWorker:
+    """
+    Runs HC-SR04 measurements in a dedicated process pinned to one core.
+
+    The worker measures at a fixed interval and publishes each result to a
+    SharedRing, so the web server reads the water level from shared memory
+    and never runs or waits on a timing loop, and the measurements never
+    compete with web threads for the GIL.
+    """
+
+    def __init__(
+            self,
+            trigger_pin: int,
+            echo_pin: int,
+            interval: float = 1.0,
+            cpu: Optional[int] = None,
+            pings: int = 5,
+            ping_interval: float = 0.06,
+            slots: int = 64,
+            debug_mode: bool = False,
+            sensor_factory: Optional[Callable] = None
+        ):
+        """
+        Initialize the worker without starting it.
+
+        Args:
+            trigger_pin (int): The GPIO pin driving the trigger input.
+            echo_pin (int): The GPIO pin reading the echo output.
+            interval (float): Seconds between measurements.
+            cpu (Optional[int]): Core the worker process is pinned to, None to leave it unpinned.
+            pings (int): Pings per measurement.
+            ping_interval (float): Seconds between pings.
+            slots (int): Number of results kept in the ring.
+            debug_mode (bool): Whether the worker simulates readings.
+            sensor_factory (Optional[Callable]): Module-level function building the sensor in the worker.
+        """
+        self.interval = interval
+        self.slots = slots
+        self.options = {
+            'trigger_pin': trigger_pin,
+            'echo_pin': echo_pin,
+            'interval': interval,
+            'cpu': cpu,
+            'pings': pings,
+            'ping_interval': ping_interval,
+            'debug_mode': debug_mode,
+            'sensor_factory': sensor_factory,
+        }
+        self.ring = None
+        self._context = multiprocessing.get_context('spawn')
+        self._stop = None
+        self._process = None
+
+    def start(self):
+        """
+        Create the ring and start the worker process.
+        """
+        if self._process is not None:
+            return
+        self.ring = SharedRing(slots=self.slots)
+        self._stop = self._context.Event()
+        self._process = self._context.Process(
+            target=run_worker,
+            args=(self.ring.name, self.slots, self._stop, self.options),
+            name="UltrasonicWorker",
+            daemon=True
+        )
+        self._process.start()
+        print(f"[{time.strftime('%m-%d-%Y %H:%M:%S')}] - (UltrasonicWorker) Started worker process {self._process.pid}")
+
+    def stop(self, timeout: float = 5.0):
+        """
+        Stop the worker process and free the ring.
+        """
+        if self._process is None:
+            return
+        self._stop.set()
+        self._process.join(timeout)
+        if self._process.is_alive():
+            self._process.terminate()
+            self._process.join()
+        self._process = None
+        self.ring.close()
+        self.ring = None
+
+    def set_air_temperature(self, temperature_c: Optional[float]):
+        """
+        Publish the air temperature the worker uses for the speed of sound.
+        """
+        if self.ring is not None:
+            self.ring.air_temperature = temperature_c
+
+    def latest(self, max_age: Optional[float] = None) -> Optional[float]:
+        """
+        Return the newest distance without blocking.
+
+        Args:
+            max_age (Optional[float]): Oldest acceptable result in seconds, defaults to three intervals.
+
+        Returns:
+            Optional[float]: The distance in centimeters, or None if there is no recent result.
+        """
+        if self.ring is None:
+            return None
+        record = self.ring.latest()
+        if record is None:
+            return None
+        timestamp, distance, _ = record
+        if time.time() - timestamp > (max_age if max_age is not None else 3 * self.interval + 1):
+            return None
+        return distance
+
+    def wait_ready(self, timeout: float = 10.0) -> bool:
+        """
+        Wait for the first result, e.g. while the worker process is starting.
+        """
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            if self.ring is not None and self.ring.count > 0:
+                return True
+            time.sleep(0.01)
+        return False
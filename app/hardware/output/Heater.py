@@ -1,23 +1,27 @@
-from app.hardware.output.RelayControlledComponent import RelayControlledComponent, GPIO
+from app.hardware.output.PwmControlledComponent import PwmControlledComponent, GPIO
+from app.config import HEATER_PWM_FREQUENCY
+from typing import Optional
 import time
 
-class Heater(RelayControlledComponent):
+class Heater(PwmControlledComponent):
     """
     Represents a heater controlled by a GPIO pin on a Raspberry Pi.
     
     This class provides an interface to control a heater by setting the state
-    of a specified GPIO pin to either HIGH (on) or LOW (off).
+    of a specified GPIO pin to either HIGH (on) or LOW (off), or, with a PWM
+    frequency, by dimming it to a level in between.
     """
 
-    def __init__(self, signal_pin: int, debug_mode: bool = False):
+    def __init__(self, signal_pin: int, debug_mode: bool = False, pwm_frequency: Optional[float] = HEATER_PWM_FREQUENCY):
         """
         Initialize the heater with the specified GPIO pin.
         
         Args:
             signal_pin (int): The GPIO pin number to use for controlling the heater.
             debug_mode (bool): Whether to run in debug mode (simulated GPIO).
+            pwm_frequency (Optional[float]): PWM frequency in Hz for dimming, None or 0 for on/off only.
         """
-        super().__init__(signal_pin, "Heater", debug_mode)
+        super().__init__(signal_pin, "Heater", debug_mode, pwm_frequency)
         
     def heat_for_duration(self, duration: int):
         """
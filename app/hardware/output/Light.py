@@ -1,22 +1,26 @@
-from app.hardware.output.RelayControlledComponent import RelayControlledComponent, GPIO
+from app.hardware.output.PwmControlledComponent import PwmControlledComponent, GPIO
+from app.config import LIGHT_PWM_FREQUENCY
+from typing import Optional
 
-class Light(RelayControlledComponent):
+class Light(PwmControlledComponent):
     """
     Represents a light controlled by a GPIO pin on a Raspberry Pi.
     
     This class provides an interface to control a light by setting the state
-    of a specified GPIO pin to either HIGH (on) or LOW (off).
+    of a specified GPIO pin to either HIGH (on) or LOW (off), or, with a PWM
+    frequency, by dimming it to a level in between.
     """
 
-    def __init__(self, signal_pin: int, debug_mode: bool = False):
+    def __init__(self, signal_pin: int, debug_mode: bool = False, pwm_frequency: Optional[float] = LIGHT_PWM_FREQUENCY):
         """
         Initialize the light with the specified GPIO pin.
         
         Args:
             signal_pin (int): The GPIO pin number to use for controlling the light.
             debug_mode (bool): Whether to run in debug mode (simulated GPIO).
+            pwm_frequency (Optional[float]): PWM frequency in Hz for dimming, None or 0 for on/off only.
         """
-        super().__init__(signal_pin, "Light", debug_mode)
+        super().__init__(signal_pin, "Light", debug_mode, pwm_frequency)
 
     def illuminate_for_duration(self, duration: int):
         """
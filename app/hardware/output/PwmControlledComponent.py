@@ -0,0 +1,194 @@
+from app.hardware.output.RelayControlledComponent import RelayControlledComponent, GPIO
+from app.hardware.GpioDispatcher import gpio_dispatcher
+from app.hardware.PwmEngine import pwm_engine
+from typing import Optional
+import math
+import threading
+
+class PwmControlledComponent(RelayControlledComponent):
+    """
+    Base class for components that can be dimmed with PWM as well as switched.
+
+    Without a PWM frequency the component is a plain on/off relay. With one,
+    its pin is handed to the PwmEngine and the component has a level between
+    0.0 and 1.0: turn_on and turn_off set full and zero duty, and set_level
+    anything in between, optionally ramping there smoothly. For state and
+    runtime accounting the component counts as on at any level above zero,
+    and during a ramp down to zero until the ramp ends.
+
+    Attributes:
+        pwm_frequency (Optional[float]): PWM frequency in Hz, None in relay mode.
+        engine (PwmEngine): The engine driving the pin in PWM mode.
+    """
+
+    def __init__(
+            self,
+            signal_pin: int,
+            component_name: str,
+            debug_mode: bool = False,
+            pwm_frequency: Optional[float] = None,
+            engine=pwm_engine
+        ):
+        """
+        Initialize the component with the specified GPIO pin.
+
+        Args:
+            signal_pin (int): The GPIO pin number to use for controlling the component.
+            component_name (str): The name of the component for logging purposes.
+            debug_mode (bool): Whether to run in debug mode (simulated GPIO).
+            pwm_frequency (Optional[float]): PWM frequency in Hz, None or 0 for relay mode.
+            engine (PwmEngine): The engine to drive the pin in PWM mode.
+        """
+        self.engine = engine
+        self.pwm_frequency = None
+        self._level = 0.0
+        self._ramp_off = None  # Timer recording the off switch at the end of a ramp down to zero
+        self._ramp_lock = threading.Lock()
+        super().__init__(signal_pin, component_name, debug_mode)
+        if pwm_frequency:
+            self.enable_pwm(pwm_frequency)
+
+    @property
+    def pwm_enabled(self) -> bool:
+        return self.pwm_frequency is not None
+
+    def enable_pwm(self, frequency: float):
+        """
+        Switch to PWM mode, keeping the current level.
+
+        Args:
+            frequency (float): PWM frequency in Hz.
+
+        Raises:
+            ValueError: If the frequency is not positive.
+        """
+        if frequency <= 0:
+            raise ValueError(f"PWM frequency must be positive, got {frequency}")
+        level = self.get_level()
+        if not self.debug_mode:
+            channel = self.engine.attach(self.signal_pin, frequency)
+            self.engine.set_duty(self.signal_pin, level)
+            mode = 'hardware' if channel.hardware else 'software'
+        else:
+            mode = 'simulated'
+        self.pwm_frequency = frequency
+        self._level = level
+        print(f"[{self.component_name}] PWM enabled at {frequency} Hz ({mode})")
+
+    def disable_pwm(self):
+        """
+        Switch back to relay mode; any level above zero becomes on.
+        """
+        if not self.pwm_enabled:
+            return
+        on = self._level > 0
+        with self._ramp_lock:
+            ramping_off = self._cancel_ramp_off()
+        if not self.debug_mode:
+            self.engine.detach(self.signal_pin)
+            # Hardware PWM leaves the pin in its alternate function
+            gpio_dispatcher.setup(self.signal_pin, GPIO.OUT)
+            gpio_dispatcher.output(self.signal_pin, GPIO.HIGH if on else GPIO.LOW)
+        self.pwm_frequency = None
+        if ramping_off:
+            self.record_state(False)
+        print(f"[{self.component_name}] PWM disabled")
+
+    def get_level(self) -> float:
+        """
+        Get the target level of the component.
+
+        Returns:
+            float: Between 0.0 and 1.0; in relay mode 1.0 when on and 0.0 when off.
+        """
+        if self.pwm_enabled:
+            return self._level
+        return 1.0 if self.state else 0.0
+
+    def set_level(self, level: float, ramp: float = 0.0, notify: bool = True):
+        """
+        Dim the component to a level.
+
+        In relay mode any level above zero turns the component on.
+
+        Args:
+            level (float): Between 0.0 (off) and 1.0 (fully on); values outside are clamped.
+            ramp (float): Seconds to move there smoothly from the current level.
+            notify (bool): Whether to report the change to the on_change observer.
+
+        Raises:
+            ValueError: If the level or ramp is not a finite number, or the ramp is negative.
+        """
+        level, ramp = float(level), float(ramp)
+        if not math.isfinite(level) or not math.isfinite(ramp) or ramp < 0:
+            raise ValueError(f"Level and ramp must be finite and the ramp >= 0, got {level} and {ramp}")
+        level = min(max(level, 0.0), 1.0)
+        if not self.pwm_enabled:
+            if level > 0:
+                super().turn_on()
+            else:
+                super().turn_off()
+            return
+        with self._ramp_lock:
+            self._cancel_ramp_off()
+            if not self.debug_mode:
+                self.engine.set_duty(self.signal_pin, level, ramp)
+            self._level = level
+            print(f"[{self.component_name}] Set level to {level:.3f}" + (f" over {ramp}s" if ramp else ""))
+            # A stopped engine cannot ramp and switches off at once
+            if level == 0 and ramp > 0 and self.state and (self.debug_mode or self.engine.running):
+                # The pin is still driven until the ramp ends, so it counts as on until then
+                self._ramp_off = threading.Timer(ramp, self._ramp_ended, args=(notify,))
+                self._ramp_off.daemon = True
+                self._ramp_off.start()
+            else:
+                self.record_state(level > 0, notify)
+
+    def _ramp_ended(self, notify: bool):
+        with self._ramp_lock:
+            # A later set_level replaced this ramp
+            if self._ramp_off is not threading.current_thread():
+                return
+            self._ramp_off = None
+            self.record_state(False, notify)
+
+    def _cancel_ramp_off(self) -> bool:
+        """
+        Drop a pending end-of-ramp off switch, returning whether there was one.
+        """
+        timer, self._ramp_off = self._ramp_off, None
+        if timer is None:
+            return False
+        timer.cancel()
+        return True
+
+    def turn_on(self):
+        """
+        Turn the component fully on.
+        """
+        if self.pwm_enabled:
+            self.set_level(1.0)
+        else:
+            super().turn_on()
+
+    def turn_off(self):
+        """
+        Turn the component off.
+        """
+        if self.pwm_enabled:
+            self.set_level(0.0)
+        else:
+            super().turn_off()
+
+    def get_usage_stats(self) -> dict:
+        """
+        Get the usage statistics of the component.
+
+        Returns:
+            dict: Runtime and state, plus the level and frequency in PWM mode.
+        """
+        stats = super().get_usage_stats()
+        if self.pwm_enabled:
+            stats["level"] = self._level
+            stats["pwm_frequency"] = self.pwm_frequency
+        return stats
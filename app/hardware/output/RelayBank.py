@@ -0,0 +1,118 @@
+from app.hardware.output.RelayControlledComponent import RelayControlledComponent, GPIO
+from app.hardware.GpioDispatcher import gpio_dispatcher
+from app.config import RELAY_INRUSH_DELAY
+from typing import Callable, Dict, Mapping, Optional
+import time
+
+class RelayBank:
+    """
+    Switches several relay-controlled components together.
+
+    apply() takes the desired on/off state of any of the components,
+    works out which actually have to change, and drives all of their pins
+    in one batched GPIO write. With an inrush delay, everything being
+    switched off goes in the first write and the components being switched
+    on follow one at a time, so loads such as the heater and the pump do not
+    start drawing current at the same instant. The new states are then
+    committed in one step through on_commit instead of one notification per
+    relay.
+    """
+
+    def __init__(
+            self,
+            components: Mapping[str, RelayControlledComponent],
+            inrush_delay: float = RELAY_INRUSH_DELAY,
+            on_commit: Optional[Callable[[Dict[str, bool]], None]] = None,
+            dispatcher=gpio_dispatcher
+        ):
+        """
+        Initialize the bank.
+
+        Args:
+            components (Mapping[str, RelayControlledComponent]): The relays keyed by device name.
+            inrush_delay (float): Seconds between switching on consecutive relays, 0 to switch them together.
+            on_commit (Optional[Callable[[Dict[str, bool]], None]]): Called with the changed states after each apply.
+            dispatcher (GpioDispatcher): Where the pin writes go.
+        """
+        self.components = dict(components)
+        self.inrush_delay = inrush_delay
+        self.on_commit = on_commit
+        self.dispatcher = dispatcher
+
+    def states(self) -> Dict[str, bool]:
+        """
+        Return the on/off state of every relay, keyed by device name.
+        """
+        return {name: bool(component.state) for name, component in self.components.items()}
+
+    def diff(self, desired: Mapping[str, bool]) -> Dict[str, bool]:
+        """
+        Return the subset of desired states that differ from the current ones.
+
+        Raises:
+            KeyError: If a device is not in the bank.
+        """
+        changes = {}
+        for name, on in desired.items():
+            if bool(self.components[name].state) != bool(on):
+                changes[name] = bool(on)
+        return changes
+
+    def apply(self, desired: Mapping[str, bool], inrush_delay: Optional[float] = None) -> Dict[str, bool]:
+        """
+        Bring the relays to the desired states.
+
+        Args:
+            desired (Mapping[str, bool]): On/off states keyed by device name; relays left out are not touched.
+            inrush_delay (Optional[float]): Overrides the bank's inrush delay for this call.
+
+        Returns:
+            Dict[str, bool]: The relays that were switched and their new states.
+
+        Raises:
+            KeyError: If a device is not in the bank; nothing is switched.
+        """
+        changes = self.diff(desired)
+        if not changes:
+            return changes
+        delay = self.inrush_delay if inrush_delay is None else inrush_delay
+        offs = {name: on for name, on in changes.items() if not on}
+        ons = {name: on for name, on in changes.items() if on}
+        if delay > 0 and len(ons) > 1:
+            # Everything switching off goes with the first relay switching on
+            first, *rest = ons
+            steps = [dict(offs, **{first: True})] + [{name: True} for name in rest]
+        else:
+            steps = [changes]
+        for index, step in enumerate(steps):
+            if index:
+                time.sleep(delay)
+            self._write(step)
+        if self.on_commit is not None:
+            try:
+                self.on_commit(changes)
+            except Exception as e:
+                print(f"[{time.strftime('%m-%d-%Y %H:%M:%S')}] - (RelayBank) Error committing states: {str(e)}")
+        switched = ', '.join(f"{name} {'on' if on else 'off'}" for name, on in changes.items())
+        print(f"[{time.strftime('%m-%d-%Y %H:%M:%S')}] - (RelayBank) Switched {switched}")
+        return changes
+
+    def _write(self, step: Dict[str, bool]):
+        """
+        Write one batch of pins and record the new states on the components.
+
+        Components in PWM mode are set to full or zero duty through their PWM engine instead.
+        """
+        dimmed = {name for name in step if getattr(self.components[name], 'pwm_enabled', False)}
+        pins = {
+            self.components[name].signal_pin: GPIO.HIGH if on else GPIO.LOW
+            for name, on in step.items()
+            if not self.components[name].debug_mode and name not in dimmed
+        }
+        if pins:
+            self.dispatcher.output_many(pins)
+        for name, on in step.items():
+            if name in dimmed:
+                self.components[name].set_level(1.0 if on else 0.0, notify=self.on_commit is None)
+            else:
+                self.components[name].record_state(on, notify=self.on_commit is None)
@@ -1,14 +1,16 @@
 try:
     import RPi.GPIO as GPIO
-except ImportError:
+except (ImportError, RuntimeError):
     # Mock GPIO for development environments
     from unittest.mock import MagicMock
     GPIO = MagicMock()
     GPIO.HIGH = True
     GPIO.LOW = False
     GPIO.OUT = 'out'
+from app.hardware.GpioDispatcher import gpio_dispatcher
+from app.hardware.output.RuntimeCounter import RuntimeCounter
 import time
-from typing import Literal, Union
+from typing import Callable, Dict, Literal, Optional, Union
 
 class RelayControlledComponent:
     """
@@ -20,9 +22,11 @@ class RelayControlledComponent:
     Attributes:
         signal_pin (int): The GPIO pin number that controls the component.
         state (bool): The current state of the component (GPIO.HIGH or GPIO.LOW).
-        runtime (int): The total runtime of the component in seconds.
+        runtime (float): The total on-time of the component in seconds, counted on every switch.
+        usage (RuntimeCounter): Monotonic on-time and rolling duty-cycle accounting.
         debug_mode (bool): Whether the component is in debug mode.
         component_name (str): The name of the component for logging purposes.
+        on_change (Optional[Callable[[bool], None]]): Called with the new on/off state after every switch.
     """
 
     def __init__(self, signal_pin: int, component_name: str, debug_mode: bool = False):
@@ -40,7 +44,8 @@ class RelayControlledComponent:
             print(f"[{self.component_name}] Debug mode enabled, GPIO will be simulated")
         self.signal_pin = signal_pin                               # The GPIO pin number to use for controlling the component
         self.state = GPIO.LOW if not self.debug_mode else False    # Initialize component in OFF state
-        self.runtime = 0                                           # The total runtime of the component in seconds
+        self.usage = RuntimeCounter()                              # On-time accounting, fed by every switch
+        self.on_change: Optional[Callable[[bool], None]] = None    # Observer notified of every switch
         self.__setup()
 
     def __setup(self):
@@ -51,8 +56,8 @@ class RelayControlledComponent:
         as an output and set its initial state to LOW (off).
         """
         if not self.debug_mode:
-            GPIO.setup(self.signal_pin, GPIO.OUT)
-            GPIO.output(self.signal_pin, self.state)
+            gpio_dispatcher.setup(self.signal_pin, GPIO.OUT)
+            gpio_dispatcher.output(self.signal_pin, self.state)
         print(f"[{self.component_name}] Initialized on pin {self.signal_pin} with state {self.state}")
 
     def __set_state(self, state: Union[Literal[GPIO.HIGH, GPIO.LOW], bool]):
@@ -66,9 +71,18 @@ class RelayControlledComponent:
         """
         self.state = state
         if not self.debug_mode:
-            GPIO.output(self.signal_pin, state)
+            gpio_dispatcher.output(self.signal_pin, state)
+        self.usage.switch(bool(state))
         print(f"[{self.component_name}] Set state to {state}")
 
+    @property
+    def runtime(self) -> float:
+        return self.usage.runtime()
+
+    @runtime.setter
+    def runtime(self, seconds: float):
+        self.usage.restore(seconds)
+
     def get_status(self) -> Union[bool, Literal[GPIO.HIGH, GPIO.LOW]]:
         """
         Get the current state of the component.
@@ -78,15 +92,24 @@ class RelayControlledComponent:
         """
         return self.state
     
-    def get_runtime(self) -> int:
+    def get_runtime(self) -> float:
         """
         Get the current runtime of the component.
         
         Returns:
-            int: The total runtime of the component in seconds.
+            float: The total on-time of the component in seconds, including the current run.
         """
         return self.runtime
 
+    def get_duty_cycles(self) -> Dict[str, float]:
+        """
+        Get the fraction of the last hour and day the component was on.
+        
+        Returns:
+            Dict[str, float]: Duty cycles between 0.0 and 1.0 keyed by window, e.g. '1h'.
+        """
+        return self.usage.duty_cycles()
+
     def turn_on(self):
         """
         Turn the component on by setting the GPIO pin to HIGH.
@@ -94,7 +117,10 @@ class RelayControlledComponent:
         if not self.debug_mode:
             self.__set_state(GPIO.HIGH)
         else:
+            self.state = True
+            self.usage.switch(True)
             print(f"[{self.component_name}] Debug mode enabled, {self.component_name} set to HIGH")
+        self.__notify()
 
     def turn_off(self):
         """
@@ -103,7 +129,36 @@ class RelayControlledComponent:
         if not self.debug_mode:
             self.__set_state(GPIO.LOW)
         else:
+            self.state = False
+            self.usage.switch(False)
             print(f"[{self.component_name}] Debug mode enabled, {self.component_name} set to LOW")
+        self.__notify()
+
+    def record_state(self, on: bool, notify: bool = True):
+        """
+        Record a switch whose pin write was made elsewhere, e.g. by a RelayBank.
+
+        Args:
+            on (bool): True if the component is now on.
+            notify (bool): Whether to report the change to the on_change observer.
+        """
+        if self.debug_mode:
+            self.state = bool(on)
+        else:
+            self.state = GPIO.HIGH if on else GPIO.LOW
+        self.usage.switch(bool(on))
+        if notify:
+            self.__notify()
+
+    def __notify(self):
+        """
+        Report the current state to the on_change observer, if any.
+        """
+        if self.on_change is not None:
+            try:
+                self.on_change(bool(self.state))
+            except Exception as e:
+                print(f"[{self.component_name}] Error notifying state change: {str(e)}")
 
     def activate_for_duration(self, duration: int):
         """
@@ -116,7 +171,6 @@ class RelayControlledComponent:
         self.turn_on()
         time.sleep(duration)
         self.turn_off()
-        self.runtime += duration
         print(f"[{self.component_name}] Activation complete for {duration} seconds")
 
     def pulse_activate(self, on_time: int, off_time: int, cycles: int):
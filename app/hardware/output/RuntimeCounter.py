@@ -0,0 +1,166 @@
+from typing import Callable, Dict, Optional
+import threading
+import time
+
+# Rolling windows reported by default, in seconds
+DUTY_WINDOWS = {'1h': 3600, '24h': 86400}
+
+class RuntimeCounter:
+    """
+    On-time accounting for one relay, driven by its on/off transitions.
+
+    Time is taken from the monotonic clock, so wall-clock adjustments (NTP on
+    a Pi without an RTC) do not distort it. Closed on-intervals are added to
+    per-bucket totals in a ring covering the longest window, and a running
+    sum is kept per window: a bucket's time is subtracted when it slides out.
+    Reading a duty cycle is therefore O(1) however often the relay switched;
+    the bucket straddling the old edge of a window is counted pro rata.
+
+    Attributes:
+        clock (Callable[[], float]): Returns the current monotonic time in seconds.
+        windows (Dict[str, int]): Duty-cycle windows in seconds, keyed by name.
+        bucket_seconds (int): Width of one ring bucket in seconds.
+        switches (int): Number of off-to-on transitions counted.
+    """
+
+    def __init__(self, windows: Optional[Dict[str, int]] = None, bucket_seconds: int = 60, clock: Optional[Callable[[], float]] = None):
+        """
+        Initialize a counter for a relay that is off and has never run.
+
+        Args:
+            windows (Optional[Dict[str, int]]): Duty-cycle windows in seconds, each a multiple of bucket_seconds.
+            bucket_seconds (int): Width of one ring bucket in seconds.
+            clock (Optional[Callable[[], float]]): Time source, defaults to time.monotonic.
+        """
+        self.clock = clock if clock is not None else time.monotonic
+        self.windows = dict(windows if windows is not None else DUTY_WINDOWS)
+        self.bucket_seconds = bucket_seconds
+        self._spans = {name: max(1, seconds // bucket_seconds) for name, seconds in self.windows.items()}
+        # One extra slot keeps the bucket straddling the longest window's edge
+        self._slots = max(self._spans.values()) + 1
+        self._buckets = [0.0] * self._slots
+        self._sums = {name: 0.0 for name in self.windows}  # Closed on-time in each window's buckets
+        self._newest = None   # Absolute index of the newest bucket
+        self._closed = 0.0    # On-time of every closed interval
+        self._on_since = None # Monotonic time of the last switch on, None while off
+        self._lock = threading.Lock()
+        self.switches = 0
+
+    @property
+    def on(self) -> bool:
+        return self._on_since is not None
+
+    def switch(self, on: bool, now: Optional[float] = None):
+        """
+        Record a transition; repeated switches to the current state are ignored.
+
+        Args:
+            on (bool): True if the relay is now on.
+            now (Optional[float]): Monotonic time of the transition, defaults to the clock's.
+        """
+        now = self.clock() if now is None else now
+        with self._lock:
+            if on and self._on_since is None:
+                self._on_since = now
+                self.switches += 1
+            elif not on and self._on_since is not None:
+                started, self._on_since = self._on_since, None
+                if now > started:
+                    self._closed += now - started
+                    self._add(started, now)
+
+    def runtime(self, now: Optional[float] = None) -> float:
+        """
+        Return the total on-time in seconds, including the interval in progress.
+        """
+        now = self.clock() if now is None else now
+        with self._lock:
+            return self._closed + self._open_time(now, None)
+
+    def restore(self, runtime: float):
+        """
+        Set the total on-time, e.g. from a database checkpoint; the rolling windows are unaffected.
+
+        Args:
+            runtime (float): Seconds of on-time, not counting an interval in progress.
+        """
+        with self._lock:
+            self._closed = float(runtime)
+
+    def duty_cycle(self, window: str, now: Optional[float] = None) -> float:
+        """
+        Return the fraction of a window the relay spent on.
+
+        Args:
+            window (str): A window name, e.g. '1h'.
+            now (Optional[float]): Monotonic time the window ends at, defaults to now.
+
+        Returns:
+            float: Between 0.0 and 1.0.
+        """
+        now = self.clock() if now is None else now
+        seconds = self.windows[window]
+        with self._lock:
+            self._advance(self._bucket(now))
+            edge = self._newest - self._spans[window]
+            inside = ((edge + 1) * self.bucket_seconds - (now - seconds)) / self.bucket_seconds
+            on_time = self._sums[window] + min(max(inside, 0.0), 1.0) * self._buckets[edge % self._slots]
+            on_time += self._open_time(now, seconds)
+        return min(max(on_time, 0.0) / seconds, 1.0)
+
+    def duty_cycles(self, now: Optional[float] = None) -> Dict[str, float]:
+        """
+        Return the duty cycle of every window, keyed by window name.
+        """
+        now = self.clock() if now is None else now
+        return {window: self.duty_cycle(window, now) for window in self.windows}
+
+    def _open_time(self, now: float, limit: Optional[float]) -> float:
+        if self._on_since is None:
+            return 0.0
+        elapsed = max(now - self._on_since, 0.0)
+        return elapsed if limit is None else min(elapsed, limit)
+
+    def _bucket(self, moment: float) -> int:
+        return int(moment // self.bucket_seconds)
+
+    def _advance(self, newest: int):
+        """
+        Slide every window forward to end at bucket newest, dropping what falls out.
+        """
+        if self._newest is None:
+            self._newest = newest
+            return
+        if newest <= self._newest:
+            return
+        if newest - self._newest >= self._slots:
+            # Idle for longer than the longest window: nothing is left in it
+            self._buckets = [0.0] * self._slots
+            self._sums = dict.fromkeys(self._sums, 0.0)
+            self._newest = newest
+            return
+        for index in range(self._newest + 1, newest + 1):
+            for window, span in self._spans.items():
+                # The bucket leaving the window becomes its edge bucket
+                self._sums[window] -= self._buckets[(index - span) % self._slots]
+            self._buckets[index % self._slots] = 0.0
+        self._newest = newest
+
+    def _add(self, start: float, end: float):
+        """
+        Spread a closed on-interval over the buckets it overlaps that are still in the ring.
+        """
+        last = self._bucket(end)
+        self._advance(last)
+        first = max(self._bucket(start), self._newest - self._slots + 1)
+        for index in range(max(first, last - self._slots + 1), last + 1):
+            if index > self._newest:
+                break
+            lower = max(start, index * self.bucket_seconds)
+            upper = min(end, (index + 1) * self.bucket_seconds)
+            if upper <= lower:
+                continue
+            self._buckets[index % self._slots] += upper - lower
+            for window, span in self._spans.items():
+                if index > self._newest - span:
+                    self._sums[window] += upper - lower
@@ -3,8 +3,76 @@ from datetime import datetime
 
 db = SQLAlchemy()
 
+class SensorReading(db.Model):
+    """
+    Narrow time-series store holding one row per sensor sample.
+
+    Rows are keyed by (sensor, timestamp) in a WITHOUT ROWID table, so the
+    primary key is a clustered, covering index: a range scan for one sensor
+    reads a contiguous run of the b-tree and never touches a second structure.
+    """
+    __tablename__ = 'sensor_reading'
+    __table_args__ = {'sqlite_with_rowid': False}
+
+    sensor = db.Column(db.String(32), primary_key=True)
+    timestamp = db.Column(db.DateTime, primary_key=True, default=datetime.utcnow)
+    value = db.Column(db.Float, nullable=False)
+
+class ReadingRollup(db.Model):
+    """
+    Aggregate of one sensor's readings over a fixed-width time bucket.
+
+    Rows are keyed by (sensor, resolution, bucket) so a chart query at one
+    resolution is a contiguous range scan of the primary key.
+    """
+    __tablename__ = 'reading_rollup'
+    __table_args__ = {'sqlite_with_rowid': False}
+
+    sensor = db.Column(db.String(32), primary_key=True)
+    resolution = db.Column(db.Integer, primary_key=True)  # Bucket width in seconds
+    bucket = db.Column(db.DateTime, primary_key=True)     # Bucket start
+    count = db.Column(db.Integer, nullable=False)
+    total = db.Column(db.Float, nullable=False)
+    minimum = db.Column(db.Float, nullable=False)
+    maximum = db.Column(db.Float, nullable=False)
+    last = db.Column(db.Float, nullable=False)
+    last_timestamp = db.Column(db.DateTime, nullable=False)
+
+    @property
+    def mean(self):
+        return self.total / self.count if self.count else None
+
+    def to_dict(self):
+        """Convert model to dictionary for JSON serialization."""
+        return {
+            'timestamp': self.bucket.isoformat(),
+            'count': self.count,
+            'min': self.minimum,
+            'max': self.maximum,
+            'mean': self.mean,
+            'last': self.last,
+        }
+
+class RelayRuntime(db.Model):
+    """
+    Checkpointed total on-time of one output device.
+
+    Written periodically rather than on every switch, so the counters survive
+    restarts without costing a write per relay toggle.
+    """
+    __tablename__ = 'relay_runtime'
+
+    device = db.Column(db.String(32), primary_key=True)
+    runtime = db.Column(db.Float, nullable=False, default=0.0)  # Seconds
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
 class Reading(db.Model):
-    """Reading data from the grow system."""
+    """
+    Legacy reading data from the grow system.
+
+    Superseded by SensorReading; kept so existing databases can be migrated
+    with ReadingStore.migrate_legacy_readings().
+    """
     id = db.Column(db.Integer, primary_key=True)
     timestamp = db.Column(db.DateTime, default=datetime.utcnow)
 
@@ -52,7 +120,7 @@ class Config(db.Model):
     atomizer_pin = db.Column(db.Integer, default=1)
     heater_pin = db.Column(db.Integer, default=1)
     
-    # Thresholds
+    # Thresholds; light and soil are percentages of the analog sensor's range
     light_threshold = db.Column(db.Integer, default=40)
     humidity_threshold_low = db.Column(db.Integer, default=40)
     humidity_threshold_high = db.Column(db.Integer, default=40)
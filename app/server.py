@@ -1,17 +1,58 @@
-from flask import Blueprint, render_template, request, jsonify
-from app.models import db, Config
-from app.services.DeviceManager import DeviceManager
-from app.config import DEBUG_MODE
-from app.hardware.gpio_manager import initialize_gpio, cleanup_gpio
+from flask import Blueprint, Response, current_app, render_template, request, jsonify, make_response
+from app.services.ReadingBuffer import reading_buffer
+from app.services.ConfigCache import config_cache
+from app.services.RollupManager import RollupManager
+from app.services.RetentionManager import retention_manager
+from app.services.HardwareService import hardware_service
+from app.services.HardwareIPC import HardwareUnavailable
+from app.config import SNAPSHOT_TIMEOUT
+from datetime import datetime, timedelta
+import json
+import math
 import time
 
-OUTPUT_DEVICES = ['atomizer', 'light', 'water', 'heater']
-INPUT_DEVICES = ['temperature_sensor', 'humidity_sensor', 'ultrasonic_trigger', 'ultrasonic_echo', 'soil_moisture_sensor', 'light_sensor']
+# Longest a /api/status long-poll is held open, in seconds
+STATUS_LONG_POLL_TIMEOUT = 25.0
+
+# Longest deadline a client may request from /api/snapshot
+MAX_SNAPSHOT_TIMEOUT = 10.0
+
+# Longest inrush delay a bulk control request may ask for, in seconds per device
+MAX_INRUSH_DELAY = 2.0
+
+# Longest dimming ramp a request may ask for, in seconds
+MAX_PWM_RAMP = 600.0
+
+# Seconds /api/test waits for a sensor reading before handing back a job id instead
+INPUT_TEST_WAIT = 2.0
 
 bp = Blueprint('api', __name__)
 
-# Initialize GPIO at module level
-initialize_gpio()
+def finite(value) -> float:
+    """
+    Convert a request value to a float, rejecting NaN and infinities.
+
+    Raises:
+        TypeError, ValueError: If the value is not a finite number.
+    """
+    number = float(value)
+    if not math.isfinite(number):
+        raise ValueError(f'{value} is not a finite number')
+    return number
+
+def hardware():
+    """
+    The hardware this process serves: the in-process HardwareService, or a
+    HardwareClient of the hardware daemon.
+    """
+    return current_app.extensions['hardware']
+
+def reply(status, body):
+    return jsonify(body), status
+
+@bp.errorhandler(HardwareUnavailable)
+def hardware_unavailable(e):
+    return jsonify({'status': 'error', 'message': str(e)}), 503
 
 @bp.route('/')
 def index():
@@ -19,116 +60,187 @@ def index():
 
 @bp.route('/config')
 def config():
-    # Get current configuration from database
-    config = Config.query.first()
-    return render_template('config.html', active_page='config', config=config)
+    # Get current configuration from the in-process cache, picking up changes
+    # saved through another web worker
+    config_cache.revalidate()
+    return render_template('config.html', active_page='config', config=config_cache.snapshot())
 
 @bp.route('/api/config', methods=['GET'])
 def get_config():
-    # Get current configuration from database
-    config = Config.query.first()
-    if not config:
-        # Create default config if none exists
-        config = Config()
-        db.session.add(config)
-        db.session.commit()
-    
-    return jsonify(config.to_dict())
+    # Polling clients revalidate with If-None-Match and get a 304 while the
+    # configuration is unchanged; the ETag is a hash of the content, so it
+    # agrees across web workers and restarts. Another worker may have saved
+    # the configuration, so the snapshot is checked against the row first
+    config_cache.revalidate()
+    etag, snapshot = config_cache.get_tagged()
+    if request.if_none_match.contains(etag):
+        response = make_response('', 304)
+    else:
+        response = jsonify(dict(snapshot))
+    response.set_etag(etag)
+    response.headers['Cache-Control'] = 'no-cache'
+    return response
 
 @bp.route('/api/config', methods=['POST'])
 def update_config():
-    # Get current configuration from database
-    config = Config.query.first()
-    if not config:
-        config = Config()
-        db.session.add(config)
-    
-    # Update configuration with form data
-    data = request.json
-    
-    # Update each field if it exists in the request
-    for key, value in data.items():
-        if hasattr(config, key):
-            # Convert string values to integers where needed
-            if isinstance(getattr(config, key), int):
-                try:
-                    setattr(config, key, int(value))
-                except ValueError:
-                    return jsonify({'success': False, 'message': f'Invalid value for {key}'})
-            else:
-                setattr(config, key, value)
-    
-    # Save changes
-    try:
-        db.session.commit()
+    # Update configuration with form data; the cache swaps in the new snapshot
+    success, message = config_cache.update(request.json)
+    if success:
+        # Rebuild the shared devices if a pin assignment changed
+        hardware().call('reload')
         return jsonify({'success': True})
-    except Exception as e:
-        db.session.rollback()
-        return jsonify({'success': False, 'message': str(e)})
+    return jsonify({'success': False, 'message': message})
+
+@bp.route('/api/readings', methods=['GET'])
+def get_readings():
+    # Chart data for one or more sensors, served from the coarsest rollup that
+    # still fits the requested number of points
+    sensors = [sensor for sensor in request.args.get('sensors', '').split(',') if sensor]
+    try:
+        end = datetime.fromisoformat(request.args['end']) if 'end' in request.args else datetime.utcnow()
+        start = datetime.fromisoformat(request.args['start']) if 'start' in request.args else end - timedelta(days=1)
+        max_points = int(request.args.get('points', 500))
+    except ValueError as e:
+        return jsonify({'success': False, 'message': str(e)}), 400
+
+    rollups = RollupManager()
+    series = {}
+    for sensor in sensors:
+        resolution, points = rollups.query(sensor, start, end, max_points)
+        series[sensor] = {'resolution': resolution, 'points': points}
+    return jsonify({'start': start.isoformat(), 'end': end.isoformat(), 'series': series})
 
-# Add your existing control endpoints here
 @bp.route('/api/status', methods=['GET'])
 def get_status():
-    # This is a placeholder - you'll need to implement actual status retrieval
-    return jsonify({
-        'light': False,
-        'humidifier': False,
-        'water': False
+    # With ?since=<sequence>, hold the request until something changes or the timeout expires
+    since = request.args.get('since', type=int)
+    timeout = min(max(request.args.get('timeout', STATUS_LONG_POLL_TIMEOUT, type=finite), 0.0), STATUS_LONG_POLL_TIMEOUT)
+    return reply(*hardware().call('status', since=since, timeout=timeout))
+
+@bp.route('/api/stream', methods=['GET'])
+def stream_events():
+    # Server-Sent Events; ?topics=sensors,devices filters, and a reconnecting
+    # client resumes after its Last-Event-ID header (or ?last_id=)
+    topics = [topic for topic in request.args.get('topics', '').split(',') if topic] or None
+    last_id = request.headers.get('Last-Event-ID', type=int)
+    if last_id is None:
+        last_id = request.args.get('last_id', type=int)
+    source = hardware()
+
+    def generate():
+        yield 'retry: 3000\n\n'
+        resume_from = last_id
+        if resume_from is None:
+            # A new client starts from the full state, then follows the changes
+            resume_from, state = source.stream_start()
+            yield f"event: state\ndata: {json.dumps(state)}\n\n"
+        for event in source.listen(resume_from, topics):
+            yield ': keep-alive\n\n' if event is None else event.to_sse()
+
+    return Response(generate(), mimetype='text/event-stream', headers={
+        'Cache-Control': 'no-cache',
+        'X-Accel-Buffering': 'no'
     })
 
+@bp.route('/api/acquisition', methods=['GET'])
+def get_acquisition():
+    return reply(*hardware().call('acquisition'))
+
+@bp.route('/api/gpio', methods=['GET'])
+def get_gpio():
+    # Command counts and queue latency of the GPIO I/O thread
+    return reply(*hardware().call('gpio'))
+
+@bp.route('/api/pwm', methods=['GET'])
+def get_pwm():
+    # PWM channels and the software PWM thread's edge timing
+    return reply(*hardware().call('pwm'))
+
+@bp.route('/api/rules', methods=['GET'])
+def get_rules():
+    # Control engine thresholds and per-rule evaluation counters
+    return reply(*hardware().call('rules'))
+
+@bp.route('/api/usage', methods=['GET'])
+def get_usage():
+    # Total runtime and last hour/day duty cycle of every output
+    return reply(*hardware().call('usage'))
+
+@bp.route('/api/snapshot', methods=['GET'])
+def get_snapshot():
+    # Bounded so a client cannot hold a request thread indefinitely
+    timeout = min(max(request.args.get('timeout', SNAPSHOT_TIMEOUT, type=finite), 0.0), MAX_SNAPSHOT_TIMEOUT)
+    return reply(*hardware().call('snapshot', timeout=timeout))
+
 @bp.route('/api/test', methods=['POST'])
 def test_device():
     data = request.json
     print(data)
-    device = data.get('device')
-    if device == 'ultrasonic_sensor':
-        trigger_pin = data.get('trigger_pin')
-        echo_pin = data.get('echo_pin')
-        device_manager = DeviceManager(ultrasonic_trigger_pin_in=trigger_pin, ultrasonic_echo_pin_in=echo_pin, debug_mode=DEBUG_MODE)
-        value = device_manager.test_device(device, io="input")
-        del device_manager
-        return jsonify({'status': 'success', 'device': device, 'value': value})
-    elif device == 'atomizer':
-        device_manager = DeviceManager(atomizer_pin=data.get('pin'), debug_mode=DEBUG_MODE)
-    elif device == 'light':
-        device_manager = DeviceManager(light_pin=data.get('pin'), debug_mode=DEBUG_MODE)
-    elif device == 'water':
-        device_manager = DeviceManager(water_pin=data.get('pin'), debug_mode=DEBUG_MODE)
-    elif device == 'heater':
-        device_manager = DeviceManager(heater_pin=data.get('pin'), debug_mode=DEBUG_MODE)
-    elif device == 'light_sensor':
-        device_manager = DeviceManager(light_pin_in=data.get('pin'), debug_mode=DEBUG_MODE)
-    elif device == 'temperature_sensor':
-        device_manager = DeviceManager(temperature_pin_in=data.get('pin'), debug_mode=DEBUG_MODE)
-    elif device == 'humidity_sensor':
-        device_manager = DeviceManager(humidity_pin_in=data.get('pin'), debug_mode=DEBUG_MODE)
-    elif device == 'soil_moisture_sensor':
-        device_manager = DeviceManager(soil_moisture_pin_in=data.get('pin'), debug_mode=DEBUG_MODE)
-    
-    if device in OUTPUT_DEVICES:
-        device_manager.test_device(device, io="output")
-        return jsonify({'status': 'success', 'device': device})
-    elif device in INPUT_DEVICES:
-        value = device_manager.test_device(device, io="input")
-        return jsonify({'status': 'success', 'device': device, 'value': value})
-
-    del device_manager
-    
+    return reply(*hardware().call('test', data=data, wait=INPUT_TEST_WAIT))
+
+@bp.route('/api/test/<int:job_id>', methods=['GET'])
+def get_test_job(job_id):
+    return reply(*hardware().call('test_job', job_id=job_id))
 
 @bp.route('/api/control', methods=['POST'])
 def control_device():
     data = request.json
-    device = data.get('device')
-    state = data.get('state', False)
+    return reply(*hardware().call('control', device=data.get('device'), state=data.get('state', False)))
 
-    device_manager = DeviceManager(debug_mode=DEBUG_MODE)
-    if state:
-        device_manager.turn_on(device)
-    else:
-        device_manager.turn_off(device)
-    return jsonify({'status': 'success', 'device': device, 'state': state})
+@bp.route('/api/control/bulk', methods=['POST'])
+def control_devices():
+    # {"states": {"light": true, "heater": false}, "inrush_delay": 0.5}
+    data = request.json
+    states = data.get('states')
+    if not isinstance(states, dict) or not states:
+        return jsonify({'status': 'error', 'message': 'states must map device names to on/off'}), 400
+    inrush_delay = data.get('inrush_delay')
+    if inrush_delay is not None:
+        try:
+            inrush_delay = min(max(finite(inrush_delay), 0.0), MAX_INRUSH_DELAY)
+        except (TypeError, ValueError) as e:
+            return jsonify({'status': 'error', 'message': str(e)}), 400
+    return reply(*hardware().call('control_bulk', states=states, inrush_delay=inrush_delay))
+
+@bp.route('/api/control/level', methods=['POST'])
+def control_level():
+    # {"device": "light", "level": 0.4, "ramp": 5}
+    data = request.json
+    try:
+        level = finite(data.get('level'))
+        ramp = min(max(finite(data.get('ramp', 0.0)), 0.0), MAX_PWM_RAMP)
+    except (TypeError, ValueError):
+        return jsonify({'status': 'error', 'message': 'level and ramp must be numbers'}), 400
+    if not 0.0 <= level <= 1.0:
+        return jsonify({'status': 'error', 'message': 'level must be between 0 and 1'}), 400
+    return reply(*hardware().call('level', device=data.get('device'), level=level, ramp=ramp))
+
+@bp.route('/api/schedule', methods=['POST'])
+def schedule_activation():
+    return reply(*hardware().call('schedule', data=request.json))
+
+@bp.route('/api/schedule', methods=['GET'])
+def list_activations():
+    return reply(*hardware().call('schedules'))
+
+@bp.route('/api/schedule/<int:job_id>', methods=['GET'])
+def get_activation(job_id):
+    return reply(*hardware().call('schedule_job', job_id=job_id))
+
+@bp.route('/api/schedule/<int:job_id>/cancel', methods=['POST'])
+def cancel_activation(job_id):
+    return reply(*hardware().call('schedule_cancel', job_id=job_id))
+
+@bp.route('/api/schedule/<int:job_id>/extend', methods=['POST'])
+def extend_activation(job_id):
+    try:
+        seconds = float(request.json.get('seconds', 0))
+    except (TypeError, ValueError) as e:
+        return jsonify({'status': 'error', 'message': str(e)}), 400
+    return reply(*hardware().call('schedule_extend', job_id=job_id, seconds=seconds))
 
 def cleanup():
     """Cleanup function to be called when the application is shutting down"""
-    cleanup_gpio()
-
+    retention_manager.stop()
+    hardware_service.close()
+    reading_buffer.stop()
@@ -0,0 +1,320 @@
+from app.services.DeviceRegistry import device_registry
+from app.services.ReadingBuffer import reading_buffer
+from app.services.StateStore import state_store
+from app.config import ACQUISITION_WORKERS, SNAPSHOT_TIMEOUT
+from concurrent.futures import ThreadPoolExecutor, wait
+from collections import deque
+from datetime import datetime
+from typing import Dict, Optional
+import heapq
+import threading
+import time
+
+# Seconds between polls of each sensor
+DEFAULT_RATES = {
+    'ultrasonic_sensor': 1.0,
+    'humidity_sensor': 2.0,
+    'temperature_sensor': 5.0,
+    'light_sensor': 10.0,
+    'soil_moisture_sensor': 30.0,
+}
+
+class SensorStats:
+    """
+    Polling statistics for one sensor.
+
+    Attributes:
+        period (float): Target seconds between polls.
+        polls (int): Completed polls.
+        errors (int): Polls that raised or returned no value.
+        missed (int): Deadlines skipped because the previous poll was still running or the engine fell behind.
+        last_duration (Optional[float]): Seconds the last poll took.
+    """
+
+    def __init__(self, period: float, window: int = 20):
+        self.period = period
+        self.polls = 0
+        self.errors = 0
+        self.missed = 0
+        self.last_duration = None
+        self._starts = deque(maxlen=window)
+
+    def record_poll(self, started: float):
+        """
+        Count a completed poll that started at the given monotonic time.
+        """
+        self.polls += 1
+        self._starts.append(started)
+
+    @property
+    def achieved_rate(self) -> Optional[float]:
+        """
+        Polls per second over the recent window, None until two polls have started.
+        """
+        if len(self._starts) < 2 or self._starts[-1] == self._starts[0]:
+            return None
+        return (len(self._starts) - 1) / (self._starts[-1] - self._starts[0])
+
+    def to_dict(self) -> dict:
+        """
+        Convert the statistics to a dictionary for JSON serialization.
+        """
+        rate = self.achieved_rate
+        return {
+            'period': self.period,
+            'target_rate': 1.0 / self.period,
+            'achieved_rate': round(rate, 4) if rate is not None else None,
+            'polls': self.polls,
+            'errors': self.errors,
+            'missed': self.missed,
+            'last_duration': self.last_duration,
+        }
+
+class AcquisitionEngine:
+    """
+    Background engine that polls every configured sensor at its own rate.
+
+    A single scheduler thread keeps a heap of next deadlines and hands due
+    polls to a thread pool, so a slow sensor (a DHT11 retry, a 1-wire
+    conversion) never delays a fast one. A sensor whose previous poll is
+    still running skips that deadline and it is counted as missed. Each
+    poll publishes its timestamped values to an in-memory latest-value store
+    and to the reading buffer for persistence.
+
+    snapshot() reads every configured sensor at once on demand and returns
+    whatever finished before a single overall deadline.
+    """
+
+    def __init__(
+            self,
+            registry=device_registry,
+            buffer=reading_buffer,
+            store=state_store,
+            rates: Optional[Dict[str, float]] = None,
+            max_workers: int = ACQUISITION_WORKERS,
+            publish_timeout: float = 1.0
+        ):
+        """
+        Initialize the engine without starting it.
+
+        Args:
+            registry (DeviceRegistry): Source of the shared sensor instances.
+            buffer (ReadingBuffer): Buffer the samples are persisted through.
+            store (StateStore): Live state the latest values are published to.
+            rates (Optional[Dict[str, float]]): Seconds between polls per sensor device, defaults to DEFAULT_RATES.
+            max_workers (int): Threads available for concurrent polls.
+            publish_timeout (float): Maximum seconds a poll waits for room in the buffer.
+        """
+        self.registry = registry
+        self.buffer = buffer
+        self.store = store
+        self.rates = dict(rates if rates is not None else DEFAULT_RATES)
+        self.max_workers = max_workers
+        self.publish_timeout = publish_timeout
+        self._app = None
+        self._lock = threading.Lock()
+        self._stats = {device: SensorStats(period) for device, period in self.rates.items()}
+        self._latest = {}  # quantity -> (timestamp, value)
+        self._in_flight = set()
+        self._executor = None
+        self._snapshot_executor = None
+        self._snapshot_reads = {}  # device -> Future of a snapshot read still in progress
+        self._thread = None
+        self._stop = threading.Event()
+
+    def init_app(self, app):
+        """
+        Bind the engine to an application and start polling outside of testing.
+
+        Args:
+            app (Flask): The application whose context polls run in.
+        """
+        self._app = app
+        if not app.testing:
+            self.start()
+
+    def start(self):
+        """
+        Start the scheduler thread and the poll pool.
+        """
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="Acquisition")
+        self._thread = threading.Thread(target=self._run, name="AcquisitionEngine", daemon=True)
+        self._thread.start()
+        print(f"[{time.strftime('%m-%d-%Y %H:%M:%S')}] - (AcquisitionEngine) Polling {', '.join(self.rates)}")
+
+    def stop(self):
+        """
+        Stop scheduling and wait for in-progress polls to finish.
+        """
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+        if self._snapshot_executor is not None:
+            # A hung probe must not hold up shutdown
+            self._snapshot_executor.shutdown(wait=False)
+            self._snapshot_executor = None
+
+    def latest(self) -> Dict[str, dict]:
+        """
+        Return the newest value of every quantity.
+
+        Returns:
+            Dict[str, dict]: {'value', 'timestamp'} keyed by quantity name.
+        """
+        with self._lock:
+            return {
+                quantity: {'value': value, 'timestamp': timestamp.isoformat()}
+                for quantity, (timestamp, value) in self._latest.items()
+            }
+
+    def stats(self) -> Dict[str, dict]:
+        """
+        Return the polling statistics of every sensor, keyed by device name.
+        """
+        with self._lock:
+            return {device: stats.to_dict() for device, stats in self._stats.items()}
+
+    def snapshot(self, timeout: float = SNAPSHOT_TIMEOUT) -> Dict[str, dict]:
+        """
+        Read every configured sensor concurrently and return what finished before the deadline.
+
+        A sensor still being read from an earlier snapshot is not read again;
+        the snapshot waits on the read already in progress.
+
+        Args:
+            timeout (float): Overall deadline in seconds.
+
+        Returns:
+            Dict[str, dict]: Per sensor device: 'values', 'latency' in seconds,
+                'timed_out' and 'error'.
+        """
+        devices = [device for device in self.rates if self.registry.get(device) is not None]
+        futures = {}
+        with self._lock:
+            if self._snapshot_executor is None:
+                self._snapshot_executor = ThreadPoolExecutor(max_workers=max(len(self.rates), 1), thread_name_prefix="Snapshot")
+            for device in devices:
+                future = self._snapshot_reads.get(device)
+                if future is None or future.done():
+                    future = self._snapshot_executor.submit(self._snapshot_read, device)
+                    self._snapshot_reads[device] = future
+                futures[device] = future
+        wait(list(futures.values()), timeout=timeout)
+
+        results = {}
+        for device, future in futures.items():
+            if future.done():
+                values, latency, error = future.result()
+                results[device] = {'values': values, 'latency': round(latency, 4), 'timed_out': False, 'error': error}
+            else:
+                results[device] = {'values': None, 'latency': None, 'timed_out': True, 'error': None}
+        return results
+
+    def poll(self, device: str):
+        """
+        Read one sensor and publish its values; runs on the poll pool.
+
+        Args:
+            device (str): The sensor device name, e.g. 'humidity_sensor'.
+        """
+        stats = self._stats[device]
+        started = time.monotonic()
+        try:
+            published = self._read(device)
+            if published is None:
+                return
+            with self._lock:
+                stats.record_poll(started)
+                if not published:
+                    stats.errors += 1
+        except Exception as e:
+            with self._lock:
+                stats.errors += 1
+            print(f"[{time.strftime('%m-%d-%Y %H:%M:%S')}] - (AcquisitionEngine) Error polling {device}: {str(e)}")
+        finally:
+            with self._lock:
+                stats.last_duration = time.monotonic() - started
+                self._in_flight.discard(device)
+
+    def _read(self, device: str) -> Optional[dict]:
+        """
+        Read a sensor once and publish its values.
+
+        Returns:
+            Optional[dict]: The values that were published, or None if the sensor is not configured.
+        """
+        sensor = self.registry.get(device)
+        if sensor is None:
+            return None
+        with self.registry.lock(device):
+            values = sensor.read_all()
+        timestamp = datetime.utcnow()
+        published = {quantity: value for quantity, value in values.items() if value is not None}
+        with self._lock:
+            for quantity, value in published.items():
+                self._latest[quantity] = (timestamp, value)
+        self.store.set_sensors(published, timestamp)
+        self.buffer.record_many(published, timestamp, timeout=self.publish_timeout)
+        return published
+
+    def _snapshot_read(self, device: str):
+        started = time.monotonic()
+        try:
+            if self._app is not None:
+                with self._app.app_context():
+                    values = self._read(device)
+            else:
+                values = self._read(device)
+            return values, time.monotonic() - started, None
+        except Exception as e:
+            return None, time.monotonic() - started, str(e)
+
+    def _submit(self, device: str):
+        with self._lock:
+            if device in self._in_flight:
+                self._stats[device].missed += 1
+                return
+            self._in_flight.add(device)
+        self._executor.submit(self._poll_in_context, device)
+
+    def _poll_in_context(self, device: str):
+        if self._app is not None:
+            with self._app.app_context():
+                self.poll(device)
+        else:
+            self.poll(device)
+
+    def _run(self):
+        """
+        Scheduler loop: sleep until the earliest deadline and submit every due poll.
+        """
+        now = time.monotonic()
+        heap = [(now, device) for device in self.rates]
+        heapq.heapify(heap)
+        while not self._stop.is_set():
+            due, device = heap[0]
+            wait = due - time.monotonic()
+            if wait > 0:
+                self._stop.wait(wait)
+                continue
+            heapq.heappop(heap)
+            self._submit(device)
+            period = self.rates[device]
+            next_due = due + period
+            now = time.monotonic()
+            if next_due <= now:
+                # Fell behind: skip the deadlines that already passed instead of bursting
+                skipped = int((now - next_due) // period) + 1
+                with self._lock:
+                    self._stats[device].missed += skipped
+                next_due += skipped * period
+            heapq.heappush(heap, (next_due, device))
+
+acquisition_engine = AcquisitionEngine()
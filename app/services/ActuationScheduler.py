@@ -0,0 +1,365 @@
+from collections import OrderedDict
+from typing import Callable, List, Optional, Tuple
+import heapq
+import itertools
+import math
+import threading
+import time
+
+# Longest on or off phase a job may have, in seconds
+MAX_PHASE = 24 * 3600
+
+class ActuationJob:
+    """
+    A timed activation of one relay: a single "on for N seconds" run or a pulse train.
+
+    Attributes:
+        id (int): Unique job id.
+        device (str): Name of the device being driven.
+        on_time (float): Seconds the relay stays on per cycle.
+        off_time (float): Seconds the relay stays off between cycles.
+        cycles (int): Number of on/off cycles.
+        cycles_done (int): Number of completed on phases.
+        status (str): 'pending', 'running', 'completed' or 'cancelled'.
+    """
+
+    def __init__(self, job_id: int, device: str, component, on_time: float, off_time: float, cycles: int, lock=None):
+        self.id = job_id
+        self.device = device
+        self.component = component
+        # Serializes the job's switches with each other and with cancellation
+        self.lock = lock if lock is not None else threading.RLock()
+        self.on_time = on_time
+        self.off_time = off_time
+        self.cycles = cycles
+        self.cycles_done = 0
+        self.status = 'pending'
+        self.phase = None          # 'on' or 'off' while running
+        self.phase_ends_at = None  # Monotonic deadline of the current phase
+        self.generation = 0        # Bumped to invalidate queued timer entries
+        self.created_at = time.time()
+
+    def to_dict(self) -> dict:
+        """
+        Convert the job to a dictionary for JSON serialization.
+        """
+        remaining = None
+        if self.phase_ends_at is not None and self.status == 'running':
+            remaining = max(self.phase_ends_at - time.monotonic(), 0.0)
+        return {
+            'id': self.id,
+            'device': self.device,
+            'status': self.status,
+            'phase': self.phase,
+            'on_time': self.on_time,
+            'off_time': self.off_time,
+            'cycles': self.cycles,
+            'cycles_done': self.cycles_done,
+            'phase_remaining': remaining,
+        }
+
+class ActuationScheduler:
+    """
+    Non-blocking scheduler for timed relay activations.
+
+    Jobs are driven by a single dedicated thread that sleeps on a condition
+    variable until the earliest deadline in a heap, so any number of timed
+    runs across many relays cost one thread and O(log n) per transition, and
+    callers get a job handle back immediately instead of blocking in
+    time.sleep. Cancelling or extending a job bumps its generation, which
+    lazily invalidates the timer entries already in the heap.
+
+    Due transitions are collected under the scheduler's condition and the
+    relays are switched after releasing it, so a slow GPIO write never stalls
+    the scheduler's API. Under the job's lock, a job cancelled in the
+    meantime is never switched on again.
+
+    A new job for a device supersedes any job still active on that device.
+    """
+
+    def __init__(self, history_size: int = 1000):
+        """
+        Initialize the scheduler.
+
+        Args:
+            history_size (int): Number of finished jobs kept for status queries.
+        """
+        self.history_size = history_size
+        self._condition = threading.Condition()
+        self._heap = []
+        self._jobs = OrderedDict()
+        self._active = {}  # device -> job id
+        self._ids = itertools.count(1)
+        self._sequence = itertools.count()
+        self._thread = None
+        self._running = False
+
+    def start(self):
+        """
+        Start the scheduler thread if it is not already running.
+        """
+        with self._condition:
+            if self._running:
+                return
+            self._running = True
+            self._thread = threading.Thread(target=self._run, name="ActuationScheduler", daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        """
+        Cancel every active job, switching its relay off, and stop the thread.
+        """
+        with self._condition:
+            switch_off = [job for job in self._active_list() if self._cancel(job)]
+            self._running = False
+            self._condition.notify()
+        for job in switch_off:
+            self._switch(job, False)
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def activate_for(self, device: str, component, duration: float, lock=None) -> ActuationJob:
+        """
+        Switch a relay on now and off again after duration seconds.
+
+        Args:
+            device (str): Name of the device, used to supersede earlier jobs.
+            component (RelayControlledComponent): The relay to drive.
+            duration (float): Seconds to stay on.
+            lock (Optional[threading.RLock]): Lock held around each GPIO transition.
+
+        Returns:
+            ActuationJob: The job handle.
+        """
+        return self.pulse(device, component, duration, 0, 1, lock)
+
+    def pulse(self, device: str, component, on_time: float, off_time: float, cycles: int, lock=None) -> ActuationJob:
+        """
+        Pulse a relay on and off for a number of cycles.
+
+        Args:
+            device (str): Name of the device, used to supersede earlier jobs.
+            component (RelayControlledComponent): The relay to drive.
+            on_time (float): Seconds on per cycle.
+            off_time (float): Seconds off between cycles.
+            cycles (int): Number of cycles.
+            lock (Optional[threading.RLock]): Lock held around each GPIO transition.
+
+        Returns:
+            ActuationJob: The job handle.
+        """
+        # NaN and inf would leave the scheduler thread without a deadline to wait for
+        if not all(math.isfinite(t) and 0 <= t <= MAX_PHASE for t in (on_time, off_time)) or cycles < 1:
+            raise ValueError(f"on_time and off_time must be between 0 and {MAX_PHASE}s and cycles >= 1")
+        if not self._running:
+            self.start()
+        with self._condition:
+            job = ActuationJob(next(self._ids), device, component, on_time, off_time, cycles, lock)
+            previous = self._active.get(device)
+            if previous is not None:
+                self._cancel(self._jobs[previous], switch_off=False)
+            self._jobs[job.id] = job
+            self._active[device] = job.id
+            self._trim_history()
+            self._push(job, time.monotonic(), 'on')
+        print(f"[{time.strftime('%m-%d-%Y %H:%M:%S')}] - (ActuationScheduler) Job {job.id}: {device} {cycles}x{on_time}s on/{off_time}s off")
+        return job
+
+    def cancel(self, job_id: int) -> Optional[ActuationJob]:
+        """
+        Cancel a job, switching its relay off if it is on.
+
+        Returns:
+            Optional[ActuationJob]: The job, or None if unknown.
+        """
+        with self._condition:
+            job = self._jobs.get(job_id)
+            switch_off = job is not None and job.status in ('pending', 'running') and self._cancel(job)
+        if switch_off:
+            self._switch(job, False)
+        return job
+
+    def rebind(self, resolve: Callable[[str], object]) -> int:
+        """
+        Point the active jobs at rebuilt components, e.g. after the device registry reloaded.
+
+        Jobs whose device no longer exists are cancelled. A job in its on phase
+        switches its new component on, since a rebuild leaves the outputs off.
+
+        Args:
+            resolve (Callable[[str], object]): Returns the current component for a job's device, or None.
+
+        Returns:
+            int: Number of jobs rebound.
+        """
+        switch_on = []
+        with self._condition:
+            for job in self._active_list():
+                component = resolve(job.device)
+                if component is None:
+                    # The old component's pin may belong to another device now
+                    self._cancel(job, switch_off=False)
+                    job.component = None
+                    continue
+                job.component = component
+                if job.phase == 'on':
+                    switch_on.append(job)
+            rebound = len(self._active)
+        for job in switch_on:
+            self._switch(job, True)
+        return rebound
+
+    def extend(self, job_id: int, seconds: float) -> Optional[ActuationJob]:
+        """
+        Lengthen the current phase of an active job.
+
+        Args:
+            job_id (int): The job to extend.
+            seconds (float): Seconds added to the current phase; may be negative to shorten it.
+
+        Returns:
+            Optional[ActuationJob]: The job, or None if it is unknown or already finished.
+
+        Raises:
+            ValueError: If seconds is not finite or the phase would exceed MAX_PHASE seconds.
+        """
+        if not math.isfinite(seconds):
+            raise ValueError(f"seconds must be finite, got {seconds}")
+        with self._condition:
+            job = self._jobs.get(job_id)
+            if job is None or job.status not in ('pending', 'running'):
+                return None
+            if job.phase is None:
+                # Not switched on yet: lengthen the first on phase
+                if job.on_time + seconds > MAX_PHASE:
+                    raise ValueError(f"A phase may last at most {MAX_PHASE}s")
+                job.on_time += seconds
+                return job
+            deadline = job.phase_ends_at + seconds
+            if deadline - time.monotonic() > MAX_PHASE:
+                raise ValueError(f"A phase may last at most {MAX_PHASE}s")
+            self._push(job, deadline, 'off' if job.phase == 'on' else 'on')
+            return job
+
+    def get(self, job_id: int) -> Optional[ActuationJob]:
+        """
+        Return a job by id, or None if it is unknown or has aged out of the history.
+        """
+        with self._condition:
+            return self._jobs.get(job_id)
+
+    def active_jobs(self) -> list:
+        """
+        Return the jobs currently pending or running.
+        """
+        with self._condition:
+            return self._active_list()
+
+    def _active_list(self) -> List[ActuationJob]:
+        return [self._jobs[job_id] for job_id in self._active.values()]
+
+    def _push(self, job: ActuationJob, deadline: float, action: str):
+        """
+        Queue the next transition of a job, invalidating any earlier entry.
+        """
+        job.generation += 1
+        job.phase_ends_at = deadline if job.phase is not None else None
+        heapq.heappush(self._heap, (deadline, next(self._sequence), job, job.generation, action))
+        self._condition.notify()
+
+    def _cancel(self, job: ActuationJob, switch_off: bool = True) -> bool:
+        """
+        Mark a job cancelled; returns True if the caller must switch its relay off after releasing the condition.
+        """
+        job.generation += 1
+        switch = job.phase == 'on' and switch_off
+        job.status = 'cancelled'
+        job.phase = None
+        if self._active.get(job.device) == job.id:
+            del self._active[job.device]
+        return switch
+
+    def _finish(self, job: ActuationJob):
+        job.status = 'completed'
+        job.phase = None
+        job.phase_ends_at = None
+        if self._active.get(job.device) == job.id:
+            del self._active[job.device]
+
+    def _switch(self, job: ActuationJob, on: bool):
+        """
+        Perform one GPIO transition; the component accounts its own on-time.
+
+        Must be called without holding the condition. Switching on is skipped
+        if the job was cancelled since the transition was collected.
+        """
+        try:
+            with job.lock:
+                if job.component is None or (on and job.status == 'cancelled'):
+                    return
+                if on:
+                    job.component.turn_on()
+                else:
+                    job.component.turn_off()
+        except Exception as e:
+            print(f"[{time.strftime('%m-%d-%Y %H:%M:%S')}] - (ActuationScheduler) Job {job.id}: error switching {job.device}: {str(e)}")
+
+    def _fire(self, job: ActuationJob, action: str, now: float) -> bool:
+        """
+        Advance a job through a due transition and queue the next one.
+
+        Returns:
+            bool: The state the relay must be switched to.
+        """
+        if action == 'on':
+            job.status = 'running'
+            job.phase = 'on'
+            self._push(job, now + job.on_time, 'off')
+            return True
+        job.phase = 'off'
+        job.cycles_done += 1
+        if job.cycles_done >= job.cycles:
+            self._finish(job)
+        else:
+            self._push(job, now + job.off_time, 'on')
+        return False
+
+    def _due(self, now: float) -> List[Tuple[ActuationJob, bool]]:
+        """
+        Pop and fire every transition due by now, returning the switches to perform.
+        """
+        due = []
+        while self._heap and self._heap[0][0] <= now:
+            _, _, job, generation, action = heapq.heappop(self._heap)
+            if generation != job.generation or job.status in ('completed', 'cancelled'):
+                continue
+            due.append((job, self._fire(job, action, now)))
+        return due
+
+    def _trim_history(self):
+        while len(self._jobs) > self.history_size:
+            job_id, job = next(iter(self._jobs.items()))
+            if job.status in ('pending', 'running'):
+                break
+            del self._jobs[job_id]
+
+    def _run(self):
+        """
+        Scheduler loop: sleep until the earliest deadline, then switch every due transition.
+        """
+        while True:
+            with self._condition:
+                due = self._due(time.monotonic())
+                while not due and self._running:
+                    timeout = self._heap[0][0] - time.monotonic() if self._heap else None
+                    if timeout is None or timeout > 0:
+                        self._condition.wait(timeout)
+                    due = self._due(time.monotonic())
+                if not self._running:
+                    # stop() has already switched the cancelled jobs off
+                    return
+            for job, on in due:
+                self._switch(job, on)
+
+actuation_scheduler = ActuationScheduler()
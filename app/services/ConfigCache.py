@@ -0,0 +1,158 @@
+from app.models import db, Config
+from types import MappingProxyType
+from typing import Mapping, Optional, Tuple
+import hashlib
+import json
+import threading
+
+class ConfigCache:
+    """
+    Process-wide cached snapshot of the Config row.
+
+    Readers get an immutable mapping and a version number without touching
+    SQLite. The version increases every time the snapshot is replaced, so
+    control loops detect threshold changes with an integer comparison. The
+    version is local to the process, so HTTP caching uses an ETag hashed from
+    the snapshot's content instead, which every worker and every restart
+    computes the same way.
+
+    Each web worker holds its own snapshot, and an update in one worker does
+    not reach the others; readers that must see other processes' writes call
+    revalidate(), which compares the row's updated_at with the snapshot's.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._snapshot = None
+        self._version = 0
+        self._etag = None
+        self._updated_at = None
+
+    def init_app(self, app):
+        """
+        Drop any snapshot loaded from a previous application's database.
+
+        Args:
+            app (Flask): The application whose database backs the cache.
+        """
+        self.invalidate()
+
+    @property
+    def version(self) -> int:
+        """
+        The version of the current snapshot, 0 before the first load.
+        """
+        return self._version
+
+    def get(self) -> Tuple[int, Mapping]:
+        """
+        Return the current (version, snapshot) pair, loading it on first use.
+
+        Loading requires an application context; cached reads do not.
+
+        Returns:
+            Tuple[int, Mapping]: The snapshot version and a read-only mapping of Config.to_dict().
+        """
+        with self._lock:
+            if self._snapshot is None:
+                self._load()
+            return self._version, self._snapshot
+
+    def revalidate(self) -> bool:
+        """
+        Reload the snapshot if another process has changed the Config row since it was taken.
+
+        Costs one single-column query; requires an application context.
+
+        Returns:
+            bool: Whether the snapshot was replaced.
+        """
+        with self._lock:
+            updated_at = db.session.query(Config.updated_at).scalar()
+            if self._snapshot is not None and updated_at == self._updated_at:
+                return False
+            self._load()
+            return True
+
+    def get_tagged(self) -> Tuple[str, Mapping]:
+        """
+        Return the current snapshot with its content ETag, loading it on first use.
+
+        Returns:
+            Tuple[str, Mapping]: The ETag and the read-only snapshot it was computed from.
+        """
+        self.get()
+        with self._lock:
+            return self._etag, self._snapshot
+
+    def snapshot(self) -> Mapping:
+        """
+        Return the current snapshot without its version.
+        """
+        return self.get()[1]
+
+    def update(self, data: dict) -> Tuple[bool, Optional[str]]:
+        """
+        Apply field updates to the Config row, commit, and swap in the new snapshot.
+
+        The write and the snapshot swap happen under the cache lock, so readers
+        never see a version that does not match the committed row.
+
+        Args:
+            data (dict): Field names and values; unknown fields are ignored.
+
+        Returns:
+            Tuple[bool, Optional[str]]: Whether the update succeeded and an error message if not.
+        """
+        with self._lock:
+            config = Config.query.first()
+            if not config:
+                config = Config()
+                db.session.add(config)
+
+            for key, value in data.items():
+                if hasattr(config, key):
+                    # Convert string values to integers where needed
+                    if isinstance(getattr(config, key), int):
+                        try:
+                            setattr(config, key, int(value))
+                        except ValueError:
+                            db.session.rollback()
+                            return False, f'Invalid value for {key}'
+                    else:
+                        setattr(config, key, value)
+
+            try:
+                db.session.commit()
+            except Exception as e:
+                db.session.rollback()
+                return False, str(e)
+            self._replace(config)
+            return True, None
+
+    def invalidate(self):
+        """
+        Discard the snapshot so the next get() reloads it from the database.
+        """
+        with self._lock:
+            self._snapshot = None
+
+    def _load(self):
+        # populate_existing: the session may still hold the row as it was
+        # before another process committed to it
+        config = Config.query.populate_existing().first()
+        if not config:
+            config = Config()
+            db.session.add(config)
+            db.session.commit()
+        self._replace(config)
+
+    def _replace(self, config: Config):
+        snapshot = config.to_dict()
+        digest = hashlib.sha1(json.dumps(snapshot, sort_keys=True, default=str).encode()).hexdigest()
+        self._snapshot = MappingProxyType(snapshot)
+        self._etag = f'config-{digest[:16]}'
+        self._updated_at = config.updated_at
+        self._version += 1
+
+config_cache = ConfigCache()
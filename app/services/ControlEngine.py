@@ -0,0 +1,505 @@
+from app.services.DeviceRegistry import device_registry
+from app.services.ConfigCache import config_cache
+from app.services.StateStore import state_store
+from app.services.EventBus import event_bus
+from app.config import CONTROL_ENGINE, CONTROL_LIGHT_BAND, CONTROL_WATER_LEVEL_BAND, CONTROL_STALE_AFTER
+from typing import Callable, Dict, List, Mapping, Optional, Tuple
+import threading
+import time
+
+class HysteresisRule:
+    """
+    Two-threshold on/off rule for one output device driven by one sensor quantity.
+
+    With direction 'below' the output turns on when the value falls below
+    on_at and off when it rises above off_at (a heater); with 'above' the
+    reverse (a cooler). Between the thresholds the decision holds, so a
+    value hovering at one threshold does not chatter the relay. An optional
+    interlock names a second quantity that forces the output off once it
+    passes a trip value, until it is back at a release value. With the
+    release value above the trip value the interlock trips on falling
+    values, and with it below on rising ones (e.g. the distance from the
+    ultrasonic sensor down to the water).
+
+    Attributes:
+        name (str): Rule name, unique within an engine.
+        device (str): The output device the rule drives.
+        quantity (str): The sensor quantity the rule reads.
+        direction (str): 'below' or 'above', see above.
+        on_at (Optional[float]): Threshold that turns the output on, None disables the rule.
+        off_at (Optional[float]): Threshold that turns the output off, None disables the rule.
+        interlock (Optional[Tuple[str, float, float]]): Quantity, the value past which the output is forced
+            off, and the value it must get back to to release the output.
+        tripped (bool): Whether the interlock is holding the output off.
+        stale (bool): Whether an input is too old to decide on and the output is forced off.
+        error (Optional[str]): Why the rule is disabled, None while it is active.
+        output (Optional[bool]): The state the rule last commanded, None before its first decision.
+        evaluations (int): Times the rule was evaluated.
+        actuations (int): Times the rule switched its device.
+        interlocked (int): Evaluations in which the interlock forced the output off.
+        eval_ns (int): Total nanoseconds spent deciding, excluding the switching itself.
+    """
+
+    __slots__ = (
+        'name', 'device', 'quantity', 'direction', 'on_at', 'off_at', 'interlock', 'tripped', 'stale', 'error',
+        'output', 'evaluations', 'actuations', 'interlocked', 'eval_ns', 'last_value'
+    )
+
+    def __init__(
+            self,
+            name: str,
+            device: str,
+            quantity: str,
+            direction: str,
+            on_at: Optional[float],
+            off_at: Optional[float],
+            interlock: Optional[Tuple[str, float, float]] = None
+        ):
+        """
+        Initialize a rule that has not decided yet.
+
+        Raises:
+            ValueError: If the direction is not 'below' or 'above'.
+        """
+        if direction not in ('below', 'above'):
+            raise ValueError(f"Unknown rule direction: {direction}")
+        self.name = name
+        self.device = device
+        self.quantity = quantity
+        self.direction = direction
+        self.on_at = on_at
+        self.off_at = off_at
+        self.interlock = interlock
+        self.tripped = False
+        self.stale = False
+        self.error = self._check()
+        self.output = None
+        self.evaluations = 0
+        self.actuations = 0
+        self.interlocked = 0
+        self.eval_ns = 0
+        self.last_value = None
+
+    @property
+    def inputs(self) -> Tuple[str, ...]:
+        """
+        The quantities whose changes require the rule to be evaluated.
+        """
+        if self.interlock is None:
+            return (self.quantity,)
+        return (self.quantity, self.interlock[0])
+
+    def decide(self, values: Mapping[str, float]) -> Optional[bool]:
+        """
+        Decide the output state from the latest values.
+
+        Args:
+            values (Mapping[str, float]): Latest value per quantity.
+
+        Returns:
+            Optional[bool]: True for on, False for off, None to keep the current state.
+        """
+        if self.interlock is not None:
+            quantity, trip_at, release_at = self.interlock
+            level = values.get(quantity)
+            if level is not None:
+                rising = release_at < trip_at
+                if (level > trip_at) if rising else (level < trip_at):
+                    self.tripped = True
+                elif (level <= release_at) if rising else (level >= release_at):
+                    self.tripped = False
+            if self.tripped:
+                self.interlocked += 1
+                return False
+        value = values.get(self.quantity)
+        if value is None:
+            return None
+        if self.direction == 'below':
+            if value < self.on_at:
+                return True
+            if value > self.off_at:
+                return False
+        else:
+            if value > self.on_at:
+                return True
+            if value < self.off_at:
+                return False
+        return None
+
+    def to_dict(self) -> dict:
+        """
+        Convert the rule and its counters to a dictionary for JSON serialization.
+        """
+        return {
+            'name': self.name,
+            'device': self.device,
+            'quantity': self.quantity,
+            'direction': self.direction,
+            'on_at': self.on_at,
+            'off_at': self.off_at,
+            'interlock': list(self.interlock) if self.interlock else None,
+            'tripped': self.tripped,
+            'stale': self.stale,
+            'active': self.error is None,
+            'error': self.error,
+            'output': self.output,
+            'last_value': self.last_value,
+            'evaluations': self.evaluations,
+            'actuations': self.actuations,
+            'interlocked': self.interlocked,
+            'mean_eval_us': round(self.eval_ns / self.evaluations / 1000, 3) if self.evaluations else None,
+        }
+
+    def _check(self) -> Optional[str]:
+        if self.on_at is None or self.off_at is None:
+            return 'threshold not set'
+        if self.interlock is not None and (self.interlock[1] is None or self.interlock[2] is None):
+            return 'interlock threshold not set'
+        # Overlapping thresholds would turn the output on and off at the same value
+        if self.direction == 'below' and self.on_at > self.off_at:
+            return f'on threshold {self.on_at} is above off threshold {self.off_at}'
+        if self.direction == 'above' and self.on_at < self.off_at:
+            return f'on threshold {self.on_at} is below off threshold {self.off_at}'
+        return None
+
+def build_rules(
+        config: Mapping,
+        light_band: float = CONTROL_LIGHT_BAND,
+        water_level_band: float = CONTROL_WATER_LEVEL_BAND
+    ) -> List[HysteresisRule]:
+    """
+    Build the control rules from a Config snapshot.
+
+    The light and soil thresholds are percentages of the ADC's full scale,
+    the unit the analog sensors report in.
+
+    Args:
+        config (Mapping): Config.to_dict() values.
+        light_band (float): How far above light_threshold the light level must rise before the light turns off.
+        water_level_band (float): How far below water_level_threshold_low the distance to the water must fall
+            before the pump is released.
+
+    Returns:
+        List[HysteresisRule]: One rule per output device.
+    """
+    light = config.get('light_threshold')
+    dry = config.get('dry_soil_threshold')
+    watered = config.get('watered_soil_threshold')
+    # water_level is the distance from the ultrasonic sensor down to the water, so it grows as the tank empties
+    limit = config.get('water_level_threshold_low')
+    # Resistive probes read higher when wet, capacitive ones lower; the order of the thresholds tells which
+    soil_direction = 'above' if dry is not None and watered is not None and dry > watered else 'below'
+    return [
+        HysteresisRule('humidity', 'atomizer', 'humidity', 'below',
+                       config.get('humidity_threshold_low'), config.get('humidity_threshold_high')),
+        HysteresisRule('temperature', 'heater', 'temperature', 'below',
+                       config.get('temperature_threshold_low'), config.get('temperature_threshold_high')),
+        HysteresisRule('light', 'light', 'light', 'below',
+                       light, light + light_band if light is not None else None),
+        HysteresisRule('soil_moisture', 'water', 'soil_moisture', soil_direction, dry, watered,
+                       interlock=('water_level', limit, limit - water_level_band if limit is not None else None)),
+    ]
+
+class ControlEngine:
+    """
+    Event-driven controller that switches the outputs from the sensor samples.
+
+    The engine subscribes to the 'sensors' events on the event bus and keeps
+    the latest value of each quantity. A sample only triggers the rules that
+    read a quantity whose value changed, so the unchanged values the
+    acquisition engine republishes on every poll cost one dictionary
+    comparison each. Thresholds come from the ConfigCache and are rebuilt
+    only when its version moves. Rules are edge-triggered: a device is
+    switched only when its rule's decision changes, so a manual switch holds
+    until the rule next decides differently. As a fail-safe, a rule whose
+    input has not been sampled for stale_after seconds (a dead sensor or a
+    stalled acquisition engine) has its output forced off and is reported
+    as stale until a new sample arrives.
+
+    Attributes:
+        samples (int): Samples processed.
+        skipped (int): Samples in which no relevant value changed.
+        reloads (int): Times the rules were rebuilt from a new Config version.
+    """
+
+    def __init__(
+            self,
+            registry=device_registry,
+            config=config_cache,
+            events=event_bus,
+            store=state_store,
+            heartbeat: float = 0.5,
+            stale_after: float = CONTROL_STALE_AFTER,
+            clock: Callable[[], float] = time.monotonic
+        ):
+        """
+        Initialize the engine without starting it.
+
+        Args:
+            registry (DeviceRegistry): Registry the devices are switched through.
+            config (ConfigCache): Source of the versioned Config snapshot.
+            events (EventBus): Bus the sensor samples arrive on.
+            store (StateStore): Live state the values are reloaded from after lost events.
+            heartbeat (float): Seconds between checks for a stop request or stale inputs.
+            stale_after (float): Seconds without a sample after which an input is stale.
+            clock (Callable[[], float]): Monotonic time source for the sample ages.
+        """
+        self.registry = registry
+        self.config = config
+        self.events = events
+        self.store = store
+        self.heartbeat = heartbeat
+        self.stale_after = stale_after
+        self.clock = clock
+        self._app = None
+        self._lock = threading.Lock()
+        self._thread = None
+        self._stop = threading.Event()
+        self._rules = []
+        self._by_input = {}  # quantity -> rules reading it
+        self._values = {}    # quantity -> latest value
+        self._seen = {}      # quantity -> clock time of its latest sample
+        self._stale = []     # rules forced off for stale inputs
+        self._loaded_at = None
+        self._version = None
+        self.samples = 0
+        self.skipped = 0
+        self.reloads = 0
+
+    def init_app(self, app):
+        """
+        Bind the engine to an application and start it outside of testing when CONTROL_ENGINE is set.
+
+        Args:
+            app (Flask): The application providing the Config context.
+        """
+        self._app = app
+        if CONTROL_ENGINE and not app.testing:
+            self.start()
+
+    def start(self):
+        """
+        Start the background thread that processes sensor events.
+        """
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="ControlEngine", daemon=True)
+        self._thread.start()
+        print(f"[{time.strftime('%m-%d-%Y %H:%M:%S')}] - (ControlEngine) Started")
+
+    def stop(self):
+        """
+        Stop the background thread; the outputs are left as they are.
+        """
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def process(self, values: Mapping[str, float], fresh: bool = True) -> int:
+        """
+        Apply one sensor sample, evaluating the rules whose inputs changed.
+
+        The first call, and the first after a Config change, loads the
+        thresholds, which requires an application context if the cache is
+        empty.
+
+        Args:
+            values (Mapping[str, float]): Reading values keyed by quantity name.
+            fresh (bool): Whether the values were just sampled; False for values
+                reloaded from the state store, which do not count as new samples.
+
+        Returns:
+            int: Number of rules evaluated.
+        """
+        with self._lock:
+            self.samples += 1
+            now = self.clock()
+            if fresh:
+                # Unchanged values still show the sensor is alive
+                self._seen.update(dict.fromkeys(values, now))
+            version, config = self.config.get()
+            if version != self._version:
+                self._values.update(values)
+                self._reload(version, config)
+                pending = self._rules
+            else:
+                pending = []
+                latest = self._values
+                for quantity, value in values.items():
+                    if latest.get(quantity) == value:
+                        continue
+                    latest[quantity] = value
+                    for rule in self._by_input.get(quantity, ()):
+                        if rule not in pending:
+                            pending.append(rule)
+            if self._stale:
+                # A recovered rule decides afresh even if its value did not change
+                for rule in self._recovered(now):
+                    if rule not in pending:
+                        pending.append(rule)
+            if not pending:
+                self.skipped += 1
+                return 0
+            switches = [switch for switch in map(self._evaluate, pending) if switch is not None]
+        for device, state in switches:
+            self._switch(device, state)
+        return len(pending)
+
+    def check_stale(self) -> int:
+        """
+        Force off the outputs of rules whose inputs have not been sampled for stale_after seconds.
+
+        Returns:
+            int: Number of rules that became stale.
+        """
+        switches = []
+        with self._lock:
+            if self._loaded_at is None:
+                return 0
+            now = self.clock()
+            for rule in self._rules:
+                if rule.error is not None or rule.stale or not self._is_stale(rule, now):
+                    continue
+                rule.stale = True
+                self._stale.append(rule)
+                print(f"[{time.strftime('%m-%d-%Y %H:%M:%S')}] - (ControlEngine) Rule {rule.name} inputs are stale, forcing {rule.device} off")
+                if rule.output is not False:
+                    rule.output = False
+                    rule.actuations += 1
+                    switches.append(rule.device)
+            count = len(switches)
+        for device in switches:
+            self._switch(device, False)
+        return count
+
+    def rules(self) -> List[dict]:
+        """
+        Return every rule with its thresholds and counters.
+        """
+        with self._lock:
+            return [rule.to_dict() for rule in self._rules]
+
+    def stats(self) -> dict:
+        """
+        Return the engine counters and its rules.
+        """
+        with self._lock:
+            return {
+                'running': self._thread is not None and self._thread.is_alive(),
+                'config_version': self._version,
+                'samples': self.samples,
+                'skipped': self.skipped,
+                'reloads': self.reloads,
+                'stale_after': self.stale_after,
+                'stale': [rule.name for rule in self._stale],
+                'values': dict(self._values),
+                'rules': [rule.to_dict() for rule in self._rules],
+            }
+
+    def _reload(self, version: int, config: Mapping):
+        """
+        Rebuild the rules from a Config snapshot, keeping each rule's counters and last output.
+        """
+        previous = {rule.name: rule for rule in self._rules}
+        rules = build_rules(config)
+        by_input = {}
+        for rule in rules:
+            old = previous.get(rule.name)
+            if old is not None:
+                rule.output = old.output
+                rule.evaluations = old.evaluations
+                rule.actuations = old.actuations
+                rule.interlocked = old.interlocked
+                rule.eval_ns = old.eval_ns
+                rule.tripped = old.tripped
+                rule.stale = old.stale
+            if rule.error is not None:
+                print(f"[{time.strftime('%m-%d-%Y %H:%M:%S')}] - (ControlEngine) Rule {rule.name} disabled: {rule.error}")
+                continue
+            for quantity in rule.inputs:
+                by_input.setdefault(quantity, []).append(rule)
+        self._rules = rules
+        self._by_input = by_input
+        self._stale = [rule for rule in rules if rule.stale]
+        if self._loaded_at is None:
+            # Inputs never sampled count as stale once stale_after has passed since the first load
+            self._loaded_at = self.clock()
+        if self._version is not None:
+            self.reloads += 1
+        self._version = version
+
+    def _evaluate(self, rule: HysteresisRule) -> Optional[Tuple[str, bool]]:
+        """
+        Run one rule, returning the (device, state) to switch to if its decision changed.
+        """
+        if rule.error is not None or rule.stale:
+            return None
+        started = time.perf_counter_ns()
+        decision = rule.decide(self._values)
+        rule.eval_ns += time.perf_counter_ns() - started
+        rule.evaluations += 1
+        rule.last_value = self._values.get(rule.quantity)
+        if decision is None or decision == rule.output:
+            return None
+        rule.output = decision
+        rule.actuations += 1
+        return rule.device, decision
+
+    def _is_stale(self, rule: HysteresisRule, now: float) -> bool:
+        return any(now - self._seen.get(quantity, self._loaded_at) > self.stale_after for quantity in rule.inputs)
+
+    def _recovered(self, now: float) -> List[HysteresisRule]:
+        """
+        Clear the stale flag of rules whose inputs are fresh again and return them.
+        """
+        recovered = [rule for rule in self._stale if not self._is_stale(rule, now)]
+        for rule in recovered:
+            rule.stale = False
+            self._stale.remove(rule)
+        return recovered
+
+    def _switch(self, device: str, state: bool):
+        try:
+            if self.registry.set_state(device, state):
+                print(f"[{time.strftime('%m-%d-%Y %H:%M:%S')}] - (ControlEngine) Turned {device} {'on' if state else 'off'}")
+        except Exception as e:
+            print(f"[{time.strftime('%m-%d-%Y %H:%M:%S')}] - (ControlEngine) Error switching {device}: {str(e)}")
+
+    def _current_values(self) -> Dict[str, float]:
+        _, state = self.store.snapshot()
+        return {quantity: entry['value'] for quantity, entry in state['sensors'].items()}
+
+    def _run(self):
+        """
+        Background loop: process sensor events until stopped or the bus closes.
+        """
+        with self._app.app_context():
+            try:
+                self.process(self._current_values(), fresh=False)
+            except Exception as e:
+                print(f"[{time.strftime('%m-%d-%Y %H:%M:%S')}] - (ControlEngine) Error applying current values: {str(e)}")
+            next_check = time.monotonic() + self.heartbeat
+            for event in self.events.listen(self.events.last_id, topics=('sensors',), heartbeat=self.heartbeat):
+                if self._stop.is_set():
+                    break
+                if time.monotonic() >= next_check:
+                    # Samples of other sensors keep the stream busy, so stale inputs are not left to heartbeats
+                    next_check = time.monotonic() + self.heartbeat
+                    try:
+                        self.check_stale()
+                    except Exception as e:
+                        print(f"[{time.strftime('%m-%d-%Y %H:%M:%S')}] - (ControlEngine) Error checking for stale inputs: {str(e)}")
+                if event is None:
+                    continue
+                try:
+                    if event.topic == 'reset':
+                        # Samples were lost; the store holds the latest value of every quantity
+                        self.process(self._current_values(), fresh=False)
+                    else:
+                        self.process(event.data['values'])
+                except Exception as e:
+                    print(f"[{time.strftime('%m-%d-%Y %H:%M:%S')}] - (ControlEngine) Error processing sample: {str(e)}")
+
+control_engine = ControlEngine()
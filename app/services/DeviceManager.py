@@ -2,13 +2,46 @@ from app.hardware.output.Atomizer import Atomizer
 from app.hardware.output.Light import Light
 from app.hardware.output.WaterPump import WaterPump
 from app.hardware.output.Heater import Heater
+from app.hardware.input.Sensor import Sensor
 from app.hardware.input.TemperatureSensor import TemperatureSensor
 from app.hardware.input.HumiditySensor import HumiditySensor
 from app.hardware.input.UltrasonicSensor import UltrasonicSensor
 from app.hardware.input.LightSensor import LightSensor
 from app.hardware.input.SoilMoistureSensor import SoilMoistureSensor
+from app.config import ULTRASONIC_ISOLATED
+from datetime import datetime
 import time
 
+# Config fields holding device pins, matching the DeviceManager keyword arguments
+DEVICE_PIN_FIELDS = [
+    'atomizer_pin',
+    'light_pin',
+    'water_pin',
+    'heater_pin',
+    'light_pin_in',
+    'humidity_pin_in',
+    'temperature_pin_in',
+    'ultrasonic_trigger_pin_in',
+    'ultrasonic_echo_pin_in',
+    'soil_moisture_pin_in',
+]
+
+# Device names used by the API and the attribute holding each device
+DEVICE_ATTRIBUTES = {
+    'atomizer': 'atomizer',
+    'light': 'light',
+    'water': 'water_pump',
+    'heater': 'heater',
+    'light_sensor': 'light_sensor',
+    'temperature_sensor': 'temperature_sensor',
+    'humidity_sensor': 'humidity_sensor',
+    'ultrasonic_sensor': 'ultrasonic_sensor',
+    'soil_moisture_sensor': 'soil_moisture_sensor',
+}
+
+# Sensors read through the shared MCP3008 ADC bus
+ANALOG_DEVICES = ['light_sensor', 'soil_moisture_sensor']
+
 class DeviceManager:
     def __init__(
             self, 
@@ -22,19 +55,61 @@ class DeviceManager:
             ultrasonic_trigger_pin_in=None, 
             ultrasonic_echo_pin_in=None, 
             soil_moisture_pin_in=None, 
-            debug_mode: bool = False
+            debug_mode: bool = False,
+            ultrasonic_isolated: bool = ULTRASONIC_ISOLATED
         ):
         # Only initialize components that have a pin specified
-        self.atomizer = Atomizer(atomizer_pin, debug_mode) if atomizer_pin is not None else None
-        self.light = Light(light_pin, debug_mode) if light_pin is not None else None
-        self.water_pump = WaterPump(water_pin, debug_mode) if water_pin is not None else None
-        self.heater = Heater(heater_pin, debug_mode) if heater_pin is not None else None
-        self.light_sensor = LightSensor(light_pin_in, debug_mode) if light_pin_in is not None else None
-        self.temperature_sensor = TemperatureSensor(temperature_pin_in, debug_mode) if temperature_pin_in is not None else None
-        self.humidity_sensor = HumiditySensor(humidity_pin_in, debug_mode) if humidity_pin_in is not None else None
-        self.ultrasonic_sensor = UltrasonicSensor(ultrasonic_trigger_pin_in, ultrasonic_echo_pin_in, debug_mode) if (ultrasonic_trigger_pin_in is not None and ultrasonic_echo_pin_in is not None) else None
-        self.soil_moisture_sensor = SoilMoistureSensor(soil_moisture_pin_in, debug_mode) if soil_moisture_pin_in is not None else None
-        
+        self.atomizer = self._create(Atomizer, atomizer_pin, debug_mode) if atomizer_pin is not None else None
+        self.light = self._create(Light, light_pin, debug_mode) if light_pin is not None else None
+        self.water_pump = self._create(WaterPump, water_pin, debug_mode) if water_pin is not None else None
+        self.heater = self._create(Heater, heater_pin, debug_mode) if heater_pin is not None else None
+        self.light_sensor = self._create(LightSensor, light_pin_in, debug_mode) if light_pin_in is not None else None
+        self.temperature_sensor = self._create(TemperatureSensor, temperature_pin_in, debug_mode) if temperature_pin_in is not None else None
+        self.humidity_sensor = self._create(HumiditySensor, humidity_pin_in, debug_mode) if humidity_pin_in is not None else None
+        self.ultrasonic_sensor = self._create(UltrasonicSensor, ultrasonic_trigger_pin_in, ultrasonic_echo_pin_in, debug_mode, isolated=ultrasonic_isolated) if (ultrasonic_trigger_pin_in is not None and ultrasonic_echo_pin_in is not None) else None
+        self.soil_moisture_sensor = self._create(SoilMoistureSensor, soil_moisture_pin_in, debug_mode) if soil_moisture_pin_in is not None else None
+
+    @classmethod
+    def from_config(cls, config, debug_mode: bool = False, **kwargs):
+        """
+        Build a manager with every device configured in a Config row or snapshot.
+
+        Args:
+            config (Mapping): Config.to_dict() or an equivalent mapping of pin fields.
+            debug_mode (bool): Whether to run in debug mode (simulated GPIO).
+            **kwargs: Further DeviceManager options, e.g. ultrasonic_isolated.
+        """
+        return cls(debug_mode=debug_mode, **kwargs, **{field: config.get(field) for field in DEVICE_PIN_FIELDS})
+
+    @staticmethod
+    def _create(device_class, *args, **kwargs):
+        """
+        Construct a device, leaving it unavailable instead of failing the whole manager.
+        """
+        try:
+            return device_class(*args, **kwargs)
+        except Exception as e:
+            print(f"[{time.strftime('%m-%d-%Y %H:%M:%S')}] - (DeviceManager) Could not initialize {device_class.__name__}: {str(e)}")
+            return None
+
+    def get(self, device):
+        """
+        Return the component or sensor registered under a device name, or None.
+        """
+        attribute = DEVICE_ATTRIBUTES.get(device)
+        return getattr(self, attribute) if attribute is not None else None
+
+    def close(self):
+        """
+        Release the sensors' resources, e.g. stop the ultrasonic worker process.
+        """
+        for device in DEVICE_ATTRIBUTES:
+            sensor = self.get(device)
+            if isinstance(sensor, Sensor):
+                try:
+                    sensor.close()
+                except Exception as e:
+                    print(f"[{time.strftime('%m-%d-%Y %H:%M:%S')}] - (DeviceManager) Error closing {device}: {str(e)}")
 
     def test_device(self, device, io=None):
         print(f"[{time.strftime('%m-%d-%Y %H:%M:%S')}] - (DeviceManager) Starting test sequence for {device}")
@@ -80,6 +155,56 @@ class DeviceManager:
         elif device == 'soil_moisture_sensor' and self.soil_moisture_sensor is not None:
             return self.soil_moisture_sensor.read()
         
+    def read_analog(self):
+        """
+        Read every configured ADC sensor in a single MCP3008 bus session.
+
+        Each channel is oversampled and trimmed with its sensor's own settings
+        and converted by the sensor, so the values match Sensor.read().
+
+        Returns:
+            dict: Percentage of full scale keyed by device name, e.g. {'light_sensor': 37.3}.
+        """
+        sensors = {device: self.get(device) for device in ANALOG_DEVICES if self.get(device) is not None}
+        if not sensors:
+            return {}
+        if any(sensor.debug_mode for sensor in sensors.values()):
+            return {device: sensor.read() for device, sensor in sensors.items()}
+        bus = next(iter(sensors.values())).bus
+        try:
+            readings = bus.scan(
+                {sensor.adc_channel: sensor.samples for sensor in sensors.values()},
+                trim={sensor.adc_channel: sensor.trim for sensor in sensors.values()}
+            )
+        except Exception as e:
+            print(f"[{time.strftime('%m-%d-%Y %H:%M:%S')}] - (DeviceManager) Error scanning ADC: {str(e)}")
+            return {device: None for device in sensors}
+        return {device: sensor.convert(readings[sensor.adc_channel]) for device, sensor in sensors.items()}
+
+    def read_all(self):
+        """
+        Read every configured sensor once, sharing one timestamp.
+
+        Multi-value sensors contribute every quantity from their single read,
+        and the ADC sensors are read together in one bus scan.
+
+        Returns:
+            tuple: The timestamp and a dict of readings keyed by quantity name.
+        """
+        timestamp = datetime.utcnow()
+        readings = {}
+        for device, value in self.read_analog().items():
+            readings[self.get(device).quantity] = value
+        for device in DEVICE_ATTRIBUTES:
+            sensor = self.get(device)
+            if not isinstance(sensor, Sensor) or device in ANALOG_DEVICES:
+                continue
+            try:
+                readings.update(sensor.read_all())
+            except Exception as e:
+                print(f"[{time.strftime('%m-%d-%Y %H:%M:%S')}] - (DeviceManager) Error reading {device}: {str(e)}")
+        return timestamp, readings
+
     def __del__(self):
         print(f"[{time.strftime('%m-%d-%Y %H:%M:%S')}] - (DeviceManager) Turning off devices")
         if self.atomizer is not None:
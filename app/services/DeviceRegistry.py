@@ -0,0 +1,328 @@
+from app.services.DeviceManager import DeviceManager, DEVICE_PIN_FIELDS, DEVICE_ATTRIBUTES
+from app.services.ConfigCache import config_cache
+from app.services.StateStore import state_store
+from app.hardware.output.RelayBank import RelayBank
+from functools import partial
+from app.config import DEBUG_MODE
+from typing import Dict, Mapping, Optional
+import threading
+import time
+
+# Alternative names used by the dashboard
+DEVICE_ALIASES = {
+    'humidifier': 'atomizer',
+    'pump': 'water',
+}
+
+OUTPUT_DEVICES = ['atomizer', 'light', 'water', 'heater']
+
+# Sensors that hold more than their pins (the ultrasonic worker process), kept
+# across rebuilds that leave their pins unchanged
+KEPT_SENSORS = {
+    'ultrasonic_sensor': ('ultrasonic_trigger_pin_in', 'ultrasonic_echo_pin_in'),
+}
+
+class DeviceRegistry:
+    """
+    Long-lived, thread-safe owner of the physical devices.
+
+    The registry builds one DeviceManager from the cached Config at startup and
+    hands the same component instances to every request, so controlling a
+    relay costs a single GPIO write instead of constructing drivers and
+    re-running pin setup. Each device has its own lock, so concurrent requests
+    for the same device are serialized while different devices proceed in
+    parallel. The devices are only rebuilt when a pin assignment changes; the
+    replaced sensors are closed, and a sensor with its own worker process is
+    carried over when its pins did not change, so there is one worker per pin
+    pair for the life of the registry.
+
+    Attributes:
+        on_rebuild (Optional[Callable[[], None]]): Called after the devices were
+            rebuilt, with every device lock still held, so holders of the old
+            components (e.g. scheduled jobs) can switch to the new ones.
+    """
+
+    def __init__(self, debug_mode: bool = DEBUG_MODE):
+        self.debug_mode = debug_mode
+        self.on_rebuild = None
+        self._lock = threading.RLock()
+        self._manager = None
+        self._pins = None
+        self._device_locks = {name: threading.RLock() for name in DEVICE_ATTRIBUTES}
+
+    def init_app(self, app):
+        """
+        Bind the registry to an application, building the devices now outside of testing.
+
+        Args:
+            app (Flask): The application whose Config describes the devices.
+        """
+        with self._lock:
+            self._manager = None
+            self._pins = None
+        if not app.testing:
+            with app.app_context():
+                self.reload()
+
+    @property
+    def manager(self) -> DeviceManager:
+        """
+        The shared DeviceManager, built from Config on first use.
+        """
+        with self._lock:
+            if self._manager is None:
+                self.reload()
+            return self._manager
+
+    def reload(self, config: Optional[Mapping] = None) -> bool:
+        """
+        Rebuild the devices if any pin assignment changed.
+
+        Args:
+            config (Optional[Mapping]): Config snapshot to build from, defaults to the cached one.
+
+        Returns:
+            bool: True if the devices were rebuilt.
+        """
+        config = config if config is not None else config_cache.snapshot()
+        pins = {field: config.get(field) for field in DEVICE_PIN_FIELDS}
+        with self._lock:
+            if self._manager is not None and pins == self._pins:
+                return False
+            # Hold every device lock so no request drives a half-replaced device
+            for lock in self._device_locks.values():
+                lock.acquire()
+            try:
+                counters = {}
+                kept = {}
+                old = self._manager
+                replaced = old is not None
+                if replaced:
+                    self._turn_off_outputs(old)
+                    self._release_pwm(old)
+                    counters = self._usage_counters(old)
+                    kept = self._kept_sensors(old, self._pins, pins)
+                print(f"[{time.strftime('%m-%d-%Y %H:%M:%S')}] - (DeviceRegistry) Building devices from config")
+                build = dict(pins)
+                for device in kept:
+                    build.update(dict.fromkeys(KEPT_SENSORS[device]))
+                self._manager = DeviceManager.from_config(build, self.debug_mode)
+                self._pins = pins
+                for device, sensor in kept.items():
+                    setattr(self._manager, DEVICE_ATTRIBUTES[device], sensor)
+                    setattr(old, DEVICE_ATTRIBUTES[device], None)
+                if replaced:
+                    old.close()
+                # Runtime accounting carries over to the rebuilt components
+                for device, counter in counters.items():
+                    component = self._manager.get(device)
+                    if component is not None:
+                        component.usage = counter
+                self._publish_states(self._manager)
+                if replaced and self.on_rebuild is not None:
+                    self.on_rebuild()
+            finally:
+                for lock in self._device_locks.values():
+                    lock.release()
+            return True
+
+    def resolve(self, device: str) -> str:
+        """
+        Map a dashboard alias to its canonical device name.
+        """
+        return DEVICE_ALIASES.get(device, device)
+
+    def get(self, device: str):
+        """
+        Return the shared component or sensor for a device name, or None.
+
+        Args:
+            device (str): A device name or alias, e.g. 'light' or 'humidifier'.
+        """
+        return self.manager.get(self.resolve(device))
+
+    def lock(self, device: str) -> threading.RLock:
+        """
+        Return the lock serializing access to a device.
+        """
+        return self._device_locks[self.resolve(device)]
+
+    def set_state(self, device: str, state: bool) -> bool:
+        """
+        Switch an output device on or off.
+
+        Args:
+            device (str): A device name or alias.
+            state (bool): True to turn the device on, False to turn it off.
+
+        Returns:
+            bool: False if no such output device is configured.
+        """
+        device = self.resolve(device)
+        if device not in OUTPUT_DEVICES:
+            return False
+        self._ensure_built()
+        with self.lock(device):
+            component = self._current(device)
+            if component is None:
+                return False
+            if state:
+                component.turn_on()
+            else:
+                component.turn_off()
+        return True
+
+    def set_level(self, device: str, level: float, ramp: float = 0.0) -> bool:
+        """
+        Dim an output device; devices without PWM turn on at any level above zero.
+
+        Args:
+            device (str): A device name or alias.
+            level (float): Between 0.0 (off) and 1.0 (fully on).
+            ramp (float): Seconds to move there smoothly from the current level.
+
+        Returns:
+            bool: False if no such dimmable output device is configured.
+        """
+        device = self.resolve(device)
+        if device not in OUTPUT_DEVICES:
+            return False
+        self._ensure_built()
+        with self.lock(device):
+            component = self._current(device)
+            if component is None or not hasattr(component, 'set_level'):
+                return False
+            component.set_level(level, ramp)
+        return True
+
+    def set_states(self, states: Mapping[str, bool], inrush_delay: Optional[float] = None) -> Dict[str, bool]:
+        """
+        Switch several output devices together through a RelayBank.
+
+        Every device is validated first, so either all of them are driven or none is.
+
+        Args:
+            states (Mapping[str, bool]): Desired on/off states keyed by device name or alias.
+            inrush_delay (Optional[float]): Seconds between switching on consecutive devices, None for the configured delay.
+
+        Returns:
+            Dict[str, bool]: The devices that were switched and their new states.
+
+        Raises:
+            KeyError: If a device is unknown or not configured.
+        """
+        desired = {self.resolve(device): bool(state) for device, state in states.items()}
+        for device in desired:
+            if device not in OUTPUT_DEVICES:
+                raise KeyError(device)
+        self._ensure_built()
+        # Fixed lock order, so two bulk changes cannot deadlock
+        locks = [self.lock(device) for device in OUTPUT_DEVICES if device in desired]
+        for lock in locks:
+            lock.acquire()
+        try:
+            components = {}
+            for device in desired:
+                component = self._current(device)
+                if component is None:
+                    raise KeyError(device)
+                components[device] = component
+            bank = RelayBank(components, on_commit=state_store.set_devices)
+            return bank.apply(desired, inrush_delay)
+        finally:
+            for lock in reversed(locks):
+                lock.release()
+
+    def read(self, device: str):
+        """
+        Read an input device while holding its lock.
+
+        Args:
+            device (str): A sensor name, e.g. 'humidity_sensor'.
+
+        Returns:
+            The sensor reading, or None if the sensor is not configured.
+        """
+        device = self.resolve(device)
+        if device not in DEVICE_ATTRIBUTES:
+            return None
+        self._ensure_built()
+        with self.lock(device):
+            sensor = self._current(device)
+            return sensor.read() if sensor is not None else None
+
+    def shutdown(self):
+        """
+        Turn every output off and close the sensors; called when the application is shutting down.
+        """
+        with self._lock:
+            if self._manager is not None:
+                self._turn_off_outputs(self._manager)
+                self._manager.close()
+
+    def _ensure_built(self):
+        """
+        Build the devices if needed; called before taking a device lock, since reload takes the registry lock first.
+        """
+        with self._lock:
+            if self._manager is None:
+                self.reload()
+
+    def _current(self, device: str):
+        """
+        Return a device's component from the current manager; the caller holds the device lock,
+        so a reload cannot replace it until the lock is released.
+        """
+        manager = self._manager
+        return manager.get(device) if manager is not None else None
+
+    @staticmethod
+    def _publish_states(manager: DeviceManager):
+        """
+        Mirror every output's state into the state store, now and on each switch.
+        """
+        for device in OUTPUT_DEVICES:
+            component = manager.get(device)
+            if component is None:
+                state_store.remove_device(device)
+                continue
+            component.on_change = partial(state_store.set_device, device)
+            state_store.set_device(device, bool(component.state))
+
+    @staticmethod
+    def _kept_sensors(manager: DeviceManager, old_pins: Mapping, pins: Mapping) -> dict:
+        """
+        Return the sensors of a replaced manager whose pins are unchanged, keyed by device.
+        """
+        return {
+            device: manager.get(device)
+            for device, fields in KEPT_SENSORS.items()
+            if manager.get(device) is not None and all(old_pins[field] == pins[field] for field in fields)
+        }
+
+    @staticmethod
+    def _usage_counters(manager: DeviceManager) -> dict:
+        return {
+            device: manager.get(device).usage
+            for device in OUTPUT_DEVICES
+            if manager.get(device) is not None
+        }
+
+    @staticmethod
+    def _release_pwm(manager: DeviceManager):
+        """
+        Hand the PWM pins of replaced devices back, so the engine stops driving them.
+        """
+        for device in OUTPUT_DEVICES:
+            component = manager.get(device)
+            if getattr(component, 'pwm_enabled', False):
+                component.disable_pwm()
+
+    @staticmethod
+    def _turn_off_outputs(manager: DeviceManager):
+        for device in OUTPUT_DEVICES:
+            component = manager.get(device)
+            if component is not None:
+                component.turn_off()
+
+device_registry = DeviceRegistry()
@@ -0,0 +1,214 @@
+from app.services.ActuationScheduler import actuation_scheduler
+from concurrent.futures import ThreadPoolExecutor
+from collections import OrderedDict
+from contextlib import nullcontext
+from typing import Optional
+import itertools
+import threading
+import time
+
+class DeviceTestJob:
+    """
+    A device test running in the background.
+
+    Attributes:
+        id (int): Unique job id.
+        device (str): The device under test.
+        io (str): 'input' for sensors, 'output' for relays.
+        status (str): 'running', 'completed', 'failed', 'timeout' or 'cancelled'.
+        value: The sensor reading for input tests.
+        error (Optional[str]): The failure reason, if any.
+    """
+
+    def __init__(self, job_id: int, device: str, io: str, deadline: Optional[float], manager=None, lock=None, owned: bool = False):
+        self.id = job_id
+        self.device = device
+        self.io = io
+        self.status = 'running'
+        self.value = None
+        self.error = None
+        self.deadline = deadline  # Monotonic time after which an input test is reported as timed out
+        self.manager = manager    # Keeps the devices under test alive until the job finishes
+        self.lock = lock          # Held around each access to the device under test
+        self.owned = owned        # Whether the job closes the manager when it is done with it
+        self.actuation = None     # ActuationJob driving an output test
+        self.done = threading.Event()
+        self.started_at = time.time()
+        self.finished_at = None
+
+    def refresh(self):
+        """
+        Bring the status up to date with the actuation job or the input deadline.
+        """
+        if self.status != 'running':
+            return
+        if self.actuation is not None:
+            if self.actuation.status in ('completed', 'cancelled'):
+                self.finish(self.actuation.status)
+        elif self.deadline is not None and time.monotonic() > self.deadline:
+            self.error = 'Sensor did not respond before the deadline'
+            self.finish('timeout')
+
+    def finish(self, status: str):
+        self.status = status
+        self.finished_at = time.time()
+        # An input test's read may still be pending or running; the reading thread releases its manager
+        if self.io == 'output':
+            self.release()
+        self.done.set()
+
+    def release(self):
+        """
+        Close the manager under test if the job owns it.
+        """
+        manager, self.manager = self.manager, None
+        if self.owned and manager is not None:
+            manager.close()
+
+    @property
+    def progress(self) -> float:
+        """
+        Fraction of the test sequence completed, from 0.0 to 1.0.
+        """
+        if self.actuation is not None:
+            return self.actuation.cycles_done / self.actuation.cycles
+        return 1.0 if self.status != 'running' else 0.0
+
+    def to_dict(self) -> dict:
+        """
+        Convert the job to a dictionary for JSON serialization.
+        """
+        self.refresh()
+        return {
+            'id': self.id,
+            'device': self.device,
+            'io': self.io,
+            'status': self.status,
+            'progress': round(self.progress, 3),
+            'value': self.value,
+            'error': self.error,
+        }
+
+class DeviceTestRunner:
+    """
+    Runs device test sequences in the background so /api/test returns immediately.
+
+    Output tests become pulse jobs on the ActuationScheduler, so several relays
+    can be tested at once without holding a thread each. Input tests run on a
+    small thread pool and are reported as timed out once their deadline
+    passes, so a hung sensor never holds a request.
+    """
+
+    def __init__(
+            self,
+            scheduler=actuation_scheduler,
+            max_workers: int = 4,
+            input_deadline: float = 10.0,
+            output_cycles: int = 3,
+            output_period: float = 1.0,
+            history_size: int = 200
+        ):
+        """
+        Initialize the runner.
+
+        Args:
+            scheduler (ActuationScheduler): Scheduler driving output test sequences.
+            max_workers (int): Threads available for concurrent input tests.
+            input_deadline (float): Seconds before an input test is reported as timed out.
+            output_cycles (int): Number of on/off cycles in an output test.
+            output_period (float): Seconds on and seconds off per output test cycle.
+            history_size (int): Number of jobs kept for status queries.
+        """
+        self.scheduler = scheduler
+        self.input_deadline = input_deadline
+        self.output_cycles = output_cycles
+        self.output_period = output_period
+        self.history_size = history_size
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="DeviceTest")
+        self._jobs = OrderedDict()
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+
+    def submit(self, device: str, manager, io: str, lock=None, key: Optional[str] = None, owned: bool = False) -> DeviceTestJob:
+        """
+        Start a test of one device.
+
+        Args:
+            device (str): The device name, e.g. 'light' or 'humidity_sensor'.
+            manager (DeviceManager): A manager holding the device to test.
+            io (str): 'output' to pulse a relay, 'input' to take a reading.
+            lock (Optional[threading.RLock]): Lock held around each access to the device.
+            key (Optional[str]): Scheduler key of an output test, defaults to 'test:<device>'.
+                Tests of the shared devices use the device name, so a real job supersedes them.
+            owned (bool): Whether the manager was built for this test and is closed when it ends.
+
+        Returns:
+            DeviceTestJob: The job handle.
+        """
+        with self._lock:
+            deadline = time.monotonic() + self.input_deadline if io == 'input' else None
+            job = DeviceTestJob(next(self._ids), device, io, deadline, manager, lock, owned)
+            self._jobs[job.id] = job
+            while len(self._jobs) > self.history_size:
+                self._jobs.popitem(last=False)
+
+        print(f"[{time.strftime('%m-%d-%Y %H:%M:%S')}] - (DeviceTestRunner) Starting test sequence for {device}")
+        if io == 'output':
+            component = manager.get(device)
+            if component is None:
+                job.error = f'Device {device} could not be initialized'
+                job.finish('failed')
+                return job
+            # A separate scheduler key keeps tests of unassigned pins apart from the device's real jobs
+            job.actuation = self.scheduler.pulse(
+                key or f'test:{device}', component, self.output_period, self.output_period, self.output_cycles, lock
+            )
+        else:
+            self._executor.submit(self._read, job)
+        return job
+
+    def get(self, job_id: int) -> Optional[DeviceTestJob]:
+        """
+        Return a job by id, or None if it is unknown or has aged out of the history.
+        """
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def wait(self, job: DeviceTestJob, timeout: float) -> bool:
+        """
+        Wait up to timeout seconds for a job to finish.
+
+        Returns:
+            bool: True if the job finished.
+        """
+        if job.io == 'input' and job.deadline is not None:
+            timeout = min(timeout, max(job.deadline - time.monotonic(), 0))
+        deadline = time.monotonic() + timeout
+        # Output tests finish on the scheduler thread, so their status is polled
+        step = 0.01 if job.actuation is not None else None
+        while True:
+            job.refresh()
+            remaining = deadline - time.monotonic()
+            if job.done.is_set() or remaining <= 0:
+                break
+            job.done.wait(remaining if step is None else min(step, remaining))
+        job.refresh()
+        return job.done.is_set()
+
+    def _read(self, job: DeviceTestJob):
+        try:
+            if job.status == 'running':
+                with job.lock if job.lock is not None else nullcontext():
+                    value = job.manager.sense(job.device)
+                if job.status == 'running':
+                    job.value = value
+                    job.finish('completed')
+        except Exception as e:
+            if job.status == 'running':
+                job.error = str(e)
+                job.finish('failed')
+        finally:
+            job.release()
+        print(f"[{time.strftime('%m-%d-%Y %H:%M:%S')}] - (DeviceTestRunner) {job.device} test {job.status}")
+
+device_test_runner = DeviceTestRunner()
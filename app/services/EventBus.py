@@ -0,0 +1,202 @@
+from app.config import EVENT_REPLAY_SIZE, EVENT_HEARTBEAT_INTERVAL
+from collections import deque
+from typing import Iterable, Iterator, List, Optional, Tuple
+import json
+import threading
+import time
+
+class BusEvent:
+    """
+    One published event.
+
+    Attributes:
+        id (int): Position in the stream; increases by one per event.
+        topic (str): The event category, e.g. 'sensors' or 'devices'.
+        data (dict): The JSON-serializable payload.
+        time (float): Wall-clock time the event was published.
+    """
+    __slots__ = ('id', 'topic', 'data', 'time')
+
+    def __init__(self, id: int, topic: str, data: dict, timestamp: Optional[float] = None):
+        self.id = id
+        self.topic = topic
+        self.data = data
+        self.time = timestamp if timestamp is not None else time.time()
+
+    def to_dict(self) -> dict:
+        """
+        Convert the event to a dictionary for JSON serialization.
+        """
+        return {'id': self.id, 'topic': self.topic, 'data': self.data, 'time': self.time}
+
+    def to_sse(self) -> str:
+        """
+        Format the event as a Server-Sent Events message.
+        """
+        data = json.dumps({'time': self.time, **self.data})
+        return f"id: {self.id}\nevent: {self.topic}\ndata: {data}\n\n"
+
+class EventBus:
+    """
+    Fan-out of live events to any number of stream subscribers.
+
+    Events go into one bounded replay buffer shared by every subscriber
+    instead of a queue per client, so publishing costs the same no matter
+    how many dashboards are open. Subscribers remember the last id they
+    sent and wait on a condition for newer events. A reconnecting client
+    resumes from its Last-Event-ID as long as that event is still in the
+    buffer; otherwise it is told the stream has a gap.
+    """
+
+    def __init__(self, replay_size: int = EVENT_REPLAY_SIZE):
+        """
+        Initialize the bus.
+
+        Args:
+            replay_size (int): Events kept for resuming subscribers.
+        """
+        self._condition = threading.Condition()
+        self._events = deque(maxlen=replay_size)
+        self._last_id = 0
+        self._subscribers = 0
+        self._closed = False
+
+    @property
+    def last_id(self) -> int:
+        """
+        The id of the newest event, 0 before the first.
+        """
+        return self._last_id
+
+    @property
+    def closed(self) -> bool:
+        """
+        Whether the bus has been closed and streams are ending.
+        """
+        return self._closed
+
+    @property
+    def subscribers(self) -> int:
+        """
+        The number of streams currently open.
+        """
+        return self._subscribers
+
+    def publish(self, topic: str, data: dict) -> BusEvent:
+        """
+        Publish an event and wake every subscriber.
+
+        Args:
+            topic (str): The event category.
+            data (dict): The JSON-serializable payload.
+
+        Returns:
+            BusEvent: The published event.
+        """
+        with self._condition:
+            self._last_id += 1
+            event = BusEvent(self._last_id, topic, data)
+            self._events.append(event)
+            self._condition.notify_all()
+        return event
+
+    def since(self, last_id: int) -> Tuple[List[BusEvent], bool]:
+        """
+        Return the buffered events after last_id.
+
+        Returns:
+            Tuple[List[BusEvent], bool]: The events, and False if some events after
+                last_id have already left the buffer.
+        """
+        with self._condition:
+            return self._since(last_id)
+
+    def wait(self, last_id: int, timeout: float) -> Tuple[List[BusEvent], bool]:
+        """
+        Block until there are events after last_id, the timeout expires or the bus closes.
+
+        Returns:
+            Tuple[List[BusEvent], bool]: As since().
+        """
+        with self._condition:
+            self._condition.wait_for(lambda: self._last_id > last_id or self._closed, timeout)
+            return self._since(last_id)
+
+    def listen(
+            self,
+            last_id: Optional[int] = None,
+            topics: Optional[Iterable[str]] = None,
+            heartbeat: float = EVENT_HEARTBEAT_INTERVAL
+        ) -> Iterator[Optional[BusEvent]]:
+        """
+        Yield events for one subscriber until the bus closes.
+
+        Args:
+            last_id (Optional[int]): The last event the subscriber received, None to start with new events.
+            topics (Optional[Iterable[str]]): Topics to deliver, None for all.
+            heartbeat (float): Seconds of silence after which None is yielded so the caller can keep the connection alive.
+
+        Yields:
+            Optional[BusEvent]: The next event, None as a heartbeat, or a 'reset'
+                event when events after last_id were lost or last_id is unknown,
+                and the client should reload its state.
+        """
+        topics = set(topics) if topics else None
+        with self._condition:
+            self._subscribers += 1
+            # An id from before a restart is ahead of the bus and cannot be resumed
+            known = last_id is None or last_id <= self._last_id
+            if last_id is None or not known:
+                last_id = self._last_id
+        try:
+            events, complete = self.since(last_id)
+            complete = complete and known
+            sent_at = time.monotonic()
+            while not self._closed:
+                if not complete:
+                    yield BusEvent(last_id, 'reset', {'last_id': self._last_id})
+                    sent_at = time.monotonic()
+                for event in events:
+                    if topics is None or event.topic in topics:
+                        yield event
+                        sent_at = time.monotonic()
+                if events:
+                    last_id = events[-1].id
+                    events = []
+                elif time.monotonic() - sent_at >= heartbeat:
+                    yield None
+                    sent_at = time.monotonic()
+                events, complete = self.wait(last_id, max(heartbeat - (time.monotonic() - sent_at), 0))
+        finally:
+            with self._condition:
+                self._subscribers -= 1
+
+    def close(self):
+        """
+        End every open stream, e.g. at shutdown.
+        """
+        with self._condition:
+            self._closed = True
+            self._condition.notify_all()
+
+    def open(self):
+        """
+        Accept streams again after close(), e.g. when the hardware services are restarted.
+
+        The ids and the replay buffer are kept, so subscribers from before the
+        restart can still resume.
+        """
+        with self._condition:
+            self._closed = False
+
+    def _since(self, last_id: int) -> Tuple[List[BusEvent], bool]:
+        if not self._events or last_id >= self._last_id:
+            return [], True
+        oldest = self._events[0].id
+        if last_id + 1 < oldest:
+            return list(self._events), False
+        # Ids are consecutive, so the position of last_id + 1 is known
+        start = last_id + 1 - oldest
+        return [self._events[i] for i in range(start, len(self._events))], True
+
+event_bus = EventBus()
@@ -0,0 +1,106 @@
+from app.services.HardwareService import hardware_service
+from app.services.HardwareIPC import send_message, recv_message
+import os
+import socketserver
+import threading
+import time
+
+class _ConnectionHandler(socketserver.BaseRequestHandler):
+    """
+    Serves one client connection: a sequence of request/response messages.
+    """
+
+    def handle(self):
+        daemon = self.server.hardware_daemon
+        while True:
+            try:
+                request = recv_message(self.request)
+            except (OSError, ValueError) as e:
+                print(f"[{time.strftime('%m-%d-%Y %H:%M:%S')}] - (HardwareDaemon) Dropping connection: {str(e)}")
+                return
+            if request is None:
+                return
+            status, body = daemon.dispatch(request.get('op'), request.get('args') or {})
+            try:
+                send_message(self.request, {'status': status, 'body': body})
+            except OSError:
+                return
+
+class _UnixServer(socketserver.ThreadingUnixStreamServer):
+    daemon_threads = True
+
+class HardwareDaemon:
+    """
+    Serves the HardwareService over a Unix socket.
+
+    The daemon is the only process that touches the GPIO pins; it runs the
+    device registry, sensor acquisition and actuation scheduling, and web
+    workers reach them through HardwareClient. Each client connection gets a
+    thread, so a long-poll on one connection does not hold up the others.
+    """
+
+    def __init__(self, path: str, service=hardware_service):
+        """
+        Initialize the daemon without binding the socket.
+
+        Args:
+            path (str): The Unix socket path to listen on.
+            service (HardwareService): The service the requests are run against.
+        """
+        self.path = path
+        self.service = service
+        self._app = None
+        self._server = None
+        self._thread = None
+
+    def init_app(self, app):
+        """
+        Run requests in an application's context, e.g. for database access.
+
+        Args:
+            app (Flask): The application owning the hardware.
+        """
+        self._app = app
+
+    def start(self):
+        """
+        Bind the socket and serve on a background thread.
+        """
+        if self._server is not None:
+            return
+        if os.path.exists(self.path):
+            # Left behind by a daemon that did not shut down cleanly
+            os.unlink(self.path)
+        self._server = _UnixServer(self.path, _ConnectionHandler)
+        self._server.hardware_daemon = self
+        os.chmod(self.path, 0o660)
+        self._thread = threading.Thread(target=self._server.serve_forever, name="HardwareDaemon", daemon=True)
+        self._thread.start()
+        print(f"[{time.strftime('%m-%d-%Y %H:%M:%S')}] - (HardwareDaemon) Listening on {self.path}")
+
+    def stop(self):
+        """
+        Stop serving and remove the socket.
+        """
+        if self._server is None:
+            return
+        self._server.shutdown()
+        self._server.server_close()
+        self._thread.join()
+        self._server = None
+        self._thread = None
+        if os.path.exists(self.path):
+            os.unlink(self.path)
+
+    def dispatch(self, op: str, args: dict):
+        """
+        Run one request and return its (status, body).
+        """
+        try:
+            if self._app is not None:
+                with self._app.app_context():
+                    return self.service.call(op, **args)
+            return self.service.call(op, **args)
+        except Exception as e:
+            print(f"[{time.strftime('%m-%d-%Y %H:%M:%S')}] - (HardwareDaemon) Error running {op}: {str(e)}")
+            return 500, {'status': 'error', 'message': str(e)}
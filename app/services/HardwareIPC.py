@@ -0,0 +1,179 @@
+from app.services.EventBus import BusEvent
+from typing import Iterable, Iterator, Optional, Tuple
+import json
+import socket
+import struct
+import threading
+
+# Every message is a 4-byte big-endian length followed by that many bytes of UTF-8 JSON
+FRAME_HEADER = struct.Struct('!I')
+
+# Largest message either side accepts, in bytes
+MAX_FRAME_SIZE = 16 * 1024 * 1024
+
+class HardwareUnavailable(ConnectionError):
+    """
+    Raised when the hardware daemon cannot be reached.
+    """
+
+def send_message(sock: socket.socket, message: dict):
+    """
+    Write one framed JSON message.
+    """
+    body = json.dumps(message, separators=(',', ':')).encode('utf-8')
+    sock.sendall(FRAME_HEADER.pack(len(body)) + body)
+
+def recv_message(sock: socket.socket) -> Optional[dict]:
+    """
+    Read one framed JSON message.
+
+    Returns:
+        Optional[dict]: The message, or None if the peer closed the connection between messages.
+    """
+    header = _recv_exactly(sock, FRAME_HEADER.size)
+    if header is None:
+        return None
+    (length,) = FRAME_HEADER.unpack(header)
+    if length > MAX_FRAME_SIZE:
+        raise ValueError(f"Message of {length} bytes exceeds the {MAX_FRAME_SIZE} byte limit")
+    body = _recv_exactly(sock, length)
+    if body is None:
+        raise ConnectionError("Connection closed mid-message")
+    return json.loads(body)
+
+def _recv_exactly(sock: socket.socket, size: int) -> Optional[bytes]:
+    chunks = []
+    remaining = size
+    while remaining:
+        chunk = sock.recv(remaining)
+        if not chunk:
+            if remaining == size:
+                return None
+            raise ConnectionError("Connection closed mid-message")
+        chunks.append(chunk)
+        remaining -= len(chunk)
+    return b''.join(chunks)
+
+class HardwareClient:
+    """
+    Client side of the hardware daemon's Unix socket protocol.
+
+    Web workers use this in place of the in-process HardwareService when
+    another process owns the GPIO pins. Connections are kept open in a
+    small pool and reused across requests, so a call costs one round trip
+    and no connection setup whatever threading model the web server uses. A request is {"op": name, "args": {...}} and the daemon answers
+    {"status": http_status, "body": {...}}.
+    """
+
+    def __init__(self, path: str, timeout: float = 5.0, max_idle: int = 8):
+        """
+        Initialize the client without connecting.
+
+        Args:
+            path (str): The daemon's Unix socket path.
+            timeout (float): Seconds to wait for an answer, on top of any wait the call itself asks for.
+            max_idle (int): Idle connections kept open for reuse.
+        """
+        self.path = path
+        self.timeout = timeout
+        self.max_idle = max_idle
+        self._lock = threading.Lock()
+        self._idle = []
+
+    def init_app(self, app):
+        """
+        Serve an application's hardware routes through the daemon.
+
+        Args:
+            app (Flask): The web application.
+        """
+        app.extensions['hardware'] = self
+
+    def call(self, op: str, **args) -> Tuple[int, dict]:
+        """
+        Run an operation in the daemon.
+
+        Args:
+            op (str): The operation name, e.g. 'control'.
+            **args: The operation's JSON-serializable arguments.
+
+        Returns:
+            Tuple[int, dict]: The HTTP status and the response body.
+
+        Raises:
+            HardwareUnavailable: If the daemon cannot be reached or drops the connection.
+        """
+        sock = self._checkout()
+        try:
+            sock.settimeout(self.timeout + float(args.get('timeout') or args.get('wait') or 0))
+            send_message(sock, {'op': op, 'args': args})
+            reply = recv_message(sock)
+            if reply is None:
+                raise ConnectionError("Daemon closed the connection")
+        except (OSError, ValueError) as e:
+            # The stream may be out of step after a failure, so the connection is not reused
+            sock.close()
+            raise HardwareUnavailable(f"Hardware daemon call {op} failed: {str(e)}") from e
+        self._checkin(sock)
+        return reply['status'], reply['body']
+
+    def stream_start(self) -> Tuple[int, dict]:
+        """
+        Return the current event id and state a new stream subscriber starts from.
+        """
+        _, body = self.call('stream_start')
+        return body['last_id'], body['state']
+
+    def listen(
+            self,
+            last_id: int,
+            topics: Optional[Iterable[str]] = None,
+            heartbeat: float = 15.0
+        ) -> Iterator[Optional[BusEvent]]:
+        """
+        Yield events from the daemon's event bus, like EventBus.listen().
+
+        Each step is one long-poll for the events after the last one seen, so
+        a subscriber holds one connection while it waits.
+        """
+        topics = list(topics) if topics else None
+        while True:
+            _, body = self.call('events', last_id=last_id, topics=topics, timeout=heartbeat)
+            if body.get('closed'):
+                return
+            if not body['complete']:
+                yield BusEvent(last_id, 'reset', {'last_id': body['last_id']})
+            if not body['events']:
+                yield None
+            for event in body['events']:
+                yield BusEvent(event['id'], event['topic'], event['data'], event['time'])
+            last_id = body['last_id']
+
+    def close(self):
+        """
+        Close the idle connections.
+        """
+        with self._lock:
+            idle, self._idle = self._idle, []
+        for sock in idle:
+            sock.close()
+
+    def _checkout(self) -> socket.socket:
+        with self._lock:
+            if self._idle:
+                return self._idle.pop()
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            sock.settimeout(self.timeout)
+            sock.connect(self.path)
+        except OSError as e:
+            sock.close()
+            raise HardwareUnavailable(f"Cannot connect to hardware daemon at {self.path}: {str(e)}") from e
+        return sock
+
+    def _checkin(self, sock: socket.socket):
+        with self._lock:
+            if len(self._idle) < self.max_idle:
+                self._idle.append(sock)
+                return
+        sock.close()
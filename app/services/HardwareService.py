@@ -0,0 +1,329 @@
+from app.services.DeviceManager import DeviceManager, DEVICE_PIN_FIELDS
+from app.services.DeviceRegistry import device_registry, OUTPUT_DEVICES
+from app.services.ActuationScheduler import actuation_scheduler
+from app.services.DeviceTestRunner import device_test_runner
+from app.services.AcquisitionEngine import acquisition_engine
+from app.services.RuntimeCheckpointer import runtime_checkpointer
+from app.services.ControlEngine import control_engine
+from app.services.ConfigCache import config_cache
+from app.services.StateStore import state_store
+from app.services.EventBus import event_bus
+from app.hardware.gpio_manager import initialize_gpio, cleanup_gpio
+from app.hardware.GpioDispatcher import gpio_dispatcher
+from app.hardware.PwmEngine import pwm_engine
+from app.hardware.input.OneWireBus import one_wire_bus
+from app.config import DEBUG_MODE, SNAPSHOT_TIMEOUT, EVENT_HEARTBEAT_INTERVAL, GPIO_DISPATCHER
+from functools import partial
+from typing import Iterable, Iterator, Optional, Tuple
+import inspect
+import time
+
+# Test request field holding the pin of each single-pin device, and the DeviceManager argument it maps to
+TEST_DEVICE_PINS = {
+    'atomizer': 'atomizer_pin',
+    'light': 'light_pin',
+    'water': 'water_pin',
+    'heater': 'heater_pin',
+    'light_sensor': 'light_pin_in',
+    'temperature_sensor': 'temperature_pin_in',
+    'humidity_sensor': 'humidity_pin_in',
+    'soil_moisture_sensor': 'soil_moisture_pin_in',
+}
+
+# Pin fields holding MCP3008 channels rather than GPIO pins
+ANALOG_PIN_FIELDS = {'light_pin_in', 'soil_moisture_pin_in'}
+
+class HardwareService:
+    """
+    The operations web requests perform on the hardware, run in the process that owns it.
+
+    Every operation takes JSON-serializable arguments and returns an HTTP
+    status and a JSON-serializable body, so the same calls work in-process
+    (a single process serving the web app and driving the pins) and through
+    the hardware daemon's Unix socket, where web workers use a HardwareClient
+    with the same call() interface.
+    """
+
+    def __init__(self):
+        self._app = None
+        self.active = False
+
+    def init_app(self, app):
+        """
+        Take ownership of the GPIO pins and start the hardware services for an application.
+
+        Args:
+            app (Flask): The application whose Config describes the devices.
+        """
+        initialize_gpio()
+        # A previous close() ended the streams; this owner serves them again
+        event_bus.open()
+        if GPIO_DISPATCHER and not app.testing:
+            # Start before the devices are built so their pin setup is queued too
+            gpio_dispatcher.start()
+        if not app.testing:
+            # Software PWM and ramps need the engine thread, with or without the dispatcher
+            pwm_engine.start()
+        # Scheduled jobs follow the devices when a pin change rebuilds them
+        device_registry.on_rebuild = partial(actuation_scheduler.rebind, device_registry.get)
+        device_registry.init_app(app)
+        runtime_checkpointer.init_app(app)
+        acquisition_engine.init_app(app)
+        control_engine.init_app(app)
+        self._app = app
+        self.active = True
+        app.extensions['hardware'] = self
+
+    def call(self, op: str, **args) -> Tuple[int, dict]:
+        """
+        Run an operation.
+
+        Args:
+            op (str): The operation name, e.g. 'control'.
+            **args: The operation's arguments.
+
+        Returns:
+            Tuple[int, dict]: The HTTP status and the response body.
+        """
+        handler = getattr(self, f'op_{op}', None)
+        if handler is None:
+            return 400, {'status': 'error', 'message': f'Unknown operation: {op}'}
+        try:
+            inspect.signature(handler).bind(**args)
+        except TypeError as e:
+            return 400, {'status': 'error', 'message': f'Invalid arguments for {op}: {str(e)}'}
+        return handler(**args)
+
+    def stream_start(self) -> Tuple[int, dict]:
+        """
+        Return the current event id and state a new stream subscriber starts from.
+        """
+        # Taking the position first means no change between the two is missed
+        last_id = event_bus.last_id
+        _, state = state_store.snapshot()
+        return last_id, state
+
+    def listen(
+            self,
+            last_id: int,
+            topics: Optional[Iterable[str]] = None,
+            heartbeat: float = EVENT_HEARTBEAT_INTERVAL
+        ) -> Iterator:
+        """
+        Yield live events, see EventBus.listen().
+        """
+        return event_bus.listen(last_id, topics, heartbeat)
+
+    def close(self):
+        """
+        Turn the outputs off, stop the hardware services and release the pins.
+        """
+        if not self.active:
+            return
+        self.active = False
+        control_engine.stop()
+        acquisition_engine.stop()
+        actuation_scheduler.stop()
+        device_registry.shutdown()
+        # After the outputs are off, so the final checkpoint counts their last run
+        runtime_checkpointer.stop()
+        one_wire_bus.stop()
+        event_bus.close()
+        pwm_engine.stop()
+        gpio_dispatcher.stop()
+        cleanup_gpio()
+
+    def op_ping(self) -> Tuple[int, dict]:
+        return 200, {'status': 'success'}
+
+    def op_status(self, since: Optional[int] = None, timeout: float = 0.0) -> Tuple[int, dict]:
+        if since is None:
+            sequence, state = state_store.snapshot()
+            changed = True
+        else:
+            sequence, state, changed = state_store.wait_for_change(since, timeout)
+        return 200, {
+            'sequence': sequence,
+            'changed': changed,
+            'devices': state['devices'],
+            'sensors': state['sensors']
+        }
+
+    def op_stream_start(self) -> Tuple[int, dict]:
+        last_id, state = self.stream_start()
+        return 200, {'last_id': last_id, 'state': state}
+
+    def op_events(self, last_id: int, topics: Optional[list] = None, timeout: float = EVENT_HEARTBEAT_INTERVAL) -> Tuple[int, dict]:
+        # One long-poll step of a remote stream subscriber
+        known = last_id <= event_bus.last_id
+        events, complete = event_bus.wait(last_id if known else event_bus.last_id, timeout)
+        if topics:
+            filtered = [event for event in events if event.topic in topics]
+        else:
+            filtered = events
+        return 200, {
+            'events': [event.to_dict() for event in filtered],
+            'complete': complete and known,
+            'last_id': events[-1].id if events else (last_id if known else event_bus.last_id),
+            'closed': event_bus.closed
+        }
+
+    def op_gpio(self) -> Tuple[int, dict]:
+        return 200, {'status': 'success', 'gpio': gpio_dispatcher.stats()}
+
+    def op_usage(self) -> Tuple[int, dict]:
+        usage = {}
+        for device in OUTPUT_DEVICES:
+            component = device_registry.get(device)
+            if component is None:
+                continue
+            usage[device] = {
+                **component.get_usage_stats(),
+                'state': bool(component.state),
+                'duty_cycle': component.get_duty_cycles(),
+                'switches': component.usage.switches,
+            }
+        return 200, {'status': 'success', 'usage': usage}
+
+    def op_rules(self) -> Tuple[int, dict]:
+        return 200, {'status': 'success', 'control': control_engine.stats()}
+
+    def op_pwm(self) -> Tuple[int, dict]:
+        return 200, {'status': 'success', 'pwm': pwm_engine.stats(), 'channels': list(pwm_engine.channels().values())}
+
+    def op_acquisition(self) -> Tuple[int, dict]:
+        return 200, {
+            'status': 'success',
+            'sensors': acquisition_engine.stats(),
+            'latest': acquisition_engine.latest()
+        }
+
+    def op_snapshot(self, timeout: float = SNAPSHOT_TIMEOUT) -> Tuple[int, dict]:
+        started = time.monotonic()
+        sensors = acquisition_engine.snapshot(timeout)
+        return 200, {
+            'status': 'success',
+            'timeout': timeout,
+            'elapsed': round(time.monotonic() - started, 4),
+            'sensors': sensors
+        }
+
+    def op_reload(self) -> Tuple[int, dict]:
+        # The configuration was changed by another process
+        config_cache.invalidate()
+        return 200, {'status': 'success', 'rebuilt': device_registry.reload()}
+
+    def op_control(self, device: str, state: bool) -> Tuple[int, dict]:
+        # Drive the long-lived shared device: a single GPIO write, no driver setup
+        if not device_registry.set_state(device, bool(state)):
+            return 404, {'status': 'error', 'device': device, 'message': f'Unknown or unconfigured device: {device}'}
+        return 200, {'status': 'success', 'device': device, 'state': state}
+
+    def op_level(self, device: str, level: float, ramp: float = 0.0) -> Tuple[int, dict]:
+        try:
+            dimmed = device_registry.set_level(device, level, ramp)
+        except ValueError as e:
+            return 400, {'status': 'error', 'device': device, 'message': str(e)}
+        if not dimmed:
+            return 404, {'status': 'error', 'device': device, 'message': f'Unknown or undimmable device: {device}'}
+        component = device_registry.get(device)
+        return 200, {'status': 'success', 'device': device, 'level': component.get_level(), 'pwm': component.pwm_enabled}
+
+    def op_control_bulk(self, states: dict, inrush_delay: Optional[float] = None) -> Tuple[int, dict]:
+        # Switch several devices in one batched write; unknown devices reject the whole request
+        try:
+            changed = device_registry.set_states(states, inrush_delay)
+        except KeyError as e:
+            device = e.args[0]
+            return 404, {'status': 'error', 'device': device, 'message': f'Unknown or unconfigured device: {device}'}
+        return 200, {'status': 'success', 'changed': changed, 'states': states}
+
+    def op_test(self, data: dict, wait: float = 0.0) -> Tuple[int, dict]:
+        device = data.get('device')
+        if device == 'ultrasonic_sensor':
+            pins = {'ultrasonic_trigger_pin_in': data.get('trigger_pin'), 'ultrasonic_echo_pin_in': data.get('echo_pin')}
+        elif device in TEST_DEVICE_PINS:
+            pins = {TEST_DEVICE_PINS[device]: data.get('pin')}
+        else:
+            return 400, {'status': 'error', 'device': device, 'message': f'Unknown device: {device}'}
+
+        io = 'output' if device in OUTPUT_DEVICES else 'input'
+        configured = {field: config_cache.snapshot().get(field) for field in DEVICE_PIN_FIELDS}
+        if all(configured[field] == pin for field, pin in pins.items()) and device_registry.get(device) is not None:
+            # The registry already drives these pins: test its device under its lock
+            if io == 'output' and any(job.device == device for job in actuation_scheduler.active_jobs()):
+                return 409, {'status': 'error', 'device': device, 'message': f'{device} is running a scheduled job'}
+            device_manager, lock, key, owned = device_registry.manager, device_registry.lock(device), device, False
+        else:
+            # Analog sensors are addressed by ADC channel, everything else by GPIO pin
+            owners = [
+                field for field, pin in configured.items()
+                if pin is not None and pin in pins.values()
+                and (field in ANALOG_PIN_FIELDS) == (next(iter(pins)) in ANALOG_PIN_FIELDS)
+            ]
+            if owners:
+                return 409, {'status': 'error', 'device': device, 'message': f'Pin already assigned to {", ".join(owners)}'}
+            # A one-off read runs in-process: only the registry keeps an ultrasonic worker
+            device_manager, lock, key, owned = DeviceManager(**pins, debug_mode=DEBUG_MODE, ultrasonic_isolated=False), None, None, True
+
+        # The test runs in the background; quick sensor reads are still answered inline
+        job = device_test_runner.submit(device, device_manager, io, lock, key, owned)
+        if io == 'input' and device_test_runner.wait(job, wait):
+            if job.status == 'completed':
+                return 200, {'status': 'success', 'device': device, 'value': job.value, 'job': job.to_dict()}
+            return 200, {'status': 'error', 'device': device, 'message': job.error, 'job': job.to_dict()}
+        return 202, {'status': 'accepted', 'device': device, 'job': job.to_dict()}
+
+    def op_test_job(self, job_id: int) -> Tuple[int, dict]:
+        job = device_test_runner.get(job_id)
+        if job is None:
+            return 404, {'status': 'error', 'message': f'Unknown test job: {job_id}'}
+        return 200, {'status': 'success', 'job': job.to_dict()}
+
+    def op_schedule(self, data: dict) -> Tuple[int, dict]:
+        # Timed runs return a job handle immediately; the scheduler thread does the switching
+        device = device_registry.resolve(data.get('device'))
+        component = device_registry.get(device) if device in OUTPUT_DEVICES else None
+        if component is None:
+            return 404, {'status': 'error', 'device': device, 'message': f'Unknown or unconfigured device: {device}'}
+        try:
+            if 'duration' in data:
+                job = actuation_scheduler.activate_for(device, component, float(data['duration']), device_registry.lock(device))
+            else:
+                job = actuation_scheduler.pulse(
+                    device,
+                    component,
+                    float(data.get('on_time', 0)),
+                    float(data.get('off_time', 0)),
+                    int(data.get('cycles', 1)),
+                    device_registry.lock(device)
+                )
+        except (TypeError, ValueError) as e:
+            return 400, {'status': 'error', 'device': device, 'message': str(e)}
+        return 202, {'status': 'success', 'job': job.to_dict()}
+
+    def op_schedules(self) -> Tuple[int, dict]:
+        return 200, {'jobs': [job.to_dict() for job in actuation_scheduler.active_jobs()]}
+
+    def op_schedule_job(self, job_id: int) -> Tuple[int, dict]:
+        job = actuation_scheduler.get(job_id)
+        if job is None:
+            return 404, {'status': 'error', 'message': f'Unknown job: {job_id}'}
+        return 200, {'status': 'success', 'job': job.to_dict()}
+
+    def op_schedule_cancel(self, job_id: int) -> Tuple[int, dict]:
+        job = actuation_scheduler.cancel(job_id)
+        if job is None:
+            return 404, {'status': 'error', 'message': f'Unknown job: {job_id}'}
+        return 200, {'status': 'success', 'job': job.to_dict()}
+
+    def op_schedule_extend(self, job_id: int, seconds: float) -> Tuple[int, dict]:
+        try:
+            job = actuation_scheduler.extend(job_id, seconds)
+        except ValueError as e:
+            return 400, {'status': 'error', 'message': str(e)}
+        if job is None:
+            return 404, {'status': 'error', 'message': f'Unknown or finished job: {job_id}'}
+        return 200, {'status': 'success', 'job': job.to_dict()}
+
+hardware_service = HardwareService()
@@ -0,0 +1,195 @@
+from app.services.ReadingStore import ReadingStore
+from app.config import READING_BUFFER_MAX_SIZE, READING_BUFFER_FLUSH_SIZE, READING_BUFFER_FLUSH_INTERVAL
+from collections import deque
+from datetime import datetime
+from typing import Optional
+import threading
+import time
+
+class ReadingBuffer:
+    """
+    Write-behind buffer that batches sensor readings into bulk inserts.
+
+    Producers call record() from any thread; a background flusher writes the
+    buffered samples through ReadingStore.insert_many once flush_size samples
+    are waiting or flush_interval seconds have passed, so the SD card sees one
+    transaction per batch instead of one per sample. Memory is bounded by
+    max_size: when the buffer (including a batch being written) is full,
+    record() blocks until the flusher catches up.
+
+    Attributes:
+        max_size (int): Maximum number of samples held in memory.
+        flush_size (int): Number of buffered samples that triggers a flush.
+        flush_interval (float): Maximum age in seconds of an unflushed sample.
+        flushed (int): Total number of samples written to the database.
+        dropped (int): Total number of samples rejected because the buffer stayed full.
+    """
+
+    def __init__(
+            self,
+            max_size: int = READING_BUFFER_MAX_SIZE,
+            flush_size: int = READING_BUFFER_FLUSH_SIZE,
+            flush_interval: float = READING_BUFFER_FLUSH_INTERVAL,
+            store: Optional[ReadingStore] = None
+        ):
+        self.max_size = max_size
+        self.flush_size = min(flush_size, max_size)
+        self.flush_interval = flush_interval
+        self.store = store or ReadingStore()
+        self.flushed = 0
+        self.dropped = 0
+        self._app = None
+        self._buffer = deque()
+        self._in_flight = 0
+        self._lock = threading.Lock()
+        self._not_full = threading.Condition(self._lock)
+        self._flush_wanted = threading.Condition(self._lock)
+        self._flush_lock = threading.Lock()
+        self._thread = None
+        self._running = False
+
+    def init_app(self, app):
+        """
+        Bind the buffer to a Flask application whose database receives the flushes.
+
+        Args:
+            app (Flask): The application providing the database context.
+        """
+        self._app = app
+
+    def start(self):
+        """
+        Start the background flusher thread if it is not already running.
+        """
+        with self._lock:
+            if self._running:
+                return
+            self._running = True
+            self._thread = threading.Thread(target=self._run, name="ReadingBuffer", daemon=True)
+            self._thread.start()
+        print(f"[{time.strftime('%m-%d-%Y %H:%M:%S')}] - (ReadingBuffer) Flusher started")
+
+    def stop(self):
+        """
+        Stop the flusher thread and write out everything still buffered.
+        """
+        with self._lock:
+            running = self._running
+            self._running = False
+            self._flush_wanted.notify_all()
+        if running and self._thread is not threading.current_thread():
+            self._thread.join()
+        self.flush()
+        print(f"[{time.strftime('%m-%d-%Y %H:%M:%S')}] - (ReadingBuffer) Flusher stopped, {self.flushed} readings written")
+
+    def record(self, sensor: str, value: float, timestamp: Optional[datetime] = None, timeout: Optional[float] = None) -> bool:
+        """
+        Queue a reading for the next bulk insert.
+
+        Blocks while the buffer is full. Readings with a value of None are ignored.
+
+        Args:
+            sensor (str): The sensor name the reading is stored under.
+            value (float): The reading value.
+            timestamp (Optional[datetime]): When the reading was taken, defaults to now.
+            timeout (Optional[float]): Maximum seconds to wait for room, None to wait forever.
+
+        Returns:
+            bool: True if the reading was queued, False if it was dropped.
+        """
+        if value is None:
+            return False
+        if not self._running:
+            self.start()
+        sample = (sensor, timestamp or datetime.utcnow(), value)
+        with self._lock:
+            if len(self._buffer) + self._in_flight >= self.max_size:
+                self._flush_wanted.notify()
+                if not self._not_full.wait_for(
+                        lambda: len(self._buffer) + self._in_flight < self.max_size,
+                        timeout):
+                    self.dropped += 1
+                    return False
+            self._buffer.append(sample)
+            if len(self._buffer) >= self.flush_size:
+                self._flush_wanted.notify()
+        return True
+
+    def record_many(self, values: dict, timestamp: Optional[datetime] = None, timeout: Optional[float] = None) -> bool:
+        """
+        Queue several quantities taken in the same read under one timestamp.
+
+        Args:
+            values (dict): Reading values keyed by sensor name.
+            timestamp (Optional[datetime]): When the readings were taken, defaults to now.
+            timeout (Optional[float]): Maximum seconds to wait for room, None to wait forever.
+
+        Returns:
+            bool: True if at least one reading was queued.
+        """
+        timestamp = timestamp or datetime.utcnow()
+        results = [self.record(sensor, value, timestamp, timeout) for sensor, value in values.items()]
+        return any(results)
+
+    def record_reading(self, sensor, timeout: Optional[float] = None) -> bool:
+        """
+        Read a sensor once and queue every quantity it provides.
+
+        Args:
+            sensor (Sensor): Any Sensor subclass with a quantity attribute.
+            timeout (Optional[float]): Maximum seconds to wait for room, None to wait forever.
+
+        Returns:
+            bool: True if at least one reading was queued, False if they were dropped or failed.
+        """
+        return self.record_many(sensor.read_all(), timeout=timeout)
+
+    def flush(self) -> int:
+        """
+        Write every buffered reading to the database in one multi-row insert.
+
+        Returns:
+            int: The number of readings written.
+        """
+        with self._flush_lock:
+            with self._lock:
+                batch = list(self._buffer)
+                self._buffer.clear()
+                self._in_flight = len(batch)
+            if not batch:
+                return 0
+            try:
+                if self._app is not None:
+                    with self._app.app_context():
+                        written = self.store.insert_many(batch)
+                else:
+                    written = self.store.insert_many(batch)
+                self.flushed += written
+                return written
+            except Exception as e:
+                self.dropped += len(batch)
+                print(f"[{time.strftime('%m-%d-%Y %H:%M:%S')}] - (ReadingBuffer) Error flushing {len(batch)} readings: {str(e)}")
+                return 0
+            finally:
+                with self._lock:
+                    self._in_flight = 0
+                    self._not_full.notify_all()
+
+    def __len__(self):
+        with self._lock:
+            return len(self._buffer)
+
+    def _run(self):
+        """
+        Flusher loop: wait for the size threshold or the flush interval, then flush.
+        """
+        while True:
+            with self._lock:
+                self._flush_wanted.wait_for(
+                    lambda: not self._running or len(self._buffer) >= self.flush_size,
+                    self.flush_interval)
+                if not self._running:
+                    return
+            self.flush()
+
+reading_buffer = ReadingBuffer()
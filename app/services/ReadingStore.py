@@ -0,0 +1,214 @@
+from app.models import (
+    db,
+    SensorReading,
+    Reading,
+    LightReading,
+    TemperatureReading,
+    HumidityReading,
+    Water_Reading,
+    Soil_Moisture_Reading,
+)
+from app.services.RollupManager import RollupManager
+from sqlalchemy import insert, select, delete
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Tuple, Union
+import sqlite3
+import time
+
+# INSERT ... RETURNING needs SQLite 3.35; older libraries (Debian Bullseye ships
+# 3.34) find the new keys with a select before inserting instead
+SQLITE_RETURNING = sqlite3.sqlite_version_info >= (3, 35, 0)
+
+# Legacy joined-table models and the value column each one stores, keyed by
+# the sensor name used in the narrow sensor_reading table.
+LEGACY_READING_MODELS = {
+    'light': (LightReading, 'light_level'),
+    'temperature': (TemperatureReading, 'temperature'),
+    'humidity': (HumidityReading, 'humidity'),
+    'water_level': (Water_Reading, 'water_level'),
+    'soil_moisture': (Soil_Moisture_Reading, 'soil_moisture'),
+}
+
+class ReadingStore:
+    """
+    Read/write access to the narrow sensor_reading time-series table.
+
+    All methods use the current Flask-SQLAlchemy session, so they must be
+    called inside an application context.
+    """
+
+    def __init__(self, maintain_rollups: bool = True):
+        """
+        Initialize the reading store.
+
+        Args:
+            maintain_rollups (bool): Whether inserts also update the rollup tables.
+        """
+        self.rollups = RollupManager() if maintain_rollups else None
+
+    def insert_many(self, samples: Iterable[Tuple[str, datetime, float]]) -> int:
+        """
+        Insert many samples in a single multi-row statement and transaction.
+
+        Samples that collide with an existing (sensor, timestamp) key are ignored.
+        Rollups are updated in the same transaction, from the rows actually inserted.
+
+        Args:
+            samples (Iterable[Tuple[str, datetime, float]]): (sensor, timestamp, value) tuples.
+
+        Returns:
+            int: The number of samples inserted, excluding ignored duplicates.
+        """
+        rows = [
+            {'sensor': sensor, 'timestamp': timestamp, 'value': value}
+            for sensor, timestamp, value in samples
+            if value is not None
+        ]
+        if not rows:
+            return 0
+        inserted = self._insert(rows)
+        db.session.commit()
+        return inserted
+
+    def query_range(
+            self,
+            sensors: Union[str, Iterable[str]],
+            start: datetime,
+            end: Optional[datetime] = None,
+            limit: Optional[int] = None
+        ) -> Dict[str, List[Tuple[datetime, float]]]:
+        """
+        Return the samples of one or more sensors within a time range.
+
+        Args:
+            sensors (Union[str, Iterable[str]]): A sensor name or several sensor names.
+            start (datetime): Inclusive start of the range.
+            end (Optional[datetime]): Inclusive end of the range, defaults to now.
+            limit (Optional[int]): Maximum number of samples returned per sensor.
+
+        Returns:
+            Dict[str, List[Tuple[datetime, float]]]: (timestamp, value) pairs per sensor,
+            ordered by timestamp.
+        """
+        if isinstance(sensors, str):
+            sensors = [sensors]
+        end = end or datetime.utcnow()
+        result = {}
+        # One statement per sensor keeps every scan a single contiguous range
+        # of the (sensor, timestamp) primary key.
+        for sensor in sensors:
+            stmt = (
+                select(SensorReading.timestamp, SensorReading.value)
+                .where(SensorReading.sensor == sensor)
+                .where(SensorReading.timestamp >= start)
+                .where(SensorReading.timestamp <= end)
+                .order_by(SensorReading.timestamp)
+            )
+            if limit is not None:
+                stmt = stmt.limit(limit)
+            result[sensor] = [tuple(row) for row in db.session.execute(stmt)]
+        return result
+
+    def latest(self, sensor: str) -> Optional[Tuple[datetime, float]]:
+        """
+        Return the most recent sample of a sensor.
+
+        Args:
+            sensor (str): The sensor name.
+
+        Returns:
+            Optional[Tuple[datetime, float]]: The (timestamp, value) pair, or None if empty.
+        """
+        row = db.session.execute(
+            select(SensorReading.timestamp, SensorReading.value)
+            .where(SensorReading.sensor == sensor)
+            .order_by(SensorReading.timestamp.desc())
+            .limit(1)
+        ).first()
+        return tuple(row) if row is not None else None
+
+    def migrate_legacy_readings(self, chunk_size: int = 5000) -> int:
+        """
+        Move rows from the legacy joined-table Reading hierarchy into sensor_reading.
+
+        Rows are copied and deleted in chunks, each in its own transaction, so the
+        migration can be interrupted and re-run safely.
+
+        Args:
+            chunk_size (int): Number of legacy rows moved per transaction.
+
+        Returns:
+            int: The number of rows migrated.
+        """
+        migrated = 0
+        for sensor, (model, column) in LEGACY_READING_MODELS.items():
+            value_column = getattr(model, column)
+            while True:
+                rows = db.session.execute(
+                    select(model.id, model.timestamp, value_column)
+                    .order_by(model.id)
+                    .limit(chunk_size)
+                ).all()
+                if not rows:
+                    break
+                ids = [row[0] for row in rows]
+                samples = [
+                    {'sensor': sensor, 'timestamp': timestamp, 'value': value}
+                    for _, timestamp, value in rows
+                    if timestamp is not None
+                ]
+                if samples:
+                    self._insert(samples)
+                db.session.execute(delete(model.__table__).where(model.__table__.c.id.in_(ids)))
+                db.session.execute(delete(Reading.__table__).where(Reading.__table__.c.id.in_(ids)))
+                db.session.commit()
+                migrated += len(rows)
+        if migrated:
+            print(f"[{time.strftime('%m-%d-%Y %H:%M:%S')}] - (ReadingStore) Migrated {migrated} legacy readings")
+        return migrated
+
+    def _insert(self, rows: List[dict]) -> int:
+        """
+        INSERT OR IGNORE rows and fold only the ones actually inserted into the rollups.
+
+        Rows ignored as duplicates of an existing key are left out of the
+        count and the rollups, so a re-submitted sample is not counted twice.
+
+        Returns:
+            int: The number of rows inserted.
+        """
+        stmt = insert(SensorReading).prefix_with('OR IGNORE')
+        if SQLITE_RETURNING:
+            inserted = [tuple(row) for row in db.session.execute(
+                stmt.returning(SensorReading.sensor, SensorReading.timestamp, SensorReading.value), rows
+            )]
+        else:
+            inserted = self._new_rows(rows)
+            if inserted:
+                db.session.execute(stmt, [
+                    {'sensor': sensor, 'timestamp': timestamp, 'value': value}
+                    for sensor, timestamp, value in inserted
+                ])
+        if self.rollups is not None:
+            self.rollups.apply(inserted)
+        return len(inserted)
+
+    def _new_rows(self, rows: List[dict]) -> List[Tuple[str, datetime, float]]:
+        """
+        Return the rows whose (sensor, timestamp) key is neither stored nor repeated earlier in the batch.
+
+        Matches what INSERT OR IGNORE keeps: the first row for each new key.
+        """
+        timestamps = [row['timestamp'] for row in rows]
+        seen = set(db.session.execute(
+            select(SensorReading.sensor, SensorReading.timestamp)
+            .where(SensorReading.sensor.in_({row['sensor'] for row in rows}))
+            .where(SensorReading.timestamp.between(min(timestamps), max(timestamps)))
+        ).tuples())
+        fresh = []
+        for row in rows:
+            key = (row['sensor'], row['timestamp'])
+            if key not in seen:
+                seen.add(key)
+                fresh.append((row['sensor'], row['timestamp'], row['value']))
+        return fresh
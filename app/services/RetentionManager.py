@@ -0,0 +1,276 @@
+from app.models import db, SensorReading, ReadingRollup, Log
+from app.config import (
+    RETENTION_RAW_DAYS,
+    RETENTION_MINUTE_ROLLUP_DAYS,
+    RETENTION_HOUR_ROLLUP_DAYS,
+    RETENTION_DAY_ROLLUP_DAYS,
+    RETENTION_LOG_DAYS,
+    RETENTION_CHUNK_SIZE,
+    RETENTION_INTERVAL_HOURS,
+)
+from sqlalchemy import select, delete, text
+from datetime import datetime, timedelta
+from typing import Dict, Optional
+import threading
+import time
+
+def default_policies() -> Dict[str, Optional[timedelta]]:
+    """
+    Build the retention policies from app.config; a value of None keeps data forever.
+    """
+    days = {
+        'raw': RETENTION_RAW_DAYS,
+        '1m': RETENTION_MINUTE_ROLLUP_DAYS,
+        '1h': RETENTION_HOUR_ROLLUP_DAYS,
+        '1d': RETENTION_DAY_ROLLUP_DAYS,
+        'log': RETENTION_LOG_DAYS,
+    }
+    return {target: timedelta(days=value) if value > 0 else None for target, value in days.items()}
+
+# Rollup policy targets and the bucket width in seconds they apply to
+ROLLUP_TARGETS = {'1m': 60, '1h': 3600, '1d': 86400}
+
+class RetentionManager:
+    """
+    Prunes old readings, rollups and Log rows, then gives the space back to the filesystem.
+
+    Every delete touches at most chunk_size rows and commits on its own, with a
+    short pause between chunks, so the SQLite write lock is only ever held
+    briefly and web requests are never stalled behind a large purge. A pass
+    ends with an incremental vacuum and WAL checkpoint so the database file
+    actually shrinks on the SD card.
+
+    Attributes:
+        policies (Dict[str, Optional[timedelta]]): Maximum age per target ('raw', '1m', '1h', '1d', 'log').
+        chunk_size (int): Maximum rows deleted per transaction.
+        interval (float): Seconds between background passes.
+    """
+
+    def __init__(
+            self,
+            policies: Optional[Dict[str, Optional[timedelta]]] = None,
+            chunk_size: int = RETENTION_CHUNK_SIZE,
+            interval: float = RETENTION_INTERVAL_HOURS * 3600,
+            pause: float = 0.01
+        ):
+        self.policies = policies if policies is not None else default_policies()
+        self.chunk_size = chunk_size
+        self.interval = interval
+        self.pause = pause
+        self._app = None
+        self._thread = None
+        self._stop = threading.Event()
+        self._warned = False
+
+    def init_app(self, app):
+        """
+        Bind the manager to an application and start background passes outside of testing.
+
+        Args:
+            app (Flask): The application providing the database context.
+        """
+        self._app = app
+        if not app.testing:
+            self.start()
+
+    def start(self):
+        """
+        Start the background thread that runs a pass every interval.
+        """
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="RetentionManager", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """
+        Stop the background thread, waiting for an in-progress chunk to finish.
+        """
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def run_pass(self, now: Optional[datetime] = None) -> Dict[str, int]:
+        """
+        Apply every retention policy once and reclaim the freed pages.
+
+        Must be called inside an application context.
+
+        Args:
+            now (Optional[datetime]): Reference time for the cutoffs, defaults to now.
+
+        Returns:
+            Dict[str, int]: Number of rows deleted per target.
+        """
+        now = now or datetime.utcnow()
+        deleted = {}
+        for target, max_age in self.policies.items():
+            if max_age is None:
+                continue
+            cutoff = now - max_age
+            if target == 'raw':
+                deleted[target] = self._prune_readings(cutoff)
+            elif target == 'log':
+                deleted[target] = self._prune_log(cutoff)
+            elif target in ROLLUP_TARGETS:
+                deleted[target] = self._prune_rollups(ROLLUP_TARGETS[target], cutoff)
+        self.reclaim_space()
+        total = sum(deleted.values())
+        if total:
+            print(f"[{time.strftime('%m-%d-%Y %H:%M:%S')}] - (RetentionManager) Deleted {total} rows: {deleted}")
+        return deleted
+
+    def reclaim_space(self, pages_per_step: int = 256) -> bool:
+        """
+        Return free pages to the filesystem in small incremental-vacuum steps.
+
+        Databases created before incremental auto-vacuum was enabled are left
+        alone: converting them needs a full VACUUM that locks out every other
+        user of the database, so it is an offline step, see convert_to_incremental().
+
+        Args:
+            pages_per_step (int): Pages released per transaction.
+
+        Returns:
+            bool: False if the database is not in incremental auto-vacuum mode.
+        """
+        if db.session.execute(text("PRAGMA auto_vacuum")).scalar() != 2:
+            db.session.commit()
+            if not self._warned:
+                self._warned = True
+                print(f"[{time.strftime('%m-%d-%Y %H:%M:%S')}] - (RetentionManager) Database is not in incremental "
+                      f"auto-vacuum mode, free space is not returned; stop the server and run 'python vacuum.py'")
+            return False
+        free_pages = db.session.execute(text("PRAGMA freelist_count")).scalar()
+        while free_pages:
+            # SQLite frees one page per result row, so the result must be drained
+            result = db.session.execute(text(f"PRAGMA incremental_vacuum({int(pages_per_step)})"))
+            if result.returns_rows:
+                result.fetchall()
+            db.session.commit()
+            remaining = db.session.execute(text("PRAGMA freelist_count")).scalar()
+            if remaining >= free_pages:
+                break
+            free_pages = remaining
+            time.sleep(self.pause)
+        db.session.execute(text("PRAGMA wal_checkpoint(TRUNCATE)"))
+        db.session.commit()
+        return True
+
+    def convert_to_incremental(self) -> bool:
+        """
+        Switch an existing database to incremental auto-vacuum with a full VACUUM.
+
+        The VACUUM rewrites the whole file and holds an exclusive lock while it
+        runs, so this must only be called with the server and hardware daemon
+        stopped (see vacuum.py), never from the background thread.
+
+        Must be called inside an application context.
+
+        Returns:
+            bool: True if the database was converted, False if it already was incremental.
+        """
+        if db.session.execute(text("PRAGMA auto_vacuum")).scalar() == 2:
+            return False
+        db.session.commit()
+        with db.engine.connect() as connection:
+            connection.exec_driver_sql("PRAGMA auto_vacuum=INCREMENTAL")
+            connection.exec_driver_sql("VACUUM")
+        self._warned = False
+        print(f"[{time.strftime('%m-%d-%Y %H:%M:%S')}] - (RetentionManager) Converted database to incremental auto-vacuum")
+        return True
+
+    def _prune_readings(self, cutoff: datetime) -> int:
+        """
+        Delete raw readings older than cutoff, one sensor and one chunk at a time.
+        """
+        sensors = db.session.execute(select(SensorReading.sensor).distinct()).scalars().all()
+        deleted = 0
+        for sensor in sensors:
+            deleted += self._prune_keyed(
+                SensorReading,
+                SensorReading.timestamp,
+                cutoff,
+                SensorReading.sensor == sensor
+            )
+        return deleted
+
+    def _prune_rollups(self, width: int, cutoff: datetime) -> int:
+        """
+        Delete rollup buckets of one resolution older than cutoff.
+        """
+        sensors = db.session.execute(
+            select(ReadingRollup.sensor).where(ReadingRollup.resolution == width).distinct()
+        ).scalars().all()
+        deleted = 0
+        for sensor in sensors:
+            deleted += self._prune_keyed(
+                ReadingRollup,
+                ReadingRollup.bucket,
+                cutoff,
+                ReadingRollup.sensor == sensor,
+                ReadingRollup.resolution == width
+            )
+        return deleted
+
+    def _prune_keyed(self, model, time_column, cutoff: datetime, *prefix) -> int:
+        """
+        Chunked delete from a WITHOUT ROWID table whose key is (prefix..., time_column).
+
+        Each chunk ends at the timestamp chunk_size rows into the range, so every
+        statement is a bounded range delete on the primary key.
+        """
+        deleted = 0
+        while not self._stop.is_set():
+            bound = db.session.execute(
+                select(time_column)
+                .where(*prefix)
+                .where(time_column < cutoff)
+                .order_by(time_column)
+                .offset(self.chunk_size)
+                .limit(1)
+            ).scalar()
+            result = db.session.execute(
+                delete(model).where(*prefix).where(time_column < (bound or cutoff))
+                .execution_options(synchronize_session=False)
+            )
+            db.session.commit()
+            deleted += result.rowcount
+            if bound is None:
+                break
+            time.sleep(self.pause)
+        return deleted
+
+    def _prune_log(self, cutoff: datetime) -> int:
+        """
+        Delete Log rows older than cutoff in id-ordered chunks.
+        """
+        deleted = 0
+        while not self._stop.is_set():
+            ids = db.session.execute(
+                select(Log.id).where(Log.timestamp < cutoff).order_by(Log.id).limit(self.chunk_size)
+            ).scalars().all()
+            if not ids:
+                break
+            result = db.session.execute(
+                delete(Log).where(Log.id.in_(ids)).execution_options(synchronize_session=False)
+            )
+            db.session.commit()
+            deleted += result.rowcount
+            time.sleep(self.pause)
+        return deleted
+
+    def _run(self):
+        """
+        Background loop: run a pass every interval until stopped.
+        """
+        while not self._stop.wait(self.interval):
+            try:
+                with self._app.app_context():
+                    self.run_pass()
+            except Exception as e:
+                print(f"[{time.strftime('%m-%d-%Y %H:%M:%S')}] - (RetentionManager) Error during retention pass: {str(e)}")
+
+retention_manager = RetentionManager()
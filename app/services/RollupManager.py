@@ -0,0 +1,178 @@
+from app.models import db, ReadingRollup, SensorReading
+from sqlalchemy import select, func, case
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, List, Optional, Tuple
+
+EPOCH = datetime(1970, 1, 1)
+
+# Rollup resolutions, finest first: label -> bucket width in seconds
+RESOLUTIONS = {
+    '1m': 60,
+    '1h': 3600,
+    '1d': 86400,
+}
+
+def bucket_start(timestamp: datetime, width: int) -> datetime:
+    """
+    Return the start of the width-second bucket containing timestamp.
+
+    Args:
+        timestamp (datetime): A naive UTC timestamp.
+        width (int): Bucket width in seconds.
+
+    Returns:
+        datetime: The bucket start, aligned to the Unix epoch.
+    """
+    seconds = int((timestamp - EPOCH).total_seconds())
+    return EPOCH + timedelta(seconds=seconds - seconds % width)
+
+class RollupManager:
+    """
+    Incrementally maintained min/max/mean/count/last aggregates per sensor.
+
+    apply() folds a batch of new samples into the 1-minute, 1-hour and 1-day
+    buckets with one upsert per resolution, so rollups are always current and
+    never need a batch recompute. query() answers chart requests from the
+    coarsest table that still honours the caller's point budget.
+    """
+
+    def __init__(self, resolutions: Optional[Dict[str, int]] = None):
+        """
+        Initialize the rollup manager.
+
+        Args:
+            resolutions (Optional[Dict[str, int]]): Label to bucket width in seconds, finest first.
+        """
+        self.resolutions = resolutions or RESOLUTIONS
+
+    def apply(self, samples: Iterable[Tuple[str, datetime, float]]):
+        """
+        Fold new samples into every rollup resolution.
+
+        The caller owns the transaction; nothing is committed here.
+
+        Args:
+            samples (Iterable[Tuple[str, datetime, float]]): (sensor, timestamp, value) tuples.
+        """
+        samples = [sample for sample in samples if sample[2] is not None]
+        if not samples:
+            return
+        for width in self.resolutions.values():
+            # Pre-aggregate the batch so each bucket costs a single upsert row
+            buckets = {}
+            for sensor, timestamp, value in samples:
+                key = (sensor, bucket_start(timestamp, width))
+                agg = buckets.get(key)
+                if agg is None:
+                    buckets[key] = [1, value, value, value, value, timestamp]
+                    continue
+                agg[0] += 1
+                agg[1] += value
+                if value < agg[2]:
+                    agg[2] = value
+                if value > agg[3]:
+                    agg[3] = value
+                if timestamp >= agg[5]:
+                    agg[4] = value
+                    agg[5] = timestamp
+            rows = [
+                {
+                    'sensor': sensor,
+                    'resolution': width,
+                    'bucket': bucket,
+                    'count': count,
+                    'total': total,
+                    'minimum': minimum,
+                    'maximum': maximum,
+                    'last': last,
+                    'last_timestamp': last_timestamp,
+                }
+                for (sensor, bucket), (count, total, minimum, maximum, last, last_timestamp) in buckets.items()
+            ]
+            stmt = sqlite_insert(ReadingRollup)
+            excluded = stmt.excluded
+            newer = excluded.last_timestamp >= ReadingRollup.last_timestamp
+            stmt = stmt.on_conflict_do_update(
+                index_elements=['sensor', 'resolution', 'bucket'],
+                set_={
+                    'count': ReadingRollup.count + excluded['count'],
+                    'total': ReadingRollup.total + excluded.total,
+                    'minimum': func.min(ReadingRollup.minimum, excluded.minimum),
+                    'maximum': func.max(ReadingRollup.maximum, excluded.maximum),
+                    'last': case((newer, excluded['last']), else_=ReadingRollup.last),
+                    'last_timestamp': case((newer, excluded.last_timestamp), else_=ReadingRollup.last_timestamp),
+                }
+            )
+            db.session.execute(stmt, rows)
+
+    def plan(self, sensor: str, start: datetime, end: datetime, max_points: int) -> Optional[int]:
+        """
+        Choose the resolution for a chart query.
+
+        Returns the finest resolution whose point count fits within max_points,
+        so detail is only given up when the budget requires it. Raw samples are
+        chosen when the 1-minute rollups show few enough of them in the range.
+
+        Args:
+            sensor (str): The sensor name.
+            start (datetime): Start of the range.
+            end (datetime): End of the range.
+            max_points (int): Maximum number of points the caller wants back.
+
+        Returns:
+            Optional[int]: Bucket width in seconds, or None for raw samples.
+        """
+        finest = min(self.resolutions.values())
+        raw_points = db.session.execute(
+            select(func.coalesce(func.sum(ReadingRollup.count), 0))
+            .where(ReadingRollup.sensor == sensor)
+            .where(ReadingRollup.resolution == finest)
+            .where(ReadingRollup.bucket >= bucket_start(start, finest))
+            .where(ReadingRollup.bucket <= end)
+        ).scalar()
+        if raw_points <= max_points:
+            return None
+        span = (end - start).total_seconds()
+        widths = sorted(self.resolutions.values())
+        for width in widths:
+            if span / width + 1 <= max_points:
+                return width
+        return widths[-1]
+
+    def query(self, sensor: str, start: datetime, end: Optional[datetime] = None, max_points: int = 500) -> Tuple[Optional[int], List[dict]]:
+        """
+        Return chart points for a sensor at the resolution chosen by plan().
+
+        Args:
+            sensor (str): The sensor name.
+            start (datetime): Start of the range.
+            end (Optional[datetime]): End of the range, defaults to now.
+            max_points (int): Maximum number of points the caller wants back.
+
+        Returns:
+            Tuple[Optional[int], List[dict]]: The resolution used (None for raw) and the points.
+        """
+        end = end or datetime.utcnow()
+        width = self.plan(sensor, start, end, max_points)
+        if width is None:
+            rows = db.session.execute(
+                select(SensorReading.timestamp, SensorReading.value)
+                .where(SensorReading.sensor == sensor)
+                .where(SensorReading.timestamp >= start)
+                .where(SensorReading.timestamp <= end)
+                .order_by(SensorReading.timestamp)
+            )
+            return None, [
+                {'timestamp': timestamp.isoformat(), 'count': 1, 'min': value, 'max': value, 'mean': value, 'last': value}
+                for timestamp, value in rows
+            ]
+        rollups = db.session.execute(
+            select(ReadingRollup)
+            .where(ReadingRollup.sensor == sensor)
+            .where(ReadingRollup.resolution == width)
+            .where(ReadingRollup.bucket >= bucket_start(start, width))
+            .where(ReadingRollup.bucket <= end)
+            .order_by(ReadingRollup.bucket)
+        ).scalars()
+        return width, [rollup.to_dict() for rollup in rollups]
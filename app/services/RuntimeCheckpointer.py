@@ -0,0 +1,127 @@
+from app.models import db, RelayRuntime
+from app.services.DeviceRegistry import device_registry, OUTPUT_DEVICES
+from app.config import RUNTIME_CHECKPOINT_INTERVAL
+from sqlalchemy import select
+from typing import Dict
+import threading
+import time
+
+class RuntimeCheckpointer:
+    """
+    Persists the relays' runtime counters so they survive restarts.
+
+    The counters live in memory on the registry's components and are written
+    to the RelayRuntime table every interval, in one transaction and only for
+    devices whose runtime changed, so toggling a relay never costs a database
+    write. A final checkpoint is taken on shutdown; after a crash at most one
+    interval of on-time is lost.
+
+    Attributes:
+        interval (float): Seconds between background checkpoints.
+    """
+
+    def __init__(self, registry=device_registry, interval: float = RUNTIME_CHECKPOINT_INTERVAL):
+        self.registry = registry
+        self.interval = interval
+        self._app = None
+        self._thread = None
+        self._stop = threading.Event()
+        self._written = {}  # device -> runtime last written
+
+    def init_app(self, app):
+        """
+        Bind the checkpointer to an application; outside of testing, restore the counters and start checkpointing.
+
+        Args:
+            app (Flask): The application providing the database context.
+        """
+        self._app = app
+        self._written = {}
+        if not app.testing:
+            with app.app_context():
+                self.restore()
+            self.start()
+
+    def start(self):
+        """
+        Start the background thread that checkpoints every interval.
+        """
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="RuntimeCheckpointer", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """
+        Stop the background thread and take a final checkpoint.
+        """
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+            try:
+                with self._app.app_context():
+                    self.checkpoint()
+            except Exception as e:
+                print(f"[{time.strftime('%m-%d-%Y %H:%M:%S')}] - (RuntimeCheckpointer) Error during final checkpoint: {str(e)}")
+
+    def restore(self) -> Dict[str, float]:
+        """
+        Load the checkpointed runtimes into the registry's components.
+
+        Must be called inside an application context, before the relays are used.
+
+        Returns:
+            Dict[str, float]: The runtime restored per device.
+        """
+        stored = dict(db.session.execute(select(RelayRuntime.device, RelayRuntime.runtime)).all())
+        restored = {}
+        for device in OUTPUT_DEVICES:
+            component = self.registry.get(device)
+            if component is None or device not in stored:
+                continue
+            component.runtime = stored[device]
+            restored[device] = stored[device]
+        self._written.update(restored)
+        if restored:
+            print(f"[{time.strftime('%m-%d-%Y %H:%M:%S')}] - (RuntimeCheckpointer) Restored runtimes: {restored}")
+        return restored
+
+    def checkpoint(self) -> int:
+        """
+        Write the runtimes that changed since the last checkpoint.
+
+        Must be called inside an application context.
+
+        Returns:
+            int: Number of devices written.
+        """
+        changed = {}
+        for device in OUTPUT_DEVICES:
+            component = self.registry.get(device)
+            if component is None:
+                continue
+            runtime = round(component.runtime, 3)
+            if self._written.get(device) != runtime:
+                changed[device] = runtime
+        if not changed:
+            return 0
+        for device, runtime in changed.items():
+            db.session.merge(RelayRuntime(device=device, runtime=runtime))
+        db.session.commit()
+        self._written.update(changed)
+        return len(changed)
+
+    def _run(self):
+        """
+        Background loop: checkpoint every interval until stopped.
+        """
+        while not self._stop.wait(self.interval):
+            try:
+                with self._app.app_context():
+                    self.checkpoint()
+            except Exception as e:
+                print(f"[{time.strftime('%m-%d-%Y %H:%M:%S')}] - (RuntimeCheckpointer) Error during checkpoint: {str(e)}")
+
+runtime_checkpointer = RuntimeCheckpointer()
@@ -0,0 +1,130 @@
+from app.services.EventBus import event_bus
+from datetime import datetime
+from typing import Dict, Optional, Tuple
+import threading
+
+class StateStore:
+    """
+    Live in-memory view of actuator states and the latest sensor values.
+
+    Every change bumps a sequence number and wakes waiting readers, so
+    clients can long-poll with the last sequence they saw and get an answer
+    as soon as anything changes instead of polling on a timer. Writes that do
+    not change a value are ignored and do not wake anyone.
+
+    Device changes and every sensor sample are also published to the event
+    bus for stream subscribers.
+    """
+
+    def __init__(self, events=event_bus):
+        """
+        Initialize an empty store.
+
+        Args:
+            events (Optional[EventBus]): Bus device changes and sensor samples are published to, None for none.
+        """
+        self.events = events
+        self._condition = threading.Condition()
+        self._sequence = 0
+        self._devices = {}  # device -> bool
+        self._sensors = {}  # quantity -> {'value', 'timestamp'}
+
+    @property
+    def sequence(self) -> int:
+        """
+        The number of changes applied so far.
+        """
+        return self._sequence
+
+    def set_device(self, device: str, state: bool):
+        """
+        Record the on/off state of an actuator.
+
+        Args:
+            device (str): The device name, e.g. 'light'.
+            state (bool): True if the device is on.
+        """
+        self.set_devices({device: state})
+
+    def set_devices(self, states: Dict[str, bool]):
+        """
+        Record the states of several actuators switched together, as one change.
+
+        Args:
+            states (Dict[str, bool]): On/off states keyed by device name.
+        """
+        with self._condition:
+            changes = {device: state for device, state in states.items() if self._devices.get(device) != state}
+            if not changes:
+                return
+            self._devices.update(changes)
+            self._changed()
+            if self.events is not None:
+                self.events.publish('devices', {'devices': changes})
+
+    def remove_device(self, device: str):
+        """
+        Forget an actuator that is no longer configured.
+        """
+        with self._condition:
+            if self._devices.pop(device, None) is not None:
+                self._changed()
+
+    def set_sensors(self, values: Dict[str, float], timestamp: Optional[datetime] = None):
+        """
+        Record the latest values of several quantities taken together.
+
+        Args:
+            values (Dict[str, float]): Reading values keyed by quantity name.
+            timestamp (Optional[datetime]): When the values were read, defaults to now.
+        """
+        timestamp = (timestamp or datetime.utcnow()).isoformat()
+        with self._condition:
+            changed = False
+            for quantity, value in values.items():
+                current = self._sensors.get(quantity)
+                if current is not None and current['value'] == value:
+                    continue
+                self._sensors[quantity] = {'value': value, 'timestamp': timestamp}
+                changed = True
+            if changed:
+                self._changed()
+            if self.events is not None and values:
+                self.events.publish('sensors', {'timestamp': timestamp, 'values': dict(values)})
+
+    def snapshot(self) -> Tuple[int, dict]:
+        """
+        Return the current sequence number and a copy of the state.
+
+        Returns:
+            Tuple[int, dict]: The sequence and {'devices': {...}, 'sensors': {...}}.
+        """
+        with self._condition:
+            return self._sequence, self._copy()
+
+    def wait_for_change(self, since: int, timeout: float) -> Tuple[int, dict, bool]:
+        """
+        Block until the sequence moves past since, or the timeout expires.
+
+        Args:
+            since (int): The last sequence number the caller has seen.
+            timeout (float): Maximum seconds to wait.
+
+        Returns:
+            Tuple[int, dict, bool]: The sequence, the state, and whether it changed since the caller's sequence.
+        """
+        with self._condition:
+            changed = self._condition.wait_for(lambda: self._sequence != since, timeout)
+            return self._sequence, self._copy(), changed
+
+    def _changed(self):
+        self._sequence += 1
+        self._condition.notify_all()
+
+    def _copy(self) -> dict:
+        return {
+            'devices': dict(self._devices),
+            'sensors': {quantity: dict(entry) for quantity, entry in self._sensors.items()},
+        }
+
+state_store = StateStore()
@@ -177,22 +177,50 @@ function sendTestRequest(body, device) {
     .then(response => response.json())
     .then(data => {
         console.log(data);
-        if (data.status === 'success') {
-            if (INPUT_DEVICES.includes(device)) {
-                if (device === 'light_sensor' || device === 'soil_moisture_sensor') {
-                    alert(`${device} is reading ${data.value}V`);
-                } else {
-                    alert(`${device} is reading ${data.value}`);
-                }
-            } else {
-                alert(`fired ${device} 3 times`);
-            }
+        if (data.status === 'accepted') {
+            pollTestJob(data.job.id, device);
         } else {
-            alert(`Error testing ${device}: ${data.message || ''}`);
+            reportTestResult(data, device);
         }
     })
     .catch(error => {
         console.error('Error:', error);
         alert('Failed to test device');
     });
-}
\ No newline at end of file
+}
+
+function pollTestJob(jobId, device) {
+    fetch(`/api/test/${jobId}`)
+    .then(response => response.json())
+    .then(data => {
+        if (data.status !== 'success') {
+            reportTestResult(data, device);
+        } else if (data.job.status === 'running') {
+            setTimeout(() => pollTestJob(jobId, device), 500);
+        } else if (data.job.status === 'completed') {
+            reportTestResult({ status: 'success', value: data.job.value }, device);
+        } else {
+            reportTestResult({ status: 'error', message: data.job.error || data.job.status }, device);
+        }
+    })
+    .catch(error => {
+        console.error('Error:', error);
+        alert('Failed to test device');
+    });
+}
+
+function reportTestResult(data, device) {
+    if (data.status === 'success') {
+        if (INPUT_DEVICES.includes(device)) {
+            if (device === 'light_sensor' || device === 'soil_moisture_sensor') {
+                alert(`${device} is reading ${data.value}V`);
+            } else {
+                alert(`${device} is reading ${data.value}`);
+            }
+        } else {
+            alert(`fired ${device} 3 times`);
+        }
+    } else {
+        alert(`Error testing ${device}: ${data.message || ''}`);
+    }
+}
@@ -19,31 +19,108 @@ function updateControl(device, state) {
     });
 }
 
-// Get initial status
-function getStatus() {
-    fetch('/api/status')
+const OUTPUT_DEVICES = ['light', 'atomizer', 'water', 'heater'];
+
+const latestReadings = {};
+
+function setDevices(devices) {
+    for (const device of OUTPUT_DEVICES) {
+        const control = document.getElementById(`${device}-control`);
+        if (control && device in devices) {
+            control.checked = devices[device];
+        }
+    }
+}
+
+function setReadings(values) {
+    Object.assign(latestReadings, values);
+    const container = document.getElementById('readings');
+    container.innerHTML = '';
+    for (const [quantity, value] of Object.entries(latestReadings)) {
+        const item = document.createElement('div');
+        item.className = 'control-item';
+        item.innerHTML = `<span class="control-label">${quantity}</span><span>${value}</span>`;
+        container.appendChild(item);
+    }
+}
+
+function setState(state) {
+    setDevices(state.devices);
+    setReadings(Object.fromEntries(Object.entries(state.sensors).map(([quantity, entry]) => [quantity, entry.value])));
+}
+
+// Long-poll the live state: each request returns as soon as anything changes
+let statusSequence = null;
+
+function getStatus(follow) {
+    const url = statusSequence === null || !follow ? '/api/status' : `/api/status?since=${statusSequence}`;
+    fetch(url)
         .then(response => response.json())
         .then(data => {
-            document.getElementById('light-control').checked = data.light;
-            document.getElementById('humidifier-control').checked = data.humidifier;
-            document.getElementById('water-control').checked = data.water;
+            statusSequence = data.sequence;
+            setState(data);
+            if (follow) {
+                getStatus(true);
+            }
         })
         .catch((error) => {
             console.error('Error:', error);
+            if (follow) {
+                setTimeout(() => getStatus(true), 5000);
+            }
         });
 }
 
-// Load initial status when page loads
-window.onload = getStatus;
+// Receive device changes and sensor samples as they happen; the browser
+// reconnects on its own and resumes from the last event it saw
+function subscribe() {
+    if (!window.EventSource) {
+        getStatus(true);
+        return;
+    }
+    const source = new EventSource('/api/stream?topics=devices,sensors');
+    source.addEventListener('state', event => setState(JSON.parse(event.data)));
+    source.addEventListener('devices', event => setDevices(JSON.parse(event.data).devices));
+    source.addEventListener('sensors', event => setReadings(JSON.parse(event.data).values));
+    // Events were missed while disconnected: reload the whole state
+    source.addEventListener('reset', () => getStatus(false));
+}
 
-document.getElementById('light-control').addEventListener('change', function() {
-    updateControl('light', this.checked);
-});
+// Read every sensor at once; slow probes are shown as timed out instead of holding the page
+function getConditions() {
+    fetch('/api/snapshot')
+        .then(response => response.json())
+        .then(data => {
+            const container = document.getElementById('conditions');
+            container.innerHTML = '';
+            for (const [device, result] of Object.entries(data.sensors)) {
+                let text;
+                if (result.timed_out) {
+                    text = 'timed out';
+                } else if (result.error || !result.values) {
+                    text = 'unavailable';
+                } else {
+                    text = Object.entries(result.values).map(([quantity, value]) => `${quantity}: ${value}`).join(', ');
+                }
+                const item = document.createElement('div');
+                item.className = 'control-item';
+                item.innerHTML = `<span class="control-label">${device}</span><span>${text}</span>`;
+                container.appendChild(item);
+            }
+        })
+        .catch((error) => {
+            console.error('Error:', error);
+        });
+}
 
-document.getElementById('humidifier-control').addEventListener('change', function() {
-    updateControl('humidifier', this.checked);
-});
+// Load initial status when page loads
+window.onload = function() {
+    subscribe();
+    getConditions();
+};
 
-document.getElementById('water-control').addEventListener('change', function() {
-    updateControl('water', this.checked);
-});
\ No newline at end of file
+for (const device of OUTPUT_DEVICES) {
+    document.getElementById(`${device}-control`).addEventListener('change', function() {
+        updateControl(device, this.checked);
+    });
+}
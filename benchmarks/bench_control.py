@@ -0,0 +1,99 @@
+"""
+Time the control engine takes to decide per sensor sample.
+
+A stream of samples shaped like the acquisition engine's (every quantity
+in each sample, most of them unchanged since the previous one) is fed to
+ControlEngine.process() with a registry stand-in that only counts switch
+calls, so what is measured is change detection and rule evaluation, not
+the relays. Reported: microseconds per sample, the share of samples
+skipped because nothing relevant changed, and each rule's evaluations,
+actuations and mean decision time.
+
+Usage:
+    DEBUG_MODE=true python -m benchmarks.bench_control --samples 200000 --change-rate 0.1 0.5 1.0
+"""
+import argparse
+import contextlib
+import io
+import os
+import random
+import sys
+import time
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from app.services.ControlEngine import ControlEngine
+
+THRESHOLDS = {
+    'humidity_threshold_low': 60, 'humidity_threshold_high': 80,
+    'temperature_threshold_low': 68, 'temperature_threshold_high': 75,
+    'light_threshold': 30,
+    'dry_soil_threshold': 20, 'watered_soil_threshold': 40,
+    'water_level_threshold_low': 30,
+}
+
+# Starting value and random-walk step per quantity
+QUANTITIES = {
+    'humidity': (70.0, 1.0),
+    'temperature': (71.0, 0.5),
+    'air_temperature': (71.0, 0.5),
+    'light': (35.0, 2.0),
+    'soil_moisture': (30.0, 1.0),
+    'water_level': (20.0, 0.5),
+}
+
+class CountingRegistry:
+    """
+    Registry stand-in that counts switch calls instead of driving relays.
+    """
+
+    def __init__(self):
+        self.switches = 0
+
+    def set_state(self, device, state):
+        self.switches += 1
+        return True
+
+class StaticConfig:
+    """
+    ConfigCache stand-in holding one fixed snapshot.
+    """
+
+    def get(self):
+        return 1, THRESHOLDS
+
+def make_samples(count, change_rate, seed=1):
+    rng = random.Random(seed)
+    values = {quantity: start for quantity, (start, _) in QUANTITIES.items()}
+    samples = []
+    for _ in range(count):
+        for quantity, (_, step) in QUANTITIES.items():
+            if rng.random() < change_rate:
+                values[quantity] = round(values[quantity] + rng.uniform(-step, step), 1)
+        samples.append(dict(values))
+    return samples
+
+def run(count, change_rate):
+    samples = make_samples(count, change_rate)
+    registry = CountingRegistry()
+    engine = ControlEngine(registry, config=StaticConfig())
+    with contextlib.redirect_stdout(io.StringIO()):
+        started = time.perf_counter_ns()
+        for sample in samples:
+            engine.process(sample)
+        elapsed = time.perf_counter_ns() - started
+    print(f"change rate {change_rate:4.2f}  {elapsed / count / 1000:6.2f}us/sample  "
+          f"skipped {engine.skipped / count * 100:5.1f}%  switches {registry.switches}")
+    for rule in engine.rules():
+        print(f"    {rule['name']:14s} {rule['evaluations']:8d} evaluations  {rule['actuations']:6d} actuations  "
+              f"{rule['mean_eval_us'] or 0:6.3f}us/decision")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--samples', type=int, default=200_000, help='samples processed per run')
+    parser.add_argument('--change-rate', type=float, nargs='+', default=[0.1, 0.5, 1.0], help='chance each quantity changes between samples')
+    args = parser.parse_args()
+    for change_rate in args.change_rate:
+        run(args.samples, change_rate)
+
+if __name__ == '__main__':
+    main()
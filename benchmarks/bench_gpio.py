@@ -0,0 +1,87 @@
+"""
+Command latency of the GPIO I/O thread under concurrent writers.
+
+Several threads switch relays the way concurrent requests and the
+actuation scheduler would, each waiting for its write to be applied.
+GPIO calls are simulated with a fixed cost per call. Reported: caller
+latency percentiles and throughput, and how many writes the shadow
+register dropped and how many were merged into multi-channel calls.
+
+Usage:
+    DEBUG_MODE=true python -m benchmarks.bench_gpio --threads 1 4 16 --commands 20000 --pins 4
+"""
+import argparse
+import os
+import random
+import sys
+import threading
+import time
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from app.hardware.GpioDispatcher import GpioDispatcher
+
+class SimulatedGpio:
+    """
+    GPIO stand-in whose calls take a fixed time, like the sysfs/mmap writes of RPi.GPIO.
+    """
+
+    def __init__(self, call_us):
+        self.call_ns = int(call_us * 1000)
+        self.calls = 0
+
+    def output(self, channels, values):
+        self.calls += 1
+        deadline = time.perf_counter_ns() + self.call_ns
+        while time.perf_counter_ns() < deadline:
+            pass
+
+    def setup(self, *args, **kwargs):
+        pass
+
+def percentiles(values):
+    values = sorted(values)
+    p50 = values[len(values) // 2]
+    p99 = values[min(len(values) - 1, int(len(values) * 0.99))]
+    return f"p50 {p50:7.1f}us  p99 {p99:8.1f}us  max {values[-1]:8.1f}us"
+
+def run(threads, commands, pins, call_us):
+    gpio = SimulatedGpio(call_us)
+    dispatcher = GpioDispatcher(gpio)
+    dispatcher.start()
+    per_thread = commands // threads
+    latencies = [[] for _ in range(threads)]
+
+    def writer(index):
+        rng = random.Random(index)
+        for _ in range(per_thread):
+            pin = rng.randrange(pins)
+            started = time.perf_counter_ns()
+            dispatcher.output(pin, rng.random() < 0.5)
+            latencies[index].append((time.perf_counter_ns() - started) / 1000)
+
+    workers = [threading.Thread(target=writer, args=(i,)) for i in range(threads)]
+    started = time.perf_counter()
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    elapsed = time.perf_counter() - started
+    dispatcher.stop()
+    stats = dispatcher.stats()
+    total = per_thread * threads
+    print(f"{threads:3d} threads  {total / elapsed:9,.0f} commands/s  latency {percentiles([l for ls in latencies for l in ls])}")
+    print(f"{'':>11}  GPIO calls {gpio.calls:,} for {total:,} commands: "
+          f"{stats['writes']:,} pin writes, {stats['dropped']:,} dropped, {stats['coalesced']:,} coalesced")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--threads', type=int, nargs='+', default=[1, 4, 16], help='concurrent writer thread counts')
+    parser.add_argument('--commands', type=int, default=20_000, help='commands per run')
+    parser.add_argument('--pins', type=int, default=4, help='relay pins written')
+    parser.add_argument('--call-us', type=float, default=5.0, help='simulated cost of one GPIO call in microseconds')
+    args = parser.parse_args()
+    for threads in args.threads:
+        run(threads, args.commands, args.pins, args.call_us)
+
+if __name__ == '__main__':
+    main()
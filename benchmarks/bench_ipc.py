@@ -0,0 +1,106 @@
+"""
+Round-trip latency and throughput of the hardware daemon's Unix socket protocol.
+
+The daemon runs in its own process, as in production, with simulated
+devices. Latency is measured with one client calling back to back;
+throughput with several client threads sharing one HardwareClient, as the
+threads of a web worker would. The in-process HardwareService call is
+shown as the baseline the IPC adds to.
+
+Usage:
+    DEBUG_MODE=true python -m benchmarks.bench_ipc --calls 20000 --threads 1 4 8
+"""
+import argparse
+import contextlib
+import io
+import multiprocessing
+import os
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from app import create_app
+from app.services.HardwareIPC import HardwareClient
+
+def serve(path, database, ready, stop):
+    """Entry point of the daemon process"""
+    sys.stdout = open(os.devnull, 'w')
+    from app.services.HardwareDaemon import HardwareDaemon
+    app = create_app({'TESTING': True, 'SQLALCHEMY_DATABASE_URI': 'sqlite:///' + database}, owns_hardware=True)
+    daemon = HardwareDaemon(path)
+    daemon.init_app(app)
+    daemon.start()
+    ready.set()
+    stop.wait()
+    daemon.stop()
+
+def percentiles(values):
+    values = sorted(values)
+    p50 = values[len(values) // 2]
+    p99 = values[min(len(values) - 1, int(len(values) * 0.99))]
+    return f"p50 {p50:7.1f}us  p99 {p99:7.1f}us  max {values[-1]:8.1f}us"
+
+def latency(call, calls, op, args):
+    samples = []
+    for _ in range(calls):
+        started = time.perf_counter()
+        call(op, **args)
+        samples.append((time.perf_counter() - started) * 1e6)
+    return samples
+
+def throughput(client, calls, threads, op, args):
+    per_thread = calls // threads
+
+    def run():
+        for _ in range(per_thread):
+            client.call(op, **args)
+
+    workers = [threading.Thread(target=run) for _ in range(threads)]
+    started = time.perf_counter()
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    return per_thread * threads / (time.perf_counter() - started)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--calls', type=int, default=20_000, help='calls per measurement')
+    parser.add_argument('--threads', type=int, nargs='+', default=[1, 4, 8], help='client thread counts for throughput')
+    args = parser.parse_args()
+
+    operations = [
+        ('ping', {}),
+        ('control', {'device': 'light', 'state': True}),
+        ('status', {}),
+    ]
+    context = multiprocessing.get_context('spawn')
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'hardware.sock')
+        ready, stop = context.Event(), context.Event()
+        process = context.Process(target=serve, args=(path, os.path.join(tmp, 'daemon.db'), ready, stop), daemon=True)
+        process.start()
+        try:
+            if not ready.wait(30):
+                raise RuntimeError("daemon did not start")
+            with contextlib.redirect_stdout(io.StringIO()):
+                app = create_app({'TESTING': True, 'SQLALCHEMY_DATABASE_URI': 'sqlite:///' + os.path.join(tmp, 'local.db')}, owns_hardware=True)
+            local = app.extensions['hardware']
+            client = HardwareClient(path)
+            for op, op_args in operations:
+                with contextlib.redirect_stdout(io.StringIO()), app.app_context():
+                    in_process = latency(local.call, args.calls, op, op_args)
+                print(f"{op:>8}  in-process   {percentiles(in_process)}")
+                print(f"{'':>8}  round trip   {percentiles(latency(client.call, args.calls, op, op_args))}")
+                for threads in args.threads:
+                    rate = throughput(client, args.calls, threads, op, op_args)
+                    print(f"{'':>8}  {threads:2d} threads   {rate:10,.0f} calls/s")
+            client.close()
+        finally:
+            stop.set()
+            process.join(10)
+
+if __name__ == '__main__':
+    main()
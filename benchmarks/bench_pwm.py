@@ -0,0 +1,109 @@
+"""
+CPU cost and timing jitter of the software PWM thread as channels are added.
+
+Each run drives N channels at one frequency with spread-out duty cycles
+through a simulated GPIO whose calls take a fixed time. Reported: CPU used
+by the process as a share of one core, edges written per second, how late
+edges were written after their deadlines, and how far the measured duty
+cycles were from the requested ones. Comparing spin settings shows what
+busy-waiting before each edge buys in jitter and costs in CPU; the channel
+count where lateness nears the PWM period is the practical limit for one Pi.
+
+Usage:
+    DEBUG_MODE=true python -m benchmarks.bench_pwm --channels 1 4 16 32 --frequency 100 --spin-us 0 200
+"""
+import argparse
+import contextlib
+import io
+import os
+import sys
+import threading
+import time
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from app.hardware.PwmEngine import PwmEngine
+
+class SimulatedGpio:
+    """
+    GPIO stand-in whose calls take a fixed time and that integrates each pin's high time.
+    """
+
+    def __init__(self, call_us):
+        self.call_ns = int(call_us * 1000)
+        self.lock = threading.Lock()
+        self.calls = 0
+        self.level = {}
+        self.since = {}
+        self.high = {}
+
+    def output(self, pins, values):
+        deadline = time.perf_counter_ns() + self.call_ns
+        while time.perf_counter_ns() < deadline:
+            pass
+        if not isinstance(pins, list):
+            pins, values = [pins], [values]
+        now = time.perf_counter()
+        with self.lock:
+            self.calls += 1
+            for pin, value in zip(pins, values):
+                self._close(pin, now)
+                self.level[pin] = bool(value)
+
+    def reset(self):
+        now = time.perf_counter()
+        with self.lock:
+            for pin in self.level:
+                self.since[pin] = now
+                self.high[pin] = 0.0
+
+    def duty(self, pin, started, ended):
+        with self.lock:
+            self._close(pin, ended)
+            return self.high.get(pin, 0.0) / (ended - started)
+
+    def _close(self, pin, now):
+        if self.level.get(pin):
+            self.high[pin] = self.high.get(pin, 0.0) + now - self.since.get(pin, now)
+        self.since[pin] = now
+
+def run(channels, frequency, spin_us, duration, call_us):
+    gpio = SimulatedGpio(call_us)
+    engine = PwmEngine(gpio, hardware=False, spin_us=spin_us, history=200_000)
+    duties = {}
+    with contextlib.redirect_stdout(io.StringIO()):
+        for pin in range(channels):
+            engine.attach(pin, frequency)
+            duties[pin] = 0.1 + 0.8 * (pin % 9) / 8
+            engine.set_duty(pin, duties[pin])
+        engine.start()
+        time.sleep(0.2)
+        gpio.reset()
+        edges_before = engine.edges
+        cpu_before = time.process_time()
+        started = time.perf_counter()
+        time.sleep(duration)
+        ended = time.perf_counter()
+        cpu = (time.process_time() - cpu_before) / (ended - started)
+        edges = engine.edges - edges_before
+        stats = engine.stats()
+        engine.stop()
+    error = sum(abs(gpio.duty(pin, started, ended) - duty) for pin, duty in duties.items()) / channels
+    period_us = 1e6 / frequency
+    print(f"{channels:3d} channels  spin {spin_us:5.0f}us  CPU {cpu * 100:5.1f}%  {edges / (ended - started):9,.0f} edges/s  "
+          f"lateness p50 {stats['lateness_p50_us']:7.1f}us  p99 {stats['lateness_p99_us']:8.1f}us  max {stats['lateness_max_us']:8.1f}us  "
+          f"({stats['lateness_p99_us'] / period_us * 100:4.1f}% of period)  duty error {error * 100:4.2f}%")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--channels', type=int, nargs='+', default=[1, 4, 16, 32], help='software PWM channel counts')
+    parser.add_argument('--frequency', type=float, default=100.0, help='PWM frequency in Hz')
+    parser.add_argument('--spin-us', type=float, nargs='+', default=[0.0, 200.0], help='busy-wait before each edge in microseconds')
+    parser.add_argument('--duration', type=float, default=3.0, help='seconds measured per run')
+    parser.add_argument('--call-us', type=float, default=5.0, help='simulated cost of one GPIO call in microseconds')
+    args = parser.parse_args()
+    for spin_us in args.spin_us:
+        for channels in args.channels:
+            run(channels, args.frequency, spin_us, args.duration, args.call_us)
+
+if __name__ == '__main__':
+    main()
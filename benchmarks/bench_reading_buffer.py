@@ -0,0 +1,54 @@
+"""
+Sustained ingestion rate of the write-behind ReadingBuffer on a file-backed SQLite database.
+
+Usage:
+    python -m benchmarks.bench_reading_buffer --samples 200000 --producers 4
+"""
+import argparse
+import os
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from app import create_app
+from app.services.ReadingBuffer import ReadingBuffer
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--samples', type=int, default=200_000, help='samples recorded per producer')
+    parser.add_argument('--producers', type=int, default=4, help='concurrent producer threads')
+    parser.add_argument('--max-size', type=int, default=10_000, help='buffer capacity')
+    parser.add_argument('--flush-size', type=int, default=500, help='samples per bulk insert')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        app = create_app({'SQLALCHEMY_DATABASE_URI': 'sqlite:///' + os.path.join(tmp, 'bench.db')})
+        reading_buffer = ReadingBuffer(max_size=args.max_size, flush_size=args.flush_size, flush_interval=1.0)
+        reading_buffer.init_app(app)
+        peak = [0]
+
+        def produce(index):
+            sensor = f'sensor_{index}'
+            for i in range(args.samples):
+                reading_buffer.record(sensor, float(i))
+                if i % 1000 == 0:
+                    peak[0] = max(peak[0], len(reading_buffer))
+
+        started = time.perf_counter()
+        producers = [threading.Thread(target=produce, args=(i,)) for i in range(args.producers)]
+        for producer in producers:
+            producer.start()
+        for producer in producers:
+            producer.join()
+        reading_buffer.stop()
+        elapsed = time.perf_counter() - started
+
+        total = args.samples * args.producers
+        print(f"ingested {reading_buffer.flushed}/{total} samples in {elapsed:.1f}s "
+              f"({reading_buffer.flushed / elapsed:,.0f} samples/s), dropped {reading_buffer.dropped}, "
+              f"peak buffered {peak[0]}/{args.max_size}")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,69 @@
+"""
+Insert and range-scan throughput of the sensor_reading time-series table.
+
+Usage:
+    python -m benchmarks.bench_reading_store --rows 10000000
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from app import create_app
+from app.services.ReadingStore import ReadingStore
+
+SENSORS = ['light', 'temperature', 'humidity', 'water_level', 'soil_moisture']
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--rows', type=int, default=10_000_000, help='total rows to insert')
+    parser.add_argument('--batch', type=int, default=10_000, help='rows per insert transaction')
+    parser.add_argument('--scans', type=int, default=200, help='number of range scans per query shape')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'bench.db')
+        app = create_app({'SQLALCHEMY_DATABASE_URI': 'sqlite:///' + path})
+        store = ReadingStore()
+        # One sample per sensor per minute, starting far enough back to fit every row
+        minutes = args.rows // len(SENSORS)
+        origin = datetime(2020, 1, 1)
+
+        with app.app_context():
+            started = time.perf_counter()
+            batch = []
+            inserted = 0
+            for minute in range(minutes):
+                timestamp = origin + timedelta(minutes=minute)
+                for sensor in SENSORS:
+                    batch.append((sensor, timestamp, random.random() * 100))
+                if len(batch) >= args.batch:
+                    inserted += store.insert_many(batch)
+                    batch = []
+            inserted += store.insert_many(batch)
+            elapsed = time.perf_counter() - started
+            print(f"insert: {inserted} rows in {elapsed:.1f}s ({inserted / elapsed:,.0f} rows/s)")
+            print(f"file size: {os.path.getsize(path) / 1e6:.1f} MB")
+
+            for label, sensors, window in (
+                ('1 sensor, 1 hour', SENSORS[:1], timedelta(hours=1)),
+                ('1 sensor, 1 day', SENSORS[:1], timedelta(days=1)),
+                ('3 sensors, 1 day', SENSORS[:3], timedelta(days=1)),
+                ('1 sensor, 1 week', SENSORS[:1], timedelta(weeks=1)),
+            ):
+                span = max(minutes - int(window.total_seconds() // 60), 1)
+                rows = 0
+                started = time.perf_counter()
+                for _ in range(args.scans):
+                    start = origin + timedelta(minutes=random.randrange(span))
+                    result = store.query_range(sensors, start, start + window)
+                    rows += sum(len(samples) for samples in result.values())
+                elapsed = time.perf_counter() - started
+                print(f"range scan ({label}): {args.scans / elapsed:,.1f} scans/s, {rows / elapsed:,.0f} rows/s")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,138 @@
+"""
+Concurrent /api/stream subscribers one server process sustains at a given event rate.
+
+The app is served by the threaded development server, as on the Pi, and
+each step opens more Server-Sent Events subscribers while sensor samples
+are published through the state store. One selector thread reads every
+subscriber socket so the load generator does not compete with the server
+for threads. Reported per step: events delivered out of those published
+and the delay from publish to receipt.
+
+Usage:
+    DEBUG_MODE=true python -m benchmarks.bench_sse --subscribers 10 50 100 200 --rate 20 --seconds 5
+"""
+import argparse
+import json
+import os
+import selectors
+import socket
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from werkzeug.serving import make_server
+from app import create_app
+from app.services.EventBus import event_bus
+from app.services.StateStore import state_store
+
+class Subscribers:
+    """
+    Many SSE connections read by one selector thread.
+    """
+
+    def __init__(self, port):
+        self.port = port
+        self.selector = selectors.DefaultSelector()
+        self.sockets = []
+        self.buffers = {}
+        self.delays = []
+        self.received = 0
+        self.lock = threading.Lock()
+        self.stop = threading.Event()
+        self.thread = threading.Thread(target=self._run, daemon=True)
+        self.thread.start()
+
+    def connect(self, count):
+        for _ in range(count):
+            sock = socket.create_connection(('127.0.0.1', self.port))
+            sock.sendall(b'GET /api/stream?topics=sensors HTTP/1.1\r\nHost: localhost\r\nAccept: text/event-stream\r\n\r\n')
+            sock.setblocking(False)
+            with self.lock:
+                self.sockets.append(sock)
+                self.buffers[sock] = b''
+                self.selector.register(sock, selectors.EVENT_READ)
+
+    def reset(self):
+        with self.lock:
+            self.delays = []
+            self.received = 0
+
+    def close(self):
+        self.stop.set()
+        self.thread.join()
+        for sock in self.sockets:
+            sock.close()
+
+    def _run(self):
+        while not self.stop.is_set():
+            with self.lock:
+                if not self.sockets:
+                    ready = []
+                else:
+                    ready = self.selector.select(0.05)
+            if not ready:
+                time.sleep(0.01)
+                continue
+            now = time.time()
+            with self.lock:
+                for key, _ in ready:
+                    try:
+                        data = key.fileobj.recv(65536)
+                    except BlockingIOError:
+                        continue
+                    buffer = self.buffers[key.fileobj] + data
+                    *messages, self.buffers[key.fileobj] = buffer.split(b'\n\n')
+                    for message in messages:
+                        for line in message.split(b'\n'):
+                            if line.startswith(b'data: ') and b'"values"' in line:
+                                self.received += 1
+                                self.delays.append(now - json.loads(line[6:])['time'])
+
+def percentiles(values):
+    values = sorted(values)
+    if not values:
+        return "n/a"
+    p50 = values[len(values) // 2]
+    p99 = values[min(len(values) - 1, int(len(values) * 0.99))]
+    return f"p50 {p50 * 1000:7.1f}ms  p99 {p99 * 1000:7.1f}ms  max {values[-1] * 1000:7.1f}ms"
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--subscribers', type=int, nargs='+', default=[10, 50, 100, 200], help='subscriber counts to step through')
+    parser.add_argument('--rate', type=float, default=20.0, help='sensor samples published per second')
+    parser.add_argument('--seconds', type=float, default=5.0, help='measurement time per step')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        app = create_app({'TESTING': True, 'SQLALCHEMY_DATABASE_URI': 'sqlite:///' + os.path.join(tmp, 'bench.db')})
+        server = make_server('127.0.0.1', 0, app, threaded=True)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        subscribers = Subscribers(server.server_port)
+        try:
+            for count in args.subscribers:
+                subscribers.connect(count - len(subscribers.sockets))
+                deadline = time.monotonic() + 10
+                while event_bus.subscribers < count and time.monotonic() < deadline:
+                    time.sleep(0.05)
+                subscribers.reset()
+                published = 0
+                started = time.monotonic()
+                while time.monotonic() - started < args.seconds:
+                    state_store.set_sensors({'humidity': float(published)})
+                    published += 1
+                    time.sleep(max(started + published / args.rate - time.monotonic(), 0))
+                time.sleep(0.5)  # Let the last events arrive
+                with subscribers.lock:
+                    received, delays = subscribers.received, list(subscribers.delays)
+                expected = published * count
+                print(f"{count:5d} subscribers ({event_bus.subscribers} connected)  "
+                      f"delivered {received}/{expected} ({received / expected:6.1%})  delay {percentiles(delays)}")
+        finally:
+            subscribers.close()
+            event_bus.close()
+            server.shutdown()
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,134 @@
+"""
+Latency and timing jitter of ultrasonic measurements in-process versus in an isolated worker process.
+
+A simulated HC-SR04 raises its echo for a fixed width; the measured width is
+compared against it while background threads load the interpreter the way
+busy web request handlers would. The error includes the sleep overshoot of
+the simulated edges, which is the same in both modes. Caller latency is the time the main thread
+spends obtaining a water level.
+
+Usage:
+    DEBUG_MODE=true python -m benchmarks.bench_ultrasonic --seconds 5 --load-threads 4 --cpu 3
+"""
+import argparse
+import contextlib
+import io
+import os
+import sys
+import threading
+import time
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from app.hardware.input.UltrasonicSensor import UltrasonicSensor, speed_of_sound
+from app.hardware.input.UltrasonicWorker import UltrasonicWorker
+
+ECHO_DELAY_NS = 100_000
+
+class SimulatedUltrasonicSensor(UltrasonicSensor):
+    """
+    UltrasonicSensor whose echo is a pulse of known width.
+
+    A separate thread stands in for the GPIO edge-detection thread: it
+    timestamps each edge when it wakes, so any wait for the GIL shows up as
+    timing error exactly as it would with real edge callbacks.
+    """
+    echo_ns = 1_000_000
+
+    def _trigger(self):
+        rise_at = time.monotonic_ns() + ECHO_DELAY_NS
+        threading.Thread(target=self._echo, args=(rise_at, rise_at + self.echo_ns), daemon=True).start()
+
+    def _echo(self, rise_at, fall_at):
+        for at in (rise_at, fall_at):
+            time.sleep(max(at - time.monotonic_ns(), 0) / 1e9)
+            self._edge(time.monotonic_ns())
+
+def simulated_sensor(trigger_pin, echo_pin, debug_mode, pings, ping_interval, temperature_source):
+    """Sensor factory used inside the worker process"""
+    sys.stdout = open(os.devnull, 'w')
+    sensor = SimulatedUltrasonicSensor(trigger_pin, echo_pin, False, pings=pings, ping_interval=ping_interval,
+                                       temperature_source=None, isolated=False)
+    sensor.edge_detection = True
+    return sensor
+
+def load(stop):
+    """Pure-Python work competing for the GIL, like a busy request handler"""
+    while not stop.is_set():
+        sum(i * i for i in range(10_000))
+
+def percentiles(values):
+    values = sorted(values)
+    if not values:
+        return "n/a"
+    p50 = values[len(values) // 2]
+    p99 = values[min(len(values) - 1, int(len(values) * 0.99))]
+    return f"p50 {p50:9.1f}  p99 {p99:9.1f}  max {values[-1]:9.1f}"
+
+def width_error_us(distance, echo_ns):
+    """Absolute error of the measured echo width in microseconds"""
+    measured = distance * 2 / speed_of_sound(None)
+    return abs(measured - echo_ns / 1e9) * 1e6
+
+def run_in_process(args):
+    sensor = SimulatedUltrasonicSensor(23, 24, False, pings=1, ping_interval=0, temperature_source=None, isolated=False)
+    sensor.edge_detection = True
+    latencies, errors = [], []
+    deadline = time.monotonic() + args.seconds
+    with contextlib.redirect_stdout(io.StringIO()):
+        while time.monotonic() < deadline:
+            started = time.perf_counter()
+            distance = sensor.read()
+            latencies.append((time.perf_counter() - started) * 1e6)
+            errors.append(width_error_us(distance, SimulatedUltrasonicSensor.echo_ns) if distance is not None else None)
+            time.sleep(args.interval)
+    return latencies, errors
+
+def run_isolated(args):
+    worker = UltrasonicWorker(23, 24, interval=args.interval, cpu=args.cpu, pings=1, ping_interval=0,
+                              slots=65_536, sensor_factory=simulated_sensor)
+    worker.start()
+    try:
+        if not worker.wait_ready(30):
+            raise RuntimeError("worker produced no results")
+        first = worker.ring.count  # Results before this point were taken during start-up
+        latencies = []
+        deadline = time.monotonic() + args.seconds
+        while time.monotonic() < deadline:
+            started = time.perf_counter()
+            worker.latest()
+            latencies.append((time.perf_counter() - started) * 1e6)
+            time.sleep(args.interval)
+        records = worker.ring.records(worker.ring.count - first)
+        errors = [width_error_us(distance, SimulatedUltrasonicSensor.echo_ns) if distance is not None else None for _, distance, _ in records]
+    finally:
+        worker.stop()
+    return latencies, errors
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--seconds', type=float, default=5.0, help='measurement time per mode')
+    parser.add_argument('--load-threads', type=int, default=4, help='background threads loading the interpreter')
+    parser.add_argument('--interval', type=float, default=0.02, help='seconds between measurements')
+    parser.add_argument('--echo-us', type=int, default=1000, help='simulated echo width in microseconds')
+    parser.add_argument('--cpu', type=int, default=None, help='core the worker process is pinned to')
+    args = parser.parse_args()
+    SimulatedUltrasonicSensor.echo_ns = args.echo_us * 1000
+
+    for name, run in [('in-process', run_in_process), ('isolated', run_isolated)]:
+        stop = threading.Event()
+        threads = [threading.Thread(target=load, args=(stop,), daemon=True) for _ in range(args.load_threads)]
+        for thread in threads:
+            thread.start()
+        try:
+            latencies, errors = run(args)
+        finally:
+            stop.set()
+            for thread in threads:
+                thread.join()
+        timeouts = errors.count(None)
+        print(f"{name:>10}  {len(errors)} measurements, {timeouts} timed out")
+        print(f"{'':>10}  caller latency (us)   {percentiles(latencies)}")
+        print(f"{'':>10}  echo width error (us) {percentiles([e for e in errors if e is not None])}")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,27 @@
+import atexit
+import signal
+import threading
+from app import create_app
+from app.config import HARDWARE_SOCKET
+from app.server import cleanup
+from app.services.HardwareDaemon import HardwareDaemon
+
+if not HARDWARE_SOCKET:
+    raise SystemExit("Set HARDWARE_SOCKET to the Unix socket path the daemon listens on")
+
+# The only process that drives the GPIO pins; run the web workers with the
+# same HARDWARE_SOCKET and they reach the hardware through this daemon
+app = create_app(owns_hardware=True)
+daemon = HardwareDaemon(HARDWARE_SOCKET)
+daemon.init_app(app)
+atexit.register(cleanup)
+atexit.register(daemon.stop)
+
+if __name__ == '__main__':
+    stop = threading.Event()
+    signal.signal(signal.SIGTERM, lambda signum, frame: stop.set())
+    daemon.start()
+    try:
+        stop.wait()
+    except KeyboardInterrupt:
+        pass
@@ -1,6 +1,25 @@
+import atexit
 from app import create_app
+from app.server import cleanup
 
+# Single-process development server, driving the GPIO pins itself:
+#     python run.py
+# The reloader is off: it would run this module in a second process, and both
+# would take the pins and start the hardware threads.
+#
+# With several web workers, one daemon owns the pins and the workers reach it
+# over a Unix socket; start both with the same HARDWARE_SOCKET:
+#     HARDWARE_SOCKET=/run/growlab.sock python daemon.py
+#     HARDWARE_SOCKET=/run/growlab.sock gunicorn -w 2 -k gthread --threads 16 -b 0.0.0.0:5000 run:app
+# Use threaded workers, not gunicorn's default sync ones: every open dashboard
+# holds a thread for its /api/stream response for as long as the page is open,
+# and /api/status long-polls hold one for up to 25 seconds. A sync worker
+# serves one request at a time, so a few dashboards would take every worker,
+# and the 30 second worker timeout would kill the streaming ones. Workers times
+# threads caps the number of open dashboards plus concurrent requests; raise
+# --threads to allow more.
 app = create_app()
+atexit.register(cleanup)
 
 if __name__ == '__main__':
-    app.run(host='0.0.0.0', port=5000, debug=True)
\ No newline at end of file
+    app.run(host='0.0.0.0', port=5000, debug=True, use_reloader=False)
@@ -1,4 +1,5 @@
 import sys
+import pytest
 from unittest.mock import MagicMock
 
 # Create a mock for the GPIO module
@@ -13,4 +14,15 @@ mock_gpio.input = MagicMock()
 mock_gpio.cleanup = MagicMock()
 
 # Mock the RPi.GPIO module
-sys.modules['RPi.GPIO'] = mock_gpio 
\ No newline at end of file
+sys.modules['RPi.GPIO'] = mock_gpio
+
+@pytest.fixture
+def app():
+    """Application bound to an in-memory SQLite database"""
+    from app import create_app
+    from app.models import db
+    flask_app = create_app({'TESTING': True, 'SQLALCHEMY_DATABASE_URI': 'sqlite://'})
+    with flask_app.app_context():
+        yield flask_app
+        db.session.remove()
+        db.drop_all()
@@ -0,0 +1,141 @@
+import pytest
+from unittest.mock import patch, MagicMock
+import threading
+import sys
+import os
+
+# Add the app directory to the path so we can import the AdcBus class
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../../../')))
+from app.hardware.input.AdcBus import AdcBus, REFERENCE_VOLTAGE, summarize
+from array import array
+from app.hardware.input.LightSensor import LightSensor
+from app.hardware.input.SoilMoistureSensor import SoilMoistureSensor
+from app.services.DeviceManager import DeviceManager
+
+class FakeChannel:
+    """Analog input returning a fixed voltage per channel and counting conversions"""
+
+    def __init__(self, mcp, channel):
+        self.channel = channel
+        self.conversions = 0
+
+    @property
+    def voltage(self):
+        self.conversions += 1
+        return channel_voltage(self.channel)
+
+def channel_voltage(channel):
+    return 0.5 + channel * 0.25
+
+def channel_level(channel):
+    return round(channel_voltage(channel) / REFERENCE_VOLTAGE * 100, 1)
+
+class TestAdcBus:
+
+    @pytest.fixture
+    def hardware(self):
+        """Patch the SPI, chip-select and MCP3008 drivers with mocks"""
+        with patch('app.hardware.input.AdcBus.busio') as busio, \
+             patch('app.hardware.input.AdcBus.digitalio'), \
+             patch('app.hardware.input.AdcBus.MCP') as mcp, \
+             patch('app.hardware.input.AdcBus.AnalogIn', side_effect=FakeChannel):
+            yield busio, mcp
+
+    def test_bus_opened_once(self, hardware):
+        """Test that sensors sharing a bus create one SPI bus and one MCP3008"""
+        busio, mcp = hardware
+        bus = AdcBus()
+        light = LightSensor(0, bus=bus)
+        soil = SoilMoistureSensor(3, bus=bus)
+
+        assert light.read() == channel_level(0)
+        assert soil.read() == channel_level(3)
+        assert light.read() == channel_level(0)
+        busio.SPI.assert_called_once()
+        mcp.MCP3008.assert_called_once()
+
+    def test_scan_reads_all_channels(self, hardware):
+        """Test that a scan returns the averaged voltage of every channel"""
+        bus = AdcBus(samples=4)
+
+        readings = bus.scan()
+
+        assert {channel: reading.mean for channel, reading in readings.items()} == {channel: channel_voltage(channel) for channel in range(8)}
+        assert all(chan.conversions == 4 for chan in bus._channels.values())
+
+    def test_invalid_channel(self, hardware):
+        """Test that channels outside 0-7 are rejected"""
+        with pytest.raises(ValueError):
+            AdcBus().read_voltage(8)
+
+    def test_scan_holds_lock(self, hardware):
+        """Test that a scan excludes other readers for the whole session"""
+        bus = AdcBus()
+        bus._lock = MagicMock(wraps=threading.RLock())
+
+        bus.scan([0, 1, 2])
+
+        assert bus._lock.__enter__.call_count == 1
+
+    def test_manager_reads_analog_in_one_scan(self, hardware):
+        """Test that DeviceManager reads all ADC sensors with a single scan"""
+        manager = DeviceManager(light_pin_in=1, soil_moisture_pin_in=2)
+        manager.light_sensor.bus.close()
+        with patch.object(manager.light_sensor.bus, 'scan', wraps=manager.light_sensor.bus.scan) as scan:
+            readings = manager.read_analog()
+
+        scan.assert_called_once_with({1: 10, 2: 10}, trim={1: 0.1, 2: 0.1})
+        assert readings == {'light_sensor': channel_level(1), 'soil_moisture_sensor': channel_level(2)}
+
+    def test_manager_matches_sensor_settings(self, hardware):
+        """Test that read_analog uses each sensor's samples and trim, like Sensor.read"""
+        manager = DeviceManager(light_pin_in=1, soil_moisture_pin_in=2)
+        bus = AdcBus()
+        manager.light_sensor.bus = manager.soil_moisture_sensor.bus = bus
+        manager.light_sensor.samples, manager.light_sensor.trim = 10, 0.0
+        manager.soil_moisture_sensor.samples, manager.soil_moisture_sensor.trim = 10, 0.2
+        # One outlier in every ten conversions
+        bus._sample = lambda channel, samples: array('d', [1.0] * (samples - 1) + [11.0])
+
+        readings = manager.read_analog()
+
+        assert readings['light_sensor'] == manager.light_sensor.read() == 60.6
+        assert readings['soil_moisture_sensor'] == manager.soil_moisture_sensor.read() == 30.3
+
+    def test_scan_per_channel_samples(self, hardware):
+        """Test that each channel in a scan can use its own sample count"""
+        bus = AdcBus()
+
+        readings = bus.scan({0: 2, 5: 32})
+
+        assert readings[0].samples == 2
+        assert readings[5].samples == 32
+        assert bus._channels[5].conversions == 32
+
+    def test_sensor_sample_count(self, hardware):
+        """Test that a sensor oversamples with its configured sample count"""
+        sensor = SoilMoistureSensor(4, bus=AdcBus(), samples=3)
+
+        reading = sensor.sample()
+
+        assert reading.samples == 3
+        assert reading.stdev == 0.0
+        assert sensor.read() == channel_level(4)
+
+    def test_summarize_statistics(self):
+        """Test the mean, median, trimmed mean and noise estimate of a noisy buffer"""
+        raw = array('d', [1.0, 1.0, 1.0, 1.0, 1.0, 1.0, 1.0, 1.0, 1.0, 11.0])
+
+        reading = summarize(raw, trim=0.1)
+
+        assert reading.mean == pytest.approx(2.0)
+        assert reading.median == 1.0
+        assert reading.trimmed_mean == 1.0
+        assert reading.stdev == pytest.approx(3.0)
+
+    def test_summarize_small_buffer(self):
+        """Test that trimming never discards every sample"""
+        reading = summarize(array('d', [1.0, 3.0]), trim=0.5)
+
+        assert reading.trimmed_mean == 2.0
+        assert reading.median == 2.0
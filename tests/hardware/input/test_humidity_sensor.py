@@ -0,0 +1,137 @@
+import pytest
+from unittest.mock import patch, MagicMock
+import threading
+import time
+import sys
+import os
+
+# Add the app directory to the path so we can import the HumiditySensor class
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../../../')))
+from app.hardware.input.HumiditySensor import HumiditySensor
+from app.services.DeviceManager import DeviceManager
+
+class FakeDHT:
+    """DHT11 stand-in that counts measurements and can fail on demand"""
+
+    def __init__(self, humidity=50.0, temperature=21.0, delay=0.0):
+        self.humidity_value = humidity
+        self.temperature = temperature
+        self.delay = delay
+        self.failures = 0
+        self.measurements = 0
+
+    def measure(self):
+        time.sleep(self.delay)
+        self.measurements += 1
+        if self.failures:
+            self.failures -= 1
+            raise RuntimeError("Checksum did not validate")
+
+    @property
+    def humidity(self):
+        return self.humidity_value
+
+class TestHumiditySensor:
+
+    @pytest.fixture
+    def make_sensor(self):
+        """Build a sensor on a fake DHT11 with short timings"""
+        def make(dht, **kwargs):
+            with patch('app.hardware.input.HumiditySensor.adafruit_dht', create=True) as adafruit_dht, \
+                 patch('app.hardware.input.HumiditySensor.pin_map', {4: 'D4'}, create=True):
+                adafruit_dht.DHT11.return_value = dht
+                sensor = HumiditySensor(4, **kwargs)
+            dht.measurements = 0
+            return sensor
+        return make
+
+    def test_serves_cached_value_within_ttl(self, make_sensor):
+        """Test that reads within the TTL do not trigger a new measurement"""
+        dht = FakeDHT()
+        sensor = make_sensor(dht, ttl=10, min_interval=0.01)
+
+        assert sensor.read() == 50.0
+        dht.humidity_value = 60.0
+        assert sensor.read() == 50.0
+        assert dht.measurements == 0
+
+    def test_measures_again_after_ttl(self, make_sensor):
+        """Test that an expired cache entry is refreshed"""
+        dht = FakeDHT()
+        sensor = make_sensor(dht, ttl=0.05, min_interval=0.01)
+
+        dht.humidity_value = 60.0
+        time.sleep(0.06)
+
+        assert sensor.read() == 60.0
+        assert dht.measurements == 1
+
+    def test_retries_failures(self, make_sensor):
+        """Test that transient failures are retried at the minimum interval"""
+        dht = FakeDHT()
+        dht.failures = 3
+        sensor = make_sensor(dht, ttl=1, retry_deadline=1, min_interval=0.02)
+
+        reading = sensor.sample()
+
+        assert reading.humidity == 50.0
+        assert reading.temperature == 21.0
+        assert not reading.stale
+        assert dht.measurements == 3
+
+    def test_reports_stale_after_deadline(self, make_sensor):
+        """Test that a read gives up at the deadline and serves the last good value"""
+        dht = FakeDHT()
+        sensor = make_sensor(dht, ttl=0.02, retry_deadline=0.1, min_interval=0.02)
+        time.sleep(0.03)
+        dht.failures = 1000
+
+        started = time.monotonic()
+        reading = sensor.sample()
+
+        assert time.monotonic() - started < 0.3
+        assert reading.humidity == 50.0
+        assert reading.stale
+        assert 'Checksum' in reading.error
+
+    def test_never_measured(self, make_sensor):
+        """Test that a sensor that never succeeds returns None instead of recursing"""
+        dht = FakeDHT()
+        dht.failures = 1000
+        sensor = make_sensor(dht, retry_deadline=0.05, min_interval=0.01)
+
+        assert sensor.read() is None
+
+    def test_coalesces_concurrent_reads(self, make_sensor):
+        """Test that concurrent callers share one in-flight measurement"""
+        dht = FakeDHT(delay=0.1)
+        sensor = make_sensor(dht, ttl=0.05, min_interval=0.01)
+        time.sleep(0.06)
+        results = []
+
+        threads = [threading.Thread(target=lambda: results.append(sensor.read())) for _ in range(5)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert results == [50.0] * 5
+        assert dht.measurements == 1
+
+    def test_read_all_uses_one_measurement(self, make_sensor):
+        """Test that humidity and air temperature come from the same measurement"""
+        dht = FakeDHT(humidity=55.0, temperature=25.0)
+        sensor = make_sensor(dht, ttl=0.01, min_interval=0.01)
+        time.sleep(0.02)
+
+        assert sensor.read_all() == {'humidity': 55.0, 'air_temperature': 77.0}
+        assert dht.measurements == 1
+
+    def test_manager_read_all(self):
+        """Test that DeviceManager publishes every quantity under one timestamp"""
+        manager = DeviceManager(humidity_pin_in=4, light_pin_in=0, debug_mode=True)
+
+        timestamp, readings = manager.read_all()
+
+        assert timestamp is not None
+        assert set(readings) == {'light', 'humidity', 'air_temperature'}
@@ -0,0 +1,103 @@
+import pytest
+import time
+import sys
+import os
+
+# Add the app directory to the path so we can import the OneWireBus class
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../../../')))
+from app.hardware.input.OneWireBus import OneWireBus
+from app.hardware.input.TemperatureSensor import TemperatureSensor
+
+def w1_slave(millicelsius, crc='YES'):
+    return (f"72 01 4b 46 7f ff 0e 10 57 : crc=57 {crc}\n"
+            f"72 01 4b 46 7f ff 0e 10 57 t={millicelsius}\n")
+
+class TestOneWireBus:
+
+    @pytest.fixture
+    def sysfs(self, tmp_path):
+        """Build a fake /sys/bus/w1/devices tree with two probes and one bus master"""
+        master = tmp_path / 'w1_bus_master1'
+        master.mkdir()
+        (master / 'therm_bulk_read').write_text('0\n')
+        for device_id, millicelsius in [('28-000000000001', 21500), ('28-000000000002', 18250)]:
+            probe = tmp_path / device_id
+            probe.mkdir()
+            (probe / 'w1_slave').write_text(w1_slave(millicelsius))
+            (probe / 'temperature').write_text(f'{millicelsius}\n')
+        (tmp_path / '00-000000000003').mkdir()  # Not a temperature probe
+        return tmp_path
+
+    @pytest.fixture
+    def bus(self, sysfs):
+        """Setup fixture for 1-wire bus tests"""
+        bus = OneWireBus(root=str(sysfs), interval=0.02, conversion_timeout=0.2)
+        yield bus
+        bus.stop()
+
+    def test_discover(self, bus):
+        """Test that only DS18B20 probes are discovered"""
+        assert bus.discover() == ['28-000000000001', '28-000000000002']
+
+    def test_bulk_scan(self, bus, sysfs):
+        """Test that a scan triggers one bulk conversion and reads every probe"""
+        temperatures = bus.scan()
+
+        assert temperatures == {'28-000000000001': 21.5, '28-000000000002': 18.25}
+        assert (sysfs / 'w1_bus_master1' / 'therm_bulk_read').read_text() == 'trigger\n'
+
+    def test_scan_without_bulk_support(self, bus, sysfs):
+        """Test the w1_slave fallback when the master cannot bulk convert"""
+        (sysfs / 'w1_bus_master1' / 'therm_bulk_read').unlink()
+        (sysfs / '28-000000000002' / 'w1_slave').write_text(w1_slave(30000))
+
+        assert bus.scan()['28-000000000002'] == 30.0
+
+    def test_crc_failure_skipped(self, bus, sysfs):
+        """Test that a probe failing its CRC check is left out"""
+        (sysfs / 'w1_bus_master1' / 'therm_bulk_read').unlink()
+        (sysfs / '28-000000000001' / 'w1_slave').write_text(w1_slave(21500, crc='NO'))
+
+        assert list(bus.scan()) == ['28-000000000002']
+
+    def test_background_reader(self, bus, sysfs):
+        """Test that the background thread keeps values fresh and reads are served from memory"""
+        assert bus.latest('28-000000000001') == 21.5
+
+        (sysfs / '28-000000000001' / 'temperature').write_text('25000\n')
+        deadline = time.monotonic() + 2
+        while bus.latest('28-000000000001') != 25.0 and time.monotonic() < deadline:
+            time.sleep(0.01)
+
+        assert bus.latest('28-000000000001') == 25.0
+        started = time.perf_counter()
+        bus.latest('28-000000000002')
+        assert time.perf_counter() - started < 0.01
+
+    def test_stale_values_expire(self, sysfs):
+        """Test that a probe that stops answering reads as missing after max_age"""
+        bus = OneWireBus(root=str(sysfs), interval=60, conversion_timeout=0.2, max_age=0.05)
+        bus.scan()
+        assert bus.temperatures() == {'28-000000000001': 21.5, '28-000000000002': 18.25}
+
+        (sysfs / '28-000000000001' / 'temperature').unlink()
+        (sysfs / '28-000000000001' / 'w1_slave').unlink()
+        time.sleep(0.1)
+        bus.scan()
+
+        assert bus.latest('28-000000000001') is None
+        assert bus.temperatures() == {'28-000000000002': 18.25}
+        bus.stop()
+
+    def test_temperature_sensor_reads_from_bus(self, bus):
+        """Test that TemperatureSensor converts the cached value to Fahrenheit"""
+        sensor = TemperatureSensor(4, device_id='28-000000000002', bus=bus)
+
+        assert sensor.read() == pytest.approx(64.85)
+
+    def test_temperature_sensor_defaults_to_first_probe(self, bus):
+        """Test that a sensor without a device id uses the first probe"""
+        sensor = TemperatureSensor(4, bus=bus)
+        sensor.device_id = None
+
+        assert sensor.read() == pytest.approx(70.7)
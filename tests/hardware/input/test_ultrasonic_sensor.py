@@ -0,0 +1,84 @@
+import pytest
+import time
+import sys
+import os
+
+# Add the app directory to the path so we can import the UltrasonicSensor class
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../../../')))
+from app.hardware.input.UltrasonicSensor import UltrasonicSensor, GPIO, aggregate, speed_of_sound
+
+class TestUltrasonicSensor:
+
+    @pytest.fixture
+    def make_sensor(self):
+        """Build a sensor whose trigger pulse produces simulated echo edges"""
+        def make(echo_widths_us, temperature=None, **kwargs):
+            GPIO.reset_mock()
+            GPIO.add_event_detect.side_effect = None
+            sensor = UltrasonicSensor(23, 24, pings=len(echo_widths_us), ping_interval=0, temperature_source=lambda: temperature, **kwargs)
+            widths = iter(echo_widths_us)
+
+            def output(pin, value):
+                # The falling edge of the trigger pulse starts the echo
+                if pin == 23 and value is False and GPIO.output.call_count % 3 == 0:
+                    width = next(widths)
+                    if width is not None:
+                        sensor._edge(1_000_000)
+                        sensor._edge(1_000_000 + width * 1000)
+            GPIO.output.side_effect = output
+            return sensor
+        yield make
+        GPIO.output.side_effect = None
+
+    def test_uses_edge_detection(self, make_sensor):
+        """Test that the echo pin is watched with an edge callback instead of polling"""
+        sensor = make_sensor([1000])
+
+        GPIO.add_event_detect.assert_called_once_with(24, GPIO.BOTH, callback=sensor._on_edge)
+        assert sensor.edge_detection
+
+    def test_edges_classified_by_order(self, make_sensor):
+        """Test that a short echo is measured even when the pin has already fallen in the callback"""
+        sensor = make_sensor([None])
+        GPIO.input.return_value = 0
+
+        def output(pin, value):
+            if pin == 23 and value is False and GPIO.output.call_count % 3 == 0:
+                sensor._on_edge(24)
+                sensor._on_edge(24)
+                sensor._on_edge(24)
+        GPIO.output.side_effect = output
+
+        assert sensor._ping() is not None
+        assert sensor._edges is None
+
+    def test_single_ping_distance(self, make_sensor):
+        """Test that an echo width is converted with the speed of sound at 20C"""
+        sensor = make_sensor([1000])
+
+        assert sensor.read() == round(0.001 * speed_of_sound(20.0) / 2, 2)
+
+    def test_burst_rejects_outliers(self, make_sensor):
+        """Test that a stray echo in a burst does not move the reading"""
+        sensor = make_sensor([1000, 1002, 998, 3000, 1001])
+
+        assert sensor.read() == round(0.0010005 * speed_of_sound(20.0) / 2, 2)
+
+    def test_temperature_compensation(self, make_sensor):
+        """Test that a warmer reading gives a longer distance for the same echo"""
+        cold = make_sensor([1000], temperature=0.0).read()
+        warm = make_sensor([1000], temperature=35.0).read()
+
+        assert warm > cold
+        assert cold == round(0.001 * 33130 / 2, 2)
+
+    def test_too_many_timeouts(self, make_sensor):
+        """Test that a burst with mostly missing echoes returns None"""
+        sensor = make_sensor([1000, None, None])
+
+        assert sensor.read() is None
+
+    def test_aggregate(self):
+        """Test median aggregation with outlier rejection"""
+        assert aggregate([10.0, 10.2, 9.9, 50.0, 10.1]) == pytest.approx(10.05)
+        assert aggregate([]) is None
@@ -0,0 +1,109 @@
+import pytest
+import time
+import sys
+import os
+
+# Add the app directory to the path so we can import the UltrasonicWorker class
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../../../')))
+from app.hardware.input.UltrasonicWorker import UltrasonicWorker, SharedRing, RECORD, HEADER, VERSION, PAYLOAD
+
+class TestUltrasonicWorker:
+
+    @pytest.fixture
+    def ring(self):
+        """Setup fixture for shared ring tests"""
+        ring = SharedRing(slots=4)
+        yield ring
+        ring.close()
+
+    def test_empty_ring(self, ring):
+        """Test that an empty ring has no latest record"""
+        assert ring.latest() is None
+        assert ring.records() == []
+        assert ring.air_temperature is None
+
+    def test_append_and_wrap(self, ring):
+        """Test that the ring keeps the newest records after wrapping"""
+        for i in range(10):
+            ring.append(1000.0 + i, 10.0 + i, 0.01)
+
+        assert ring.count == 10
+        assert ring.latest() == (1009.0, 19.0, 0.01)
+        assert [record[1] for record in ring.records()] == [17.0, 18.0, 19.0]
+
+    def test_timeouts_stored_as_none(self, ring):
+        """Test that a failed measurement reads back as None"""
+        ring.append(1000.0, None, 0.08)
+
+        assert ring.latest() == (1000.0, None, 0.08)
+
+    def test_record_being_written_skipped(self, ring):
+        """Test that a record whose version is odd, i.e. mid-write, is rejected"""
+        ring.append(1000.0, 10.0, 0.01)
+        offset = HEADER.size + (1 % ring.slots) * RECORD.size
+        version = VERSION.unpack_from(ring.shm.buf, offset)[0]
+        VERSION.pack_into(ring.shm.buf, offset, version + 1)
+        PAYLOAD.pack_into(ring.shm.buf, offset + VERSION.size, 1, 1000.0, 99.0, 0.01)
+
+        assert ring.latest() is None
+
+        VERSION.pack_into(ring.shm.buf, offset, version + 2)
+        assert ring.latest() == (1000.0, 99.0, 0.01)
+
+    def test_record_changed_during_copy_retried(self, ring, monkeypatch):
+        """Test that a read racing a rewrite of the record is retried instead of accepted"""
+        ring.append(1000.0, 10.0, 0.01)
+        offset = HEADER.size + (1 % ring.slots) * RECORD.size
+        unpack = PAYLOAD.unpack_from
+        calls = []
+
+        class RacingPayload:
+            size = PAYLOAD.size
+
+            def unpack_from(self, buf, at):
+                record = unpack(buf, at)
+                if not calls:
+                    # The writer finishes a rewrite while the first copy is taken
+                    VERSION.pack_into(buf, offset, VERSION.unpack_from(buf, offset)[0] + 2)
+                    record = (1, 1000.0, -1.0, 0.01)
+                calls.append(record)
+                return record
+        monkeypatch.setattr('app.hardware.input.UltrasonicWorker.PAYLOAD', RacingPayload())
+
+        assert ring.latest() == (1000.0, 10.0, 0.01)
+        assert len(calls) == 2
+
+    def test_overwritten_record_skipped(self, ring):
+        """Test that a slot already holding a newer record is not returned for an older sequence"""
+        for i in range(ring.slots + 1):
+            ring.append(1000.0 + i, 10.0, 0.01)
+
+        assert ring._read(1) is None
+
+    def test_attach_by_name(self, ring):
+        """Test that a second handle sees the same records and temperature"""
+        other = SharedRing(ring.name, slots=4)
+        try:
+            ring.append(1000.0, 12.5, 0.01)
+            other.air_temperature = 25.0
+
+            assert other.latest() == (1000.0, 12.5, 0.01)
+            assert ring.air_temperature == 25.0
+        finally:
+            other.close()
+
+    def test_worker_process(self, monkeypatch):
+        """Test that a worker process publishes results the main process reads without blocking"""
+        # The spawned worker imports the app afresh, without the test GPIO mock
+        monkeypatch.setenv('DEBUG_MODE', 'true')
+        worker = UltrasonicWorker(23, 24, interval=0.05, debug_mode=True)
+        worker.start()
+        try:
+            assert worker.wait_ready()
+            started = time.perf_counter()
+            distance = worker.latest()
+            assert time.perf_counter() - started < 0.001
+            assert distance == 42.0
+        finally:
+            worker.stop()
+        assert worker.latest() is None
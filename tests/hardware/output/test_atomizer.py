@@ -1,5 +1,6 @@
 import pytest
 from unittest.mock import patch, call
+import itertools
 import time
 import sys
 import os
@@ -96,7 +97,9 @@ class TestAtomizer:
         GPIO.reset_mock()
         
         duration = 5
-        atomizer.atomize_for_duration(duration)
+        # The runtime clock advances by the sleep at every switch
+        with patch.object(atomizer.usage, 'clock', itertools.count(0, duration).__next__):
+            atomizer.atomize_for_duration(duration)
         
         # Check that the atomizer was turned on and off
         assert GPIO.output.call_count == 2
@@ -139,7 +142,9 @@ class TestAtomizer:
         GPIO.output.assert_not_called()
         
         # Test mist_for_duration in debug mode
-        with patch('time.sleep') as mock_sleep:
+        # The manual switches above count too
+        before = atomizer.runtime
+        with patch('time.sleep') as mock_sleep, patch.object(atomizer.usage, 'clock', itertools.count(0, 5).__next__):
             atomizer.atomize_for_duration(5)
             mock_sleep.assert_called_once_with(5)
-            assert atomizer.runtime == 5 
\ No newline at end of file
+            assert atomizer.runtime == before + 5 
\ No newline at end of file
@@ -1,5 +1,6 @@
 import pytest
 from unittest.mock import patch, call
+import itertools
 import time
 import sys
 import os
@@ -96,7 +97,9 @@ class TestHeater:
         GPIO.reset_mock()
         
         duration = 5
-        heater.heat_for_duration(duration)
+        # The runtime clock advances by the sleep at every switch
+        with patch.object(heater.usage, 'clock', itertools.count(0, duration).__next__):
+            heater.heat_for_duration(duration)
         
         # Check that the heater was turned on and off
         assert GPIO.output.call_count == 2
@@ -139,8 +142,10 @@ class TestHeater:
         GPIO.output.assert_not_called()
         
         # Test heat_for_duration in debug mode
-        with patch('time.sleep') as mock_sleep:
+        # The manual switches above count too
+        before = heater.runtime
+        with patch('time.sleep') as mock_sleep, patch.object(heater.usage, 'clock', itertools.count(0, 5).__next__):
             heater.heat_for_duration(5)
             mock_sleep.assert_called_once_with(5)
-            assert heater.runtime == 5
+            assert heater.runtime == before + 5
     
\ No newline at end of file
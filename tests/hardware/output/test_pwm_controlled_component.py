@@ -0,0 +1,135 @@
+import pytest
+from unittest.mock import MagicMock, call
+import time
+import sys
+import os
+
+# Add the app directory to the path so we can import the PwmControlledComponent class
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../../')))
+from app.hardware.output.PwmControlledComponent import PwmControlledComponent, GPIO
+from app.hardware.output.Light import Light
+from app.hardware.PwmEngine import PwmEngine
+
+class TestPwmControlledComponent:
+
+    @pytest.fixture
+    def engine(self):
+        """Setup fixture for a stopped, software-only engine"""
+        GPIO.reset_mock()
+        return PwmEngine(MagicMock(), hardware=False)
+
+    def test_relay_mode_by_default(self, engine):
+        """Test that without a frequency the component is a plain relay"""
+        light = Light(27, pwm_frequency=None)
+
+        assert light.pwm_enabled is False
+        light.set_level(0.3)
+        assert light.state == GPIO.HIGH
+        assert light.get_level() == 1.0
+        assert set(light.get_usage_stats()) == {"runtime", "state"}
+
+    def test_set_level_drives_the_engine(self, engine):
+        """Test that levels go to the PWM engine and count as on above zero"""
+        component = PwmControlledComponent(27, "Dimmer", pwm_frequency=200, engine=engine)
+        changes = []
+        component.on_change = changes.append
+
+        component.set_level(0.4, ramp=1.0)
+
+        assert engine.get(27).duty == 0.4
+        assert component.get_level() == 0.4
+        assert component.state == GPIO.HIGH
+        assert component.usage.on is True
+        component.turn_off()
+        assert engine.get(27).duty == 0.0
+        assert component.state == GPIO.LOW
+        assert changes == [True, False]
+
+    def test_ramp_down_counts_as_on_until_it_ends(self, engine):
+        """Test that a ramp down to zero reports the off switch only once the ramp is over"""
+        component = PwmControlledComponent(27, "Dimmer", pwm_frequency=200, engine=engine)
+        changes = []
+        component.on_change = changes.append
+        component.set_level(0.8)
+        engine.start()
+        try:
+            component.set_level(0.0, ramp=0.2)
+
+            assert component.state == GPIO.HIGH
+            assert component.usage.on is True
+            deadline = time.monotonic() + 2
+            while component.usage.on and time.monotonic() < deadline:
+                time.sleep(0.01)
+        finally:
+            engine.stop()
+
+        assert component.state == GPIO.LOW
+        assert changes == [True, False]
+
+    def test_new_level_cancels_pending_off(self, engine):
+        """Test that a level set during a ramp down keeps the component on"""
+        component = PwmControlledComponent(27, "Dimmer", debug_mode=True, pwm_frequency=200, engine=engine)
+        component.set_level(0.8)
+
+        component.set_level(0.0, ramp=0.05)
+        component.set_level(0.5)
+        time.sleep(0.1)
+
+        assert component.state is True
+        assert component.usage.on is True
+
+    def test_non_finite_levels_rejected(self, engine):
+        """Test that a NaN level or ramp leaves the component and its pin unchanged"""
+        component = PwmControlledComponent(27, "Dimmer", pwm_frequency=200, engine=engine)
+        component.set_level(0.6)
+
+        with pytest.raises(ValueError):
+            component.set_level(float('nan'))
+        with pytest.raises(ValueError):
+            component.set_level(0.0, ramp=float('nan'))
+
+        assert component.get_level() == 0.6
+        assert engine.get(27).duty == 0.6
+        assert component.state == GPIO.HIGH
+
+    def test_levels_are_clamped(self, engine):
+        """Test that out-of-range levels are clamped"""
+        component = PwmControlledComponent(27, "Dimmer", pwm_frequency=200, engine=engine)
+
+        component.set_level(3)
+        assert component.get_level() == 1.0
+        component.set_level(-1)
+        assert component.get_level() == 0.0
+
+    def test_usage_stats_report_level(self, engine):
+        """Test that PWM mode adds the level and frequency to the usage stats"""
+        component = PwmControlledComponent(27, "Dimmer", pwm_frequency=200, engine=engine)
+        component.set_level(0.5)
+
+        stats = component.get_usage_stats()
+
+        assert stats["level"] == 0.5
+        assert stats["pwm_frequency"] == 200
+
+    def test_disable_pwm_returns_the_pin(self, engine):
+        """Test that leaving PWM mode detaches the pin and keeps it on"""
+        component = PwmControlledComponent(27, "Dimmer", pwm_frequency=200, engine=engine)
+        component.set_level(0.5)
+        GPIO.reset_mock()
+
+        component.disable_pwm()
+
+        assert engine.get(27) is None
+        GPIO.setup.assert_called_once_with(27, GPIO.OUT)
+        GPIO.output.assert_called_with(27, GPIO.HIGH)
+        assert component.get_level() == 1.0
+
+    def test_debug_mode_skips_the_engine(self, engine):
+        """Test that debug mode simulates levels without GPIO"""
+        component = PwmControlledComponent(27, "Dimmer", debug_mode=True, pwm_frequency=200, engine=engine)
+
+        component.set_level(0.7)
+
+        assert engine.get(27) is None
+        assert component.get_level() == 0.7
+        assert component.state is True
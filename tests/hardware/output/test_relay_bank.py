@@ -0,0 +1,95 @@
+import pytest
+from unittest.mock import patch, call, MagicMock
+import sys
+import os
+
+# Add the app directory to the path so we can import the RelayBank class
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../../')))
+from app.hardware.output.RelayBank import RelayBank
+from app.hardware.output.RelayControlledComponent import RelayControlledComponent, GPIO
+
+class TestRelayBank:
+
+    @pytest.fixture
+    def relays(self):
+        """Setup fixture for four relays on distinct pins"""
+        GPIO.reset_mock()
+        return {
+            name: RelayControlledComponent(signal_pin=pin, component_name=name)
+            for name, pin in (('light', 27), ('water', 18), ('atomizer', 17), ('heater', 23))
+        }
+
+    @pytest.fixture
+    def dispatcher(self):
+        """Setup fixture recording the batched writes"""
+        return MagicMock()
+
+    def test_diff_only_changes(self, relays, dispatcher):
+        """Test that relays already in the desired state are left out"""
+        relays['light'].record_state(True)
+        bank = RelayBank(relays, dispatcher=dispatcher)
+
+        assert bank.diff({'light': True, 'heater': True, 'water': False}) == {'heater': True}
+
+    def test_apply_is_one_write(self, relays, dispatcher):
+        """Test that every change goes out in a single batched write"""
+        bank = RelayBank(relays, inrush_delay=0, dispatcher=dispatcher)
+
+        changed = bank.apply({'light': True, 'heater': True, 'water': False})
+
+        assert changed == {'light': True, 'heater': True}
+        dispatcher.output_many.assert_called_once_with({27: GPIO.HIGH, 23: GPIO.HIGH})
+        assert bank.states() == {'light': True, 'water': False, 'atomizer': False, 'heater': True}
+
+    def test_apply_without_changes(self, relays, dispatcher):
+        """Test that reapplying the current states writes nothing"""
+        bank = RelayBank(relays, dispatcher=dispatcher)
+
+        assert bank.apply({'light': False}) == {}
+        dispatcher.output_many.assert_not_called()
+
+    def test_inrush_delay_staggers_turn_on(self, relays, dispatcher):
+        """Test that loads switch on one at a time, with switch-offs in the first step"""
+        relays['atomizer'].record_state(True)
+        bank = RelayBank(relays, inrush_delay=0.5, dispatcher=dispatcher)
+
+        with patch('app.hardware.output.RelayBank.time.sleep') as sleep:
+            bank.apply({'heater': True, 'water': True, 'atomizer': False})
+
+        assert dispatcher.output_many.call_args_list == [
+            call({17: GPIO.LOW, 23: GPIO.HIGH}),
+            call({18: GPIO.HIGH}),
+        ]
+        sleep.assert_called_once_with(0.5)
+
+    def test_commit_is_batched(self, relays, dispatcher):
+        """Test that observers get one commit instead of one notification per relay"""
+        on_change = MagicMock()
+        relays['light'].on_change = on_change
+        on_commit = MagicMock()
+        bank = RelayBank(relays, on_commit=on_commit, dispatcher=dispatcher)
+
+        bank.apply({'light': True, 'water': True})
+
+        on_commit.assert_called_once_with({'light': True, 'water': True})
+        on_change.assert_not_called()
+
+    def test_unknown_device_switches_nothing(self, relays, dispatcher):
+        """Test that an unknown device rejects the whole change"""
+        bank = RelayBank(relays, dispatcher=dispatcher)
+
+        with pytest.raises(KeyError):
+            bank.apply({'light': True, 'fan': True})
+
+        dispatcher.output_many.assert_not_called()
+        assert relays['light'].state == GPIO.LOW
+
+    def test_debug_relays_are_not_written(self, dispatcher):
+        """Test that simulated relays only record their state"""
+        relays = {'light': RelayControlledComponent(signal_pin=27, component_name='light', debug_mode=True)}
+        bank = RelayBank(relays, dispatcher=dispatcher)
+
+        bank.apply({'light': True})
+
+        dispatcher.output_many.assert_not_called()
+        assert relays['light'].state is True
@@ -0,0 +1,90 @@
+import pytest
+import sys
+import os
+
+# Add the app directory to the path so we can import the RuntimeCounter class
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../../')))
+from app.hardware.output.RuntimeCounter import RuntimeCounter
+
+class TestRuntimeCounter:
+
+    @pytest.fixture
+    def counter(self):
+        """Setup fixture for runtime counter tests"""
+        return RuntimeCounter()
+
+    def test_counts_every_transition(self, counter):
+        """Test that closed and open on-intervals add up"""
+        counter.switch(True, now=100.0)
+        counter.switch(False, now=130.0)
+        counter.switch(True, now=200.0)
+
+        assert counter.runtime(now=210.0) == pytest.approx(40.0)
+        assert counter.switches == 2
+
+    def test_repeated_switches_are_ignored(self, counter):
+        """Test that switching to the current state does not restart the interval"""
+        counter.switch(True, now=0.0)
+        counter.switch(True, now=10.0)
+        counter.switch(False, now=20.0)
+        counter.switch(False, now=30.0)
+
+        assert counter.runtime(now=40.0) == pytest.approx(20.0)
+        assert counter.switches == 1
+
+    def test_restore_keeps_counting(self, counter):
+        """Test that a restored total is added to"""
+        counter.restore(1000.0)
+        counter.switch(True, now=0.0)
+        counter.switch(False, now=5.0)
+
+        assert counter.runtime(now=5.0) == pytest.approx(1005.0)
+
+    def test_duty_cycle_windows(self, counter):
+        """Test the fraction of each window spent on"""
+        start = 86400.0
+        # 15 minutes on, then off for the rest of the hour
+        counter.switch(True, now=start)
+        counter.switch(False, now=start + 900)
+
+        cycles = counter.duty_cycles(now=start + 3600)
+
+        assert cycles['1h'] == pytest.approx(0.25)
+        assert cycles['24h'] == pytest.approx(900 / 86400)
+
+    def test_duty_cycle_includes_open_interval(self, counter):
+        """Test that a relay still on counts up to the window length"""
+        counter.switch(True, now=0.0)
+
+        assert counter.duty_cycle('1h', now=1800.0) == pytest.approx(0.5)
+        assert counter.duty_cycle('1h', now=7200.0) == pytest.approx(1.0)
+
+    def test_old_time_slides_out(self, counter):
+        """Test that on-time leaves the hour window but stays in the day window"""
+        counter.switch(True, now=0.0)
+        counter.switch(False, now=600.0)
+
+        assert counter.duty_cycle('1h', now=3000.0) == pytest.approx(600 / 3600)
+        assert counter.duty_cycle('1h', now=4300.0) == pytest.approx(0.0)
+        assert counter.duty_cycle('24h', now=4300.0) == pytest.approx(600 / 86400)
+        assert counter.duty_cycle('24h', now=90000.0) == pytest.approx(0.0)
+        assert counter.runtime(now=90000.0) == pytest.approx(600.0)
+
+    def test_many_short_runs(self, counter):
+        """Test that frequent toggles add up across buckets"""
+        for i in range(120):
+            counter.switch(True, now=i * 30.0)
+            counter.switch(False, now=i * 30.0 + 15.0)
+
+        assert counter.duty_cycle('1h', now=3600.0) == pytest.approx(0.5)
+        assert counter.runtime(now=3600.0) == pytest.approx(1800.0)
+
+    def test_injected_clock(self):
+        """Test that transitions without an explicit time are taken from the injected clock"""
+        ticks = iter([100.0, 130.0, 130.0])
+        counter = RuntimeCounter(clock=lambda: next(ticks))
+
+        counter.switch(True)
+        counter.switch(False)
+
+        assert counter.runtime() == 30.0
@@ -1,5 +1,6 @@
 import pytest
 from unittest.mock import patch, call
+import itertools
 import time
 import sys
 import os
@@ -96,7 +97,9 @@ class TestWaterPump:
         GPIO.reset_mock()
         
         duration = 5
-        pump.water_for_duration(duration)
+        # The runtime clock advances by the sleep at every switch
+        with patch.object(pump.usage, 'clock', itertools.count(0, duration).__next__):
+            pump.water_for_duration(duration)
         
         # Check that the pump was turned on and off
         assert GPIO.output.call_count == 2
@@ -122,7 +125,8 @@ class TestWaterPump:
         off_time = 1
         cycles = 3
         
-        pump.pulse_water(on_time, off_time, cycles)
+        with patch.object(pump.usage, 'clock', itertools.count(0, on_time).__next__):
+            pump.pulse_water(on_time, off_time, cycles)
         
         # Check that the pump was turned on and off the correct number of times
         # Each cycle: turn_on, turn_off = 2 calls per cycle
@@ -170,7 +174,9 @@ class TestWaterPump:
         GPIO.output.assert_not_called()
         
         # Test water_for_duration in debug mode
-        with patch('time.sleep') as mock_sleep:
+        # The manual switches above count too
+        before = pump.runtime
+        with patch('time.sleep') as mock_sleep, patch.object(pump.usage, 'clock', itertools.count(0, 5).__next__):
             pump.water_for_duration(5)
             mock_sleep.assert_called_once_with(5)
-            assert pump.runtime == 5
\ No newline at end of file
+            assert pump.runtime == before + 5
\ No newline at end of file
@@ -0,0 +1,133 @@
+import pytest
+from unittest.mock import MagicMock, call
+import threading
+import sys
+import os
+
+# Add the app directory to the path so we can import the GpioDispatcher class
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../../')))
+from app.hardware.GpioDispatcher import GpioDispatcher
+from app.hardware.output.RelayControlledComponent import RelayControlledComponent, GPIO
+
+class TestGpioDispatcher:
+
+    @pytest.fixture
+    def gpio(self):
+        """Setup fixture for a stand-in GPIO module"""
+        return MagicMock()
+
+    @pytest.fixture
+    def dispatcher(self, gpio):
+        """Setup fixture for a running dispatcher"""
+        dispatcher = GpioDispatcher(gpio)
+        dispatcher.start()
+        yield dispatcher
+        dispatcher.stop()
+
+    def hold(self, dispatcher):
+        """Block the I/O thread until the returned event is set"""
+        release = threading.Event()
+        started = threading.Event()
+
+        def blocker():
+            started.set()
+            release.wait(5)
+        threading.Thread(target=dispatcher.call, args=(blocker,), daemon=True).start()
+        started.wait(5)
+        return release
+
+    def test_inline_when_stopped(self, gpio):
+        """Test that a stopped dispatcher writes directly on every call"""
+        dispatcher = GpioDispatcher(gpio)
+
+        dispatcher.output(5, True)
+        dispatcher.output(5, True)
+
+        assert gpio.output.call_args_list == [call(5, True), call(5, True)]
+
+    def test_output_is_applied_before_return(self, dispatcher, gpio):
+        """Test that a waiting write has reached GPIO when output() returns"""
+        dispatcher.output(5, True)
+
+        gpio.output.assert_called_once_with(5, True)
+        assert dispatcher.stats()['commands'] == 1
+
+    def test_redundant_writes_are_dropped(self, dispatcher, gpio):
+        """Test that the shadow register skips writes that change nothing"""
+        dispatcher.output(5, True)
+        dispatcher.output(5, True)
+        dispatcher.output(5, False)
+
+        assert gpio.output.call_args_list == [call(5, True), call(5, False)]
+        assert dispatcher.stats()['dropped'] == 1
+
+    def test_writes_in_one_tick_are_coalesced(self, dispatcher, gpio):
+        """Test that queued writes become one multi-channel GPIO.output call"""
+        release = self.hold(dispatcher)
+        dispatcher.output(5, True, wait=False)
+        dispatcher.output(6, True, wait=False)
+        last = dispatcher.output(5, False, wait=False)
+        release.set()
+        last.done.wait(5)
+
+        gpio.output.assert_called_once_with([5, 6], [False, True])
+        stats = dispatcher.stats()
+        assert stats['coalesced'] == 1
+        assert stats['writes'] == 2
+
+    def test_calls_are_barriers(self, dispatcher, gpio):
+        """Test that a read sees every write queued before it"""
+        release = self.hold(dispatcher)
+        dispatcher.output(5, True, wait=False)
+        reader = threading.Thread(target=dispatcher.input, args=(5,))
+        reader.start()
+        release.set()
+        reader.join(5)
+
+        assert [c[0] for c in gpio.method_calls] == ['output', 'input']
+
+    def test_setup_forgets_shadow(self, dispatcher, gpio):
+        """Test that a pin is written again after it is set up"""
+        dispatcher.output(5, True)
+        dispatcher.setup(5, 'out')
+        dispatcher.output(5, True)
+
+        assert gpio.output.call_count == 2
+
+    def test_call_errors_propagate(self, dispatcher, gpio):
+        """Test that an exception on the I/O thread reaches the caller"""
+        gpio.input.side_effect = RuntimeError("not set up")
+
+        with pytest.raises(RuntimeError):
+            dispatcher.input(7)
+
+    def test_stop_applies_queued_writes(self, gpio):
+        """Test that stopping drains the queue"""
+        dispatcher = GpioDispatcher(gpio)
+        dispatcher.start()
+        release = self.hold(dispatcher)
+        command = dispatcher.output(5, True, wait=False)
+        release.set()
+        dispatcher.stop()
+
+        assert command.done.is_set()
+        gpio.output.assert_called_once_with(5, True)
+
+    def test_latency_percentiles(self, dispatcher):
+        """Test that command latency is reported"""
+        for i in range(10):
+            dispatcher.output(5, bool(i % 2))
+
+        stats = dispatcher.stats()
+        assert stats['latency_p50_us'] is not None
+        assert stats['latency_p50_us'] <= stats['latency_p99_us'] <= stats['latency_max_us']
+
+    def test_relay_writes_go_through_dispatcher(self, monkeypatch, dispatcher, gpio):
+        """Test that relays switch through the shared dispatcher"""
+        monkeypatch.setattr('app.hardware.output.RelayControlledComponent.gpio_dispatcher', dispatcher)
+        relay = RelayControlledComponent(signal_pin=22, component_name="TestComponent")
+
+        relay.turn_on()
+        relay.turn_on()
+
+        assert gpio.output.call_args_list == [call(22, GPIO.LOW), call(22, GPIO.HIGH)]
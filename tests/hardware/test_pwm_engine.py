@@ -0,0 +1,173 @@
+import pytest
+from unittest.mock import MagicMock, call
+import threading
+import time
+import sys
+import os
+
+# Add the app directory to the path so we can import the PwmEngine class
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../../')))
+import app.hardware.PwmEngine as pwm_module
+from app.hardware.PwmEngine import PwmEngine, PwmChannel, GPIO
+
+class RecordingGpio:
+    """GPIO stand-in recording when each pin level was written"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.writes = []
+
+    def output(self, pins, values):
+        now = time.perf_counter()
+        if not isinstance(pins, list):
+            pins, values = [pins], [values]
+        with self.lock:
+            self.writes.extend((now, pin, value) for pin, value in zip(pins, values))
+
+    def high_fraction(self, pin, start, end):
+        """Fraction of [start, end] the pin spent HIGH"""
+        with self.lock:
+            edges = [(t, value) for t, p, value in self.writes if p == pin]
+        high = 0.0
+        level, since = GPIO.LOW, start
+        for t, value in edges:
+            if t > end:
+                break
+            if t > start and level == GPIO.HIGH:
+                high += t - max(since, start)
+            level, since = value, t
+        if level == GPIO.HIGH:
+            high += end - max(since, start)
+        return high / (end - start)
+
+class TestPwmEngine:
+
+    @pytest.fixture
+    def gpio(self):
+        """Setup fixture for a recording GPIO stand-in"""
+        return RecordingGpio()
+
+    @pytest.fixture
+    def engine(self, gpio):
+        """Setup fixture for a running software-only engine"""
+        engine = PwmEngine(gpio, hardware=False)
+        engine.start()
+        yield engine
+        engine.stop()
+
+    def test_inline_when_stopped(self):
+        """Test that a stopped engine can only switch a channel fully on or off"""
+        gpio = MagicMock()
+        engine = PwmEngine(gpio, hardware=False)
+        engine.attach(5, 100)
+
+        engine.set_duty(5, 0.3)
+        engine.set_duty(5, 0.0)
+
+        assert gpio.output.call_args_list == [call(5, GPIO.LOW), call(5, GPIO.HIGH), call(5, GPIO.LOW)]
+
+    def test_validates_arguments(self):
+        """Test that bad frequencies, duties and pins are rejected"""
+        engine = PwmEngine(MagicMock(), hardware=False)
+
+        with pytest.raises(ValueError):
+            engine.attach(5, 0)
+        engine.attach(5, 100)
+        with pytest.raises(ValueError):
+            engine.set_duty(5, 1.5)
+        with pytest.raises(ValueError):
+            engine.set_duty(5, float('nan'))
+        with pytest.raises(ValueError):
+            engine.set_duty(5, 0.0, float('nan'))
+        with pytest.raises(ValueError):
+            engine.set_duty(5, 0.0, float('inf'))
+        with pytest.raises(KeyError):
+            engine.set_duty(6, 0.5)
+
+    def test_software_duty_cycle(self, engine, gpio):
+        """Test that the pin is high for the requested fraction of the time"""
+        engine.attach(5, 200)
+        engine.set_duty(5, 0.25)
+        time.sleep(0.05)
+        start = time.perf_counter()
+        time.sleep(0.3)
+
+        assert gpio.high_fraction(5, start, time.perf_counter()) == pytest.approx(0.25, abs=0.08)
+        assert engine.stats()['edges'] > 50
+
+    def test_full_duty_parks_the_channel(self, engine, gpio):
+        """Test that 0% and 100% duty write one level and stop producing edges"""
+        engine.attach(5, 500)
+        engine.set_duty(5, 1.0)
+        time.sleep(0.05)
+
+        assert [value for _, pin, value in gpio.writes if pin == 5] == [GPIO.LOW, GPIO.HIGH]
+        assert engine.get(5).periods == 1
+
+    def test_channels_share_edges(self, engine, gpio):
+        """Test that channels with the same frequency are written together"""
+        engine.attach(5, 100)
+        engine.attach(6, 100)
+        engine.set_duty(5, 0.5)
+        engine.set_duty(6, 0.5)
+        time.sleep(0.1)
+
+        assert engine.stats()['channels'] == 2
+        assert gpio.high_fraction(6, 0.0, time.perf_counter()) > 0
+
+    def test_ramp_interpolates(self):
+        """Test that a ramp moves the duty cycle linearly to the target"""
+        channel = PwmChannel(5, 100)
+        channel.set(1.0, 0.0, now=0.0)
+        channel.set(0.0, 2.0, now=10.0)
+
+        assert channel.duty_at(10.0) == pytest.approx(1.0)
+        assert channel.duty_at(11.0) == pytest.approx(0.5)
+        assert channel.duty_at(12.5) == pytest.approx(0.0)
+        assert channel.ramping(11.0) and not channel.ramping(12.5)
+
+    def test_ramp_runs_on_the_thread(self, engine, gpio):
+        """Test that a running engine follows a ramp to its target"""
+        engine.attach(5, 500)
+        engine.set_duty(5, 1.0, ramp=0.1)
+
+        assert engine.channels()[5]['ramping'] is True
+        time.sleep(0.2)
+        assert engine.channels()[5] == {'pin': 5, 'frequency': 500, 'hardware': False, 'duty': 1.0, 'target': 1.0, 'ramping': False}
+        assert gpio.writes[-1][2] == GPIO.HIGH
+
+    def test_stop_leaves_channels_on_or_off(self, gpio):
+        """Test that stopping writes a steady level for each channel"""
+        engine = PwmEngine(gpio, hardware=False)
+        engine.start()
+        engine.attach(5, 200)
+        engine.set_duty(5, 0.5)
+        time.sleep(0.02)
+        engine.stop()
+
+        assert gpio.writes[-1][1:] == (5, GPIO.HIGH)
+
+    def test_hardware_pwm_on_capable_pins(self, monkeypatch):
+        """Test that pigpio drives capable pins, one pin per PWM channel"""
+        fake_pigpio = MagicMock()
+        fake_pigpio.pi.return_value.connected = True
+        monkeypatch.setattr(pwm_module, 'pigpio', fake_pigpio)
+        gpio = MagicMock()
+        engine = PwmEngine(gpio, hardware=True)
+
+        assert engine.attach(18, 1000).hardware is True
+        assert engine.attach(12, 1000).hardware is False  # Same PWM channel as 18
+        assert engine.attach(5, 1000).hardware is False
+        engine.set_duty(18, 0.5)
+
+        fake_pigpio.pi.return_value.hardware_PWM.assert_called_with(18, 1000, 500000)
+        assert call(18, GPIO.HIGH) not in gpio.output.call_args_list
+
+    def test_falls_back_without_pigpio_daemon(self, monkeypatch):
+        """Test that software PWM is used when the pigpio daemon is not running"""
+        fake_pigpio = MagicMock()
+        fake_pigpio.pi.return_value.connected = False
+        monkeypatch.setattr(pwm_module, 'pigpio', fake_pigpio)
+        engine = PwmEngine(MagicMock(), hardware=True)
+
+        assert engine.attach(18, 1000).hardware is False
@@ -0,0 +1,146 @@
+import pytest
+from unittest.mock import MagicMock
+import threading
+import time
+import sys
+import os
+
+# Add the app directory to the path so we can import the AcquisitionEngine class
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../../')))
+from app.services.AcquisitionEngine import AcquisitionEngine
+
+class FakeSensor:
+    """Sensor returning fixed values after an optional delay"""
+
+    def __init__(self, values, delay=0.0):
+        self.values = values
+        self.delay = delay
+        self.reads = 0
+
+    def read_all(self):
+        self.reads += 1
+        time.sleep(self.delay)
+        return dict(self.values)
+
+class FakeRegistry:
+    """Registry stand-in holding sensors by device name"""
+
+    def __init__(self, sensors):
+        self.sensors = sensors
+        self.locks = {device: threading.RLock() for device in sensors}
+
+    def get(self, device):
+        return self.sensors.get(device)
+
+    def lock(self, device):
+        return self.locks[device]
+
+class TestAcquisitionEngine:
+
+    @pytest.fixture
+    def make_engine(self):
+        """Build engines on fake sensors and stop them after the test"""
+        engines = []
+
+        def make(sensors, rates):
+            engine = AcquisitionEngine(registry=FakeRegistry(sensors), buffer=MagicMock(), rates=rates, max_workers=4)
+            engines.append(engine)
+            return engine
+        yield make
+        for engine in engines:
+            engine.stop()
+
+    def test_poll_publishes_values(self, make_engine):
+        """Test that a poll updates the latest-value store and the buffer under one timestamp"""
+        engine = make_engine({'humidity_sensor': FakeSensor({'humidity': 50.0, 'air_temperature': 70.0})}, {'humidity_sensor': 2.0})
+
+        engine.poll('humidity_sensor')
+
+        latest = engine.latest()
+        assert latest['humidity']['value'] == 50.0
+        assert latest['humidity']['timestamp'] == latest['air_temperature']['timestamp']
+        values, timestamp = engine.buffer.record_many.call_args[0]
+        assert values == {'humidity': 50.0, 'air_temperature': 70.0}
+
+    def test_failed_read_counts_error(self, make_engine):
+        """Test that a sensor returning no value is counted as an error and not published"""
+        engine = make_engine({'light_sensor': FakeSensor({'light': None})}, {'light_sensor': 1.0})
+
+        engine.poll('light_sensor')
+
+        assert engine.stats()['light_sensor']['errors'] == 1
+        assert engine.latest() == {}
+
+    def test_unconfigured_sensor_skipped(self, make_engine):
+        """Test that a sensor missing from the registry is not polled"""
+        engine = make_engine({}, {'light_sensor': 1.0})
+
+        engine.poll('light_sensor')
+
+        assert engine.stats()['light_sensor']['polls'] == 0
+
+    def test_slow_sensor_does_not_delay_fast(self, make_engine):
+        """Test that each sensor keeps its own rate and a slow sensor only misses its own deadlines"""
+        fast = FakeSensor({'water_level': 10.0})
+        slow = FakeSensor({'soil_moisture': 1.0}, delay=0.25)
+        engine = make_engine(
+            {'ultrasonic_sensor': fast, 'soil_moisture_sensor': slow},
+            {'ultrasonic_sensor': 0.02, 'soil_moisture_sensor': 0.05}
+        )
+
+        engine.start()
+        time.sleep(0.6)
+        engine.stop()
+
+        stats = engine.stats()
+        assert stats['ultrasonic_sensor']['achieved_rate'] == pytest.approx(50, rel=0.4)
+        assert stats['ultrasonic_sensor']['missed'] == 0
+        assert stats['soil_moisture_sensor']['missed'] > 0
+        assert slow.reads <= 3
+
+    def test_snapshot_reads_concurrently(self, make_engine):
+        """Test that a snapshot reads all sensors in parallel"""
+        engine = make_engine(
+            {'humidity_sensor': FakeSensor({'humidity': 50.0}, delay=0.1),
+             'temperature_sensor': FakeSensor({'temperature': 70.0}, delay=0.1),
+             'light_sensor': FakeSensor({'light': 1.2}, delay=0.1)},
+            {'humidity_sensor': 2.0, 'temperature_sensor': 5.0, 'light_sensor': 10.0}
+        )
+
+        started = time.monotonic()
+        results = engine.snapshot(timeout=1.0)
+
+        assert time.monotonic() - started < 0.25
+        assert results['temperature_sensor']['values'] == {'temperature': 70.0}
+        assert results['light_sensor']['latency'] >= 0.1
+        assert not any(result['timed_out'] for result in results.values())
+
+    def test_snapshot_deadline(self, make_engine):
+        """Test that a hung probe is reported as timed out without delaying the others"""
+        hung = FakeSensor({'water_level': 10.0}, delay=0.5)
+        engine = make_engine(
+            {'ultrasonic_sensor': hung, 'humidity_sensor': FakeSensor({'humidity': 50.0})},
+            {'ultrasonic_sensor': 1.0, 'humidity_sensor': 2.0}
+        )
+
+        started = time.monotonic()
+        results = engine.snapshot(timeout=0.1)
+
+        assert time.monotonic() - started < 0.3
+        assert results['ultrasonic_sensor'] == {'values': None, 'latency': None, 'timed_out': True, 'error': None}
+        assert results['humidity_sensor']['values'] == {'humidity': 50.0}
+
+        # A second snapshot waits on the read already in progress instead of starting another
+        engine.snapshot(timeout=0.1)
+        assert hung.reads == 1
+
+    def test_snapshot_reports_errors(self, make_engine):
+        """Test that a sensor raising is reported with its error"""
+        sensor = FakeSensor({})
+        sensor.read_all = MagicMock(side_effect=RuntimeError("bus fault"))
+        engine = make_engine({'light_sensor': sensor}, {'light_sensor': 10.0})
+
+        result = engine.snapshot(timeout=1.0)['light_sensor']
+
+        assert result['error'] == 'bus fault'
+        assert not result['timed_out']
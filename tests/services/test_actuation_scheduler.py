@@ -0,0 +1,171 @@
+import pytest
+from unittest.mock import MagicMock, call
+import threading
+import time
+import sys
+import os
+
+# Add the app directory to the path so we can import the ActuationScheduler class
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../../')))
+from app.services.ActuationScheduler import ActuationScheduler, MAX_PHASE
+from app.hardware.output.RelayControlledComponent import RelayControlledComponent, GPIO
+
+def wait_for(predicate, timeout=2.0):
+    """Poll until predicate() is true or the timeout expires"""
+    deadline = time.monotonic() + timeout
+    while not predicate() and time.monotonic() < deadline:
+        time.sleep(0.005)
+    return predicate()
+
+class TestActuationScheduler:
+
+    @pytest.fixture
+    def scheduler(self):
+        """Setup fixture for scheduler tests"""
+        GPIO.reset_mock()
+        scheduler = ActuationScheduler()
+        yield scheduler
+        scheduler.stop()
+
+    @pytest.fixture
+    def relay(self):
+        return RelayControlledComponent(signal_pin=22, component_name="TestRelay")
+
+    def test_activate_for_returns_immediately(self, scheduler, relay):
+        """Test that a timed run does not block the caller"""
+        started = time.monotonic()
+        job = scheduler.activate_for('light', relay, 0.1)
+
+        assert time.monotonic() - started < 0.05
+        assert wait_for(lambda: relay.state == GPIO.HIGH)
+        assert job.status == 'running'
+        assert wait_for(lambda: job.status == 'completed')
+        assert relay.state == GPIO.LOW
+        assert relay.runtime == pytest.approx(0.1, abs=0.05)
+
+    def test_pulse(self, scheduler, relay):
+        """Test that a pulse train switches the relay the expected number of times"""
+        GPIO.reset_mock()
+        job = scheduler.pulse('water', relay, 0.02, 0.02, 3)
+
+        assert wait_for(lambda: job.status == 'completed')
+        assert job.cycles_done == 3
+        assert GPIO.output.call_args_list == [call(22, GPIO.HIGH), call(22, GPIO.LOW)] * 3
+
+    def test_cancel_switches_off(self, scheduler, relay):
+        """Test that cancelling a running job turns the relay off"""
+        job = scheduler.activate_for('light', relay, 10)
+        assert wait_for(lambda: relay.state == GPIO.HIGH)
+
+        scheduler.cancel(job.id)
+
+        assert job.status == 'cancelled'
+        assert relay.state == GPIO.LOW
+        assert scheduler.active_jobs() == []
+
+    def test_extend(self, scheduler, relay):
+        """Test that extending a job delays its off transition"""
+        job = scheduler.activate_for('light', relay, 0.1)
+        assert wait_for(lambda: job.status == 'running')
+
+        assert scheduler.extend(job.id, 0.2) is job
+
+        time.sleep(0.15)
+        assert relay.state == GPIO.HIGH
+        assert wait_for(lambda: job.status == 'completed')
+        assert relay.state == GPIO.LOW
+
+    def test_new_job_supersedes(self, scheduler, relay):
+        """Test that a new job on the same device replaces the old one"""
+        first = scheduler.activate_for('light', relay, 10)
+        second = scheduler.activate_for('light', relay, 0.05)
+
+        assert first.status == 'cancelled'
+        assert wait_for(lambda: second.status == 'completed')
+        assert relay.state == GPIO.LOW
+
+    def test_invalid_arguments(self, scheduler, relay):
+        """Test that impossible jobs are rejected"""
+        with pytest.raises(ValueError):
+            scheduler.pulse('light', relay, 1, 1, 0)
+
+    @pytest.mark.parametrize('duration', [float('nan'), float('inf'), -1, 2 * MAX_PHASE])
+    def test_unbounded_durations_rejected(self, scheduler, relay, duration):
+        """Test that NaN, infinite, negative and overlong durations are rejected"""
+        with pytest.raises(ValueError):
+            scheduler.activate_for('light', relay, duration)
+        with pytest.raises(ValueError):
+            scheduler.pulse('light', relay, 1, duration, 2)
+
+        assert scheduler.active_jobs() == []
+
+    @pytest.mark.parametrize('seconds', [float('nan'), float('inf'), 2 * MAX_PHASE])
+    def test_unbounded_extension_rejected(self, scheduler, relay, seconds):
+        """Test that a job cannot be extended by NaN, infinity or beyond the longest phase"""
+        job = scheduler.activate_for('light', relay, 0.1)
+
+        with pytest.raises(ValueError):
+            scheduler.extend(job.id, seconds)
+
+        assert wait_for(lambda: job.status == 'completed')
+        assert relay.state == GPIO.LOW
+
+    def test_many_concurrent_jobs(self, scheduler):
+        """Test that hundreds of relays switch off close to their deadlines"""
+        relays = [RelayControlledComponent(signal_pin=i, component_name=f"Relay{i}") for i in range(200)]
+        off_times = {}
+        for relay in relays:
+            relay.turn_off = (lambda r: lambda: off_times.setdefault(r.signal_pin, time.monotonic()))(relay)
+
+        started = time.monotonic()
+        jobs = [scheduler.activate_for(f'relay{i}', relay, 0.2 + (i % 10) * 0.01) for i, relay in enumerate(relays)]
+
+        assert wait_for(lambda: all(job.status == 'completed' for job in jobs), timeout=5)
+        lateness = [off_times[i] - started - (0.2 + (i % 10) * 0.01) for i in range(200)]
+        assert max(lateness) < 0.1
+
+    def test_slow_switch_does_not_block_api(self, scheduler):
+        """Test that the scheduler API answers while a relay switch is in progress"""
+        switching = threading.Event()
+        release = threading.Event()
+        slow = MagicMock()
+        slow.turn_on.side_effect = lambda: (switching.set(), release.wait(2))
+        job = scheduler.activate_for('light', slow, 10)
+        assert switching.wait(2)
+
+        started = time.monotonic()
+        assert scheduler.get(job.id) is job
+        assert scheduler.active_jobs() == [job]
+        assert time.monotonic() - started < 0.1
+        release.set()
+
+    def test_cancelled_job_is_not_switched_on(self, scheduler, relay):
+        """Test that a transition collected before a cancel does not switch the relay back on"""
+        job = scheduler.activate_for('light', relay, 10)
+        assert wait_for(lambda: relay.state == GPIO.HIGH)
+        scheduler.cancel(job.id)
+
+        scheduler._switch(job, True)
+
+        assert relay.state == GPIO.LOW
+
+    def test_rebind_follows_rebuilt_components(self, scheduler, relay):
+        """Test that a running job drives the new component after a rebuild"""
+        job = scheduler.activate_for('light', relay, 10)
+        assert wait_for(lambda: relay.state == GPIO.HIGH)
+        relay.turn_off()
+        rebuilt = RelayControlledComponent(signal_pin=24, component_name="RebuiltRelay")
+
+        assert scheduler.rebind({'light': rebuilt}.get) == 1
+
+        assert job.component is rebuilt
+        assert rebuilt.state == GPIO.HIGH
+        scheduler.cancel(job.id)
+        assert rebuilt.state == GPIO.LOW
+
+    def test_rebind_cancels_removed_devices(self, scheduler, relay):
+        """Test that jobs for devices that no longer exist are cancelled"""
+        job = scheduler.activate_for('light', relay, 10)
+
+        assert scheduler.rebind(lambda device: None) == 0
+        assert job.status == 'cancelled'
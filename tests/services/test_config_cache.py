@@ -0,0 +1,112 @@
+import pytest
+import sys
+import os
+
+# Add the app directory to the path so we can import the ConfigCache class
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../../')))
+from app.models import db, Config
+from app.services.ConfigCache import ConfigCache
+from sqlalchemy import event
+
+class TestConfigCache:
+
+    @pytest.fixture
+    def cache(self, app):
+        """Setup fixture for config cache tests"""
+        return ConfigCache()
+
+    @pytest.fixture
+    def query_counter(self, app):
+        """Count SQL statements issued against the database"""
+        statements = []
+
+        def count(conn, cursor, statement, parameters, context, executemany):
+            statements.append(statement)
+
+        event.listen(db.engine, 'before_cursor_execute', count)
+        yield statements
+        event.remove(db.engine, 'before_cursor_execute', count)
+
+    def test_get_loads_once(self, cache, query_counter):
+        """Test that only the first get() touches the database"""
+        version, snapshot = cache.get()
+        queries = len(query_counter)
+
+        for _ in range(10):
+            assert cache.get() == (version, snapshot)
+
+        assert version == 1
+        assert queries > 0
+        assert len(query_counter) == queries
+
+    def test_snapshot_is_read_only(self, cache):
+        """Test that callers cannot mutate the shared snapshot"""
+        snapshot = cache.snapshot()
+
+        with pytest.raises(TypeError):
+            snapshot['light_pin'] = 99
+
+    def test_etag_follows_content(self, cache):
+        """Test that the ETag is the same in another process and changes with the content"""
+        etag, _ = cache.get_tagged()
+        restarted = ConfigCache()
+        restarted.get()
+        restarted.get()
+        restarted.invalidate()
+
+        assert restarted.get_tagged()[0] == etag
+        assert restarted.version != cache.version
+
+        cache.update({'light_threshold': 55})
+        assert cache.get_tagged()[0] != etag
+
+    def test_update_bumps_version(self, cache):
+        """Test that an update commits and swaps in a new snapshot"""
+        version, _ = cache.get()
+
+        success, message = cache.update({'light_pin': '17', 'unknown_field': 1})
+
+        assert success is True
+        assert message is None
+        new_version, snapshot = cache.get()
+        assert new_version == version + 1
+        assert snapshot['light_pin'] == 17
+        assert Config.query.first().light_pin == 17
+
+    def test_update_rejects_invalid_value(self, cache):
+        """Test that a bad value leaves the snapshot untouched"""
+        version, snapshot = cache.get()
+
+        success, message = cache.update({'light_pin': 'abc'})
+
+        assert success is False
+        assert message == 'Invalid value for light_pin'
+        assert cache.get() == (version, snapshot)
+        assert Config.query.first().light_pin == snapshot['light_pin']
+
+    def test_invalidate_reloads(self, cache):
+        """Test that invalidation reloads from the database with a new version"""
+        version, _ = cache.get()
+        Config.query.first().heater_pin = 5
+        db.session.commit()
+
+        cache.invalidate()
+
+        new_version, snapshot = cache.get()
+        assert new_version > version
+        assert snapshot['heater_pin'] == 5
+
+    def test_revalidate_picks_up_other_writers(self, cache):
+        """Test that revalidate() reloads a row changed by another process's cache"""
+        version, _ = cache.get()
+        assert cache.revalidate() is False
+        assert cache.get()[0] == version
+
+        other = ConfigCache()
+        other.update({'water_pin': 17})
+
+        assert cache.revalidate() is True
+        new_version, snapshot = cache.get()
+        assert new_version > version
+        assert snapshot['water_pin'] == 17
+        assert cache.get_tagged()[0] == other.get_tagged()[0]
@@ -0,0 +1,203 @@
+import pytest
+import sys
+import os
+import time
+
+# Add the app directory to the path so we can import the ControlEngine class
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../../')))
+from app.services.DeviceRegistry import DeviceRegistry
+from app.services.ConfigCache import config_cache
+from app.services.EventBus import EventBus
+from app.services.StateStore import StateStore
+from app.services.ControlEngine import ControlEngine, HysteresisRule, build_rules
+from app.hardware.input.AdcBus import summarize
+from app.hardware.input.LightSensor import LightSensor
+from app.hardware.input.SoilMoistureSensor import SoilMoistureSensor
+from array import array
+
+THRESHOLDS = {
+    'humidity_threshold_low': 60, 'humidity_threshold_high': 80,
+    'temperature_threshold_low': 68, 'temperature_threshold_high': 75,
+    'light_threshold': 30,
+    'dry_soil_threshold': 20, 'watered_soil_threshold': 40,
+    'water_level_threshold_low': 30,
+}
+
+class TestControlEngine:
+
+    @pytest.fixture
+    def registry(self, app):
+        """Setup fixture for control engine tests"""
+        config_cache.update({'light_pin': 27, 'water_pin': 18, 'atomizer_pin': 17, 'heater_pin': 23, **THRESHOLDS})
+        return DeviceRegistry(debug_mode=True)
+
+    @pytest.fixture
+    def engine(self, registry):
+        """Setup fixture for an engine driving the debug registry"""
+        return ControlEngine(registry, events=EventBus(), store=StateStore(events=None), heartbeat=0.05)
+
+    def test_hysteresis_holds_between_thresholds(self, registry, engine):
+        """Test that the atomizer turns on below the low and off above the high threshold only"""
+        atomizer = registry.get('atomizer')
+
+        engine.process({'humidity': 55})
+        assert atomizer.state
+
+        engine.process({'humidity': 79})
+        assert atomizer.state
+
+        engine.process({'humidity': 81})
+        assert not atomizer.state
+
+        engine.process({'humidity': 61})
+        assert not atomizer.state
+
+    def test_only_changed_inputs_are_evaluated(self, engine):
+        """Test that a sample evaluates just the rules reading a changed value"""
+        engine.process({'humidity': 70, 'temperature': 70, 'light': 50, 'soil_moisture': 30, 'water_level': 20})
+
+        assert engine.process({'humidity': 70, 'temperature': 71, 'light': 50}) == 1
+        assert engine.process({'humidity': 70, 'temperature': 71, 'light': 50}) == 0
+        assert engine.skipped == 1
+
+        rules = {rule['name']: rule for rule in engine.rules()}
+        assert rules['temperature']['evaluations'] == 2
+        assert rules['humidity']['evaluations'] == 1
+        assert rules['temperature']['mean_eval_us'] is not None
+
+    def test_devices_switch_on_decision_changes_only(self, registry, engine):
+        """Test that a rule switches its device once per change of decision"""
+        engine.process({'temperature': 60})
+        engine.process({'temperature': 61})
+        engine.process({'temperature': 62})
+
+        rule = next(rule for rule in engine.rules() if rule['name'] == 'temperature')
+        assert registry.get('heater').state
+        assert rule['evaluations'] == 3
+        assert rule['actuations'] == 1
+
+    def test_low_water_interlocks_pump(self, registry, engine):
+        """Test that the pump stops once the distance down to the water passes the limit and resumes after a refill"""
+        pump = registry.get('water')
+
+        engine.process({'soil_moisture': 10, 'water_level': 12.4})
+        assert pump.state
+
+        engine.process({'water_level': 31.7})
+        assert not pump.state
+
+        engine.process({'water_level': 29.0})
+        assert not pump.state
+
+        engine.process({'water_level': 27.5})
+        assert pump.state
+
+        rule = next(rule for rule in engine.rules() if rule['name'] == 'soil_moisture')
+        assert rule['interlocked'] == 2
+
+    def test_interlock_direction_follows_release(self):
+        """Test that an interlock released above its trip value trips on falling values"""
+        rule = HysteresisRule('pump', 'water', 'soil_moisture', 'below', 20, 40, interlock=('tank_level', 5, 8))
+
+        assert rule.decide({'soil_moisture': 10, 'tank_level': 12}) is True
+        assert rule.decide({'soil_moisture': 10, 'tank_level': 4}) is False
+        assert rule.decide({'soil_moisture': 10, 'tank_level': 7}) is False
+        assert rule.decide({'soil_moisture': 10, 'tank_level': 8}) is True
+
+    def test_threshold_change_reevaluates(self, registry, engine):
+        """Test that a new Config version rebuilds the rules and keeps their counters"""
+        engine.process({'humidity': 70})
+        assert not registry.get('atomizer').state
+
+        config_cache.update({'humidity_threshold_low': 75, 'humidity_threshold_high': 85})
+        engine.process({'humidity': 70})
+
+        assert registry.get('atomizer').state
+        assert engine.reloads == 1
+        rule = next(rule for rule in engine.rules() if rule['name'] == 'humidity')
+        assert rule['on_at'] == 75
+        assert rule['evaluations'] == 2
+
+    def test_overlapping_thresholds_disable_rule(self, registry, engine):
+        """Test that a low threshold above the high one disables the rule"""
+        config_cache.update({'humidity_threshold_low': 80, 'humidity_threshold_high': 60})
+
+        engine.process({'humidity': 10})
+
+        rule = next(rule for rule in engine.rules() if rule['name'] == 'humidity')
+        assert not rule['active']
+        assert rule['evaluations'] == 0
+        assert not registry.get('atomizer').state
+
+    def test_soil_direction_follows_thresholds(self):
+        """Test that a dry threshold above the watered one inverts the soil rule"""
+        rules = {rule.name: rule for rule in build_rules({**THRESHOLDS, 'dry_soil_threshold': 2.5, 'watered_soil_threshold': 1.5})}
+        soil = rules['soil_moisture']
+
+        assert soil.direction == 'above'
+        assert soil.decide({'soil_moisture': 2.7}) is True
+        assert soil.decide({'soil_moisture': 2.0}) is None
+        assert soil.decide({'soil_moisture': 1.2}) is False
+
+    def test_default_thresholds_with_sensor_readings(self, app):
+        """Test that the default light and soil thresholds switch on real ADC voltages"""
+        rules = {rule.name: rule for rule in build_rules(config_cache.snapshot())}
+        light, soil = LightSensor(0), SoilMoistureSensor(1)
+
+        def level(sensor, volts):
+            return sensor.convert(summarize(array('d', [volts] * 10)))
+
+        assert rules['light'].decide({'light': level(light, 0.4)}) is True
+        assert rules['light'].decide({'light': level(light, 2.9)}) is False
+        assert rules['soil_moisture'].decide({'soil_moisture': level(soil, 0.6), 'water_level': 10}) is True
+        assert rules['soil_moisture'].decide({'soil_moisture': level(soil, 2.5), 'water_level': 10}) is False
+
+    def test_unknown_direction_rejected(self):
+        """Test that a rule direction other than below or above raises"""
+        with pytest.raises(ValueError):
+            HysteresisRule('bad', 'light', 'light', 'sideways', 1, 2)
+
+    def test_stale_input_forces_output_off(self, registry):
+        """Test that a rule whose input stops arriving switches its device off until samples resume"""
+        now = [0.0]
+        engine = ControlEngine(registry, events=EventBus(), store=StateStore(events=None), stale_after=10, clock=lambda: now[0])
+        atomizer = registry.get('atomizer')
+        others = {'temperature': 70, 'light': 50, 'soil_moisture': 30, 'water_level': 20}
+
+        engine.process({'humidity': 55, **others})
+        now[0] = 8.0
+        engine.process(others)
+        assert engine.check_stale() == 0
+        assert atomizer.state
+
+        now[0] = 12.0
+        engine.process(others)
+        assert engine.check_stale() == 1
+        assert not atomizer.state
+        rule = next(rule for rule in engine.rules() if rule['name'] == 'humidity')
+        assert rule['stale'] is True
+        assert engine.stats()['stale'] == ['humidity']
+
+        engine.process({'humidity': 55})
+        assert atomizer.state
+        assert engine.stats()['stale'] == []
+
+    def test_thread_processes_bus_events(self, app, registry):
+        """Test that the background thread applies samples published on the bus"""
+        events = EventBus()
+        store = StateStore(events=events)
+        engine = ControlEngine(registry, events=events, store=store, heartbeat=0.05)
+        engine.init_app(app)
+        engine.start()
+        try:
+            deadline = time.monotonic() + 2
+            while engine.samples == 0 and time.monotonic() < deadline:
+                time.sleep(0.01)
+            store.set_sensors({'humidity': 50})
+            while not registry.get('atomizer').state and time.monotonic() < deadline:
+                time.sleep(0.01)
+        finally:
+            engine.stop()
+
+        assert registry.get('atomizer').state
+        assert engine.stats()['values']['humidity'] == 50
@@ -0,0 +1,140 @@
+import pytest
+from unittest.mock import call
+import threading
+import time
+import sys
+import os
+
+# Add the app directory to the path so we can import the DeviceRegistry class
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../../')))
+from app.services.DeviceRegistry import DeviceRegistry
+from app.services.ConfigCache import config_cache
+from app.hardware.output.RelayControlledComponent import GPIO
+from app.hardware.input.UltrasonicSensor import UltrasonicSensor
+
+class TestDeviceRegistry:
+
+    @pytest.fixture
+    def registry(self, app):
+        """Setup fixture for device registry tests"""
+        config_cache.update({'light_pin': 27, 'water_pin': 18, 'atomizer_pin': 17, 'heater_pin': 23})
+        GPIO.reset_mock()
+        return DeviceRegistry(debug_mode=False)
+
+    def test_builds_once(self, registry):
+        """Test that devices are built on first use and then shared"""
+        light = registry.get('light')
+
+        assert light is not None
+        assert registry.get('light') is light
+        assert registry.reload() is False
+        assert registry.get('light') is light
+
+    def test_set_state_is_single_write(self, registry):
+        """Test that control only costs one GPIO write on the shared device"""
+        registry.get('light')
+        GPIO.reset_mock()
+
+        assert registry.set_state('light', True) is True
+
+        GPIO.setup.assert_not_called()
+        GPIO.output.assert_called_once_with(27, GPIO.HIGH)
+        assert registry.get('light').state == GPIO.HIGH
+
+    def test_set_states_is_one_batched_write(self, registry):
+        """Test that a bulk change drives only the pins that change"""
+        registry.get('light')
+        GPIO.reset_mock()
+
+        changed = registry.set_states({'light': True, 'pump': True, 'heater': False})
+
+        assert changed == {'light': True, 'water': True}
+        GPIO.output.assert_has_calls([call(27, GPIO.HIGH), call(18, GPIO.HIGH)])
+        assert registry.get('water').state == GPIO.HIGH
+
+    def test_set_states_validates_all_devices(self, registry):
+        """Test that an unknown device rejects the whole bulk change"""
+        registry.get('light')
+        GPIO.reset_mock()
+
+        with pytest.raises(KeyError):
+            registry.set_states({'light': True, 'fan': True})
+
+        GPIO.output.assert_not_called()
+
+    def test_aliases(self, registry):
+        """Test that dashboard aliases resolve to the canonical device"""
+        assert registry.get('humidifier') is registry.get('atomizer')
+        assert registry.get('pump') is registry.get('water')
+
+    def test_unknown_device(self, registry):
+        """Test that unknown or input devices cannot be switched"""
+        assert registry.set_state('fan', True) is False
+        assert registry.set_state('humidity_sensor', True) is False
+
+    def test_reload_on_pin_change(self, registry):
+        """Test that changing a pin rebuilds the devices and switches the old ones off"""
+        old_light = registry.get('light')
+        registry.set_state('light', True)
+
+        config_cache.update({'light_pin': 22})
+
+        assert registry.reload() is True
+        assert old_light.state == GPIO.LOW
+        assert registry.get('light') is not old_light
+        assert registry.get('light').signal_pin == 22
+
+    def test_waiting_request_drives_rebuilt_device(self, registry):
+        """Test that a request queued behind a reload drives the new component, not the replaced one"""
+        old_light = registry.get('light')
+        with registry.lock('light'):
+            worker = threading.Thread(target=registry.set_state, args=('light', True))
+            worker.start()
+            time.sleep(0.1)
+            config_cache.update({'light_pin': 22})
+            registry.reload()
+        worker.join(2)
+
+        assert registry.get('light').signal_pin == 22
+        assert registry.get('light').state == GPIO.HIGH
+        assert old_light.state == GPIO.LOW
+
+    def test_rebuild_notifies_holders(self, registry):
+        """Test that on_rebuild runs after a rebuild, with the new devices in place"""
+        seen = []
+        registry.get('light')
+        registry.on_rebuild = lambda: seen.append(registry.get('light').signal_pin)
+
+        config_cache.update({'light_pin': 22})
+        registry.reload()
+
+        assert seen == [22]
+
+    def test_rebuild_keeps_ultrasonic_sensor(self, registry, monkeypatch):
+        """Test that a rebuild keeps the ultrasonic sensor on unchanged pins and closes replaced ones"""
+        closed = []
+        monkeypatch.setattr(UltrasonicSensor, 'close', lambda sensor: closed.append(sensor))
+        config_cache.update({'ultrasonic_trigger_pin_in': 5, 'ultrasonic_echo_pin_in': 6})
+        sensor = registry.get('ultrasonic_sensor')
+
+        config_cache.update({'light_pin': 22})
+        registry.reload()
+
+        assert registry.get('ultrasonic_sensor') is sensor
+        assert closed == []
+
+        config_cache.update({'ultrasonic_echo_pin_in': 7})
+        registry.reload()
+
+        assert registry.get('ultrasonic_sensor').echo_pin == 7
+        assert closed == [sensor]
+
+    def test_shutdown_turns_outputs_off(self, registry):
+        """Test that shutdown switches every output off"""
+        registry.set_state('heater', True)
+        registry.set_state('water', True)
+
+        registry.shutdown()
+
+        assert registry.get('heater').state == GPIO.LOW
+        assert registry.get('water').state == GPIO.LOW
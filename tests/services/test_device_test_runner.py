@@ -0,0 +1,106 @@
+import pytest
+from unittest.mock import MagicMock, call
+import threading
+import time
+import sys
+import os
+
+# Add the app directory to the path so we can import the DeviceTestRunner class
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../../')))
+from app.services.ActuationScheduler import ActuationScheduler
+from app.services.DeviceTestRunner import DeviceTestRunner
+from app.hardware.output.RelayControlledComponent import RelayControlledComponent, GPIO
+
+class TestDeviceTestRunner:
+
+    @pytest.fixture
+    def scheduler(self):
+        """Setup fixture for the scheduler driving output tests"""
+        GPIO.reset_mock()
+        scheduler = ActuationScheduler()
+        yield scheduler
+        scheduler.stop()
+
+    @pytest.fixture
+    def runner(self, scheduler):
+        """Setup fixture for device test runner tests"""
+        return DeviceTestRunner(scheduler=scheduler, input_deadline=0.2, output_period=0.02)
+
+    def sensor_manager(self, read):
+        """Build a manager stub whose sense() calls read"""
+        manager = MagicMock()
+        manager.sense.side_effect = lambda device: read()
+        return manager
+
+    def test_output_test_pulses_relay(self, runner):
+        """Test that an output test returns at once and fires the relay three times"""
+        relay = RelayControlledComponent(signal_pin=22, component_name="TestRelay")
+        manager = MagicMock()
+        manager.get.return_value = relay
+        GPIO.reset_mock()
+
+        started = time.monotonic()
+        job = runner.submit('light', manager, 'output')
+
+        assert time.monotonic() - started < 0.05
+        assert runner.wait(job, 2.0)
+        assert job.status == 'completed'
+        assert job.progress == 1.0
+        assert GPIO.output.call_args_list == [call(22, GPIO.HIGH), call(22, GPIO.LOW)] * 3
+
+    def test_output_test_missing_device(self, runner):
+        """Test that an output test fails when the device could not be built"""
+        manager = MagicMock()
+        manager.get.return_value = None
+
+        job = runner.submit('heater', manager, 'output')
+
+        assert job.status == 'failed'
+        assert runner.get(job.id) is job
+
+    def test_input_test_returns_value(self, runner):
+        """Test that an input test records the sensor reading"""
+        job = runner.submit('humidity_sensor', self.sensor_manager(lambda: 55.0), 'input')
+
+        assert runner.wait(job, 1.0)
+        assert job.to_dict()['status'] == 'completed'
+        assert job.value == 55.0
+
+    def test_input_test_times_out(self, runner):
+        """Test that a hung sensor is reported as timed out at the deadline"""
+        release = threading.Event()
+        job = runner.submit('temperature_sensor', self.sensor_manager(lambda: release.wait(5)), 'input')
+
+        started = time.monotonic()
+        assert runner.wait(job, 5.0)
+        assert time.monotonic() - started < 0.5
+        assert job.status == 'timeout'
+        release.set()
+
+    def test_concurrent_tests(self, runner):
+        """Test that several sensors are tested in parallel"""
+        def slow_read():
+            time.sleep(0.1)
+            return 1.0
+
+        started = time.monotonic()
+        jobs = [runner.submit(f'sensor_{i}', self.sensor_manager(slow_read), 'input') for i in range(4)]
+
+        assert all(runner.wait(job, 1.0) for job in jobs)
+        assert time.monotonic() - started < 0.3
+        assert [job.value for job in jobs] == [1.0] * 4
+
+    def test_owned_managers_closed(self, runner):
+        """Test that a manager built for a test is closed when the test ends, and a shared one is not"""
+        owned = self.sensor_manager(lambda: 1.0)
+        shared = self.sensor_manager(lambda: 1.0)
+
+        jobs = [runner.submit('humidity_sensor', owned, 'input', owned=True), runner.submit('humidity_sensor', shared, 'input')]
+
+        assert all(runner.wait(job, 1.0) for job in jobs)
+        deadline = time.monotonic() + 1
+        while not owned.close.called and time.monotonic() < deadline:
+            time.sleep(0.01)
+        owned.close.assert_called_once()
+        shared.close.assert_not_called()
+        assert jobs[0].manager is None
@@ -0,0 +1,142 @@
+import pytest
+import json
+import threading
+import sys
+import os
+
+# Add the app directory to the path so we can import the EventBus class
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../../')))
+from app.services.EventBus import EventBus
+from app.services.StateStore import StateStore
+
+class TestEventBus:
+
+    @pytest.fixture
+    def bus(self):
+        """Setup fixture for event bus tests"""
+        bus = EventBus(replay_size=5)
+        yield bus
+        bus.close()
+
+    def test_publish_assigns_consecutive_ids(self, bus):
+        """Test that events are numbered in publish order"""
+        first = bus.publish('devices', {'devices': {'light': True}})
+        second = bus.publish('sensors', {'values': {'humidity': 50.0}})
+
+        assert (first.id, second.id) == (1, 2)
+        assert bus.last_id == 2
+
+    def test_since_replays_buffered_events(self, bus):
+        """Test that a subscriber resumes after its last event"""
+        for i in range(4):
+            bus.publish('sensors', {'i': i})
+
+        events, complete = bus.since(2)
+
+        assert complete
+        assert [event.data['i'] for event in events] == [2, 3]
+
+    def test_since_reports_gap(self, bus):
+        """Test that resuming past the replay buffer is reported as incomplete"""
+        for i in range(8):
+            bus.publish('sensors', {'i': i})
+
+        events, complete = bus.since(1)
+
+        assert not complete
+        assert [event.id for event in events] == [4, 5, 6, 7, 8]
+
+    def test_listen_filters_topics(self, bus):
+        """Test that a subscriber only receives the topics it asked for"""
+        bus.publish('sensors', {'i': 0})
+        bus.publish('devices', {'devices': {'light': True}})
+        bus.publish('sensors', {'i': 1})
+
+        stream = bus.listen(0, topics=['devices'])
+
+        event = next(stream)
+        assert (event.topic, event.id) == ('devices', 2)
+        stream.close()
+
+    def test_listen_resets_on_lost_events(self, bus):
+        """Test that a subscriber too far behind is told to reload"""
+        for i in range(8):
+            bus.publish('sensors', {'i': i})
+
+        stream = bus.listen(1)
+
+        assert next(stream).topic == 'reset'
+        assert next(stream).id == 4
+        stream.close()
+
+    def test_listen_resets_unknown_id(self, bus):
+        """Test that an id from before a restart is not silently resumed"""
+        bus.publish('sensors', {'i': 0})
+
+        stream = bus.listen(500)
+
+        assert next(stream).topic == 'reset'
+        stream.close()
+
+    def test_listen_wakes_on_publish(self, bus):
+        """Test that a waiting subscriber receives a new event"""
+        stream = bus.listen(heartbeat=5)
+        timer = threading.Timer(0.05, bus.publish, args=('devices', {'devices': {'water': True}}))
+        timer.start()
+
+        event = next(stream)
+        timer.join()
+
+        assert event.data['devices'] == {'water': True}
+        assert bus.subscribers == 1
+        stream.close()
+        assert bus.subscribers == 0
+
+    def test_listen_heartbeat(self, bus):
+        """Test that a quiet stream yields a heartbeat"""
+        stream = bus.listen(heartbeat=0.05)
+
+        assert next(stream) is None
+        stream.close()
+
+    def test_close_ends_streams(self, bus):
+        """Test that closing the bus ends open subscriptions"""
+        stream = bus.listen(heartbeat=5)
+        threading.Timer(0.05, bus.close).start()
+
+        assert list(stream) == []
+
+    def test_reopen_after_close(self, bus):
+        """Test that a reopened bus serves streams again and keeps its ids"""
+        bus.publish('devices', {'devices': {'light': True}})
+        bus.close()
+        bus.open()
+
+        stream = bus.listen(last_id=0, heartbeat=5)
+        event = next(stream)
+        stream.close()
+
+        assert not bus.closed
+        assert event.id == 1
+
+    def test_to_sse(self, bus):
+        """Test the Server-Sent Events framing"""
+        event = bus.publish('devices', {'devices': {'light': False}})
+
+        lines = event.to_sse().split('\n')
+
+        assert lines[:2] == ['id: 1', 'event: devices']
+        assert json.loads(lines[2][len('data: '):])['devices'] == {'light': False}
+        assert event.to_sse().endswith('\n\n')
+
+    def test_state_store_publishes(self, bus):
+        """Test that device changes and every sensor sample reach the bus"""
+        store = StateStore(events=bus)
+
+        store.set_device('light', True)
+        store.set_device('light', True)
+        store.set_sensors({'humidity': 50.0})
+        store.set_sensors({'humidity': 50.0})
+
+        events, _ = bus.since(0)
+        assert [event.topic for event in events] == ['devices', 'sensors', 'sensors']
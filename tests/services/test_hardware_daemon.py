@@ -0,0 +1,125 @@
+import pytest
+import socket
+import threading
+import sys
+import os
+
+# Add the app directory to the path so we can import the HardwareDaemon class
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../../')))
+from app import create_app
+from app.services.HardwareDaemon import HardwareDaemon
+from app.services.HardwareIPC import HardwareClient, HardwareUnavailable, send_message, recv_message
+from app.services.HardwareService import hardware_service
+from app.services.EventBus import event_bus
+from app.services.StateStore import state_store
+
+class TestHardwareDaemon:
+
+    @pytest.fixture
+    def path(self, tmp_path):
+        """Setup fixture for the daemon's socket path"""
+        return str(tmp_path / 'hardware.sock')
+
+    @pytest.fixture
+    def daemon(self, app, path):
+        """Setup fixture serving the hardware service over a Unix socket"""
+        daemon = HardwareDaemon(path)
+        daemon.init_app(app)
+        daemon.start()
+        yield daemon
+        daemon.stop()
+
+    @pytest.fixture
+    def client(self, daemon, path):
+        """Setup fixture for the daemon's client"""
+        client = HardwareClient(path, timeout=2.0)
+        yield client
+        client.close()
+
+    def test_framing_round_trip(self):
+        """Test that framed messages survive being split across reads"""
+        left, right = socket.socketpair()
+        message = {'op': 'control', 'args': {'device': 'light', 'state': True, 'pad': 'x' * 100_000}}
+
+        sender = threading.Thread(target=send_message, args=(left, message))
+        sender.start()
+        received = recv_message(right)
+        sender.join()
+        left.close()
+
+        assert received == message
+        assert recv_message(right) is None
+        right.close()
+
+    def test_ping(self, client):
+        """Test the simplest round trip"""
+        assert client.call('ping') == (200, {'status': 'success'})
+
+    def test_connection_is_reused(self, client):
+        """Test that consecutive calls share one pooled connection"""
+        client.call('ping')
+        client.call('ping')
+
+        assert len(client._idle) == 1
+
+    def test_control_drives_daemon_devices(self, client):
+        """Test that a control call switches the daemon's device and updates its state"""
+        status, body = client.call('control', device='water', state=True)
+
+        assert status == 200
+        assert body == {'status': 'success', 'device': 'water', 'state': True}
+        assert state_store.snapshot()[1]['devices']['water'] is True
+
+    def test_errors_keep_http_status(self, client):
+        """Test that operation errors come back as their HTTP status"""
+        assert client.call('control', device='fan', state=True)[0] == 404
+        assert client.call('launch')[0] == 400
+        assert client.call('control', colour='red')[0] == 400
+
+    def test_status_long_poll(self, client):
+        """Test that a status long-poll through the daemon wakes on a change"""
+        sequence = client.call('status')[1]['sequence']
+        timer = threading.Timer(0.05, state_store.set_sensors, args=({'water_level': sequence + 0.5},))
+        timer.start()
+
+        status, body = client.call('status', since=sequence, timeout=5)
+        timer.join()
+
+        assert status == 200
+        assert body['changed']
+        assert body['sequence'] > sequence
+
+    def test_listen_streams_events(self, client):
+        """Test that remote subscribers receive the daemon's events"""
+        last_id, _ = client.stream_start()
+        published = event_bus.publish('devices', {'devices': {'light': True}})
+
+        event = next(client.listen(last_id, ['devices'], heartbeat=1))
+
+        assert (event.id, event.topic, event.data) == (published.id, 'devices', {'devices': {'light': True}})
+
+    def test_daemon_down(self, path):
+        """Test that an unreachable daemon raises HardwareUnavailable"""
+        client = HardwareClient(path, timeout=0.5)
+
+        with pytest.raises(HardwareUnavailable):
+            client.call('ping')
+
+    def test_web_worker_uses_daemon(self, daemon, path):
+        """Test that a client-mode app serves hardware routes through the daemon"""
+        worker = create_app({'TESTING': True, 'SQLALCHEMY_DATABASE_URI': 'sqlite://', 'HARDWARE_SOCKET': path}, owns_hardware=False)
+
+        response = worker.test_client().post('/api/control', json={'device': 'light', 'state': False})
+
+        assert isinstance(worker.extensions['hardware'], HardwareClient)
+        assert response.json == {'status': 'success', 'device': 'light', 'state': False}
+        worker.extensions['hardware'].close()
+
+    def test_web_worker_reports_daemon_down(self, path):
+        """Test that hardware routes answer 503 while the daemon is down"""
+        worker = create_app({'TESTING': True, 'SQLALCHEMY_DATABASE_URI': 'sqlite://', 'HARDWARE_SOCKET': path}, owns_hardware=False)
+
+        response = worker.test_client().get('/api/status')
+
+        assert response.status_code == 503
+        assert response.json['status'] == 'error'
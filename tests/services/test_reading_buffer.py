@@ -0,0 +1,108 @@
+import pytest
+from unittest.mock import MagicMock
+from datetime import datetime, timedelta
+import threading
+import time
+import sys
+import os
+
+# Add the app directory to the path so we can import the ReadingBuffer class
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../../')))
+from app.models import SensorReading
+from app.services.ReadingBuffer import ReadingBuffer
+from app.hardware.input.HumiditySensor import HumiditySensor
+
+class TestReadingBuffer:
+
+    @pytest.fixture
+    def buffer(self, app):
+        """Setup fixture for reading buffer tests"""
+        reading_buffer = ReadingBuffer(max_size=100, flush_size=10, flush_interval=60)
+        reading_buffer.init_app(app)
+        yield reading_buffer
+        reading_buffer.stop()
+
+    def test_flush_writes_batch(self, buffer):
+        """Test that buffered readings are written in one flush"""
+        start = datetime(2025, 1, 1)
+        for i in range(5):
+            buffer.record('humidity', float(i), start + timedelta(seconds=i))
+
+        assert len(buffer) == 5
+        assert SensorReading.query.count() == 0
+
+        assert buffer.flush() == 5
+        assert len(buffer) == 0
+        assert SensorReading.query.count() == 5
+        assert buffer.flushed == 5
+
+    def test_flushed_count_excludes_duplicates(self, buffer):
+        """Test that a re-recorded sample is not counted as written"""
+        now = datetime(2025, 1, 1)
+        buffer.record('humidity', 50.0, now)
+        buffer.flush()
+        buffer.record('humidity', 51.0, now)
+        buffer.record('humidity', 52.0, now + timedelta(seconds=1))
+
+        assert buffer.flush() == 1
+        assert buffer.flushed == 2
+        assert SensorReading.query.count() == 2
+
+    def test_none_values_ignored(self, buffer):
+        """Test that failed reads are not buffered"""
+        assert buffer.record('humidity', None) is False
+        assert len(buffer) == 0
+
+    def test_size_threshold_triggers_flush(self, buffer):
+        """Test that reaching flush_size wakes the flusher"""
+        start = datetime(2025, 1, 1)
+        for i in range(10):
+            buffer.record('humidity', float(i), start + timedelta(seconds=i))
+
+        deadline = time.monotonic() + 2
+        while buffer.flushed < 10 and time.monotonic() < deadline:
+            time.sleep(0.01)
+        assert buffer.flushed == 10
+
+    def test_stop_flushes_remaining(self, buffer):
+        """Test that stopping the buffer writes out pending readings"""
+        buffer.record('humidity', 1.0)
+        buffer.record('temperature', 2.0)
+
+        buffer.stop()
+
+        assert SensorReading.query.count() == 2
+
+    def test_backpressure_drops_after_timeout(self):
+        """Test that a full buffer blocks producers and drops after the timeout"""
+        release = threading.Event()
+
+        def slow_insert(batch):
+            release.wait()
+            return len(batch)
+
+        store = MagicMock()
+        store.insert_many.side_effect = slow_insert
+        reading_buffer = ReadingBuffer(max_size=3, flush_size=3, flush_interval=60, store=store)
+
+        for i in range(3):
+            assert reading_buffer.record('humidity', float(i)) is True
+        # The flusher now holds the batch in flight, so the buffer is still full
+        assert reading_buffer.record('humidity', 3.0, timeout=0.05) is False
+        assert reading_buffer.dropped == 1
+
+        release.set()
+        assert reading_buffer.record('humidity', 4.0, timeout=2) is True
+        reading_buffer.stop()
+        assert reading_buffer.flushed == 4
+
+    def test_record_reading_from_sensor(self, buffer):
+        """Test recording a value straight from a sensor"""
+        sensor = HumiditySensor(4, debug_mode=True)
+
+        assert buffer.record_reading(sensor) is True
+        buffer.flush()
+
+        rows = SensorReading.query.order_by(SensorReading.sensor).all()
+        assert [row.sensor for row in rows] == ['air_temperature', 'humidity']
+        assert rows[0].timestamp == rows[1].timestamp
@@ -0,0 +1,123 @@
+import pytest
+from datetime import datetime, timedelta
+import sys
+import os
+
+# Add the app directory to the path so we can import the ReadingStore class
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../../')))
+from app.models import db, SensorReading, HumidityReading, TemperatureReading, Reading, ReadingRollup
+from app.services import ReadingStore as reading_store_module
+from app.services.ReadingStore import ReadingStore
+
+class TestReadingStore:
+
+    @pytest.fixture
+    def store(self, app):
+        """Setup fixture for reading store tests"""
+        return ReadingStore()
+
+    def test_insert_many(self, store):
+        """Test that samples are written to the narrow table"""
+        now = datetime(2025, 1, 1, 12, 0, 0)
+        count = store.insert_many([
+            ('humidity', now, 50.0),
+            ('temperature', now, 72.5),
+            ('humidity', now + timedelta(seconds=1), None),
+        ])
+
+        assert count == 2
+        assert SensorReading.query.count() == 2
+
+    def test_insert_many_ignores_duplicates(self, store):
+        """Test that a repeated (sensor, timestamp) key is ignored"""
+        now = datetime(2025, 1, 1, 12, 0, 0)
+        assert store.insert_many([('humidity', now, 50.0)]) == 1
+        assert store.insert_many([('humidity', now, 51.0)]) == 0
+
+        assert SensorReading.query.count() == 1
+        assert SensorReading.query.first().value == 50.0
+
+    def test_duplicates_are_not_rolled_up(self, store):
+        """Test that a re-submitted sample does not change the rollups"""
+        now = datetime(2025, 1, 1, 12, 0, 0)
+        store.insert_many([('humidity', now, 50.0)])
+        store.insert_many([('humidity', now, 90.0), ('humidity', now + timedelta(seconds=1), 52.0)])
+
+        rollup = ReadingRollup.query.filter_by(sensor='humidity', resolution=60).one()
+        assert rollup.count == 2
+        assert rollup.maximum == 52.0
+        assert rollup.mean == pytest.approx(51.0)
+        assert rollup.last == 52.0
+
+    @pytest.mark.parametrize('returning', [True, False])
+    def test_insert_with_and_without_returning(self, store, monkeypatch, returning):
+        """Test that SQLite before 3.35, without RETURNING, counts and rolls up only new rows"""
+        monkeypatch.setattr(reading_store_module, 'SQLITE_RETURNING', returning)
+        now = datetime(2025, 1, 1, 12, 0, 0)
+        store.insert_many([('humidity', now, 50.0)])
+
+        count = store.insert_many([
+            ('humidity', now, 90.0),
+            ('humidity', now + timedelta(seconds=1), 52.0),
+            ('humidity', now + timedelta(seconds=1), 99.0),
+            ('temperature', now, 70.0),
+        ])
+
+        assert count == 2
+        assert SensorReading.query.count() == 3
+        assert SensorReading.query.filter_by(sensor='humidity', timestamp=now + timedelta(seconds=1)).one().value == 52.0
+        rollup = ReadingRollup.query.filter_by(sensor='humidity', resolution=60).one()
+        assert rollup.count == 2
+        assert rollup.maximum == 52.0
+
+    def test_query_range(self, store):
+        """Test querying a time range for several sensors"""
+        start = datetime(2025, 1, 1, 12, 0, 0)
+        samples = []
+        for i in range(10):
+            samples.append(('humidity', start + timedelta(minutes=i), float(i)))
+            samples.append(('temperature', start + timedelta(minutes=i), float(i * 10)))
+        store.insert_many(samples)
+
+        result = store.query_range(
+            ['humidity', 'temperature'],
+            start + timedelta(minutes=2),
+            start + timedelta(minutes=4)
+        )
+
+        assert [value for _, value in result['humidity']] == [2.0, 3.0, 4.0]
+        assert [value for _, value in result['temperature']] == [20.0, 30.0, 40.0]
+
+    def test_query_range_limit(self, store):
+        """Test limiting the number of samples per sensor"""
+        start = datetime(2025, 1, 1, 12, 0, 0)
+        store.insert_many([('humidity', start + timedelta(seconds=i), float(i)) for i in range(5)])
+
+        result = store.query_range('humidity', start, start + timedelta(minutes=1), limit=2)
+
+        assert [value for _, value in result['humidity']] == [0.0, 1.0]
+
+    def test_latest(self, store):
+        """Test getting the most recent sample"""
+        start = datetime(2025, 1, 1, 12, 0, 0)
+        store.insert_many([('humidity', start + timedelta(seconds=i), float(i)) for i in range(5)])
+
+        assert store.latest('humidity') == (start + timedelta(seconds=4), 4.0)
+        assert store.latest('temperature') is None
+
+    def test_migrate_legacy_readings(self, store):
+        """Test moving joined-table readings into the narrow table"""
+        start = datetime(2025, 1, 1, 12, 0, 0)
+        for i in range(7):
+            db.session.add(HumidityReading(timestamp=start + timedelta(minutes=i), humidity=40.0 + i))
+        db.session.add(TemperatureReading(timestamp=start, temperature=70.0))
+        db.session.commit()
+
+        migrated = store.migrate_legacy_readings(chunk_size=3)
+
+        assert migrated == 8
+        assert Reading.query.count() == 0
+        assert len(store.query_range('humidity', start, start + timedelta(hours=1))['humidity']) == 7
+        assert store.latest('temperature') == (start, 70.0)
+        # Running the migration again is a no-op
+        assert store.migrate_legacy_readings() == 0
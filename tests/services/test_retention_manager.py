@@ -0,0 +1,109 @@
+import pytest
+from datetime import datetime, timedelta
+import sys
+import os
+import sqlite3
+
+# Add the app directory to the path so we can import the RetentionManager class
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../../')))
+from app import create_app
+from app.models import db, SensorReading, ReadingRollup, Log
+from app.services.ReadingStore import ReadingStore
+from app.services.RetentionManager import RetentionManager
+from sqlalchemy import text
+
+NOW = datetime(2025, 6, 1)
+
+class TestRetentionManager:
+
+    @pytest.fixture
+    def manager(self):
+        """Setup fixture for retention manager tests"""
+        return RetentionManager(
+            policies={
+                'raw': timedelta(days=7),
+                '1m': timedelta(days=90),
+                '1h': None,
+                '1d': None,
+                'log': timedelta(days=30),
+            },
+            chunk_size=10,
+            pause=0
+        )
+
+    def populate(self, days, per_day):
+        """Insert readings and log rows spread over the given number of days before NOW"""
+        samples = []
+        for day in range(days):
+            for i in range(per_day):
+                timestamp = NOW - timedelta(days=day, minutes=i + 1)
+                samples.append(('humidity', timestamp, float(i)))
+                samples.append(('temperature', timestamp, float(i)))
+            db.session.add(Log(event_code=101, timestamp=NOW - timedelta(days=day, minutes=1)))
+        db.session.commit()
+        ReadingStore().insert_many(samples)
+
+    def test_prunes_raw_readings(self, app, manager):
+        """Test that raw readings older than the policy are deleted in chunks"""
+        self.populate(days=10, per_day=25)
+
+        deleted = manager.run_pass(NOW)
+
+        # Days 7, 8 and 9 are past the 7-day cutoff for both sensors
+        assert deleted['raw'] == 3 * 25 * 2
+        oldest = db.session.query(db.func.min(SensorReading.timestamp)).scalar()
+        assert oldest >= NOW - timedelta(days=7)
+
+    def test_keeps_rollups_without_policy(self, app, manager):
+        """Test that hourly and daily rollups with no policy are kept forever"""
+        self.populate(days=120, per_day=1)
+        hourly = ReadingRollup.query.filter_by(resolution=3600).count()
+
+        deleted = manager.run_pass(NOW)
+
+        assert deleted['1m'] == (120 - 90) * 2
+        assert '1h' not in deleted
+        assert ReadingRollup.query.filter_by(resolution=3600).count() == hourly
+
+    def test_prunes_log(self, app, manager):
+        """Test that Log rows older than the policy are deleted"""
+        self.populate(days=45, per_day=1)
+
+        deleted = manager.run_pass(NOW)
+
+        assert deleted['log'] == 45 - 30
+        assert Log.query.count() == 30
+
+    def test_reclaims_space(self, tmp_path, manager):
+        """Test that a pass shrinks the database file"""
+        path = tmp_path / 'retention.db'
+        app = create_app({'TESTING': True, 'SQLALCHEMY_DATABASE_URI': f'sqlite:///{path}'})
+        with app.app_context():
+            self.populate(days=30, per_day=200)
+            db.session.execute(text("PRAGMA wal_checkpoint(TRUNCATE)")).fetchall()
+            size_before = os.path.getsize(path)
+
+            manager.run_pass(NOW)
+
+            assert db.session.execute(text("PRAGMA auto_vacuum")).scalar() == 2
+            assert db.session.execute(text("PRAGMA freelist_count")).scalar() == 0
+            assert os.path.getsize(path) < size_before
+            db.session.remove()
+
+    def test_legacy_database_converted_offline_only(self, tmp_path, manager):
+        """Test that a pass never runs the full VACUUM a legacy database needs"""
+        path = tmp_path / 'legacy.db'
+        connection = sqlite3.connect(path)
+        connection.execute("CREATE TABLE legacy (id INTEGER PRIMARY KEY)")
+        connection.close()
+        app = create_app({'TESTING': True, 'SQLALCHEMY_DATABASE_URI': f'sqlite:///{path}'})
+        with app.app_context():
+            manager.run_pass(NOW)
+
+            assert not manager.reclaim_space()
+            assert db.session.execute(text("PRAGMA auto_vacuum")).scalar() == 0
+
+            assert manager.convert_to_incremental()
+            assert db.session.execute(text("PRAGMA auto_vacuum")).scalar() == 2
+            assert manager.reclaim_space()
+            db.session.remove()
@@ -0,0 +1,98 @@
+import pytest
+from datetime import datetime, timedelta
+import random
+import sys
+import os
+
+# Add the app directory to the path so we can import the RollupManager class
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../../')))
+from app.models import ReadingRollup
+from app.services.ReadingStore import ReadingStore
+from app.services.RollupManager import RollupManager, RESOLUTIONS, bucket_start
+
+class TestRollupManager:
+
+    @pytest.fixture
+    def samples(self, app):
+        """Setup fixture inserting three days of readings for two sensors in several batches"""
+        rng = random.Random(42)
+        start = datetime(2025, 1, 1, 0, 0, 0)
+        samples = []
+        for sensor in ('humidity', 'soil_moisture'):
+            timestamp = start
+            while timestamp < start + timedelta(days=3):
+                samples.append((sensor, timestamp, round(rng.uniform(0, 100), 2)))
+                timestamp += timedelta(seconds=rng.randint(5, 600))
+        # Out-of-order batches exercise the incremental merge, including "last"
+        rng.shuffle(samples)
+        store = ReadingStore()
+        for i in range(0, len(samples), 97):
+            store.insert_many(samples[i:i + 97])
+        return samples
+
+    def brute_force(self, samples, width):
+        """Aggregate raw samples per (sensor, bucket) the slow way"""
+        groups = {}
+        for sensor, timestamp, value in samples:
+            groups.setdefault((sensor, bucket_start(timestamp, width)), []).append((timestamp, value))
+        expected = {}
+        for key, points in groups.items():
+            values = [value for _, value in points]
+            expected[key] = {
+                'count': len(values),
+                'min': min(values),
+                'max': max(values),
+                'mean': sum(values) / len(values),
+                'last': max(points)[1],
+            }
+        return expected
+
+    def test_bucket_start(self):
+        """Test aligning timestamps to bucket boundaries"""
+        timestamp = datetime(2025, 1, 1, 13, 47, 31, 500)
+        assert bucket_start(timestamp, 60) == datetime(2025, 1, 1, 13, 47)
+        assert bucket_start(timestamp, 3600) == datetime(2025, 1, 1, 13, 0)
+        assert bucket_start(timestamp, 86400) == datetime(2025, 1, 1)
+
+    @pytest.mark.parametrize('width', list(RESOLUTIONS.values()))
+    def test_rollups_match_brute_force(self, samples, width):
+        """Test that incrementally maintained rollups equal a full aggregation"""
+        expected = self.brute_force(samples, width)
+        rollups = ReadingRollup.query.filter_by(resolution=width).all()
+
+        assert len(rollups) == len(expected)
+        for rollup in rollups:
+            want = expected[(rollup.sensor, rollup.bucket)]
+            assert rollup.count == want['count']
+            assert rollup.minimum == want['min']
+            assert rollup.maximum == want['max']
+            assert rollup.mean == pytest.approx(want['mean'])
+            assert rollup.last == want['last']
+
+    def test_plan_picks_raw_for_small_ranges(self, samples):
+        """Test that raw samples are used when they fit the budget"""
+        start = datetime(2025, 1, 1, 12, 0, 0)
+        assert RollupManager().plan('humidity', start, start + timedelta(minutes=30), 500) is None
+
+    def test_plan_picks_finest_resolution_within_budget(self, samples):
+        """Test that the planner only coarsens as far as the budget requires"""
+        rollups = RollupManager()
+        start = datetime(2025, 1, 1)
+
+        assert rollups.plan('humidity', start, start + timedelta(days=3), 100) == 3600
+        assert rollups.plan('humidity', start, start + timedelta(days=3), 10) == 86400
+
+        # Dense sampling: raw points overflow the budget but minute buckets fit
+        ReadingStore().insert_many([('light', start + timedelta(seconds=10 * i), 1.0) for i in range(360)])
+        assert rollups.plan('light', start, start + timedelta(hours=1), 100) == 60
+
+    def test_query_returns_points_within_budget(self, samples):
+        """Test querying chart points through the planner"""
+        start = datetime(2025, 1, 1)
+        end = start + timedelta(days=3)
+
+        resolution, points = RollupManager().query('humidity', start, end, max_points=100)
+
+        assert resolution == 3600
+        assert 0 < len(points) <= 100
+        assert sum(point['count'] for point in points) == len([s for s in samples if s[0] == 'humidity'])
@@ -0,0 +1,51 @@
+import pytest
+import sys
+import os
+
+# Add the app directory to the path so we can import the RuntimeCheckpointer class
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../../')))
+from app.models import db, RelayRuntime
+from app.services.DeviceRegistry import DeviceRegistry
+from app.services.ConfigCache import config_cache
+from app.services.RuntimeCheckpointer import RuntimeCheckpointer
+
+class TestRuntimeCheckpointer:
+
+    @pytest.fixture
+    def registry(self, app):
+        """Setup fixture for runtime checkpointer tests"""
+        config_cache.update({'light_pin': 27, 'water_pin': 18, 'atomizer_pin': 17, 'heater_pin': 23})
+        return DeviceRegistry(debug_mode=True)
+
+    def test_checkpoint_writes_changed_runtimes(self, registry):
+        """Test that only devices whose runtime changed are written"""
+        checkpointer = RuntimeCheckpointer(registry)
+        registry.get('light').runtime = 120.0
+
+        assert checkpointer.checkpoint() == 4
+        assert db.session.get(RelayRuntime, 'light').runtime == 120.0
+
+        registry.get('heater').runtime = 30.0
+
+        assert checkpointer.checkpoint() == 1
+        assert checkpointer.checkpoint() == 0
+
+    def test_restore_survives_restart(self, registry):
+        """Test that a new registry picks up the checkpointed runtimes"""
+        registry.get('water').runtime = 75.5
+        RuntimeCheckpointer(registry).checkpoint()
+
+        restarted = DeviceRegistry(debug_mode=True)
+        restored = RuntimeCheckpointer(restarted).restore()
+
+        assert restored['water'] == 75.5
+        assert restarted.get('water').get_usage_stats()['runtime'] == 75.5
+
+    def test_reload_keeps_counters(self, registry):
+        """Test that rebuilding the devices does not reset their runtime"""
+        registry.get('light').runtime = 10.0
+
+        config_cache.update({'light_pin': 22})
+        registry.reload()
+
+        assert registry.get('light').runtime == 10.0
@@ -0,0 +1,83 @@
+import pytest
+from functools import partial
+import threading
+import time
+import sys
+import os
+
+# Add the app directory to the path so we can import the StateStore class
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../../')))
+from app.services.StateStore import StateStore
+from app.hardware.output.Light import Light
+
+class TestStateStore:
+
+    @pytest.fixture
+    def store(self):
+        """Setup fixture for state store tests"""
+        return StateStore()
+
+    def test_changes_bump_sequence(self, store):
+        """Test that device and sensor changes each bump the sequence"""
+        store.set_device('light', True)
+        store.set_sensors({'humidity': 55.0})
+
+        sequence, state = store.snapshot()
+        assert sequence == 2
+        assert state['devices'] == {'light': True}
+        assert state['sensors']['humidity']['value'] == 55.0
+
+    def test_unchanged_writes_are_ignored(self, store):
+        """Test that rewriting the same values does not bump the sequence"""
+        store.set_device('light', True)
+        store.set_sensors({'humidity': 55.0})
+
+        store.set_device('light', True)
+        store.set_sensors({'humidity': 55.0})
+        store.remove_device('water')
+
+        assert store.sequence == 2
+
+    def test_wait_returns_immediately_when_behind(self, store):
+        """Test that a caller with an old sequence gets the state without waiting"""
+        store.set_device('light', True)
+
+        started = time.monotonic()
+        sequence, state, changed = store.wait_for_change(0, timeout=5)
+
+        assert changed
+        assert sequence == 1
+        assert time.monotonic() - started < 1
+
+    def test_wait_times_out_without_change(self, store):
+        """Test that an idle long-poll returns unchanged after the timeout"""
+        store.set_device('light', True)
+
+        sequence, _, changed = store.wait_for_change(store.sequence, timeout=0.05)
+
+        assert not changed
+        assert sequence == 1
+
+    def test_wait_wakes_on_change(self, store):
+        """Test that a waiting reader wakes as soon as another thread writes"""
+        timer = threading.Timer(0.05, store.set_device, args=('water', True))
+        timer.start()
+
+        started = time.monotonic()
+        _, state, changed = store.wait_for_change(0, timeout=5)
+        timer.join()
+
+        assert changed
+        assert state['devices'] == {'water': True}
+        assert time.monotonic() - started < 1
+
+    def test_relay_publishes_its_state(self, store):
+        """Test that a relay's change callback keeps the store in step"""
+        light = Light(1, debug_mode=True)
+        light.on_change = partial(store.set_device, 'light')
+
+        light.turn_on()
+        assert store.snapshot()[1]['devices'] == {'light': True}
+
+        light.turn_off()
+        assert store.snapshot()[1]['devices'] == {'light': False}
@@ -0,0 +1,302 @@
+import pytest
+import sys
+import os
+
+# Add the app directory to the path so we can import the server blueprint
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../')))
+from app.services.ConfigCache import config_cache
+from app.services.DeviceRegistry import device_registry
+from app.services.ActuationScheduler import actuation_scheduler
+from app.services.StateStore import state_store
+from app.services.EventBus import event_bus
+
+class TestServer:
+
+    @pytest.fixture
+    def client(self, app):
+        """Setup fixture for route tests"""
+        return app.test_client()
+
+    def test_get_config_sets_etag(self, client):
+        """Test that the config endpoint returns the snapshot with an ETag"""
+        response = client.get('/api/config')
+
+        assert response.status_code == 200
+        assert response.headers['ETag'] == f'"{config_cache.get_tagged()[0]}"'
+        assert response.json['light_pin'] == 1
+
+    def test_get_config_not_modified(self, client):
+        """Test that a matching If-None-Match returns 304 without a body"""
+        etag = client.get('/api/config').headers['ETag']
+
+        response = client.get('/api/config', headers={'If-None-Match': etag})
+
+        assert response.status_code == 304
+        assert response.data == b''
+
+    def test_update_config_changes_etag(self, client):
+        """Test that a POST invalidates cached ETags"""
+        etag = client.get('/api/config').headers['ETag']
+
+        assert client.post('/api/config', json={'water_pin': 12}).json == {'success': True}
+
+        response = client.get('/api/config', headers={'If-None-Match': etag})
+        assert response.status_code == 200
+        assert response.headers['ETag'] != etag
+        assert response.json['water_pin'] == 12
+
+    def test_get_config_sees_other_workers(self, client):
+        """Test that a change saved by another worker reaches this worker's config reads"""
+        from app.services.ConfigCache import ConfigCache
+        etag = client.get('/api/config').headers['ETag']
+
+        ConfigCache().update({'atomizer_pin': 19})
+
+        response = client.get('/api/config', headers={'If-None-Match': etag})
+        assert response.status_code == 200
+        assert response.headers['ETag'] != etag
+        assert response.json['atomizer_pin'] == 19
+        assert b'value="19"' in client.get('/config').data
+
+    def test_config_page_renders(self, client):
+        """Test that the config page renders from the cached snapshot"""
+        client.post('/api/config', json={'heater_pin': 21})
+
+        response = client.get('/config')
+
+        assert response.status_code == 200
+        assert b'value="21"' in response.data
+
+    def test_control_uses_shared_device(self, client):
+        """Test that control drives the registry's long-lived device"""
+        light = device_registry.get('light')
+
+        response = client.post('/api/control', json={'device': 'light', 'state': True})
+
+        assert response.json == {'status': 'success', 'device': 'light', 'state': True}
+        assert device_registry.get('light') is light
+
+    def test_control_unknown_device(self, client):
+        """Test that an unknown device is reported instead of silently ignored"""
+        response = client.post('/api/control', json={'device': 'fan', 'state': True})
+
+        assert response.status_code == 404
+        assert response.json['status'] == 'error'
+
+    def test_schedule_returns_job_handle(self, client):
+        """Test that a timed run is accepted without holding the request"""
+        response = client.post('/api/schedule', json={'device': 'water', 'duration': 30})
+
+        assert response.status_code == 202
+        job_id = response.json['job']['id']
+        assert client.get(f'/api/schedule/{job_id}').json['job']['device'] == 'water'
+
+        response = client.post(f'/api/schedule/{job_id}/cancel')
+        assert response.json['job']['status'] == 'cancelled'
+        actuation_scheduler.stop()
+
+    def test_schedule_rejects_non_finite_durations(self, client):
+        """Test that NaN and infinite durations are refused instead of hanging the scheduler"""
+        assert client.post('/api/schedule', json={'device': 'water', 'duration': 'nan'}).status_code == 400
+        assert client.post('/api/schedule', json={'device': 'water', 'duration': 'inf'}).status_code == 400
+
+        job_id = client.post('/api/schedule', json={'device': 'water', 'duration': 30}).json['job']['id']
+        response = client.post(f'/api/schedule/{job_id}/extend', json={'seconds': 'inf'})
+
+        assert response.status_code == 400
+        assert client.post(f'/api/schedule/{job_id}/cancel').json['job']['status'] == 'cancelled'
+        actuation_scheduler.stop()
+
+    def test_device_test_runs_in_background(self, client):
+        """Test that an output device test is accepted and can be polled"""
+        response = client.post('/api/test', json={'device': 'light', 'pin': 5})
+
+        assert response.status_code == 202
+        job_id = response.json['job']['id']
+        polled = client.get(f'/api/test/{job_id}')
+        assert polled.status_code == 200
+        assert polled.json['job']['device'] == 'light'
+        actuation_scheduler.stop()
+
+    def test_device_test_uses_shared_device(self, client):
+        """Test that testing a configured device pulses the registry's component"""
+        config_cache.update({'light_pin': 27, 'water_pin': 18})
+        light = device_registry.get('light')
+
+        response = client.post('/api/test', json={'device': 'light', 'pin': 27})
+
+        assert response.status_code == 202
+        job = actuation_scheduler.active_jobs()[0]
+        assert job.device == 'light'
+        assert job.component is light
+        actuation_scheduler.stop()
+
+    def test_device_test_conflicts(self, client):
+        """Test that a device with a scheduled job or a pin owned by another device is not tested"""
+        config_cache.update({'light_pin': 27, 'water_pin': 18})
+        client.post('/api/schedule', json={'device': 'light', 'duration': 30})
+
+        assert client.post('/api/test', json={'device': 'light', 'pin': 27}).status_code == 409
+        assert client.post('/api/test', json={'device': 'heater', 'pin': 18}).status_code == 409
+        actuation_scheduler.stop()
+
+    def test_device_test_unknown_job(self, client):
+        """Test that polling an unknown test job returns 404"""
+        assert client.get('/api/test/999999').status_code == 404
+
+    def test_acquisition_stats(self, client):
+        """Test that the acquisition endpoint reports every polled sensor"""
+        response = client.get('/api/acquisition')
+
+        assert response.status_code == 200
+        assert response.json['sensors']['ultrasonic_sensor']['period'] == 1.0
+
+    def test_snapshot_is_bounded(self, client):
+        """Test that the snapshot endpoint caps the requested deadline"""
+        response = client.get('/api/snapshot?timeout=600')
+
+        assert response.status_code == 200
+        assert response.json['timeout'] == 10.0
+
+        response = client.get('/api/snapshot?timeout=-5')
+
+        assert response.status_code == 200
+        assert response.json['timeout'] == 0.0
+
+        response = client.get('/api/snapshot?timeout=nan')
+
+        assert response.json['timeout'] == 2.0
+
+    def test_status_reflects_control(self, client):
+        """Test that the status endpoint reports the live device states"""
+        client.post('/api/control', json={'device': 'water', 'state': True})
+
+        response = client.get('/api/status')
+
+        assert response.status_code == 200
+        assert response.json['devices']['water'] is True
+        assert response.json['sequence'] == state_store.sequence
+
+    def test_status_long_poll_times_out(self, client):
+        """Test that a long-poll with the current sequence returns unchanged"""
+        sequence = client.get('/api/status').json['sequence']
+
+        response = client.get(f'/api/status?since={sequence}&timeout=0.1')
+
+        assert response.status_code == 200
+        assert response.json['changed'] is False
+        assert response.json['sequence'] == sequence
+
+    def test_status_long_poll_ignores_bad_timeout(self, client, monkeypatch):
+        """Test that a NaN or negative long-poll timeout falls back to the bounded default"""
+        monkeypatch.setattr('app.server.STATUS_LONG_POLL_TIMEOUT', 0.1)
+        sequence = client.get('/api/status').json['sequence']
+
+        for timeout in ('nan', '-1'):
+            response = client.get(f'/api/status?since={sequence}&timeout={timeout}')
+
+            assert response.status_code == 200
+            assert response.json['changed'] is False
+
+    def test_stream_sends_state_then_changes(self, client):
+        """Test that a new stream starts with the full state and follows device changes"""
+        response = client.get('/api/stream?topics=devices', buffered=False)
+        chunks = iter(response.response)
+
+        assert response.mimetype == 'text/event-stream'
+        assert next(chunks).startswith(b'retry:')
+        assert next(chunks).startswith(b'event: state\n')
+
+        state_store.set_device('heater', not state_store.snapshot()[1]['devices'].get('heater', False))
+        assert b'event: devices' in next(chunks)
+        response.close()
+
+    def test_stream_resumes_from_last_event_id(self, client):
+        """Test that a reconnecting client gets the events it missed"""
+        event = event_bus.publish('devices', {'device': 'light', 'state': True})
+
+        response = client.get('/api/stream', headers={'Last-Event-ID': str(event.id - 1)}, buffered=False)
+        chunks = iter(response.response)
+
+        next(chunks)
+        assert next(chunks).startswith(f'id: {event.id}\n'.encode())
+        response.close()
+
+    def test_stream_after_restart(self, app, client):
+        """Test that streams are served again after the hardware services are closed and reinitialized"""
+        from app.services.HardwareService import hardware_service
+        hardware_service.close()
+        assert event_bus.closed
+
+        hardware_service.init_app(app)
+        event = event_bus.publish('devices', {'device': 'light', 'state': True})
+        response = client.get('/api/stream', headers={'Last-Event-ID': str(event.id - 1)}, buffered=False)
+        chunks = iter(response.response)
+
+        next(chunks)
+        assert next(chunks).startswith(f'id: {event.id}\n'.encode())
+        response.close()
+
+    def test_bulk_control(self, client):
+        """Test that several devices are switched in one request"""
+        client.post('/api/control/bulk', json={'states': {'light': False, 'heater': False}})
+
+        response = client.post('/api/control/bulk', json={'states': {'light': True, 'heater': True}})
+
+        assert response.status_code == 200
+        assert response.json['changed'] == {'light': True, 'heater': True}
+        assert client.get('/api/status').json['devices']['heater'] is True
+
+    def test_bulk_control_rejects_unknown_device(self, client):
+        """Test that an unknown device fails the whole bulk request"""
+        response = client.post('/api/control/bulk', json={'states': {'light': True, 'fan': True}})
+
+        assert response.status_code == 404
+        assert response.json['device'] == 'fan'
+
+    def test_bulk_control_requires_states(self, client):
+        """Test that a bulk request without states is rejected"""
+        assert client.post('/api/control/bulk', json={'light': True}).status_code == 400
+
+    def test_usage_counts_manual_control(self, client):
+        """Test that switching a device through the API is reflected in its usage"""
+        client.post('/api/control', json={'device': 'light', 'state': True})
+        client.post('/api/control', json={'device': 'light', 'state': False})
+
+        response = client.get('/api/usage')
+
+        assert response.status_code == 200
+        light = response.json['usage']['light']
+        assert light['state'] is False
+        assert light['switches'] == 1
+        assert light['runtime'] > 0
+        assert set(light['duty_cycle']) == {'1h', '24h'}
+
+    def test_rules_lists_control_counters(self, client):
+        """Test that the control rules are reported with their counters"""
+        response = client.get('/api/rules')
+
+        assert response.status_code == 200
+        assert response.json['control']['running'] is False
+        assert isinstance(response.json['control']['rules'], list)
+
+    def test_level_control(self, client):
+        """Test that a level turns a relay-mode light on"""
+        response = client.post('/api/control/level', json={'device': 'light', 'level': 0.5, 'ramp': 2})
+
+        assert response.status_code == 200
+        assert response.json == {'status': 'success', 'device': 'light', 'level': 1.0, 'pwm': False}
+
+    def test_level_control_validates_level(self, client):
+        """Test that levels outside 0..1 and undimmable devices are rejected"""
+        assert client.post('/api/control/level', json={'device': 'light', 'level': 2}).status_code == 400
+        assert client.post('/api/control/level', json={'device': 'light'}).status_code == 400
+        assert client.post('/api/control/level', json={'device': 'water', 'level': 0.5}).status_code == 404
+
+    def test_control_rejects_non_finite_numbers(self, client):
+        """Test that NaN and infinite levels, ramps and inrush delays are refused"""
+        assert client.post('/api/control/level', json={'device': 'light', 'level': 'nan'}).status_code == 400
+        assert client.post('/api/control/level', json={'device': 'light', 'level': 0, 'ramp': 'nan'}).status_code == 400
+        assert client.post('/api/control/level', json={'device': 'light', 'level': 0, 'ramp': 'inf'}).status_code == 400
+        response = client.post('/api/control/bulk', json={'states': {'light': False}, 'inrush_delay': 'nan'})
+        assert response.status_code == 400
@@ -0,0 +1,14 @@
+from app import create_app
+from app.services.RetentionManager import retention_manager
+
+# One-time conversion of a database created before incremental auto-vacuum
+# was enabled. The full VACUUM rewrites the file under an exclusive lock, so
+# stop the web server and the hardware daemon before running:
+#     python vacuum.py
+# Afterwards the retention manager returns free space in small steps.
+app = create_app(owns_hardware=False)
+
+if __name__ == '__main__':
+    with app.app_context():
+        if not retention_manager.convert_to_incremental():
+            print("Database already uses incremental auto-vacuum")